@@ -0,0 +1,40 @@
+"""add indexes for hot lookups
+
+Revision ID: 3c1f0e2a9d47
+Revises: 7ba4c7cb9a47
+Create Date: 2026-10-17 10:12:41.381920
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '3c1f0e2a9d47'
+down_revision: Union[str, None] = '7ba4c7cb9a47'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_index('ix_timesheet_employee_id_week_start', 'timesheet', ['employee_id', 'week_start'], unique=False)
+    op.create_index('ix_timesheet_manager_email_status', 'timesheet', ['manager_email', 'status'], unique=False)
+    op.create_index('ix_timeentry_timesheet_id_date', 'timeentry', ['timesheet_id', 'date'], unique=False)
+    op.create_index(op.f('ix_breakperiod_time_entry_id'), 'breakperiod', ['time_entry_id'], unique=False)
+    op.create_index('ix_timeoff_manager_email_status', 'timeoff', ['manager_email', 'status'], unique=False)
+    op.create_index(op.f('ix_timeoff_employee_id'), 'timeoff', ['employee_id'], unique=False)
+    op.create_index(op.f('ix_employee_client_id'), 'employee', ['client_id'], unique=False)
+    op.create_index(op.f('ix_auditlog_timesheet_id'), 'auditlog', ['timesheet_id'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index(op.f('ix_auditlog_timesheet_id'), table_name='auditlog')
+    op.drop_index(op.f('ix_employee_client_id'), table_name='employee')
+    op.drop_index(op.f('ix_timeoff_employee_id'), table_name='timeoff')
+    op.drop_index('ix_timeoff_manager_email_status', table_name='timeoff')
+    op.drop_index(op.f('ix_breakperiod_time_entry_id'), table_name='breakperiod')
+    op.drop_index('ix_timeentry_timesheet_id_date', table_name='timeentry')
+    op.drop_index('ix_timesheet_manager_email_status', table_name='timesheet')
+    op.drop_index('ix_timesheet_employee_id_week_start', table_name='timesheet')
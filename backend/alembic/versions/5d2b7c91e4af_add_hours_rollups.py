@@ -0,0 +1,89 @@
+"""add hours rollups
+
+Revision ID: 5d2b7c91e4af
+Revises: 3c1f0e2a9d47
+Create Date: 2026-10-17 11:04:19.527113
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '5d2b7c91e4af'
+down_revision: Union[str, None] = '3c1f0e2a9d47'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# Hours in a single entry above this are counted as overtime (as of this revision)
+REGULAR_MINUTES_PER_ENTRY = 8 * 60
+
+
+def _minutes_of_day(dialect: str, column: str) -> str:
+    """hour * 60 + minute of a TIME column; SQLite stores TIME as 'HH:MM:SS' text"""
+    if dialect == "sqlite":
+        return f"(CAST(substr({column}, 1, 2) AS INTEGER) * 60 + CAST(substr({column}, 4, 2) AS INTEGER))"
+    return f"(CAST(EXTRACT(HOUR FROM {column}) AS INTEGER) * 60 + CAST(EXTRACT(MINUTE FROM {column}) AS INTEGER))"
+
+
+def _backfill(bind) -> None:
+    """
+    Populate the rollups of existing timesheets in plain SQL, frozen at this revision
+
+    Each entry's worked minutes are (out - in) minus its breaks, split per entry into
+    up to REGULAR_MINUTES_PER_ENTRY regular minutes and the rest overtime; days are
+    summed per (timesheet, date) and timesheets from their days.
+    """
+    dialect = bind.dialect.name
+    worked = (
+        f"{_minutes_of_day(dialect, 'e.out_time')} - {_minutes_of_day(dialect, 'e.in_time')}"
+        f" - COALESCE(SUM({_minutes_of_day(dialect, 'b.end_time')} - {_minutes_of_day(dialect, 'b.start_time')}), 0)"
+    )
+    limit = REGULAR_MINUTES_PER_ENTRY
+    bind.execute(sa.text(f"""
+        INSERT INTO timesheetday (timesheet_id, date, total_minutes, regular_minutes, overtime_minutes)
+        SELECT timesheet_id, date,
+               SUM(minutes),
+               SUM(CASE WHEN minutes > {limit} THEN {limit} ELSE minutes END),
+               SUM(CASE WHEN minutes > {limit} THEN minutes - {limit} ELSE 0 END)
+        FROM (
+            SELECT e.timesheet_id AS timesheet_id, e.date AS date, {worked} AS minutes
+            FROM timeentry e LEFT JOIN breakperiod b ON b.time_entry_id = e.id
+            GROUP BY e.id, e.timesheet_id, e.date, e.in_time, e.out_time
+        ) entry_minutes
+        GROUP BY timesheet_id, date
+    """))
+    bind.execute(sa.text("""
+        UPDATE timesheet SET
+            total_minutes = COALESCE((SELECT SUM(d.total_minutes) FROM timesheetday d WHERE d.timesheet_id = timesheet.id), 0),
+            regular_minutes = COALESCE((SELECT SUM(d.regular_minutes) FROM timesheetday d WHERE d.timesheet_id = timesheet.id), 0),
+            overtime_minutes = COALESCE((SELECT SUM(d.overtime_minutes) FROM timesheetday d WHERE d.timesheet_id = timesheet.id), 0)
+    """))
+
+
+def upgrade() -> None:
+    op.add_column('timesheet', sa.Column('total_minutes', sa.Integer(), server_default='0', nullable=False))
+    op.add_column('timesheet', sa.Column('regular_minutes', sa.Integer(), server_default='0', nullable=False))
+    op.add_column('timesheet', sa.Column('overtime_minutes', sa.Integer(), server_default='0', nullable=False))
+    op.create_table('timesheetday',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('timesheet_id', sa.Integer(), nullable=False),
+    sa.Column('date', sa.Date(), nullable=False),
+    sa.Column('total_minutes', sa.Integer(), nullable=False),
+    sa.Column('regular_minutes', sa.Integer(), nullable=False),
+    sa.Column('overtime_minutes', sa.Integer(), nullable=False),
+    sa.ForeignKeyConstraint(['timesheet_id'], ['timesheet.id'], ),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('timesheet_id', 'date', name='uq_timesheetday_timesheet_id_date')
+    )
+    # Populate the rollups for existing timesheets
+    _backfill(op.get_bind())
+
+
+def downgrade() -> None:
+    op.drop_table('timesheetday')
+    op.drop_column('timesheet', 'overtime_minutes')
+    op.drop_column('timesheet', 'regular_minutes')
+    op.drop_column('timesheet', 'total_minutes')
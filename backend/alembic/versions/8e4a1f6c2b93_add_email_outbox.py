@@ -0,0 +1,43 @@
+"""add email outbox
+
+Revision ID: 8e4a1f6c2b93
+Revises: 5d2b7c91e4af
+Create Date: 2026-10-17 14:02:37.218406
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+import sqlmodel
+
+
+# revision identifiers, used by Alembic.
+revision: str = '8e4a1f6c2b93'
+down_revision: Union[str, None] = '5d2b7c91e4af'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table('emailoutbox',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('recipients', sqlmodel.sql.sqltypes.AutoString(length=2000), nullable=False),
+    sa.Column('subject', sqlmodel.sql.sqltypes.AutoString(length=500), nullable=False),
+    sa.Column('body', sqlmodel.sql.sqltypes.AutoString(), nullable=False),
+    sa.Column('html', sqlmodel.sql.sqltypes.AutoString(), nullable=True),
+    sa.Column('status', sa.Enum('PENDING', 'SENT', 'FAILED', name='outboxstatus'), nullable=False),
+    sa.Column('attempts', sa.Integer(), nullable=False),
+    sa.Column('next_attempt_at', sa.DateTime(), nullable=False),
+    sa.Column('last_error', sqlmodel.sql.sqltypes.AutoString(length=1000), nullable=True),
+    sa.Column('created_at', sa.DateTime(), nullable=False),
+    sa.Column('sent_at', sa.DateTime(), nullable=True),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index('ix_emailoutbox_status_next_attempt_at', 'emailoutbox', ['status', 'next_attempt_at'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_emailoutbox_status_next_attempt_at', table_name='emailoutbox')
+    op.drop_table('emailoutbox')
+    sa.Enum(name='outboxstatus').drop(op.get_bind(), checkfirst=True)
@@ -0,0 +1,31 @@
+"""cover status and rollups in the timesheet employee index
+
+Revision ID: 9d2c4a7e1b56
+Revises: f5b1d8e3a640
+Create Date: 2026-10-17 21:36:08.402117
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '9d2c4a7e1b56'
+down_revision: Union[str, None] = 'f5b1d8e3a640'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+COVERED = ['employee_id', 'week_start', 'status', 'total_minutes', 'regular_minutes', 'overtime_minutes']
+
+
+def upgrade() -> None:
+    # Same leading columns, so the per-employee lookups it served are unchanged
+    op.drop_index('ix_timesheet_employee_id_week_start', table_name='timesheet')
+    op.create_index('ix_timesheet_employee_id_week_start', 'timesheet', COVERED, unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_timesheet_employee_id_week_start', table_name='timesheet')
+    op.create_index('ix_timesheet_employee_id_week_start', 'timesheet', ['employee_id', 'week_start'], unique=False)
@@ -0,0 +1,44 @@
+"""add manager digest notifications
+
+Revision ID: a71c3e9d5f02
+Revises: 8e4a1f6c2b93
+Create Date: 2026-10-17 15:21:08.664012
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+import sqlmodel
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a71c3e9d5f02'
+down_revision: Union[str, None] = '8e4a1f6c2b93'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+notification_mode = sa.Enum('IMMEDIATE', 'DIGEST', name='notificationmode')
+
+
+def upgrade() -> None:
+    notification_mode.create(op.get_bind(), checkfirst=True)
+    op.add_column('employee', sa.Column('notification_mode', notification_mode, server_default='IMMEDIATE', nullable=False))
+    op.add_column('employee', sa.Column('digest_interval_minutes', sa.Integer(), server_default='60', nullable=False))
+    op.create_table('pendingnotification',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('manager_email', sqlmodel.sql.sqltypes.AutoString(length=255), nullable=False),
+    sa.Column('kind', sqlmodel.sql.sqltypes.AutoString(length=50), nullable=False),
+    sa.Column('summary', sqlmodel.sql.sqltypes.AutoString(length=500), nullable=False),
+    sa.Column('created_at', sa.DateTime(), nullable=False),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_pendingnotification_manager_email'), 'pendingnotification', ['manager_email'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index(op.f('ix_pendingnotification_manager_email'), table_name='pendingnotification')
+    op.drop_table('pendingnotification')
+    op.drop_column('employee', 'digest_interval_minutes')
+    op.drop_column('employee', 'notification_mode')
+    notification_mode.drop(op.get_bind(), checkfirst=True)
@@ -0,0 +1,31 @@
+"""add time off audit events
+
+Revision ID: c4e8b2d61a37
+Revises: a71c3e9d5f02
+Create Date: 2026-10-17 16:02:41.318207
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c4e8b2d61a37'
+down_revision: Union[str, None] = 'a71c3e9d5f02'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Enum values are stored by name; only PostgreSQL has a native type to extend
+    if op.get_bind().dialect.name != 'postgresql':
+        return
+    with op.get_context().autocommit_block():
+        op.execute("ALTER TYPE auditeventtype ADD VALUE IF NOT EXISTS 'TIME_OFF_APPROVED'")
+        op.execute("ALTER TYPE auditeventtype ADD VALUE IF NOT EXISTS 'TIME_OFF_REJECTED'")
+
+
+def downgrade() -> None:
+    # PostgreSQL can't drop enum values; the unused ones are harmless
+    pass
@@ -0,0 +1,100 @@
+"""add per-client overtime rules and double time rollups
+
+Revision ID: c81f4d2e7a35
+Revises: 9d2c4a7e1b56
+Create Date: 2026-10-17 23:12:40.815322
+
+Stored splits are per entry until the day totals are split again under the
+overtime rules. That rewrites every timesheet, so it is not done inside this
+migration's transaction; after `alembic upgrade head` run
+
+    python -m app.utils.rollups recompute
+
+which commits per batch (`python -m app.utils.rollups verify` reports the
+timesheets still to do). Downgrading restores the per-entry splits.
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c81f4d2e7a35'
+down_revision: Union[str, None] = '9d2c4a7e1b56'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+COVERED = ['employee_id', 'week_start', 'status', 'total_minutes', 'regular_minutes', 'overtime_minutes']
+
+# Hours in a single entry above this were overtime before the rules (see 5d2b7c91e4af)
+REGULAR_MINUTES_PER_ENTRY = 8 * 60
+
+
+def _minutes_of_day(dialect: str, column: str) -> str:
+    """hour * 60 + minute of a TIME column; SQLite stores TIME as 'HH:MM:SS' text"""
+    if dialect == "sqlite":
+        return f"(CAST(substr({column}, 1, 2) AS INTEGER) * 60 + CAST(substr({column}, 4, 2) AS INTEGER))"
+    return f"(CAST(EXTRACT(HOUR FROM {column}) AS INTEGER) * 60 + CAST(EXTRACT(MINUTE FROM {column}) AS INTEGER))"
+
+
+def _restore_entry_splits(bind) -> None:
+    """Rebuild timesheetday and the timesheet totals with the per-entry split of the previous revision, in plain SQL"""
+    dialect = bind.dialect.name
+    worked = (
+        f"{_minutes_of_day(dialect, 'e.out_time')} - {_minutes_of_day(dialect, 'e.in_time')}"
+        f" - COALESCE(SUM({_minutes_of_day(dialect, 'b.end_time')} - {_minutes_of_day(dialect, 'b.start_time')}), 0)"
+    )
+    limit = REGULAR_MINUTES_PER_ENTRY
+    bind.execute(sa.text("DELETE FROM timesheetday"))
+    bind.execute(sa.text(f"""
+        INSERT INTO timesheetday (timesheet_id, date, total_minutes, regular_minutes, overtime_minutes)
+        SELECT timesheet_id, date,
+               SUM(minutes),
+               SUM(CASE WHEN minutes > {limit} THEN {limit} ELSE minutes END),
+               SUM(CASE WHEN minutes > {limit} THEN minutes - {limit} ELSE 0 END)
+        FROM (
+            SELECT e.timesheet_id AS timesheet_id, e.date AS date, {worked} AS minutes
+            FROM timeentry e LEFT JOIN breakperiod b ON b.time_entry_id = e.id
+            GROUP BY e.id, e.timesheet_id, e.date, e.in_time, e.out_time
+        ) entry_minutes
+        GROUP BY timesheet_id, date
+    """))
+    bind.execute(sa.text("""
+        UPDATE timesheet SET
+            total_minutes = COALESCE((SELECT SUM(d.total_minutes) FROM timesheetday d WHERE d.timesheet_id = timesheet.id), 0),
+            regular_minutes = COALESCE((SELECT SUM(d.regular_minutes) FROM timesheetday d WHERE d.timesheet_id = timesheet.id), 0),
+            overtime_minutes = COALESCE((SELECT SUM(d.overtime_minutes) FROM timesheetday d WHERE d.timesheet_id = timesheet.id), 0)
+    """))
+
+
+def upgrade() -> None:
+    op.create_table('overtimerules',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('client_id', sa.Integer(), nullable=False),
+    sa.Column('daily_overtime_after_minutes', sa.Integer(), nullable=True),
+    sa.Column('daily_double_time_after_minutes', sa.Integer(), nullable=True),
+    sa.Column('weekly_overtime_after_minutes', sa.Integer(), nullable=True),
+    sa.Column('seventh_day', sa.Boolean(), nullable=False),
+    sa.Column('seventh_day_double_time_after_minutes', sa.Integer(), nullable=True),
+    sa.Column('created_at', sa.DateTime(), nullable=False),
+    sa.Column('updated_at', sa.DateTime(), nullable=False),
+    sa.ForeignKeyConstraint(['client_id'], ['client.id'], ),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('client_id')
+    )
+    op.add_column('timesheet', sa.Column('double_time_minutes', sa.Integer(), server_default='0', nullable=False))
+    op.add_column('timesheetday', sa.Column('double_time_minutes', sa.Integer(), server_default='0', nullable=False))
+    # The utilization report sums double time too; keep the index covering it
+    op.drop_index('ix_timesheet_employee_id_week_start', table_name='timesheet')
+    op.create_index('ix_timesheet_employee_id_week_start', 'timesheet', COVERED + ['double_time_minutes'], unique=False)
+    # Splitting under the rules is left to `python -m app.utils.rollups recompute` (see above)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_timesheet_employee_id_week_start', table_name='timesheet')
+    op.create_index('ix_timesheet_employee_id_week_start', 'timesheet', COVERED, unique=False)
+    op.drop_column('timesheetday', 'double_time_minutes')
+    op.drop_column('timesheet', 'double_time_minutes')
+    op.drop_table('overtimerules')
+    _restore_entry_splits(op.get_bind())
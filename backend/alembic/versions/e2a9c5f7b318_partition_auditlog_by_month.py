@@ -0,0 +1,88 @@
+"""partition auditlog by month
+
+Revision ID: e2a9c5f7b318
+Revises: c4e8b2d61a37
+Create Date: 2026-10-17 17:11:52.604913
+
+"""
+from datetime import date, datetime
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e2a9c5f7b318'
+down_revision: Union[str, None] = 'c4e8b2d61a37'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# Monthly partitions created past the current month; the retention job keeps adding them
+MONTHS_AHEAD = 3
+
+
+def _add_months(month: date, months: int) -> date:
+    index = month.year * 12 + month.month - 1 + months
+    return date(index // 12, index % 12 + 1, 1)
+
+
+def _create_indexes() -> None:
+    op.create_index(op.f('ix_auditlog_timesheet_id'), 'auditlog', ['timesheet_id'], unique=False)
+    op.create_index('ix_auditlog_timestamp_id', 'auditlog', ['timestamp', 'id'], unique=False)
+    op.create_index('ix_auditlog_actor_id_timestamp', 'auditlog', ['actor_id', 'timestamp'], unique=False)
+    op.create_index('ix_auditlog_event_timestamp', 'auditlog', ['event', 'timestamp'], unique=False)
+
+
+def _create_foreign_keys() -> None:
+    op.create_foreign_key('auditlog_timesheet_id_fkey', 'auditlog', 'timesheet', ['timesheet_id'], ['id'])
+    op.create_foreign_key('auditlog_actor_id_fkey', 'auditlog', 'employee', ['actor_id'], ['id'])
+
+
+def upgrade() -> None:
+    bind = op.get_bind()
+    if bind.dialect.name != 'postgresql':
+        op.create_index('ix_auditlog_timestamp_id', 'auditlog', ['timestamp', 'id'], unique=False)
+        op.create_index('ix_auditlog_actor_id_timestamp', 'auditlog', ['actor_id', 'timestamp'], unique=False)
+        op.create_index('ix_auditlog_event_timestamp', 'auditlog', ['event', 'timestamp'], unique=False)
+        return
+    # Rebuild as a table partitioned by RANGE (timestamp); the partition key must be part of the primary key
+    op.execute("ALTER TABLE auditlog RENAME TO auditlog_unpartitioned")
+    op.execute("ALTER TABLE auditlog_unpartitioned RENAME CONSTRAINT auditlog_pkey TO auditlog_unpartitioned_pkey")
+    op.execute(
+        "CREATE TABLE auditlog (LIKE auditlog_unpartitioned INCLUDING DEFAULTS, PRIMARY KEY (id, timestamp)) "
+        "PARTITION BY RANGE (timestamp)"
+    )
+    # Keep the id sequence when the old table is dropped
+    op.execute("ALTER SEQUENCE auditlog_id_seq OWNED BY auditlog.id")
+    op.execute("CREATE TABLE auditlog_default PARTITION OF auditlog DEFAULT")
+    oldest = bind.scalar(sa.text("SELECT min(timestamp) FROM auditlog_unpartitioned")) or datetime.utcnow()
+    month, last = date(oldest.year, oldest.month, 1), _add_months(date.today().replace(day=1), MONTHS_AHEAD)
+    while month <= last:
+        op.execute(
+            f"CREATE TABLE auditlog_y{month.year}m{month.month:02d} PARTITION OF auditlog "
+            f"FOR VALUES FROM ('{month.isoformat()}') TO ('{_add_months(month, 1).isoformat()}')"
+        )
+        month = _add_months(month, 1)
+    op.execute("INSERT INTO auditlog SELECT * FROM auditlog_unpartitioned")
+    op.execute("DROP TABLE auditlog_unpartitioned")
+    _create_foreign_keys()
+    _create_indexes()
+
+
+def downgrade() -> None:
+    bind = op.get_bind()
+    if bind.dialect.name != 'postgresql':
+        op.drop_index('ix_auditlog_event_timestamp', table_name='auditlog')
+        op.drop_index('ix_auditlog_actor_id_timestamp', table_name='auditlog')
+        op.drop_index('ix_auditlog_timestamp_id', table_name='auditlog')
+        return
+    op.execute("ALTER TABLE auditlog RENAME TO auditlog_partitioned")
+    op.execute("ALTER TABLE auditlog_partitioned RENAME CONSTRAINT auditlog_pkey TO auditlog_partitioned_pkey")
+    op.execute("CREATE TABLE auditlog (LIKE auditlog_partitioned INCLUDING DEFAULTS, PRIMARY KEY (id))")
+    op.execute("ALTER SEQUENCE auditlog_id_seq OWNED BY auditlog.id")
+    op.execute("INSERT INTO auditlog SELECT * FROM auditlog_partitioned")
+    # Drops every partition with it
+    op.execute("DROP TABLE auditlog_partitioned")
+    _create_foreign_keys()
+    op.create_index(op.f('ix_auditlog_timesheet_id'), 'auditlog', ['timesheet_id'], unique=False)
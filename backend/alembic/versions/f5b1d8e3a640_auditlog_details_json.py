@@ -0,0 +1,57 @@
+"""auditlog details as native json
+
+Revision ID: f5b1d8e3a640
+Revises: e2a9c5f7b318
+Create Date: 2026-10-17 18:04:19.772035
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'f5b1d8e3a640'
+down_revision: Union[str, None] = 'e2a9c5f7b318'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# The expressions AuditLog.detail_int / detail_text compile to; an index is only used for the identical expression
+EXPRESSIONS = {
+    'postgresql': {
+        'employee_id': "(CAST(details ->> 'employee_id' AS INTEGER))",
+        'previous_status': "(CAST(details ->> 'previous_status' AS VARCHAR))",
+    },
+    'sqlite': {
+        'employee_id': "JSON_EXTRACT(details, '$.\"employee_id\"')",
+        'previous_status': "JSON_EXTRACT(details, '$.\"previous_status\"')",
+    },
+}
+
+
+def upgrade() -> None:
+    dialect = op.get_bind().dialect.name
+    if dialect == 'postgresql':
+        # Legacy details that aren't valid JSON are kept under raw_details
+        op.execute(
+            "CREATE FUNCTION pg_temp.audit_details_jsonb(value text) RETURNS jsonb LANGUAGE plpgsql IMMUTABLE AS $$ "
+            "BEGIN RETURN value::jsonb; EXCEPTION WHEN others THEN RETURN jsonb_build_object('raw_details', value); END $$"
+        )
+        op.alter_column('auditlog', 'details', type_=postgresql.JSONB(), existing_nullable=True,
+                        postgresql_using='pg_temp.audit_details_jsonb(details)')
+    elif dialect == 'sqlite':
+        # JSON1 keeps documents as text, so the column stays; only invalid legacy values need wrapping
+        op.execute("UPDATE auditlog SET details = json_object('raw_details', details) WHERE details IS NOT NULL AND NOT json_valid(details)")
+    for key, expression in EXPRESSIONS.get(dialect, {}).items():
+        op.create_index(f'ix_auditlog_details_{key}', 'auditlog', [sa.text(expression)], unique=False)
+
+
+def downgrade() -> None:
+    dialect = op.get_bind().dialect.name
+    for key in EXPRESSIONS.get(dialect, {}):
+        op.drop_index(f'ix_auditlog_details_{key}', table_name='auditlog')
+    if dialect == 'postgresql':
+        op.alter_column('auditlog', 'details', type_=sa.String(length=2000), existing_nullable=True,
+                        postgresql_using='left(details::text, 2000)')
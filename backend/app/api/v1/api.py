@@ -1,6 +1,6 @@
 from fastapi import APIRouter
 
-from app.api.v1.endpoints import auth, test_auth, employee, timesheet, time_off, client
+from app.api.v1.endpoints import auth, test_auth, employee, timesheet, time_off, client, export, audit, approvals, events, reports
 
 api_router = APIRouter()
 
@@ -17,4 +17,14 @@ api_router.include_router(timesheet.router, prefix="/timesheets", tags=["timeshe
 # Include time off endpoints
 api_router.include_router(time_off.router, prefix="/time_off", tags=["time_off"])
 # Include client endpoints
-api_router.include_router(client.router, prefix="/clients", tags=["clients"]) 
\ No newline at end of file
+api_router.include_router(client.router, prefix="/clients", tags=["clients"])
+# Include export endpoints
+api_router.include_router(export.router, prefix="/exports", tags=["exports"])
+# Include audit log endpoints
+api_router.include_router(audit.router, prefix="/audit", tags=["audit"])
+# Include approval queue endpoints
+api_router.include_router(approvals.router, prefix="/approvals", tags=["approvals"])
+# Include change event stream
+api_router.include_router(events.router, prefix="/events", tags=["events"])
+# Include report endpoints
+api_router.include_router(reports.router, prefix="/reports", tags=["reports"])
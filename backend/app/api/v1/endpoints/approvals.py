@@ -0,0 +1,72 @@
+from fastapi import APIRouter, Depends, HTTPException, status
+from sqlalchemy import select, func, literal, null, union_all, Date
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.session import get_async_db
+from app.core.dependencies import get_current_user_async
+from app.models.employee import Employee, EmployeeRole
+from app.models.timesheet import Timesheet, TimesheetStatus
+from app.models.time_off import TimeOff, TimeOffStatus
+from app.schemas.approvals import ApprovalQueueSummary, SUMMARY_TIMESHEETS, SUMMARY_TIME_OFF
+
+router = APIRouter(tags=["approvals"])
+
+def _summary_query(manager_email: str):
+    """
+    The manager's queue as grouped rows, in one statement
+
+    Submitted timesheets are grouped by (employee, week) with hours summed from the
+    rollup columns; pending time off, whose ranges don't follow weeks, by employee.
+    Both filters are served by the (manager_email, status) indexes.
+    """
+    timesheets = (
+        select(
+            literal(SUMMARY_TIMESHEETS).label("kind"),
+            Timesheet.employee_id.label("employee_id"),
+            Employee.full_name.label("full_name"),
+            Employee.email.label("email"),
+            Timesheet.week_start.label("week_start"),
+            func.count().label("items"),
+            func.sum(Timesheet.regular_minutes).label("regular_minutes"),
+            func.sum(Timesheet.overtime_minutes).label("overtime_minutes"),
+            func.sum(Timesheet.double_time_minutes).label("double_time_minutes"),
+            func.sum(Timesheet.total_minutes).label("total_minutes"),
+        )
+        .join(Employee, Employee.id == Timesheet.employee_id)
+        .where(Timesheet.manager_email == manager_email, Timesheet.status == TimesheetStatus.SUBMITTED.value)
+        .group_by(Timesheet.employee_id, Employee.full_name, Employee.email, Timesheet.week_start)
+    )
+    time_off = (
+        select(
+            literal(SUMMARY_TIME_OFF),
+            TimeOff.employee_id,
+            Employee.full_name,
+            Employee.email,
+            null().cast(Date),
+            func.count(),
+            literal(0),
+            literal(0),
+            literal(0),
+            literal(0),
+        )
+        .join(Employee, Employee.id == TimeOff.employee_id)
+        .where(TimeOff.manager_email == manager_email, TimeOff.status == TimeOffStatus.PENDING)
+        .group_by(TimeOff.employee_id, Employee.full_name, Employee.email)
+    )
+    return union_all(timesheets, time_off)
+
+# Approval queue summary
+@router.get("/summary", response_model=ApprovalQueueSummary)
+async def approval_summary(db: AsyncSession = Depends(get_async_db), current_user: Employee = Depends(get_current_user_async)):
+    """
+    Counts and hours of the caller's approval queue, grouped by employee and week
+
+    **Logic:**
+    1. Managers only; the queue is what was submitted to their email
+    2. One grouped query over the rollup columns; no timesheet, entry or time off rows are loaded
+    3. Details per group come from the list endpoints' employee_id / week_start filters
+    """
+    if current_user.role != EmployeeRole.CLIENT_MANAGER:
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Only managers have an approval queue")
+    rows = (await db.execute(_summary_query(current_user.email))).all()
+    return ApprovalQueueSummary.from_rows(rows)
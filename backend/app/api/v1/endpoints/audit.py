@@ -0,0 +1,92 @@
+from fastapi import APIRouter, Depends, HTTPException, status, Query, Response
+from sqlalchemy import select, tuple_
+from sqlalchemy.ext.asyncio import AsyncSession
+from starlette.concurrency import run_in_threadpool
+from typing import List, Optional
+from datetime import datetime
+
+from app.config import settings
+from app.core.session import get_async_db
+from app.core.dependencies import get_current_user_async
+from app.models.audit_log import AuditEventType, AuditLog
+from app.models.employee import Employee, EmployeeRole
+from app.schemas.audit import AuditLogResponse
+from app.utils.audit_archive import find_archived
+from app.utils.pagination import PageParams, decode_time_cursor, encode_time_cursor, NEXT_CURSOR_HEADER
+
+router = APIRouter(tags=["audit"])
+
+def _scope(query, current_user: Employee):
+    """Admins see every event, managers the events of their client's employees"""
+    if current_user.role == EmployeeRole.DEW_ADMIN:
+        return query
+    if current_user.role == EmployeeRole.CLIENT_MANAGER:
+        return query.where(AuditLog.actor_id.in_(select(Employee.id).where(Employee.client_id == current_user.client_id)))
+    raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Not authorized")
+
+# List audit events
+@router.get("/", response_model=List[AuditLogResponse])
+async def list_audit_events(
+    response: Response,
+    event: Optional[AuditEventType] = None,
+    actor_id: Optional[int] = None,
+    actor_email: Optional[str] = None,
+    timesheet_id: Optional[int] = None,
+    employee_id: Optional[int] = Query(None, description="Events about this employee (details.employee_id)"),
+    previous_status: Optional[str] = Query(None, description="Status transitions from this status (details.previous_status)"),
+    since: Optional[datetime] = Query(None, description="Only events at or after this time"),
+    until: Optional[datetime] = Query(None, description="Only events before this time"),
+    page: PageParams = Depends(),
+    db: AsyncSession = Depends(get_async_db),
+    current_user: Employee = Depends(get_current_user_async)
+):
+    """
+    Audit events, newest first, in keyset pages
+
+    **Logic:**
+    1. Scope to the caller (admins: all, managers: their client's employees)
+    2. Apply the event, actor, timesheet, detail and time range filters (detail keys use their expression indexes)
+    3. Order by (timestamp, id) descending and seek past the cursor's (timestamp, id), served by ix_auditlog_timestamp_id
+    4. Return limit rows (default 100) and the next cursor in X-Next-Cursor
+    """
+    query = _scope(select(AuditLog), current_user)
+    if event is not None:
+        query = query.where(AuditLog.event == event)
+    if actor_id is not None:
+        query = query.where(AuditLog.actor_id == actor_id)
+    if actor_email is not None:
+        query = query.where(AuditLog.actor_email == actor_email)
+    if timesheet_id is not None:
+        query = query.where(AuditLog.timesheet_id == timesheet_id)
+    if employee_id is not None:
+        query = query.where(AuditLog.detail_int("employee_id") == employee_id)
+    if previous_status is not None:
+        query = query.where(AuditLog.detail_text("previous_status") == previous_status)
+    if since is not None:
+        query = query.where(AuditLog.timestamp >= since)
+    if until is not None:
+        query = query.where(AuditLog.timestamp < until)
+    if page.cursor:
+        query = query.where(tuple_(AuditLog.timestamp, AuditLog.id) < tuple_(*decode_time_cursor(page.cursor)))
+    limit = page.limit
+    logs = (await db.scalars(query.order_by(AuditLog.timestamp.desc(), AuditLog.id.desc()).limit(limit + 1))).all()
+    if len(logs) > limit:
+        logs = logs[:limit]
+        response.headers[NEXT_CURSOR_HEADER] = encode_time_cursor(logs[-1].timestamp, logs[-1].id)
+    return [AuditLogResponse.from_log(log) for log in logs]
+
+# Get audit event by ID (archived months included)
+@router.get("/{audit_id}", response_model=AuditLogResponse)
+async def get_audit_event(audit_id: int, db: AsyncSession = Depends(get_async_db), current_user: Employee = Depends(get_current_user_async)):
+    log = (await db.scalars(_scope(select(AuditLog), current_user).where(AuditLog.id == audit_id))).first()
+    if log:
+        return AuditLogResponse.from_log(log)
+    # Not in the database: past retention, look it up in the archive's sidecar indexes
+    record = await run_in_threadpool(find_archived, settings.audit_archive_dir, audit_id)
+    if record and current_user.role == EmployeeRole.CLIENT_MANAGER:
+        actor_client = await db.scalar(select(Employee.client_id).where(Employee.id == record["actor_id"]))
+        if record["actor_id"] is None or actor_client != current_user.client_id:
+            record = None
+    if not record:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Audit event not found")
+    return AuditLogResponse(**record, archived=True)
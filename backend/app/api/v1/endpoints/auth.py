@@ -1,15 +1,18 @@
 from datetime import timedelta
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Request, status
 from sqlalchemy.orm import Session
+from starlette.concurrency import run_in_threadpool
 
 from app.core.session import get_db
 from app.schemas.auth import LoginRequest, SignupRequest, TokenResponse, UserResponse
 from app.utils.auth import (
     authenticate_user,
     create_access_token,
-    get_password_hash,
+    hash_password,
     get_current_user
 )
+from app.core.audit import audit
+from app.models.audit_log import AuditEventType
 from app.models.employee import Employee, EmployeeRole
 from app.models.client import Client
 from app.config import settings
@@ -18,19 +21,21 @@ router = APIRouter()
 
 
 @router.post("/login", response_model=TokenResponse)
-def login(login_data: LoginRequest, db: Session = Depends(get_db)):
+async def login(login_data: LoginRequest, request: Request, db: Session = Depends(get_db)):
     """
     Authenticate user and return JWT token
     
     **Logic:**
     1. Validate email/password format
     2. Check if user exists in database
-    3. Verify password hash matches
-    4. Generate JWT token with user info
-    5. Return token with user details
+    3. Verify password hash matches (on the password pool; 503 with Retry-After when saturated)
+    4. Rehash the password if the configured bcrypt cost changed
+    5. Generate JWT token with user info
+    6. Record the login in the audit trail
+    7. Return token with user details
     """
     # Authenticate user
-    user = authenticate_user(db, login_data.email, login_data.password)
+    user = await authenticate_user(db, login_data.email, login_data.password)
     if not user:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
@@ -51,6 +56,7 @@ def login(login_data: LoginRequest, db: Session = Depends(get_db)):
         data={"sub": str(user.id)},
         expires_delta=access_token_expires
     )
+    audit(AuditEventType.USER_LOGIN, user, request)
     
     return TokenResponse(
         access_token=access_token,
@@ -64,7 +70,7 @@ def login(login_data: LoginRequest, db: Session = Depends(get_db)):
 
 
 @router.post("/signup", response_model=TokenResponse)
-def signup(signup_data: SignupRequest, db: Session = Depends(get_db)):
+async def signup(signup_data: SignupRequest, request: Request, db: Session = Depends(get_db)):
     """
     Register new user and return JWT token
     
@@ -72,11 +78,17 @@ def signup(signup_data: SignupRequest, db: Session = Depends(get_db)):
     1. Validate signup data (email, password, role, client_id)
     2. Check if email already exists
     3. Validate client_id exists (for non-admin roles)
-    4. Hash password securely
-    5. Create user in database
+    4. Hash password securely (on the password pool; 503 with Retry-After when saturated)
+    5. Create user in database and record it in the audit trail
     6. Generate JWT token
     7. Return token with user details
     """
+    await run_in_threadpool(_validate_signup, db, signup_data)
+    hashed_password = await hash_password(signup_data.password)
+    return await run_in_threadpool(_create_user, db, signup_data, hashed_password, request)
+
+
+def _validate_signup(db: Session, signup_data: SignupRequest):
     # Check if email already exists
     existing_user = db.query(Employee).filter(Employee.email == signup_data.email).first()
     if existing_user:
@@ -99,9 +111,10 @@ def signup(signup_data: SignupRequest, db: Session = Depends(get_db)):
                 status_code=status.HTTP_400_BAD_REQUEST,
                 detail="Invalid client ID"
             )
-    
+
+
+def _create_user(db: Session, signup_data: SignupRequest, hashed_password: str, request: Request) -> TokenResponse:
     # Create new user
-    hashed_password = get_password_hash(signup_data.password)
     db_user = Employee(
         email=signup_data.email,
         password_hash=hashed_password,
@@ -114,6 +127,7 @@ def signup(signup_data: SignupRequest, db: Session = Depends(get_db)):
     db.add(db_user)
     db.commit()
     db.refresh(db_user)
+    audit(AuditEventType.EMPLOYEE_CREATED, db_user, request, signup=True)
     
     # Create access token
     access_token_expires = timedelta(minutes=settings.access_token_expire_minutes)
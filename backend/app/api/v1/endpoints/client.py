@@ -1,30 +1,56 @@
-from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
-from typing import List
+from fastapi import APIRouter, Depends, HTTPException, status, Request, Response
+from dataclasses import asdict
+from datetime import datetime
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import List, Optional
 
-from app.core.session import get_db
+from app.core.session import get_async_db
 from app.models.client import Client
 from app.models.employee import Employee, EmployeeRole
-from app.schemas.client import ClientCreateRequest, ClientUpdateRequest, ClientResponse
-from app.core.dependencies import get_current_user
+from app.models.overtime_rules import OvertimeRules
+from app.schemas.client import ClientCreateRequest, ClientUpdateRequest, ClientResponse, OvertimeRulesRequest, OvertimeRulesResponse
+from app.core.dependencies import get_current_user_async
+from app.utils.pagination import PageParams, paginate, NEXT_CURSOR_HEADER
+from app.utils.etag import scope_etag, conditional_response
+from app.core.audit import audit
+from app.models.audit_log import AuditEventType
+from app.utils.overtime import OvertimeRuleSet
+from app.core.rollup_jobs import recompute_queue
 
 router = APIRouter(prefix="/clients", tags=["clients"])
 
 # List clients
 @router.get("/", response_model=List[ClientResponse])
-def list_clients(db: Session = Depends(get_db), current_user: Employee = Depends(get_current_user)):
+async def list_clients(
+    request: Request,
+    response: Response,
+    code: Optional[str] = None,
+    page: PageParams = Depends(),
+    db: AsyncSession = Depends(get_async_db),
+    current_user: Employee = Depends(get_current_user_async)
+):
+    query = select(Client)
     if current_user.role == EmployeeRole.DEW_ADMIN:
-        clients = db.query(Client).all()
+        pass
     elif current_user.role == EmployeeRole.CLIENT_MANAGER:
-        clients = db.query(Client).filter(Client.id == current_user.client_id).all()
+        query = query.where(Client.id == current_user.client_id)
     else:
         raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Not authorized")
+    if code is not None:
+        query = query.where(Client.code == code)
+    not_modified = conditional_response(request, response, await scope_etag(db, request, current_user, query, Client.updated_at))
+    if not_modified:
+        return not_modified
+    clients, next_cursor = await paginate(db, query, Client.id, page)
+    if next_cursor:
+        response.headers[NEXT_CURSOR_HEADER] = next_cursor
     return clients
 
 # Get client by ID
 @router.get("/{client_id}", response_model=ClientResponse)
-def get_client(client_id: int, db: Session = Depends(get_db), current_user: Employee = Depends(get_current_user)):
-    client = db.query(Client).filter(Client.id == client_id).first()
+async def get_client(client_id: int, db: AsyncSession = Depends(get_async_db), current_user: Employee = Depends(get_current_user_async)):
+    client = await db.get(Client, client_id)
     if not client:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Client not found")
     if current_user.role == EmployeeRole.DEW_ADMIN:
@@ -38,45 +64,108 @@ def get_client(client_id: int, db: Session = Depends(get_db), current_user: Empl
 
 # Create client
 @router.post("/", response_model=ClientResponse, status_code=status.HTTP_201_CREATED)
-def create_client(data: ClientCreateRequest, db: Session = Depends(get_db), current_user: Employee = Depends(get_current_user)):
+async def create_client(data: ClientCreateRequest, request: Request, db: AsyncSession = Depends(get_async_db), current_user: Employee = Depends(get_current_user_async)):
     if current_user.role != EmployeeRole.DEW_ADMIN:
         raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Not authorized")
     # Check for unique code
-    if db.query(Client).filter(Client.code == data.code).first():
+    if (await db.scalars(select(Client).where(Client.code == data.code))).first():
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Client code already exists")
     client = Client(name=data.name, code=data.code)
     db.add(client)
-    db.commit()
-    db.refresh(client)
+    await db.commit()
+    await db.refresh(client)
+    audit(AuditEventType.CLIENT_CREATED, current_user, request, client_id=client.id, code=client.code)
     return client
 
 # Update client
 @router.put("/{client_id}", response_model=ClientResponse)
-def update_client(client_id: int, data: ClientUpdateRequest, db: Session = Depends(get_db), current_user: Employee = Depends(get_current_user)):
+async def update_client(client_id: int, data: ClientUpdateRequest, request: Request, db: AsyncSession = Depends(get_async_db), current_user: Employee = Depends(get_current_user_async)):
     if current_user.role != EmployeeRole.DEW_ADMIN:
         raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Not authorized")
-    client = db.query(Client).filter(Client.id == client_id).first()
+    client = await db.get(Client, client_id)
     if not client:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Client not found")
     # Check for unique code if updating
     if data.code and data.code != client.code:
-        if db.query(Client).filter(Client.code == data.code).first():
+        if (await db.scalars(select(Client).where(Client.code == data.code))).first():
             raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Client code already exists")
         client.code = data.code
     if data.name:
         client.name = data.name
-    db.commit()
-    db.refresh(client)
+    client.updated_at = datetime.utcnow()
+    await db.commit()
+    await db.refresh(client)
+    audit(AuditEventType.CLIENT_UPDATED, current_user, request, client_id=client.id, fields=sorted(data.dict(exclude_unset=True)))
     return client
 
 # Delete client
 @router.delete("/{client_id}", status_code=status.HTTP_204_NO_CONTENT)
-def delete_client(client_id: int, db: Session = Depends(get_db), current_user: Employee = Depends(get_current_user)):
+async def delete_client(client_id: int, request: Request, db: AsyncSession = Depends(get_async_db), current_user: Employee = Depends(get_current_user_async)):
     if current_user.role != EmployeeRole.DEW_ADMIN:
         raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Not authorized")
-    client = db.query(Client).filter(Client.id == client_id).first()
+    client = await db.get(Client, client_id)
     if not client:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Client not found")
-    db.delete(client)
-    db.commit()
-    return None 
\ No newline at end of file
+    code = client.code
+    await db.delete(client)
+    await db.commit()
+    audit(AuditEventType.CLIENT_DELETED, current_user, request, client_id=client_id, code=code)
+    return None
+
+def _rules_response(client_id: int, rules: Optional[OvertimeRules], recompute_queued: bool = False) -> OvertimeRulesResponse:
+    return OvertimeRulesResponse(
+        client_id=client_id,
+        is_default=rules is None,
+        updated_at=rules.updated_at if rules else None,
+        recompute_queued=recompute_queued,
+        **asdict(OvertimeRuleSet.of(rules)),
+    )
+
+# Get a client's overtime rules
+@router.get("/{client_id}/overtime-rules", response_model=OvertimeRulesResponse)
+async def get_overtime_rules(client_id: int, db: AsyncSession = Depends(get_async_db), current_user: Employee = Depends(get_current_user_async)):
+    """
+    The overtime rules hours of the client's timesheets are split by
+
+    **Logic:**
+    1. Admins see any client; managers only their own; others get 403
+    2. A client without rules of its own gets the defaults, with is_default set
+    """
+    if current_user.role == EmployeeRole.CLIENT_MANAGER:
+        if client_id != current_user.client_id:
+            raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Not authorized")
+    elif current_user.role != EmployeeRole.DEW_ADMIN:
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Not authorized")
+    if not await db.get(Client, client_id):
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Client not found")
+    rules = (await db.scalars(select(OvertimeRules).where(OvertimeRules.client_id == client_id))).first()
+    return _rules_response(client_id, rules)
+
+# Set a client's overtime rules
+@router.put("/{client_id}/overtime-rules", response_model=OvertimeRulesResponse)
+async def set_overtime_rules(client_id: int, data: OvertimeRulesRequest, request: Request, db: AsyncSession = Depends(get_async_db), current_user: Employee = Depends(get_current_user_async)):
+    """
+    Replace a client's overtime rules and apply them to its existing timesheets
+
+    **Logic:**
+    1. Admin only
+    2. Creates or updates the client's OvertimeRules row and commits it
+    3. Queues the client's timesheets to be split again under the new rules
+       (app/core/rollup_jobs.py); the recompute runs in the background, outside this
+       request's DB time budget, and the response reports it as queued
+    """
+    if current_user.role != EmployeeRole.DEW_ADMIN:
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Not authorized")
+    if not await db.get(Client, client_id):
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Client not found")
+    rules = (await db.scalars(select(OvertimeRules).where(OvertimeRules.client_id == client_id))).first()
+    if rules is None:
+        rules = OvertimeRules(client_id=client_id)
+        db.add(rules)
+    for field, value in data.dict().items():
+        setattr(rules, field, value)
+    rules.updated_at = datetime.utcnow()
+    await db.commit()
+    recompute_queue.submit(client_id)
+    audit(AuditEventType.CLIENT_UPDATED, current_user, request, client_id=client_id, fields=["overtime_rules"])
+    return _rules_response(client_id, rules, recompute_queued=True)
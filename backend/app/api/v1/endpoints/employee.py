@@ -1,30 +1,59 @@
-from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
-from typing import List
+from fastapi import APIRouter, Depends, HTTPException, status, Request, Response
+from datetime import datetime
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import List, Optional
 
-from app.core.session import get_db
+from app.core.session import get_async_db
 from app.models.employee import Employee, EmployeeRole
 from app.schemas.employee import EmployeeUpdateRequest
 from app.schemas.auth import UserResponse
-from app.core.dependencies import get_current_user
+from app.core.dependencies import get_current_user_async
+from app.utils.pagination import PageParams, paginate, NEXT_CURSOR_HEADER
+from app.utils.etag import scope_etag, conditional_response
+from app.core.principal_cache import principal_cache
+from app.core.audit import audit
+from app.models.audit_log import AuditEventType
 
 router = APIRouter(prefix="/employees", tags=["employees"])
 
 # List employees
 @router.get("/", response_model=List[UserResponse])
-def list_employees(db: Session = Depends(get_db), current_user: Employee = Depends(get_current_user)):
+async def list_employees(
+    request: Request,
+    response: Response,
+    client_id: Optional[int] = None,
+    role: Optional[EmployeeRole] = None,
+    is_active: Optional[bool] = None,
+    page: PageParams = Depends(),
+    db: AsyncSession = Depends(get_async_db),
+    current_user: Employee = Depends(get_current_user_async)
+):
+    query = select(Employee)
     if current_user.role == EmployeeRole.DEW_ADMIN:
-        employees = db.query(Employee).all()
+        pass
     elif current_user.role == EmployeeRole.CLIENT_MANAGER:
-        employees = db.query(Employee).filter(Employee.client_id == current_user.client_id).all()
+        query = query.where(Employee.client_id == current_user.client_id)
     else:
         raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Not authorized")
+    if client_id is not None:
+        query = query.where(Employee.client_id == client_id)
+    if role is not None:
+        query = query.where(Employee.role == role)
+    if is_active is not None:
+        query = query.where(Employee.is_active == is_active)
+    not_modified = conditional_response(request, response, await scope_etag(db, request, current_user, query, Employee.updated_at))
+    if not_modified:
+        return not_modified
+    employees, next_cursor = await paginate(db, query, Employee.id, page)
+    if next_cursor:
+        response.headers[NEXT_CURSOR_HEADER] = next_cursor
     return employees
 
 # Get employee by ID
 @router.get("/{employee_id}", response_model=UserResponse)
-def get_employee(employee_id: int, db: Session = Depends(get_db), current_user: Employee = Depends(get_current_user)):
-    employee = db.query(Employee).filter(Employee.id == employee_id).first()
+async def get_employee(employee_id: int, db: AsyncSession = Depends(get_async_db), current_user: Employee = Depends(get_current_user_async)):
+    employee = await db.get(Employee, employee_id)
     if not employee:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Employee not found")
     if current_user.role == EmployeeRole.DEW_ADMIN:
@@ -38,8 +67,8 @@ def get_employee(employee_id: int, db: Session = Depends(get_db), current_user:
 
 # Update employee
 @router.put("/{employee_id}", response_model=UserResponse)
-def update_employee(employee_id: int, update_data: EmployeeUpdateRequest, db: Session = Depends(get_db), current_user: Employee = Depends(get_current_user)):
-    employee = db.query(Employee).filter(Employee.id == employee_id).first()
+async def update_employee(employee_id: int, update_data: EmployeeUpdateRequest, request: Request, db: AsyncSession = Depends(get_async_db), current_user: Employee = Depends(get_current_user_async)):
+    employee = await db.get(Employee, employee_id)
     if not employee:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Employee not found")
     # Access control
@@ -58,16 +87,21 @@ def update_employee(employee_id: int, update_data: EmployeeUpdateRequest, db: Se
     if update_data.role in [EmployeeRole.CONSULTANT, EmployeeRole.CLIENT_MANAGER] and not update_data.client_id:
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Client ID required for this role")
     # Apply updates
-    for field, value in update_data.dict(exclude_unset=True).items():
+    changes = update_data.dict(exclude_unset=True)
+    for field, value in changes.items():
         setattr(employee, field, value)
-    db.commit()
-    db.refresh(employee)
+    employee.updated_at = datetime.utcnow()
+    await db.commit()
+    audit(AuditEventType.EMPLOYEE_UPDATED, current_user, request, employee_id=employee.id, fields=sorted(changes))
+    # Role, client and is_active (deactivation) changes must apply to open sessions right away
+    principal_cache.invalidate_user(employee.id)
+    await db.refresh(employee)
     return employee
 
 # Delete employee
 @router.delete("/{employee_id}", status_code=status.HTTP_204_NO_CONTENT)
-def delete_employee(employee_id: int, db: Session = Depends(get_db), current_user: Employee = Depends(get_current_user)):
-    employee = db.query(Employee).filter(Employee.id == employee_id).first()
+async def delete_employee(employee_id: int, request: Request, db: AsyncSession = Depends(get_async_db), current_user: Employee = Depends(get_current_user_async)):
+    employee = await db.get(Employee, employee_id)
     if not employee:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Employee not found")
     if current_user.role == EmployeeRole.DEW_ADMIN:
@@ -77,6 +111,9 @@ def delete_employee(employee_id: int, db: Session = Depends(get_db), current_use
             raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Not authorized")
     else:
         raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Not authorized")
-    db.delete(employee)
-    db.commit()
+    email = employee.email
+    await db.delete(employee)
+    await db.commit()
+    principal_cache.invalidate_user(employee_id)
+    audit(AuditEventType.EMPLOYEE_DELETED, current_user, request, employee_id=employee_id, email=email)
     return None 
\ No newline at end of file
@@ -0,0 +1,51 @@
+from fastapi import APIRouter, Depends, Header, HTTPException, Query, Request, status
+from fastapi.responses import StreamingResponse
+from fastapi.security import HTTPAuthorizationCredentials, HTTPBearer
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import Optional
+
+from app.config import settings
+from app.core.events import EventScope, event_hub, stream_events
+from app.core.session import get_async_db
+from app.models.employee import Employee
+from app.utils.auth import get_current_user_async
+
+router = APIRouter(tags=["events"])
+
+async def _stream_user(
+    credentials: Optional[HTTPAuthorizationCredentials] = Depends(HTTPBearer(auto_error=False)),
+    access_token: Optional[str] = Query(None, description="Bearer token, for EventSource clients that cannot set headers"),
+    db: AsyncSession = Depends(get_async_db),
+) -> Employee:
+    """The caller from the Authorization header or, failing that, the access_token query parameter"""
+    token = credentials.credentials if credentials else access_token
+    if not token:
+        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Not authenticated", headers={"WWW-Authenticate": "Bearer"})
+    user = await get_current_user_async(db, token)
+    # The stream outlives the request's session; release its connection now
+    await db.close()
+    return user
+
+# Stream change events
+@router.get("/", response_class=StreamingResponse)
+async def stream_changes(
+    request: Request,
+    last_event_id: Optional[str] = Header(None, description="Sent by EventSource on reconnect"),
+    current_user: Employee = Depends(_stream_user)
+):
+    """
+    Server-sent events for timesheet and time off changes in the caller's scope
+
+    **Logic:**
+    1. Subscribes the caller (own requests; managers also those addressed to them; admins everything)
+    2. With Last-Event-ID, first replays the events missed since then, or sends `reset` when they are no longer kept
+    3. Each event is `id`, `event` (e.g. timesheet.approved) and compact JSON data with the ids and new status
+    4. Idle streams get a keepalive comment every events_heartbeat_seconds; a client that falls
+       events_buffer_size events behind gets `reset` and is disconnected
+    """
+    subscription, backlog = event_hub.subscribe(EventScope.of(current_user), last_event_id)
+    return StreamingResponse(
+        stream_events(event_hub, subscription, backlog, request.is_disconnected, settings.events_heartbeat_seconds),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
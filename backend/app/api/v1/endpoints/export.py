@@ -0,0 +1,188 @@
+from fastapi import APIRouter, Depends, HTTPException, status, Query, Request
+from fastapi.responses import StreamingResponse
+from sqlalchemy import select, func
+from sqlalchemy.orm import Session
+from typing import Optional
+from datetime import datetime, date
+from enum import Enum
+import csv
+import io
+import json
+import time as time_module
+
+from app.core.session import get_db
+from app.core.dependencies import get_current_user
+from app.core.audit import audit
+from app.models.audit_log import AuditEventType
+from app.models.client import Client
+from app.models.employee import Employee, EmployeeRole
+from app.models.time_entry import TimeEntry, BreakPeriod
+from app.models.timesheet import Timesheet, TimesheetStatus
+from app.utils.hours import minutes_of_day
+
+router = APIRouter(tags=["exports"])
+
+# Rows fetched per round trip from the server-side cursor, and rows per streamed chunk
+EXPORT_BATCH_SIZE = 2000
+
+EXPORT_COLUMNS = [
+    "timesheet_id", "week_start", "status", "employee_id", "employee_email", "employee_name",
+    "client_code", "entry_id", "date", "in_time", "out_time", "break_minutes", "worked_minutes",
+    "project", "note",
+]
+
+
+class ExportFormat(str, Enum):
+    CSV = "csv"
+    NDJSON = "ndjson"
+
+
+def _export_statement(date_from: Optional[date], date_to: Optional[date], client_id: Optional[int], status_filter: Optional[TimesheetStatus]):
+    """
+    One flat row per time entry, ordered for stable output
+
+    Break minutes are a correlated subquery per entry (index lookup on breakperiod.time_entry_id),
+    so rows stream straight off the cursor without a grouping step.
+    """
+    break_minutes = (
+        select(func.coalesce(func.sum(minutes_of_day(BreakPeriod.end_time) - minutes_of_day(BreakPeriod.start_time)), 0))
+        .where(BreakPeriod.time_entry_id == TimeEntry.id)
+        .scalar_subquery()
+    )
+    statement = (
+        select(
+            Timesheet.id, Timesheet.week_start, Timesheet.status,
+            Employee.id, Employee.email, Employee.full_name, Client.code,
+            TimeEntry.id, TimeEntry.date, TimeEntry.in_time, TimeEntry.out_time,
+            break_minutes,
+            TimeEntry.project, TimeEntry.note,
+        )
+        .select_from(TimeEntry)
+        .join(Timesheet, Timesheet.id == TimeEntry.timesheet_id)
+        .join(Employee, Employee.id == Timesheet.employee_id)
+        .outerjoin(Client, Client.id == Employee.client_id)
+        .order_by(TimeEntry.date, Timesheet.id, TimeEntry.id)
+    )
+    if date_from is not None:
+        statement = statement.where(TimeEntry.date >= date_from)
+    if date_to is not None:
+        statement = statement.where(TimeEntry.date <= date_to)
+    if client_id is not None:
+        statement = statement.where(Employee.client_id == client_id)
+    if status_filter is not None:
+        statement = statement.where(Timesheet.status == status_filter.value)
+    return statement
+
+
+def _to_record(row) -> dict:
+    (timesheet_id, week_start, ts_status, employee_id, employee_email, employee_name, client_code,
+     entry_id, entry_date, in_time, out_time, break_minutes, project, note) = row
+    worked = (out_time.hour * 60 + out_time.minute) - (in_time.hour * 60 + in_time.minute) - int(break_minutes)
+    return {
+        "timesheet_id": timesheet_id,
+        "week_start": week_start.isoformat(),
+        "status": ts_status.value if isinstance(ts_status, Enum) else ts_status,
+        "employee_id": employee_id,
+        "employee_email": employee_email,
+        "employee_name": employee_name,
+        "client_code": client_code,
+        "entry_id": entry_id,
+        "date": entry_date.isoformat(),
+        "in_time": in_time.strftime("%H:%M"),
+        "out_time": out_time.strftime("%H:%M"),
+        "break_minutes": int(break_minutes),
+        "worked_minutes": worked,
+        "project": project,
+        "note": note,
+    }
+
+
+def _stream_export(bind, statement, export_format: ExportFormat, actor: Employee, request: Request, filters: dict):
+    """
+    Generator streaming the export and recording a DATA_EXPORT audit event at the end
+
+    **Logic:**
+    1. Uses its own connection with stream_results/yield_per, so the driver keeps a
+       server-side cursor and only EXPORT_BATCH_SIZE rows are in memory at a time
+    2. Encodes each batch to CSV or NDJSON and yields it as one chunk
+    3. Always records the audit event (through the batched audit writer), flagging
+       exports cut short by the client
+    """
+    started = time_module.monotonic()
+    row_count = 0
+    completed = False
+    try:
+        with bind.connect() as connection:
+            result = connection.execution_options(stream_results=True, yield_per=EXPORT_BATCH_SIZE).execute(statement)
+            if export_format == ExportFormat.CSV:
+                buffer = io.StringIO()
+                writer = csv.DictWriter(buffer, fieldnames=EXPORT_COLUMNS)
+                writer.writeheader()
+                yield buffer.getvalue()
+            for batch in result.partitions():
+                if export_format == ExportFormat.CSV:
+                    buffer = io.StringIO()
+                    writer = csv.DictWriter(buffer, fieldnames=EXPORT_COLUMNS)
+                    writer.writerows(_to_record(row) for row in batch)
+                    chunk = buffer.getvalue()
+                else:
+                    chunk = "".join(json.dumps(_to_record(row)) + "\n" for row in batch)
+                row_count += len(batch)
+                yield chunk
+        completed = True
+    finally:
+        audit(
+            AuditEventType.DATA_EXPORT, actor, request,
+            export="timesheets",
+            format=export_format.value,
+            filters=filters,
+            row_count=row_count,
+            duration_ms=round((time_module.monotonic() - started) * 1000),
+            completed=completed,
+        )
+
+
+@router.get("/timesheets")
+def export_timesheets(
+    request: Request,
+    export_format: ExportFormat = Query(ExportFormat.CSV, alias="format"),
+    date_from: Optional[date] = Query(None, description="First entry date to include"),
+    date_to: Optional[date] = Query(None, description="Last entry date to include"),
+    client_id: Optional[int] = None,
+    status_filter: Optional[TimesheetStatus] = Query(None, alias="status"),
+    db: Session = Depends(get_db),
+    current_user: Employee = Depends(get_current_user)
+):
+    """
+    Stream time entries for payroll as CSV or NDJSON
+
+    **Logic:**
+    1. Dew Admin can export every client; Client Managers only their own client
+    2. One row per time entry with break and worked minutes
+    3. Memory stays flat regardless of the number of rows exported
+    """
+    if current_user.role == EmployeeRole.DEW_ADMIN:
+        pass
+    elif current_user.role == EmployeeRole.CLIENT_MANAGER:
+        if client_id is not None and client_id != current_user.client_id:
+            raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Not authorized")
+        client_id = current_user.client_id
+    else:
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Not authorized")
+    if date_from and date_to and date_to < date_from:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="date_to must not be before date_from")
+
+    filters = {
+        "date_from": date_from.isoformat() if date_from else None,
+        "date_to": date_to.isoformat() if date_to else None,
+        "client_id": client_id,
+        "status": status_filter.value if status_filter else None,
+    }
+    statement = _export_statement(date_from, date_to, client_id, status_filter)
+    media_type = "text/csv" if export_format == ExportFormat.CSV else "application/x-ndjson"
+    filename = f"timesheets-{datetime.utcnow().strftime('%Y%m%d%H%M%S')}.{export_format.value}"
+    return StreamingResponse(
+        _stream_export(db.get_bind(), statement, export_format, current_user, request, filters),
+        media_type=media_type,
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'}
+    )
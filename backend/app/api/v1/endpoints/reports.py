@@ -0,0 +1,52 @@
+from fastapi import APIRouter, Depends, HTTPException, status, Query
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import Optional
+from datetime import date, timedelta
+
+from app.core.session import get_async_db
+from app.core.dependencies import get_current_user_async
+from app.models.employee import Employee, EmployeeRole
+from app.schemas.reports import UtilizationGroup, UtilizationReport
+from app.utils.utilization import pivot, report_weeks, utilization_statement
+
+router = APIRouter(tags=["reports"])
+
+# Default and longest report range (one pivot column per week)
+DEFAULT_REPORT_WEEKS = 52
+MAX_REPORT_WEEKS = 156
+
+# Utilization: hours per client or employee and week
+@router.get("/utilization", response_model=UtilizationReport)
+async def utilization_report(
+    group_by: UtilizationGroup = Query(UtilizationGroup.CLIENT, description="One row per client or per employee"),
+    date_from: Optional[date] = Query(None, description="First week (default: 52 weeks before date_to)"),
+    date_to: Optional[date] = Query(None, description="Last week (default: today)"),
+    client_id: Optional[int] = None,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: Employee = Depends(get_current_user_async)
+):
+    """
+    Total, regular, overtime, double time and billable hours pivoted by week
+
+    **Logic:**
+    1. Admins report on every client (or client_id); managers only on their own client; others get 403.
+       Per-employee rows are reported for one client at a time
+    2. One GROUP BY over the timesheet rollup columns in the database; no entries are loaded
+    3. Pivot the grouped rows into one row per group with a value per week, plus totals
+    """
+    if current_user.role == EmployeeRole.CLIENT_MANAGER:
+        client_id = current_user.client_id
+    elif current_user.role != EmployeeRole.DEW_ADMIN:
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Not authorized")
+    if group_by == UtilizationGroup.EMPLOYEE and client_id is None:
+        # One row per employee of every client is too large a pivot to return at once
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="group_by=employee needs a client_id")
+    date_to = date_to or date.today()
+    date_from = date_from or date_to - timedelta(weeks=DEFAULT_REPORT_WEEKS)
+    if date_from > date_to:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="date_from must not be after date_to")
+    weeks = report_weeks(date_from, date_to)
+    if len(weeks) > MAX_REPORT_WEEKS:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=f"Reports cover at most {MAX_REPORT_WEEKS} weeks")
+    rows = (await db.execute(utilization_statement(date_from, date_to, group_by, client_id))).all()
+    return pivot(rows, weeks, group_by, date_from, date_to)
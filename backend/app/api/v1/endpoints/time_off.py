@@ -1,41 +1,118 @@
-from fastapi import APIRouter, Depends, HTTPException, status, BackgroundTasks
-from sqlalchemy.orm import Session, joinedload
-from typing import List
-from datetime import datetime
+from fastapi import APIRouter, Depends, HTTPException, status, Query, Request, Response
+from sqlalchemy import select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import joinedload
+from typing import List, Optional
+from datetime import datetime, date, timedelta
 
-from app.core.session import get_db
+from app.core.session import get_async_db
 from app.models.time_off import TimeOff, TimeOffStatus
 from app.models.employee import Employee, EmployeeRole
 from app.schemas.time_off import TimeOffCreateRequest, TimeOffUpdateRequest, TimeOffResponse
-from app.core.dependencies import get_current_user
-from app.utils.email import send_email
+from app.schemas.approvals import BatchDecisionRequest, BatchDecisionResponse, DecisionOutcome
+from app.core.dependencies import get_current_user_async
+from app.utils.email import queue_email, queue_emails
+from app.utils.notifications import notify_manager, TIME_OFF_REQUESTED
+from app.utils.pagination import PageParams, paginate, NEXT_CURSOR_HEADER
+from app.utils.etag import scope_etag, conditional_response
+from app.utils.intervals import Interval, find_overlaps
+from app.core.audit import audit
+from app.core import events
+from app.models.audit_log import AuditEventType
 
 router = APIRouter(tags=["time_off"])
 
+async def _load_time_off(db: AsyncSession, request_id: int) -> Optional[TimeOff]:
+    """Time off request with its employee eager loaded (also used to reload after a commit)"""
+    return (await db.scalars(
+        select(TimeOff).options(joinedload(TimeOff.employee))
+        .where(TimeOff.id == request_id)
+        .execution_options(populate_existing=True)
+    )).first()
+
+async def _check_time_off_range(db: AsyncSession, employee_id: int, start_date: date, end_date: date, exclude_id: Optional[int] = None):
+    """
+    Reject an empty range or one overlapping the employee's other open or approved requests
+
+    **Logic:**
+    1. SQL narrows to the employee's non-rejected requests intersecting the range
+    2. Ranges are whole days, so each becomes the half-open [start, end + 1 day) for the sweep;
+       back-to-back requests (one ends the day before the next starts) are allowed
+    3. Every conflicting request is listed in the error, not just the first
+    """
+    if end_date < start_date:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="End date must not be before start date")
+    query = select(TimeOff).where(
+        TimeOff.employee_id == employee_id,
+        TimeOff.status != TimeOffStatus.REJECTED,
+        TimeOff.start_date <= end_date,
+        TimeOff.end_date >= start_date
+    )
+    if exclude_id is not None:
+        query = query.where(TimeOff.id != exclude_id)
+    intervals = [Interval(r.start_date, r.end_date + timedelta(days=1), r) for r in (await db.scalars(query)).all()]
+    intervals.append(Interval(start_date, end_date + timedelta(days=1), None))
+    conflicting = [
+        other.position
+        for conflict in find_overlaps(intervals)
+        for other in conflict
+        if other.position is not None and None in (conflict.first.position, conflict.second.position)
+    ]
+    if conflicting:
+        ranges = ", ".join(f"#{r.id} ({r.start_date} to {r.end_date})" for r in conflicting)
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=f"Time off overlaps with existing requests: {ranges}")
+
 # List time off requests
 @router.get("/", response_model=List[TimeOffResponse])
-def list_time_off(db: Session = Depends(get_db), current_user: Employee = Depends(get_current_user)):
+async def list_time_off(
+    request: Request,
+    response: Response,
+    start_date_from: Optional[date] = Query(None, description="Only requests starting on or after this date"),
+    start_date_to: Optional[date] = Query(None, description="Only requests starting on or before this date"),
+    status_filter: Optional[TimeOffStatus] = Query(None, alias="status"),
+    employee_id: Optional[int] = None,
+    client_id: Optional[int] = None,
+    page: PageParams = Depends(),
+    db: AsyncSession = Depends(get_async_db),
+    current_user: Employee = Depends(get_current_user_async)
+):
+    query = select(TimeOff)
     if current_user.role == EmployeeRole.CLIENT_MANAGER:
         # Only requests submitted to this manager and pending
-        requests = db.query(TimeOff).options(
-            joinedload(TimeOff.employee)
-        ).filter(
+        query = query.where(
             TimeOff.manager_email == current_user.email,
             TimeOff.status == TimeOffStatus.PENDING
-        ).all()
-        return [TimeOffResponse.from_orm(r) for r in requests]
+        )
     elif current_user.role == EmployeeRole.CONSULTANT:
-        requests = db.query(TimeOff).options(
-            joinedload(TimeOff.employee)
-        ).filter(TimeOff.employee_id == current_user.id).all()
-        return [TimeOffResponse.from_orm(r) for r in requests]
+        query = query.where(TimeOff.employee_id == current_user.id)
     else:
         raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Not authorized")
+    
+    # Server-side filters, applied on top of the role scope
+    if start_date_from is not None:
+        query = query.where(TimeOff.start_date >= start_date_from)
+    if start_date_to is not None:
+        query = query.where(TimeOff.start_date <= start_date_to)
+    if status_filter is not None:
+        query = query.where(TimeOff.status == status_filter)
+    if employee_id is not None:
+        query = query.where(TimeOff.employee_id == employee_id)
+    if client_id is not None:
+        query = query.where(TimeOff.employee_id.in_(select(Employee.id).where(Employee.client_id == client_id)))
+    
+    not_modified = conditional_response(request, response, await scope_etag(db, request, current_user, query, TimeOff.updated_at))
+    if not_modified:
+        return not_modified
+    
+    requests, next_cursor = await paginate(db, query.options(joinedload(TimeOff.employee)), TimeOff.id, page)
+    if next_cursor:
+        response.headers[NEXT_CURSOR_HEADER] = next_cursor
+    return [TimeOffResponse.from_orm(r) for r in requests]
 
 # Get time off request by ID
 @router.get("/{request_id}", response_model=TimeOffResponse)
-def get_time_off(request_id: int, db: Session = Depends(get_db), current_user: Employee = Depends(get_current_user)):
-    req = db.query(TimeOff).filter(TimeOff.id == request_id).first()
+async def get_time_off(request_id: int, db: AsyncSession = Depends(get_async_db), current_user: Employee = Depends(get_current_user_async)):
+    req = await _load_time_off(db, request_id)
     if not req:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Request not found")
     if current_user.role == EmployeeRole.CLIENT_MANAGER:
@@ -50,9 +127,10 @@ def get_time_off(request_id: int, db: Session = Depends(get_db), current_user: E
 
 # Create time off request
 @router.post("/", response_model=TimeOffResponse, status_code=status.HTTP_201_CREATED)
-def create_time_off(data: TimeOffCreateRequest, background_tasks: BackgroundTasks, db: Session = Depends(get_db), current_user: Employee = Depends(get_current_user)):
+async def create_time_off(data: TimeOffCreateRequest, db: AsyncSession = Depends(get_async_db), current_user: Employee = Depends(get_current_user_async)):
     if current_user.role != EmployeeRole.CONSULTANT:
         raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Only consultants can request time off")
+    await _check_time_off_range(db, current_user.id, data.start_date, data.end_date)
     req = TimeOff(
         employee_id=current_user.id,
         start_date=data.start_date,
@@ -63,24 +141,33 @@ def create_time_off(data: TimeOffCreateRequest, background_tasks: BackgroundTask
         status=TimeOffStatus.PENDING
     )
     db.add(req)
-    db.commit()
-    db.refresh(req)
-    # Email notification to manager
+    # Notification to manager (email or digest entry), committed with the request
     subject = f"Time Off Request Submitted: {current_user.full_name} ({data.start_date} to {data.end_date})"
     body = f"Hello,\n\nA new time off request has been submitted for your approval.\n\nEmployee: {current_user.full_name}\nDates: {data.start_date} to {data.end_date}\nType: {data.type}\n\nPlease log in to review and approve.\n\n-- Dew Time Tracker"
-    background_tasks.add_task(send_email, subject, body, [data.manager_email])
+    summary = f"Time off: {current_user.full_name}, {data.start_date} to {data.end_date} ({data.type.value})"
+    await notify_manager(db, data.manager_email, TIME_OFF_REQUESTED, summary, subject, body)
+    await db.commit()
+    events.publish(events.TIME_OFF_SUBMITTED, current_user.id, data.manager_email, time_off_id=req.id, status=TimeOffStatus.PENDING.value)
+    req = await _load_time_off(db, req.id)
     return req
 
 # Update time off request
 @router.put("/{request_id}", response_model=TimeOffResponse)
-def update_time_off(request_id: int, data: TimeOffUpdateRequest, db: Session = Depends(get_db), current_user: Employee = Depends(get_current_user)):
-    req = db.query(TimeOff).filter(TimeOff.id == request_id).first()
+async def update_time_off(request_id: int, data: TimeOffUpdateRequest, db: AsyncSession = Depends(get_async_db), current_user: Employee = Depends(get_current_user_async)):
+    req = await _load_time_off(db, request_id)
     if not req:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Request not found")
     if current_user.role != EmployeeRole.CONSULTANT or req.employee_id != current_user.id:
         raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Not authorized")
     if req.status != TimeOffStatus.PENDING:
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Only pending requests can be updated")
+    if data.start_date is not None or data.end_date is not None:
+        await _check_time_off_range(
+            db, req.employee_id,
+            data.start_date if data.start_date is not None else req.start_date,
+            data.end_date if data.end_date is not None else req.end_date,
+            exclude_id=req.id
+        )
     if data.start_date is not None:
         req.start_date = data.start_date
     if data.end_date is not None:
@@ -90,28 +177,28 @@ def update_time_off(request_id: int, data: TimeOffUpdateRequest, db: Session = D
     if data.comment is not None:
         req.comment = data.comment
     req.updated_at = datetime.utcnow()
-    db.commit()
-    db.refresh(req)
+    await db.commit()
+    req = await _load_time_off(db, req.id)
     return req
 
 # Delete time off request
 @router.delete("/{request_id}", status_code=status.HTTP_204_NO_CONTENT)
-def delete_time_off(request_id: int, db: Session = Depends(get_db), current_user: Employee = Depends(get_current_user)):
-    req = db.query(TimeOff).filter(TimeOff.id == request_id).first()
+async def delete_time_off(request_id: int, db: AsyncSession = Depends(get_async_db), current_user: Employee = Depends(get_current_user_async)):
+    req = await _load_time_off(db, request_id)
     if not req:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Request not found")
     if current_user.role != EmployeeRole.CONSULTANT or req.employee_id != current_user.id:
         raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Not authorized")
     if req.status != TimeOffStatus.PENDING:
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Only pending requests can be deleted")
-    db.delete(req)
-    db.commit()
+    await db.delete(req)
+    await db.commit()
     return None
 
 # Approve time off request
 @router.post("/{request_id}/approve", response_model=TimeOffResponse)
-def approve_time_off(request_id: int, background_tasks: BackgroundTasks, db: Session = Depends(get_db), current_user: Employee = Depends(get_current_user)):
-    req = db.query(TimeOff).filter(TimeOff.id == request_id).first()
+async def approve_time_off(request_id: int, request: Request, db: AsyncSession = Depends(get_async_db), current_user: Employee = Depends(get_current_user_async)):
+    req = await _load_time_off(db, request_id)
     if not req:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Request not found")
     if current_user.role != EmployeeRole.CLIENT_MANAGER:
@@ -124,18 +211,21 @@ def approve_time_off(request_id: int, background_tasks: BackgroundTasks, db: Ses
     req.approved_by = current_user.id
     req.approved_at = datetime.utcnow()
     req.updated_at = datetime.utcnow()
-    db.commit()
-    db.refresh(req)
-    # Email notification to employee
+    # Email notification to employee, committed with the approval
     subject = f"Your Time Off Request Was Approved ({req.start_date} to {req.end_date})"
     body = f"Hello {req.employee.full_name},\n\nYour time off request for {req.start_date} to {req.end_date} has been approved.\n\n-- Dew Time Tracker"
-    background_tasks.add_task(send_email, subject, body, [req.employee.email])
+    queue_email(db, subject, body, [req.employee.email])
+    await db.commit()
+    audit(AuditEventType.TIME_OFF_APPROVED, current_user, request, time_off_id=req.id, employee_id=req.employee_id,
+          previous_status=TimeOffStatus.PENDING.value)
+    events.publish(events.TIME_OFF_APPROVED, req.employee_id, req.manager_email, time_off_id=req.id, status=TimeOffStatus.APPROVED.value)
+    req = await _load_time_off(db, req.id)
     return req
 
 # Reject time off request
 @router.post("/{request_id}/reject", response_model=TimeOffResponse)
-def reject_time_off(request_id: int, data: TimeOffUpdateRequest, db: Session = Depends(get_db), current_user: Employee = Depends(get_current_user)):
-    req = db.query(TimeOff).filter(TimeOff.id == request_id).first()
+async def reject_time_off(request_id: int, data: TimeOffUpdateRequest, request: Request, db: AsyncSession = Depends(get_async_db), current_user: Employee = Depends(get_current_user_async)):
+    req = await _load_time_off(db, request_id)
     if not req:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Request not found")
     if current_user.role != EmployeeRole.CLIENT_MANAGER:
@@ -149,6 +239,79 @@ def reject_time_off(request_id: int, data: TimeOffUpdateRequest, db: Session = D
     req.approved_by = current_user.id
     req.approved_at = datetime.utcnow()
     req.updated_at = datetime.utcnow()
-    db.commit()
-    db.refresh(req)
-    return req 
\ No newline at end of file
+    await db.commit()
+    audit(AuditEventType.TIME_OFF_REJECTED, current_user, request, time_off_id=req.id, employee_id=req.employee_id,
+          previous_status=TimeOffStatus.PENDING.value, comment=data.manager_comment)
+    events.publish(events.TIME_OFF_REJECTED, req.employee_id, req.manager_email, time_off_id=req.id, status=TimeOffStatus.REJECTED.value)
+    req = await _load_time_off(db, req.id)
+    return req 
+async def _decide_time_off_batch(db: AsyncSession, request: Request, current_user: Employee, data: BatchDecisionRequest, decision: TimeOffStatus) -> BatchDecisionResponse:
+    """
+    Approve or reject many pending time off requests at once
+
+    **Logic:**
+    1. Managers only (403 for the whole request otherwise)
+    2. Loads every requested id with its employee in one IN query and authorizes them as a set:
+       requests addressed to another manager are forbidden, ones no longer pending are skipped
+    3. One conditional UPDATE ... WHERE id IN (...) AND status = pending applies the decision;
+       RETURNING reports the rows it changed, so one decided concurrently is skipped, not overwritten
+    4. Approval emails are queued together and committed with the update; audit events are recorded per request
+    """
+    if current_user.role != EmployeeRole.CLIENT_MANAGER:
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Only managers can decide requests")
+    ids = list(dict.fromkeys(data.ids))
+    rows = (await db.execute(
+        select(TimeOff.id, TimeOff.employee_id, TimeOff.manager_email, TimeOff.status, TimeOff.start_date, TimeOff.end_date,
+               Employee.full_name, Employee.email)
+        .join(Employee, Employee.id == TimeOff.employee_id)
+        .where(TimeOff.id.in_(ids))
+    )).all()
+    outcomes = {}
+    candidates = []
+    for row in rows:
+        if row.manager_email != current_user.email:
+            outcomes[row.id] = (DecisionOutcome.FORBIDDEN, "Not authorized")
+        elif row.status != TimeOffStatus.PENDING:
+            outcomes[row.id] = (DecisionOutcome.SKIPPED, f"Request is {row.status.value}")
+        else:
+            candidates.append(row.id)
+    applied = set()
+    if candidates:
+        now = datetime.utcnow()
+        values = {"status": decision, "approved_by": current_user.id, "approved_at": now, "updated_at": now}
+        if decision == TimeOffStatus.REJECTED and data.comment is not None:
+            values["manager_comment"] = data.comment
+        applied = set((await db.execute(
+            update(TimeOff)
+            .where(TimeOff.id.in_(candidates), TimeOff.status == TimeOffStatus.PENDING)
+            .values(**values)
+            .returning(TimeOff.id)
+            .execution_options(synchronize_session=False)
+        )).scalars())
+    decided = [row for row in rows if row.id in applied]
+    for request_id in candidates:
+        outcomes[request_id] = (DecisionOutcome.APPLIED, None) if request_id in applied else (DecisionOutcome.SKIPPED, "Request was decided meanwhile")
+    if decision == TimeOffStatus.APPROVED:
+        await queue_emails(db, [(
+            f"Your Time Off Request Was Approved ({row.start_date} to {row.end_date})",
+            f"Hello {row.full_name},\n\nYour time off request for {row.start_date} to {row.end_date} has been approved.\n\n-- Dew Time Tracker",
+            [row.email],
+        ) for row in decided])
+    await db.commit()
+    event = AuditEventType.TIME_OFF_APPROVED if decision == TimeOffStatus.APPROVED else AuditEventType.TIME_OFF_REJECTED
+    change = events.TIME_OFF_APPROVED if decision == TimeOffStatus.APPROVED else events.TIME_OFF_REJECTED
+    for row in decided:
+        audit(event, current_user, request, time_off_id=row.id, employee_id=row.employee_id,
+              previous_status=TimeOffStatus.PENDING.value, comment=data.comment, batch=True)
+        events.publish(change, row.employee_id, row.manager_email, time_off_id=row.id, status=decision.value)
+    return BatchDecisionResponse.from_outcomes(ids, outcomes)
+
+# Approve many time off requests
+@router.post("/approve:batch", response_model=BatchDecisionResponse)
+async def approve_time_off_batch(data: BatchDecisionRequest, request: Request, db: AsyncSession = Depends(get_async_db), current_user: Employee = Depends(get_current_user_async)):
+    return await _decide_time_off_batch(db, request, current_user, data, TimeOffStatus.APPROVED)
+
+# Reject many time off requests
+@router.post("/reject:batch", response_model=BatchDecisionResponse)
+async def reject_time_off_batch(data: BatchDecisionRequest, request: Request, db: AsyncSession = Depends(get_async_db), current_user: Employee = Depends(get_current_user_async)):
+    return await _decide_time_off_batch(db, request, current_user, data, TimeOffStatus.REJECTED)
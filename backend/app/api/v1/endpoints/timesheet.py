@@ -1,68 +1,164 @@
-from fastapi import APIRouter, Depends, HTTPException, status, BackgroundTasks
-from sqlalchemy.orm import Session, joinedload
-from typing import List
-from datetime import datetime
+from fastapi import APIRouter, Depends, HTTPException, status, Query, Request, Response
+from sqlalchemy import select, insert, update, delete, or_
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import joinedload, selectinload
+from typing import Dict, List, Optional, Union
+from collections import defaultdict
+from datetime import datetime, date
 import json
 from fastapi.encoders import jsonable_encoder
 from fastapi import Path
 
-from app.core.session import get_db
+from app.core.session import get_async_db
 from app.models.timesheet import Timesheet, TimesheetStatus
 from app.models.employee import Employee, EmployeeRole
-from app.schemas.timesheet import TimesheetCreateRequest, TimesheetResponse
-from app.core.dependencies import get_current_user
+from app.schemas.timesheet import TimesheetCreateRequest, TimesheetResponse, TimesheetSummaryResponse, TimesheetView
+from app.core.dependencies import get_current_user_async
 from app.models.time_entry import TimeEntry, BreakPeriod
-from app.schemas.timesheet import TimeEntryCreate, TimeEntryResponse, BreakPeriodCreate
-from app.utils.email import send_email
+from app.schemas.timesheet import TimeEntryCreate, TimeEntryBatchCreate, TimeEntryResponse, BreakPeriodCreate
+from app.schemas.timesheet import TimesheetWeekSync, TimesheetWeekSyncResponse, WeekChangeSummary
+from app.schemas.approvals import BatchDecisionRequest, BatchDecisionResponse, DecisionOutcome
+from app.utils.email import queue_email, queue_emails
+from app.utils.notifications import notify_manager, TIMESHEET_SUBMITTED
+from app.utils.pagination import PageParams, paginate, keyset_window, split_page, NEXT_CURSOR_HEADER
+from app.utils.hours import entry_minutes
+from app.utils.intervals import Interval, find_empty, find_outside, find_overlaps
+from app.utils.rollups import apply_entry_minutes, apply_entries_minutes
+from app.utils.etag import scope_etag, conditional_response
+from app.core.structured_log import log_sampled
+from app.core.audit import audit
+from app.core import events
+from app.models.audit_log import AuditEventType
 
 # Remove prefix here; it will be added in the include_router call
 router = APIRouter(tags=["timesheets"])
 
+# Change event published when a timesheet enters each status
+STATUS_EVENTS = {
+    TimesheetStatus.SUBMITTED.value: events.TIMESHEET_SUBMITTED,
+    TimesheetStatus.APPROVED.value: events.TIMESHEET_APPROVED,
+    TimesheetStatus.REJECTED.value: events.TIMESHEET_REJECTED,
+}
+
+async def _load_timesheet(db: AsyncSession, timesheet_id: int) -> Optional[Timesheet]:
+    """
+    Timesheet with its employee, entries and breaks eager loaded
+
+    Three statements however many entries and breaks exist. populate_existing refreshes
+    an instance already in the session, so this also serves as the reload after a commit.
+    """
+    return (await db.scalars(
+        select(Timesheet).options(
+            joinedload(Timesheet.employee),
+            selectinload(Timesheet.time_entries).selectinload(TimeEntry.break_periods)
+        ).where(Timesheet.id == timesheet_id).execution_options(populate_existing=True)
+    )).first()
+
+async def _load_timesheet_header(db: AsyncSession, timesheet_id: int) -> Optional[Timesheet]:
+    """Timesheet with only its employee eager loaded, for the authorization checks before a write"""
+    return (await db.scalars(
+        select(Timesheet).options(joinedload(Timesheet.employee)).where(Timesheet.id == timesheet_id)
+    )).first()
+
+async def _load_entries(db: AsyncSession, *criteria) -> List[TimeEntry]:
+    """Time entries matching `criteria` with their breaks eager loaded (populate_existing, so also a reload)"""
+    return (await db.scalars(
+        select(TimeEntry).options(selectinload(TimeEntry.break_periods))
+        .where(*criteria).order_by(TimeEntry.id).execution_options(populate_existing=True)
+    )).all()
+
 # List timesheets
-@router.get("/", response_model=List[TimesheetResponse])
-def list_timesheets(db: Session = Depends(get_db), current_user: Employee = Depends(get_current_user)):
-    print(f"🔍 DEBUG: User {current_user.email} (ID: {current_user.id}) with role {current_user.role.value} requesting timesheets")
-    print(f"🔍 DEBUG: User client_id: {current_user.client_id}")
-    
+@router.get("/", response_model=Union[List[TimesheetResponse], List[TimesheetSummaryResponse]])
+async def list_timesheets(
+    request: Request,
+    response: Response,
+    view: TimesheetView = Query(TimesheetView.FULL, description="'summary' returns headers with hours totals and no entries"),
+    week_start_from: Optional[date] = Query(None, description="Only timesheets whose week starts on or after this date"),
+    week_start_to: Optional[date] = Query(None, description="Only timesheets whose week starts on or before this date"),
+    status_filter: Optional[TimesheetStatus] = Query(None, alias="status"),
+    employee_id: Optional[int] = None,
+    client_id: Optional[int] = None,
+    project: Optional[str] = None,
+    page: PageParams = Depends(),
+    db: AsyncSession = Depends(get_async_db),
+    current_user: Employee = Depends(get_current_user_async)
+):
+    query = select(Timesheet)
     if current_user.role == EmployeeRole.DEW_ADMIN:
-        timesheets = db.query(Timesheet).options(
-            joinedload(Timesheet.employee),
-            joinedload(Timesheet.time_entries).joinedload(TimeEntry.break_periods)
-        ).all()
-        print(f"🔍 DEBUG: DEW_ADMIN - Found {len(timesheets)} timesheets")
+        pass
     elif current_user.role == EmployeeRole.CLIENT_MANAGER:
         # Managers only see timesheets submitted to them for approval
-        timesheets = db.query(Timesheet).join(Employee, Timesheet.employee_id == Employee.id).filter(
+        query = query.where(
             Timesheet.status == TimesheetStatus.SUBMITTED.value,
             Timesheet.manager_email == current_user.email
-        ).options(
-            joinedload(Timesheet.employee),
-            joinedload(Timesheet.time_entries).joinedload(TimeEntry.break_periods)
-        ).all()
-        print(f"🔍 DEBUG: CLIENT_MANAGER - Found {len(timesheets)} submitted timesheets for manager_email {current_user.email}")
+        )
     elif current_user.role == EmployeeRole.CONSULTANT:
-        timesheets = db.query(Timesheet).filter(
-            Timesheet.employee_id == current_user.id
-        ).options(
-            joinedload(Timesheet.employee),
-            joinedload(Timesheet.time_entries).joinedload(TimeEntry.break_periods)
-        ).all()
-        print(f"🔍 DEBUG: CONSULTANT - Found {len(timesheets)} timesheets for employee_id {current_user.id}")
+        query = query.where(Timesheet.employee_id == current_user.id)
     else:
         raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Not authorized")
     
-    # Debug each timesheet
-    for ts in timesheets:
-        print(f"🔍 DEBUG: Timesheet {ts.id} belongs to employee_id {ts.employee_id}")
-        if hasattr(ts, 'employee') and ts.employee:
-            print(f"🔍 DEBUG: Employee name: {ts.employee.full_name}, role: {ts.employee.role.value}, client_id: {ts.employee.client_id}")
+    # Server-side filters, applied on top of the role scope
+    if week_start_from is not None:
+        query = query.where(Timesheet.week_start >= week_start_from)
+    if week_start_to is not None:
+        query = query.where(Timesheet.week_start <= week_start_to)
+    if status_filter is not None:
+        query = query.where(Timesheet.status == status_filter.value)
+    if employee_id is not None:
+        query = query.where(Timesheet.employee_id == employee_id)
+    if client_id is not None:
+        query = query.where(Timesheet.employee_id.in_(select(Employee.id).where(Employee.client_id == client_id)))
+    if project is not None:
+        query = query.where(Timesheet.project == project)
+    
+    not_modified = conditional_response(request, response, await scope_etag(db, request, current_user, query, Timesheet.updated_at))
+    if not_modified:
+        return not_modified
+    
+    if view == TimesheetView.SUMMARY:
+        summaries, next_cursor = await _list_timesheet_summaries(db, query, page)
+        if next_cursor:
+            response.headers[NEXT_CURSOR_HEADER] = next_cursor
+        return summaries
+    
+    query = query.options(
+        joinedload(Timesheet.employee),
+        selectinload(Timesheet.time_entries).selectinload(TimeEntry.break_periods)
+    )
+    timesheets, next_cursor = await paginate(db, query, Timesheet.id, page)
+    if next_cursor:
+        response.headers[NEXT_CURSOR_HEADER] = next_cursor
+    log_sampled(
+        "list_timesheets",
+        user_id=current_user.id,
+        role=current_user.role.value,
+        client_id=current_user.client_id,
+        view=view.value,
+        count=len(timesheets),
+    )
     
     return [TimesheetResponse.from_orm(t) for t in timesheets]
 
+async def _list_timesheet_summaries(db: AsyncSession, query, page: PageParams):
+    """
+    One keyset page of timesheet headers with hours totals
+    
+    **Logic:**
+    1. Select only header and employee columns; hours come from the stored rollup columns
+    2. No TimeEntry/BreakPeriod rows are read or hydrated
+    """
+    query = query.join(Employee, Employee.id == Timesheet.employee_id).with_only_columns(
+        *Timesheet.__table__.c,
+        Employee.full_name.label("employee_full_name"),
+        Employee.email.label("employee_email")
+    )
+    rows, next_cursor = split_page((await db.execute(keyset_window(query, Timesheet.id, page))).all(), page)
+    return [TimesheetSummaryResponse.from_row(row) for row in rows], next_cursor
+
 # Get timesheet by ID
 @router.get("/{timesheet_id}", response_model=TimesheetResponse)
-def get_timesheet(timesheet_id: int, db: Session = Depends(get_db), current_user: Employee = Depends(get_current_user)):
-    timesheet = db.query(Timesheet).filter(Timesheet.id == timesheet_id).first()
+async def get_timesheet(timesheet_id: int, db: AsyncSession = Depends(get_async_db), current_user: Employee = Depends(get_current_user_async)):
+    timesheet = await _load_timesheet(db, timesheet_id)
     if not timesheet:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Timesheet not found")
     if current_user.role == EmployeeRole.DEW_ADMIN:
@@ -79,7 +175,7 @@ def get_timesheet(timesheet_id: int, db: Session = Depends(get_db), current_user
 
 # Create timesheet (clock-in)
 @router.post("/", response_model=TimesheetResponse, status_code=status.HTTP_201_CREATED)
-def create_timesheet(data: TimesheetCreateRequest, db: Session = Depends(get_db), current_user: Employee = Depends(get_current_user)):
+async def create_timesheet(data: TimesheetCreateRequest, db: AsyncSession = Depends(get_async_db), current_user: Employee = Depends(get_current_user_async)):
     if current_user.role != EmployeeRole.CONSULTANT:
         raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Only consultants can create timesheets")
     timesheet = Timesheet(
@@ -91,14 +187,13 @@ def create_timesheet(data: TimesheetCreateRequest, db: Session = Depends(get_db)
         project=data.project
     )
     db.add(timesheet)
-    db.commit()
-    db.refresh(timesheet)
-    return TimesheetResponse.from_orm(timesheet)
+    await db.commit()
+    return TimesheetResponse.from_orm(await _load_timesheet(db, timesheet.id))
 
 # Update timesheet
 @router.put("/{timesheet_id}", response_model=TimesheetResponse)
-def update_timesheet(timesheet_id: int, data: dict, db: Session = Depends(get_db), current_user: Employee = Depends(get_current_user)):
-    timesheet = db.query(Timesheet).filter(Timesheet.id == timesheet_id).first()
+async def update_timesheet(timesheet_id: int, data: dict, db: AsyncSession = Depends(get_async_db), current_user: Employee = Depends(get_current_user_async)):
+    timesheet = await _load_timesheet_header(db, timesheet_id)
     if not timesheet:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Timesheet not found")
     if current_user.role == EmployeeRole.DEW_ADMIN:
@@ -111,6 +206,7 @@ def update_timesheet(timesheet_id: int, data: dict, db: Session = Depends(get_db
             raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Not authorized")
     else:
         raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Not authorized")
+    previous_status = timesheet.status
     # Only allow updating comment, status, and project
     if 'comment' in data:
         timesheet.comment = data['comment']
@@ -123,14 +219,16 @@ def update_timesheet(timesheet_id: int, data: dict, db: Session = Depends(get_db
     if 'project' in data:
         timesheet.project = data['project']
     timesheet.updated_at = datetime.utcnow()
-    db.commit()
-    db.refresh(timesheet)
-    return TimesheetResponse.from_orm(timesheet)
+    await db.commit()
+    if timesheet.status != previous_status and timesheet.status in STATUS_EVENTS:
+        events.publish(STATUS_EVENTS[timesheet.status], timesheet.employee_id, timesheet.manager_email,
+                       timesheet_id=timesheet.id, status=timesheet.status)
+    return TimesheetResponse.from_orm(await _load_timesheet(db, timesheet.id))
 
 # Delete timesheet
 @router.delete("/{timesheet_id}", status_code=status.HTTP_204_NO_CONTENT)
-def delete_timesheet(timesheet_id: int, db: Session = Depends(get_db), current_user: Employee = Depends(get_current_user)):
-    timesheet = db.query(Timesheet).filter(Timesheet.id == timesheet_id).first()
+async def delete_timesheet(timesheet_id: int, db: AsyncSession = Depends(get_async_db), current_user: Employee = Depends(get_current_user_async)):
+    timesheet = await _load_timesheet_header(db, timesheet_id)
     if not timesheet:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Timesheet not found")
     if current_user.role == EmployeeRole.DEW_ADMIN:
@@ -143,51 +241,56 @@ def delete_timesheet(timesheet_id: int, db: Session = Depends(get_db), current_u
             raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Not authorized")
     else:
         raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Not authorized")
-    db.delete(timesheet)
-    db.commit()
+    await db.delete(timesheet)
+    await db.commit()
     return None
 
 # Clock out (set end time)
 @router.post("/{timesheet_id}/clock_out", response_model=TimesheetResponse)
-def clock_out(timesheet_id: int, db: Session = Depends(get_db), current_user: Employee = Depends(get_current_user)):
-    timesheet = db.query(Timesheet).filter(Timesheet.id == timesheet_id).first()
+async def clock_out(timesheet_id: int, db: AsyncSession = Depends(get_async_db), current_user: Employee = Depends(get_current_user_async)):
+    timesheet = await _load_timesheet_header(db, timesheet_id)
     if not timesheet:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Timesheet not found")
     if current_user.role != EmployeeRole.CONSULTANT or timesheet.employee_id != current_user.id:
         raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Not authorized")
     timesheet.updated_at = datetime.utcnow()
-    db.commit()
-    db.refresh(timesheet)
-    return TimesheetResponse.from_orm(timesheet)
+    await db.commit()
+    return TimesheetResponse.from_orm(await _load_timesheet(db, timesheet.id))
 
 # Approve timesheet
 @router.post("/{timesheet_id}/approve", response_model=TimesheetResponse)
-def approve_timesheet(timesheet_id: int, background_tasks: BackgroundTasks, db: Session = Depends(get_db), current_user: Employee = Depends(get_current_user)):
-    timesheet = db.query(Timesheet).filter(Timesheet.id == timesheet_id).first()
+async def approve_timesheet(timesheet_id: int, request: Request, db: AsyncSession = Depends(get_async_db), current_user: Employee = Depends(get_current_user_async)):
+    timesheet = await _load_timesheet_header(db, timesheet_id)
     if not timesheet:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Timesheet not found")
     if current_user.role != EmployeeRole.CLIENT_MANAGER:
         raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Only managers can approve timesheets")
     if timesheet.employee.client_id != current_user.client_id:
         raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Not authorized")
+    previous_status = timesheet.status
     timesheet.status = TimesheetStatus.APPROVED.value
     timesheet.approved_by = current_user.id
     timesheet.approved_at = datetime.utcnow()
-    db.commit()
-    db.refresh(timesheet)
-    # Email notification to employee
+    timesheet.updated_at = datetime.utcnow()
+    # Email notification to employee, committed with the approval
     subject = f"Your Timesheet Was Approved ({timesheet.week_start})"
     body = f"Hello {timesheet.employee.full_name},\n\nYour timesheet for the week starting {timesheet.week_start} has been approved.\n\n-- Dew Time Tracker"
-    background_tasks.add_task(send_email, subject, body, [timesheet.employee.email])
+    queue_email(db, subject, body, [timesheet.employee.email])
+    await db.commit()
+    audit(AuditEventType.TIMESHEET_APPROVED, current_user, request, timesheet_id=timesheet.id,
+          employee_id=timesheet.employee_id, previous_status=previous_status)
+    events.publish(events.TIMESHEET_APPROVED, timesheet.employee_id, timesheet.manager_email,
+                   timesheet_id=timesheet.id, status=TimesheetStatus.APPROVED.value)
+    timesheet = await _load_timesheet(db, timesheet.id)
     return TimesheetResponse.from_orm(timesheet)
 
 @router.post("/{timesheet_id}/submit", response_model=TimesheetResponse)
-def submit_timesheet(timesheet_id: int, background_tasks: BackgroundTasks, db: Session = Depends(get_db), current_user: Employee = Depends(get_current_user)):
+async def submit_timesheet(timesheet_id: int, request: Request, db: AsyncSession = Depends(get_async_db), current_user: Employee = Depends(get_current_user_async)):
     """
     Submit a timesheet for approval. Only the consultant who owns the timesheet can submit.
     Only timesheets in DRAFT status can be submitted.
     """
-    timesheet = db.query(Timesheet).filter(Timesheet.id == timesheet_id).first()
+    timesheet = await _load_timesheet_header(db, timesheet_id)
     if not timesheet:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Timesheet not found")
     if current_user.role != EmployeeRole.CONSULTANT or timesheet.employee_id != current_user.id:
@@ -196,76 +299,218 @@ def submit_timesheet(timesheet_id: int, background_tasks: BackgroundTasks, db: S
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Only draft timesheets can be submitted")
     timesheet.status = TimesheetStatus.SUBMITTED.value
     timesheet.submitted_at = datetime.utcnow()
+    timesheet.updated_at = datetime.utcnow()
     db.add(timesheet)
-    db.commit()
-    db.refresh(timesheet)
-    # Email notification to manager
+    # Notification to manager (email or digest entry), committed with the submission
     subject = f"Timesheet Submitted for Approval: {current_user.full_name} ({timesheet.week_start})"
     body = f"Hello,\n\nA new timesheet has been submitted for your approval.\n\nEmployee: {current_user.full_name}\nWeek: {timesheet.week_start}\n\nPlease log in to review and approve.\n\n-- Dew Time Tracker"
-    background_tasks.add_task(send_email, subject, body, [timesheet.manager_email])
+    summary = f"Timesheet: {current_user.full_name}, week of {timesheet.week_start}"
+    await notify_manager(db, timesheet.manager_email, TIMESHEET_SUBMITTED, summary, subject, body)
+    await db.commit()
+    audit(AuditEventType.TIMESHEET_SUBMITTED, current_user, request, timesheet_id=timesheet.id,
+          employee_id=current_user.id, previous_status=TimesheetStatus.DRAFT.value, manager_email=timesheet.manager_email)
+    events.publish(events.TIMESHEET_SUBMITTED, current_user.id, timesheet.manager_email,
+                   timesheet_id=timesheet.id, status=TimesheetStatus.SUBMITTED.value)
+    timesheet = await _load_timesheet(db, timesheet.id)
     return TimesheetResponse.from_orm(timesheet)
 
+async def _decide_timesheet_batch(db: AsyncSession, request: Request, current_user: Employee, data: BatchDecisionRequest, decision: TimesheetStatus) -> BatchDecisionResponse:
+    """
+    Approve or reject many submitted timesheets at once
+
+    **Logic:**
+    1. Managers only (403 for the whole request otherwise)
+    2. Loads every requested id with its employee in one IN query and authorizes them as a set:
+       timesheets of another client's employees are forbidden, ones not submitted are skipped
+    3. One conditional UPDATE ... WHERE id IN (...) AND status = submitted applies the decision;
+       RETURNING reports the rows it changed, so one decided concurrently is skipped, not overwritten
+    4. Employee emails are queued together and committed with the update; audit events are recorded per timesheet
+    """
+    if current_user.role != EmployeeRole.CLIENT_MANAGER:
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Only managers can approve timesheets")
+    ids = list(dict.fromkeys(data.ids))
+    rows = (await db.execute(
+        select(Timesheet.id, Timesheet.employee_id, Timesheet.manager_email, Timesheet.status, Timesheet.week_start,
+               Employee.client_id, Employee.full_name, Employee.email)
+        .join(Employee, Employee.id == Timesheet.employee_id)
+        .where(Timesheet.id.in_(ids))
+    )).all()
+    outcomes = {}
+    candidates = []
+    for row in rows:
+        if row.client_id != current_user.client_id:
+            outcomes[row.id] = (DecisionOutcome.FORBIDDEN, "Not authorized")
+        elif row.status != TimesheetStatus.SUBMITTED.value:
+            outcomes[row.id] = (DecisionOutcome.SKIPPED, f"Timesheet is {row.status}")
+        else:
+            candidates.append(row.id)
+    applied = set()
+    if candidates:
+        now = datetime.utcnow()
+        values = {"status": decision.value, "approved_by": current_user.id, "approved_at": now, "updated_at": now}
+        # A rejection without a comment keeps the one the timesheet already has
+        if decision == TimesheetStatus.REJECTED and data.comment is not None:
+            values["comment"] = data.comment
+        applied = set((await db.execute(
+            update(Timesheet)
+            .where(Timesheet.id.in_(candidates), Timesheet.status == TimesheetStatus.SUBMITTED.value)
+            .values(**values)
+            .returning(Timesheet.id)
+            .execution_options(synchronize_session=False)
+        )).scalars())
+    for timesheet_id in candidates:
+        outcomes[timesheet_id] = (DecisionOutcome.APPLIED, None) if timesheet_id in applied else (DecisionOutcome.SKIPPED, "Timesheet was decided meanwhile")
+    decided = [row for row in rows if row.id in applied]
+    verb = "approved" if decision == TimesheetStatus.APPROVED else "rejected"
+    comment = f"\n\nComment: {data.comment}" if data.comment else ""
+    await queue_emails(db, [(
+        f"Your Timesheet Was {verb.capitalize()} ({row.week_start})",
+        f"Hello {row.full_name},\n\nYour timesheet for the week starting {row.week_start} has been {verb}.{comment}\n\n-- Dew Time Tracker",
+        [row.email],
+    ) for row in decided])
+    await db.commit()
+    event = AuditEventType.TIMESHEET_APPROVED if decision == TimesheetStatus.APPROVED else AuditEventType.TIMESHEET_REJECTED
+    for row in decided:
+        audit(event, current_user, request, timesheet_id=row.id, employee_id=row.employee_id,
+              previous_status=TimesheetStatus.SUBMITTED.value, comment=data.comment, batch=True)
+        events.publish(STATUS_EVENTS[decision.value], row.employee_id, row.manager_email, timesheet_id=row.id, status=decision.value)
+    return BatchDecisionResponse.from_outcomes(ids, outcomes)
+
+# Approve many submitted timesheets
+@router.post("/approve:batch", response_model=BatchDecisionResponse)
+async def approve_timesheets_batch(data: BatchDecisionRequest, request: Request, db: AsyncSession = Depends(get_async_db), current_user: Employee = Depends(get_current_user_async)):
+    return await _decide_timesheet_batch(db, request, current_user, data, TimesheetStatus.APPROVED)
+
+# Reject many submitted timesheets
+@router.post("/reject:batch", response_model=BatchDecisionResponse)
+async def reject_timesheets_batch(data: BatchDecisionRequest, request: Request, db: AsyncSession = Depends(get_async_db), current_user: Employee = Depends(get_current_user_async)):
+    return await _decide_timesheet_batch(db, request, current_user, data, TimesheetStatus.REJECTED)
+
+def _span(start, end) -> str:
+    return f"{start.strftime('%H:%M')}–{end.strftime('%H:%M')}"
+
+def _break_errors(entry_data: TimeEntryCreate) -> List[str]:
+    """Breaks must be non-empty, lie within the entry and not overlap each other (touching allowed)"""
+    breaks = [Interval(br.start_time, br.end_time, i) for i, br in enumerate(entry_data.break_periods)]
+    errors = ["Breaks must be within in/out time."] * len(find_outside(breaks, entry_data.in_time, entry_data.out_time))
+    empty = {br.position for br in find_empty(breaks)}
+    errors += ["Break end must be after break start."] * len(empty)
+    for conflict in find_overlaps(br for br in breaks if br.position not in empty):
+        first, second = sorted(conflict, key=lambda br: br.position)
+        errors.append(
+            f"Break period {first.position+1} ({_span(first.start, first.end)}) "
+            f"overlaps with break period {second.position+1} ({_span(second.start, second.end)})"
+        )
+    return errors
+
+def _day_errors(existing: List[TimeEntry], items: List[tuple]) -> Dict[int, List[str]]:
+    """
+    Validation errors of new entries for one day, keyed by item index
+
+    **Logic:**
+    1. `items` are (index, TimeEntryCreate) pairs; out time must be after in time
+    2. One sweep over existing rows and the new items finds every overlap (touching is
+       allowed); a conflict between two new items is reported on the later one
+    3. Breaks are checked per item
+    4. The day may not exceed 24 hours, counting items in index order
+    """
+    errors = defaultdict(list)
+    timed = []
+    for index, item in items:
+        if item.out_time <= item.in_time:
+            errors[index].append("Out time must be after in time")
+        else:
+            timed.append((index, item))
+
+    intervals = [Interval(e.in_time, e.out_time, (None, e)) for e in existing]
+    intervals += [Interval(item.in_time, item.out_time, (index, item)) for index, item in timed]
+    for conflict in find_overlaps(intervals):
+        (first_index, first), (second_index, _) = sorted(
+            (interval.position for interval in conflict),
+            key=lambda position: -1 if position[0] is None else position[0]
+        )
+        if second_index is None:
+            continue  # two existing rows: not this request's problem
+        label = f"entry ID: {first.id}" if first_index is None else f"item {first_index}"
+        errors[second_index].append(
+            f"Time entry overlaps with an existing entry: {_span(first.in_time, first.out_time)} ({label})"
+        )
+
+    for index, item in timed:
+        errors[index].extend(_break_errors(item))
+
+    total_minutes = sum(entry_minutes(e) for e in existing)
+    for index, item in timed:
+        total_minutes += entry_minutes(item)
+        if total_minutes > 24 * 60:
+            errors[index].append("Total hours for the day exceed 24.")
+    return {index: messages for index, messages in errors.items() if messages}
+
+def _items_errors(existing: List[TimeEntry], items: List[tuple]) -> List[dict]:
+    """Run _day_errors for each day in `items` and return [{"index", "errors"}] sorted by index"""
+    existing_by_day = defaultdict(list)
+    for e in existing:
+        existing_by_day[e.date].append(e)
+    items_by_day = defaultdict(list)
+    for index, item in items:
+        items_by_day[item.date].append((index, item))
+    errors = {}
+    for day, day_items in items_by_day.items():
+        errors.update(_day_errors(existing_by_day[day], day_items))
+    return [{"index": index, "errors": errors[index]} for index in sorted(errors)]
+
+async def _insert_entries(db: AsyncSession, timesheet_id: int, items: List[TimeEntryCreate], now: datetime) -> Dict[tuple, int]:
+    """
+    Bulk insert validated entries and their breaks; returns {(date, in_time): entry id}
+
+    One multi-row INSERT for entries and one for breaks. Validation guarantees (date, in_time)
+    is unique among the items, which maps RETURNING rows back to items without forcing
+    row-at-a-time ordered inserts.
+    """
+    if not items:
+        return {}
+    inserted = (await db.execute(
+        insert(TimeEntry).returning(TimeEntry.id, TimeEntry.date, TimeEntry.in_time),
+        [
+            {
+                "timesheet_id": timesheet_id,
+                "date": item.date,
+                "in_time": item.in_time,
+                "out_time": item.out_time,
+                "project": item.project,
+                "note": item.note,
+                "created_at": now,
+                "updated_at": now,
+            }
+            for item in items
+        ]
+    )).all()
+    entry_ids = {(row.date, row.in_time): row.id for row in inserted}
+    break_rows = [
+        {"time_entry_id": entry_ids[(item.date, item.in_time)], "start_time": br.start_time, "end_time": br.end_time, "created_at": now}
+        for item in items
+        for br in item.break_periods
+    ]
+    if break_rows:
+        await db.execute(insert(BreakPeriod), break_rows)
+    return entry_ids
+
 @router.post("/{timesheet_id}/entries", response_model=TimeEntryResponse)
-def add_time_entry(timesheet_id: int, entry_data: TimeEntryCreate, db: Session = Depends(get_db), current_user: Employee = Depends(get_current_user)):
-    timesheet = db.query(Timesheet).filter(Timesheet.id == timesheet_id).first()
+async def add_time_entry(timesheet_id: int, entry_data: TimeEntryCreate, db: AsyncSession = Depends(get_async_db), current_user: Employee = Depends(get_current_user_async)):
+    timesheet = await db.get(Timesheet, timesheet_id)
     if not timesheet:
         raise HTTPException(status_code=404, detail="Timesheet not found")
     if timesheet.employee_id != current_user.id and current_user.role != EmployeeRole.DEW_ADMIN:
         raise HTTPException(status_code=403, detail="Not authorized")
 
-    # --- Validation: Overlapping entries, max 24 hours, touching allowed ---
-    entries_same_day = db.query(TimeEntry).filter(
-        TimeEntry.timesheet_id == timesheet_id,
-        TimeEntry.date == entry_data.date
-    ).all()
-    new_start = entry_data.in_time
-    new_end = entry_data.out_time
-    if new_end <= new_start:
-        raise HTTPException(status_code=400, detail="Out time must be after in time")
-    # Check for overlap (touching is allowed)
-    def is_overlap(start1, end1, start2, end2):
-        return start1 < end2 and start2 < end1  # strict overlap, not touching
-    for e in entries_same_day:
-        if is_overlap(new_start, new_end, e.in_time, e.out_time):
-            raise HTTPException(
-                status_code=400,
-                detail=(
-                    f"Time entry overlaps with an existing entry: "
-                    f"{e.in_time.strftime('%H:%M')}–{e.out_time.strftime('%H:%M')}"
-                    + (f" (entry ID: {e.id})" if hasattr(e, 'id') else "")
-                )
-            )
-    # --- Validation: Breaks within in/out and no overlap ---
+    # --- Validation: Overlaps (touching allowed), breaks, max 24 hours per day ---
+    entries_same_day = await _load_entries(db, TimeEntry.timesheet_id == timesheet_id, TimeEntry.date == entry_data.date)
+    errors = _day_errors(entries_same_day, [(0, entry_data)]).get(0)
+    if errors:
+        # Every conflict, like the batch endpoint; message joins them for clients that show only text
+        raise HTTPException(status_code=400, detail={"message": "; ".join(errors), "errors": errors})
     breaks = entry_data.break_periods
-    for i, br1 in enumerate(breaks):
-        # Breaks must be within in/out
-        if br1.start_time < new_start or br1.end_time > new_end:
-            raise HTTPException(status_code=400, detail="Breaks must be within in/out time.")
-        if br1.end_time <= br1.start_time:
-            raise HTTPException(status_code=400, detail="Break end must be after break start.")
-        for j, br2 in enumerate(breaks):
-            if i != j:
-                if is_overlap(br1.start_time, br1.end_time, br2.start_time, br2.end_time):
-                    raise HTTPException(
-                        status_code=400,
-                        detail=(
-                            f"Break period {i+1} ({br1.start_time.strftime('%H:%M')}–{br1.end_time.strftime('%H:%M')}) "
-                            f"overlaps with break period {j+1} ({br2.start_time.strftime('%H:%M')}–{br2.end_time.strftime('%H:%M')})"
-                        )
-                    )
-    # --- Validation: Max 24 hours per day ---
-    def entry_minutes(e):
-        mins = (e.out_time.hour * 60 + e.out_time.minute) - (e.in_time.hour * 60 + e.in_time.minute)
-        for br in getattr(e, 'break_periods', []):
-            mins -= (br.end_time.hour * 60 + br.end_time.minute) - (br.start_time.hour * 60 + br.start_time.minute)
-        return mins
-    total_minutes = sum(entry_minutes(e) for e in entries_same_day)
-    # Add new entry's minutes
-    new_entry_minutes = (new_end.hour * 60 + new_end.minute) - (new_start.hour * 60 + new_start.minute)
-    for br in breaks:
-        new_entry_minutes -= (br.end_time.hour * 60 + br.end_time.minute) - (br.start_time.hour * 60 + br.start_time.minute)
-    if total_minutes + new_entry_minutes > 24 * 60:
-        raise HTTPException(status_code=400, detail="Total hours for the day exceed 24.")
+    new_entry_minutes = entry_minutes(entry_data)
     # --- Create entry ---
     time_entry = TimeEntry(
         timesheet_id=timesheet_id,
@@ -276,7 +521,7 @@ def add_time_entry(timesheet_id: int, entry_data: TimeEntryCreate, db: Session =
         note=entry_data.note
     )
     db.add(time_entry)
-    db.flush()  # get time_entry.id
+    await db.flush()  # get time_entry.id
     for br in breaks:
         break_period = BreakPeriod(
             time_entry_id=time_entry.id,
@@ -284,18 +529,194 @@ def add_time_entry(timesheet_id: int, entry_data: TimeEntryCreate, db: Session =
             end_time=br.end_time
         )
         db.add(break_period)
-    db.commit()
-    db.refresh(time_entry)
+    await db.run_sync(apply_entry_minutes, timesheet, entry_data.date, new_entry_minutes)
+    timesheet.updated_at = datetime.utcnow()
+    await db.commit()
+    events.publish(events.TIMESHEET_ENTRY_ADDED, timesheet.employee_id, timesheet.manager_email,
+                   timesheet_id=timesheet_id, entry_ids=[time_entry.id])
+    time_entry = (await _load_entries(db, TimeEntry.id == time_entry.id))[0]
     return TimeEntryResponse.from_orm(time_entry)
 
+@router.post("/{timesheet_id}/entries:batch", response_model=List[TimeEntryResponse], status_code=status.HTTP_201_CREATED)
+async def add_time_entries_batch(timesheet_id: int, batch: TimeEntryBatchCreate, db: AsyncSession = Depends(get_async_db), current_user: Employee = Depends(get_current_user_async)):
+    """
+    Add several time entries (e.g. a whole week) in one request and one transaction
+
+    **Logic:**
+    1. Same ownership rule as adding a single entry
+    2. Loads existing entries and breaks for every date in the batch in one query
+    3. Validates each day's items against its existing rows and each other in one
+       sweep, collecting every error instead of stopping at the first
+    4. Any error rejects the whole batch with 400 and per-item errors; nothing is written
+    5. Otherwise bulk inserts entries and breaks, updates the rollups and commits once
+    """
+    timesheet = await db.get(Timesheet, timesheet_id)
+    if not timesheet:
+        raise HTTPException(status_code=404, detail="Timesheet not found")
+    if timesheet.employee_id != current_user.id and current_user.role != EmployeeRole.DEW_ADMIN:
+        raise HTTPException(status_code=403, detail="Not authorized")
+
+    # --- Validation: every item against existing rows and earlier items of its day ---
+    existing = await _load_entries(
+        db,
+        TimeEntry.timesheet_id == timesheet_id,
+        TimeEntry.date.in_({item.date for item in batch.entries})
+    )
+    item_errors = _items_errors(existing, list(enumerate(batch.entries)))
+    if item_errors:
+        raise HTTPException(
+            status_code=400,
+            detail={"message": f"{len(item_errors)} of {len(batch.entries)} entries are invalid", "errors": item_errors}
+        )
+
+    # --- Create entries: one multi-row INSERT for entries, one for breaks ---
+    now = datetime.utcnow()
+    entry_ids = await _insert_entries(db, timesheet_id, batch.entries, now)
+    await db.run_sync(apply_entries_minutes, timesheet, added=[(item.date, entry_minutes(item)) for item in batch.entries])
+    timesheet.updated_at = now
+    await db.commit()
+    events.publish(events.TIMESHEET_ENTRY_ADDED, timesheet.employee_id, timesheet.manager_email,
+                   timesheet_id=timesheet_id, entry_ids=list(entry_ids.values()))
+    created = await _load_entries(db, TimeEntry.id.in_(list(entry_ids.values())))
+    return [TimeEntryResponse.from_orm(e) for e in created]
+
+# Entry columns a week sync may change in place
+SYNC_FIELDS = ("date", "in_time", "out_time", "project", "note")
+
+@router.put("/{timesheet_id}/week", response_model=TimesheetWeekSyncResponse)
+async def sync_week(timesheet_id: int, sync: TimesheetWeekSync, db: AsyncSession = Depends(get_async_db), current_user: Employee = Depends(get_current_user_async)):
+    """
+    Replace a timesheet's entries with the desired set, writing only what changed
+
+    **Logic:**
+    1. Same ownership rule as adding an entry
+    2. Desired rows are matched to stored entries by id, or else by (date, in, out);
+       unmatched rows are inserted and unmatched stored entries deleted
+    3. The desired state is validated as a whole (overlaps, breaks, 24h) before any write;
+       errors come back per item with 400
+    4. Matched entries are updated only when a field or their breaks differ; breaks are
+       diffed by (start, end)
+    5. Bulk DELETE/UPDATE/INSERT statements, one rollup adjustment and a single commit,
+       so the writes track the size of the edit rather than the week
+    """
+    timesheet = await db.get(Timesheet, timesheet_id)
+    if not timesheet:
+        raise HTTPException(status_code=404, detail="Timesheet not found")
+    if timesheet.employee_id != current_user.id and current_user.role != EmployeeRole.DEW_ADMIN:
+        raise HTTPException(status_code=403, detail="Not authorized")
+
+    stored = await _load_entries(db, TimeEntry.timesheet_id == timesheet_id)
+    stored_by_id = {e.id: e for e in stored}
+
+    # --- Match desired rows to stored entries: explicit ids first, then identical times ---
+    errors = defaultdict(list)
+    matched = {}
+    claimed = set()
+    for index, item in enumerate(sync.entries):
+        if item.id is None:
+            continue
+        if item.id not in stored_by_id:
+            errors[index].append(f"Entry {item.id} does not belong to this timesheet")
+        elif item.id in claimed:
+            errors[index].append(f"Entry {item.id} is listed more than once")
+        else:
+            matched[index] = stored_by_id[item.id]
+            claimed.add(item.id)
+    unclaimed = defaultdict(list)
+    for e in stored:
+        if e.id not in claimed:
+            unclaimed[(e.date, e.in_time, e.out_time)].append(e)
+    for index, item in enumerate(sync.entries):
+        if item.id is None and unclaimed[(item.date, item.in_time, item.out_time)]:
+            matched[index] = unclaimed[(item.date, item.in_time, item.out_time)].pop(0)
+            claimed.add(matched[index].id)
+
+    # --- Validation: the desired week as a whole ---
+    for item_error in _items_errors([], list(enumerate(sync.entries))):
+        errors[item_error["index"]].extend(item_error["errors"])
+    if errors:
+        item_errors = [{"index": index, "errors": errors[index]} for index in sorted(errors)]
+        raise HTTPException(
+            status_code=400,
+            detail={"message": f"{len(item_errors)} of {len(sync.entries)} entries are invalid", "errors": item_errors}
+        )
+
+    # --- Diff ---
+    now = datetime.utcnow()
+    changes = WeekChangeSummary()
+    deleted = [e for e in stored if e.id not in claimed]
+    removed_minutes = [(e.date, entry_minutes(e)) for e in deleted]
+    added_minutes = []
+    new_items = []
+    entry_updates = []
+    break_deletes = []
+    break_inserts = []
+    for index, item in enumerate(sync.entries):
+        entry = matched.get(index)
+        if entry is None:
+            new_items.append(item)
+            added_minutes.append((item.date, entry_minutes(item)))
+            continue
+        changed = {field: getattr(item, field) for field in SYNC_FIELDS if getattr(item, field) != getattr(entry, field)}
+        stored_breaks = {(br.start_time, br.end_time): br for br in entry.break_periods}
+        desired_breaks = {(br.start_time, br.end_time) for br in item.break_periods}
+        gone = [br.id for key, br in stored_breaks.items() if key not in desired_breaks]
+        new = [key for key in desired_breaks if key not in stored_breaks]
+        if not changed and not gone and not new:
+            changes.unchanged += 1
+            continue
+        entry_updates.append({"id": entry.id, **changed, "updated_at": now})
+        break_deletes.extend(gone)
+        break_inserts.extend(
+            {"time_entry_id": entry.id, "start_time": start, "end_time": end, "created_at": now}
+            for start, end in sorted(new)
+        )
+        old_minutes, new_minutes = entry_minutes(entry), entry_minutes(item)
+        if entry.date != item.date or old_minutes != new_minutes:
+            removed_minutes.append((entry.date, old_minutes))
+            added_minutes.append((item.date, new_minutes))
+        changes.updated.append(entry.id)
+
+    # --- Write: only the statements the diff needs ---
+    changes.deleted = [e.id for e in deleted]
+    changes.breaks_deleted = len(break_deletes) + sum(len(e.break_periods) for e in deleted)
+    changes.breaks_created = len(break_inserts) + sum(len(item.break_periods) for item in new_items)
+    if break_deletes or deleted:
+        await db.execute(delete(BreakPeriod).where(or_(
+            BreakPeriod.id.in_(break_deletes),
+            BreakPeriod.time_entry_id.in_(changes.deleted)
+        )))
+    if deleted:
+        await db.execute(delete(TimeEntry).where(TimeEntry.id.in_(changes.deleted)))
+    if entry_updates:
+        await db.execute(update(TimeEntry), entry_updates)
+    if break_inserts:
+        await db.execute(insert(BreakPeriod), break_inserts)
+    entry_ids = await _insert_entries(db, timesheet_id, new_items, now)
+    changes.created = [entry_ids[(item.date, item.in_time)] for item in new_items]
+    if changes.created or changes.updated or changes.deleted:
+        await db.run_sync(apply_entries_minutes, timesheet, added=added_minutes, removed=removed_minutes)
+        timesheet.updated_at = now
+        await db.commit()
+        if changes.created:
+            events.publish(events.TIMESHEET_ENTRY_ADDED, timesheet.employee_id, timesheet.manager_email,
+                           timesheet_id=timesheet_id, entry_ids=changes.created)
+    return TimesheetWeekSyncResponse(
+        timesheet=TimesheetResponse.from_orm(await _load_timesheet(db, timesheet_id)),
+        changes=changes
+    )
+
 @router.delete("/{timesheet_id}/entries/{entry_id}", status_code=204)
-def delete_time_entry(timesheet_id: int, entry_id: int, db: Session = Depends(get_db), current_user: Employee = Depends(get_current_user)):
-    time_entry = db.query(TimeEntry).filter(TimeEntry.id == entry_id, TimeEntry.timesheet_id == timesheet_id).first()
-    if not time_entry:
+async def delete_time_entry(timesheet_id: int, entry_id: int, db: AsyncSession = Depends(get_async_db), current_user: Employee = Depends(get_current_user_async)):
+    entries = await _load_entries(db, TimeEntry.id == entry_id, TimeEntry.timesheet_id == timesheet_id)
+    if not entries:
         raise HTTPException(status_code=404, detail="Time entry not found")
-    timesheet = db.query(Timesheet).filter(Timesheet.id == timesheet_id).first()
+    time_entry = entries[0]
+    timesheet = await db.get(Timesheet, timesheet_id)
     if not timesheet or (timesheet.employee_id != current_user.id and current_user.role != EmployeeRole.DEW_ADMIN):
         raise HTTPException(status_code=403, detail="Not authorized")
-    db.delete(time_entry)
-    db.commit()
+    await db.run_sync(apply_entry_minutes, timesheet, time_entry.date, entry_minutes(time_entry), sign=-1)
+    timesheet.updated_at = datetime.utcnow()
+    await db.delete(time_entry)
+    await db.commit()
     return None 
\ No newline at end of file
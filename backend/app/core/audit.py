@@ -0,0 +1,192 @@
+"""
+Batched audit trail writer
+
+Endpoints record audit events with audit(); the request only appends a row to
+an in-process buffer. A background thread writes the buffer with one bulk
+INSERT whenever audit_batch_size events are waiting or audit_flush_interval_seconds
+has passed, so the request path never waits for the audit table.
+
+Events are kept until written: a failed flush puts them back and is retried,
+and close() (called on application shutdown and at interpreter exit) writes
+whatever is left, logging the events as JSON if even that fails. The buffer is
+capped at audit_max_pending; beyond that the oldest events are dropped and
+counted, which only happens when the database has been unreachable for a while.
+"""
+import atexit
+import json
+import logging
+import threading
+import time
+from collections import deque
+from datetime import datetime
+from typing import Optional
+
+from fastapi import Request
+from fastapi.encoders import jsonable_encoder
+from sqlalchemy import insert, select
+from sqlalchemy.exc import IntegrityError
+
+from app.config import settings
+from app.core.database import engine
+from app.core.metrics import COUNT_BUCKETS, REGISTRY, current_request_stats
+from app.models import AuditEventType, AuditLog, Employee, Timesheet
+
+logger = logging.getLogger("dew_timetracker.audit")
+
+AUDIT_PENDING = REGISTRY.gauge("audit_events_pending", "Audit events waiting to be written")
+AUDIT_FLUSH_ROWS = REGISTRY.histogram("audit_flush_rows", "Audit events written per flush", (), COUNT_BUCKETS)
+AUDIT_FLUSH_SECONDS = REGISTRY.histogram("audit_flush_seconds", "Time spent writing one batch of audit events")
+AUDIT_FLUSH_ERRORS = REGISTRY.counter("audit_flush_errors_total", "Audit flushes that failed and will be retried")
+AUDIT_DROPPED = REGISTRY.counter("audit_events_dropped_total", "Audit events dropped because the buffer was full")
+
+WRITER_THREAD_NAME = "audit-writer"
+
+
+class AuditWriter:
+    """
+    Buffer of audit rows written in bulk by a background thread
+
+    **Logic:**
+    1. record() appends a row and wakes the writer once batch_size rows are waiting
+    2. The writer flushes when woken or every flush_interval seconds
+    3. A flush inserts everything buffered in one executemany INSERT; on failure the rows go back to the front
+    4. Rows whose actor or timesheet was deleted before the flush are written with that reference cleared
+    5. close() stops the writer and flushes what is left
+    """
+
+    def __init__(self, bind, batch_size: int, flush_interval: float, max_pending: int):
+        self.bind = bind
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.max_pending = max_pending
+        self._pending = deque()
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._wake = threading.Event()
+        self._closing = False
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def pending(self) -> int:
+        return len(self._pending)
+
+    def record(self, row: dict):
+        started = time.perf_counter()
+        with self._lock:
+            if len(self._pending) >= self.max_pending:
+                self._pending.popleft()
+                AUDIT_DROPPED.inc()
+            self._pending.append(row)
+            depth = len(self._pending)
+            if self._thread is None and not self._closing:
+                self._thread = threading.Thread(target=self._run, name=WRITER_THREAD_NAME, daemon=True)
+                self._thread.start()
+        AUDIT_PENDING.set(depth)
+        if depth >= self.batch_size:
+            self._wake.set()
+        stats = current_request_stats()
+        if stats is not None:
+            stats.audit_events += 1
+            stats.audit_seconds += time.perf_counter() - started
+
+    def flush(self) -> int:
+        """Write everything buffered now; returns the number of rows written"""
+        with self._flush_lock:
+            with self._lock:
+                rows = list(self._pending)
+                self._pending.clear()
+            if not rows:
+                return 0
+            started = time.perf_counter()
+            try:
+                self._insert(rows)
+            except Exception:
+                with self._lock:
+                    self._pending.extendleft(reversed(rows))
+                    while len(self._pending) > self.max_pending:
+                        self._pending.popleft()
+                        AUDIT_DROPPED.inc()
+                AUDIT_FLUSH_ERRORS.inc()
+                raise
+            finally:
+                AUDIT_PENDING.set(len(self._pending))
+            AUDIT_FLUSH_SECONDS.observe(time.perf_counter() - started)
+            AUDIT_FLUSH_ROWS.observe(len(rows))
+            return len(rows)
+
+    def close(self):
+        """Stop the writer thread and write what is left (idempotent)"""
+        with self._lock:
+            self._closing = True
+            thread, self._thread = self._thread, None
+        self._wake.set()
+        if thread is not None:
+            thread.join()
+        try:
+            self.flush()
+        except Exception:
+            logger.exception("Audit flush failed at shutdown; logging %d events instead", self.pending)
+            with self._lock:
+                rows, self._pending = list(self._pending), deque()
+            for row in rows:
+                logger.error(json.dumps(row, default=str))
+        finally:
+            with self._lock:
+                self._closing = False
+            self._wake.clear()
+
+    def _run(self):
+        while True:
+            self._wake.wait(self.flush_interval)
+            self._wake.clear()
+            if self._closing:
+                return
+            try:
+                self.flush()
+            except Exception:
+                logger.exception("Audit flush failed; %d events kept for the next attempt", self.pending)
+
+    def _insert(self, rows: list):
+        try:
+            with self.bind.begin() as conn:
+                conn.execute(insert(AuditLog), rows)
+        except IntegrityError:
+            # An actor or timesheet deleted after the event was recorded: keep the event, drop the reference
+            with self.bind.begin() as conn:
+                employees = set(conn.scalars(select(Employee.id).where(Employee.id.in_({r["actor_id"] for r in rows if r["actor_id"]}))))
+                timesheets = set(conn.scalars(select(Timesheet.id).where(Timesheet.id.in_({r["timesheet_id"] for r in rows if r["timesheet_id"]}))))
+                rows = [
+                    {**r, "actor_id": r["actor_id"] if r["actor_id"] in employees else None,
+                     "timesheet_id": r["timesheet_id"] if r["timesheet_id"] in timesheets else None}
+                    for r in rows
+                ]
+                conn.execute(insert(AuditLog), rows)
+
+
+audit_writer = AuditWriter(
+    engine,
+    settings.audit_batch_size,
+    settings.audit_flush_interval_seconds,
+    settings.audit_max_pending,
+)
+atexit.register(audit_writer.close)
+
+
+def audit(event: AuditEventType, actor: Employee, request: Optional[Request] = None, timesheet_id: Optional[int] = None, **details):
+    """Record `event` performed by `actor`; keyword arguments become the JSON details"""
+    if not settings.audit_enabled:
+        return
+    client = request.client if request is not None else None
+    user_agent = request.headers.get("user-agent") if request is not None else None
+    audit_writer.record({
+        "timesheet_id": timesheet_id,
+        "event": event,
+        "actor_id": actor.id,
+        "actor_email": actor.email,
+        "actor_role": actor.role.value if hasattr(actor.role, "value") else str(actor.role),
+        # JSON-safe now, so a date or enum in the details can't fail the whole flush later
+        "details": jsonable_encoder(details) if details else None,
+        "ip_address": client.host if client else None,
+        "user_agent": user_agent[:500] if user_agent else None,
+        "timestamp": datetime.utcnow(),
+    })
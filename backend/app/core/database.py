@@ -1,16 +1,55 @@
+from sqlalchemy.engine import URL, make_url
+from sqlalchemy.ext.asyncio import AsyncEngine, async_sessionmaker, create_async_engine
 from sqlmodel import SQLModel, create_engine, Session
 from app.config import settings
+from app.core.metrics import install_sql_hooks
+from app.core.db_pool import engine_options, install_pool_hooks, install_time_limits
 
 # Import all models to register them with SQLModel
 from app.models import Client, Employee, Timesheet, AuditLog
 
-# Create database engine
-engine = create_engine(
-    settings.database_url,
-    echo=settings.debug,  # Print SQL queries in debug mode
-    pool_pre_ping=True,   # Verify connections before use
-    pool_recycle=300      # Recycle connections every 5 minutes
-)
+# Create database engine (pool size, timeouts and echo come from Settings)
+engine = create_engine(settings.database_url, **engine_options(settings.database_url))
+
+# asyncio driver for each sync driver name database_url may use
+ASYNC_DRIVERS = {
+    "postgresql": "postgresql+asyncpg",
+    "postgresql+psycopg2": "postgresql+asyncpg",
+    "sqlite": "sqlite+aiosqlite",
+    "sqlite+pysqlite": "sqlite+aiosqlite",
+}
+
+
+def async_url(url) -> URL:
+    """The same database as `url`, reached through its asyncio driver"""
+    url = make_url(url)
+    return url.set(drivername=ASYNC_DRIVERS.get(url.drivername, url.drivername))
+
+
+def make_async_sessionmaker(bind: AsyncEngine) -> async_sessionmaker:
+    """
+    AsyncSession factory used by the API
+
+    expire_on_commit=False: an expired attribute can only be reloaded with IO, which an
+    AsyncSession cannot do implicitly, so objects keep their values after commit and
+    endpoints reload explicitly (populate_existing) where they need fresh state.
+    """
+    return async_sessionmaker(bind, expire_on_commit=False)
+
+
+# Async engine for the async endpoints, same database and pool settings
+_async_database_url = settings.async_database_url or async_url(settings.database_url)
+async_engine = create_async_engine(_async_database_url, **engine_options(_async_database_url, is_async=True))
+AsyncSessionLocal = make_async_sessionmaker(async_engine)
+
+install_time_limits(engine)
+install_time_limits(async_engine.sync_engine)
+
+if settings.metrics_enabled:
+    install_sql_hooks(engine)
+    install_sql_hooks(async_engine.sync_engine)
+    install_pool_hooks(engine)
+    install_pool_hooks(async_engine.sync_engine)
 
 def create_db_and_tables():
     """Create all database tables"""
@@ -19,4 +58,4 @@ def create_db_and_tables():
 def get_session():
     """Get database session"""
     with Session(engine) as session:
-        yield session 
\ No newline at end of file
+        yield session
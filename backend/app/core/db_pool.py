@@ -0,0 +1,236 @@
+"""
+Connection pool configuration, pool telemetry and DB time limits
+
+Engine options come from Settings (pool size, overflow, checkout timeout,
+recycle, echo). The pools report how long a checkout waited, how many
+connections are in use, overflow connections and checkout timeouts.
+
+Two optional limits stop runaway SQL:
+- db_statement_timeout_ms caps any single statement
+- db_request_time_budget_ms caps the total SQL time of one request, as measured
+  by the metrics middleware (see RequestStats); once it is spent the next
+  statement is refused, and a statement that would overrun it is cancelled
+
+Both surface as DBTimeLimitExceeded, which the app answers with 503. PostgreSQL
+enforces them server side through statement_timeout; SQLite through a progress
+handler that interrupts the statement once its deadline has passed.
+"""
+import time
+from typing import Optional
+
+from sqlalchemy import event, exc
+from sqlalchemy.engine import Engine, make_url
+from sqlalchemy.pool import AsyncAdaptedQueuePool, Pool, QueuePool
+
+from app.config import settings
+from app.core.metrics import REGISTRY, current_request_stats
+
+DB_POOL_CHECKOUT_WAIT = REGISTRY.histogram("db_pool_checkout_wait_seconds", "Time spent waiting for a pooled connection", ("pool",))
+DB_POOL_IN_USE = REGISTRY.gauge("db_pool_connections_in_use", "Connections checked out of the pool", ("pool",))
+DB_POOL_OVERFLOW = REGISTRY.counter("db_pool_overflow_total", "Connections opened beyond pool_size", ("pool",))
+DB_POOL_TIMEOUTS = REGISTRY.counter("db_pool_checkout_timeouts_total", "Checkouts that gave up after pool_timeout", ("pool",))
+DB_TIME_LIMIT_EXCEEDED = REGISTRY.counter("db_time_limit_exceeded_total", "Statements refused or cancelled by a DB time limit", ("limit",))
+
+# SQLite VM instructions between two deadline checks
+PROGRESS_INTERVAL = 1000
+# SQLSTATE query_canceled, raised by PostgreSQL when statement_timeout fires
+QUERY_CANCELED = "57014"
+
+
+class DBTimeLimitExceeded(Exception):
+    """A statement was refused or cancelled by the statement timeout or the request DB time budget"""
+
+    def __init__(self, limit: str):
+        super().__init__(f"Database {limit.replace('_', ' ')} exceeded")
+        self.limit = limit
+
+
+class _TimedCheckout:
+    """QueuePool mixin timing how long checkouts wait for a connection and counting overflow connections"""
+
+    def _do_get(self):
+        started = time.perf_counter()
+        overflow = self.overflow()
+        try:
+            record = super()._do_get()
+            # Opening a connection past pool_size raises overflow() above zero
+            if self.overflow() > max(overflow, 0):
+                DB_POOL_OVERFLOW.inc(pool=_pool_label(self))
+            return record
+        except exc.TimeoutError:
+            DB_POOL_TIMEOUTS.inc(pool=_pool_label(self))
+            raise
+        finally:
+            DB_POOL_CHECKOUT_WAIT.observe(time.perf_counter() - started, pool=_pool_label(self))
+
+
+class TimedQueuePool(_TimedCheckout, QueuePool):
+    pass
+
+
+class TimedAsyncAdaptedQueuePool(_TimedCheckout, AsyncAdaptedQueuePool):
+    pass
+
+
+def engine_options(url, is_async: bool = False) -> dict:
+    """
+    Keyword arguments for create_engine / create_async_engine from Settings
+
+    **Logic:**
+    1. echo follows db_echo, independent of debug; the pool is labelled "sync" or "async" in metrics
+    2. Server databases get a timed QueuePool sized by db_pool_size / db_max_overflow
+    3. SQLite keeps its dialect's default pool (file and :memory: need different ones)
+    4. On PostgreSQL, db_statement_timeout_ms becomes the session's statement_timeout
+    """
+    url = make_url(url)
+    options = {"echo": settings.db_echo, "pool_pre_ping": True, "pool_logging_name": "async" if is_async else "sync"}
+    if url.get_backend_name() == "sqlite":
+        return options
+
+    options.update(
+        poolclass=TimedAsyncAdaptedQueuePool if is_async else TimedQueuePool,
+        pool_size=settings.db_pool_size,
+        max_overflow=settings.db_max_overflow,
+        pool_timeout=settings.db_pool_timeout,
+        pool_recycle=settings.db_pool_recycle,
+    )
+    if settings.db_statement_timeout_ms and url.get_backend_name() == "postgresql":
+        timeout = str(settings.db_statement_timeout_ms)
+        if url.get_driver_name() == "asyncpg":
+            options["connect_args"] = {"server_settings": {"statement_timeout": timeout}}
+        else:
+            options["connect_args"] = {"options": f"-c statement_timeout={timeout}"}
+    return options
+
+
+def install_pool_hooks(engine: Engine):
+    """Export the connections checked out of an engine's pool (idempotent)"""
+    pool = engine.pool
+    label = _pool_label(pool)
+    if label not in _pool_listeners:
+        _pool_listeners[label] = _make_pool_listeners(label)
+    on_checkout, on_checkin = _pool_listeners[label]
+    if event.contains(pool, "checkout", on_checkout):
+        return
+    event.listen(pool, "checkout", on_checkout)
+    event.listen(pool, "checkin", on_checkin)
+
+
+def _pool_label(pool: Pool) -> str:
+    # pool_logging_name survives pool.recreate() on engine.dispose()
+    return pool.logging_name or "default"
+
+
+def _make_pool_listeners(label: str):
+    """Checkout and checkin listeners reporting under `label` (a connection record doesn't expose its pool)"""
+    def on_checkout(dbapi_connection, connection_record, connection_proxy):
+        DB_POOL_IN_USE.inc(pool=label)
+
+    def on_checkin(dbapi_connection, connection_record):
+        DB_POOL_IN_USE.dec(pool=label)
+
+    return on_checkout, on_checkin
+
+
+_pool_listeners = {}
+
+
+def install_time_limits(engine: Engine):
+    """
+    Enforce db_statement_timeout_ms and db_request_time_budget_ms on an engine (idempotent)
+
+    The limits are read from Settings on every statement, so changing them takes
+    effect immediately (except the PostgreSQL statement_timeout, set at connect).
+    """
+    if event.contains(engine, "before_cursor_execute", _before_cursor_execute):
+        return
+    # insert=True: refuse a statement before the metrics hooks start timing it
+    event.listen(engine, "before_cursor_execute", _before_cursor_execute, insert=True)
+    event.listen(engine, "after_cursor_execute", _after_cursor_execute)
+    event.listen(engine, "handle_error", _handle_error)
+    event.listen(engine, "begin", _on_begin)
+    if engine.dialect.name == "sqlite":
+        event.listen(engine, "connect", _install_progress_handler)
+
+
+def _remaining_budget() -> Optional[float]:
+    """Seconds of SQL the current request may still spend, or None without a budget"""
+    stats = current_request_stats()
+    if not settings.db_request_time_budget_ms or stats is None:
+        return None
+    return settings.db_request_time_budget_ms / 1000 - stats.db_seconds
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    """
+    Refuse the statement once the request budget is spent, otherwise arm its deadline
+
+    **Logic:**
+    1. No budget left: raise DBTimeLimitExceeded without running the statement
+    2. SQLite: the deadline is the nearer of the statement timeout and the remaining budget
+    3. PostgreSQL: the first statement of each transaction lowers statement_timeout
+       (SET LOCAL, undone at commit/rollback) to the remaining budget when that is shorter
+    """
+    remaining = _remaining_budget()
+    if remaining is not None and remaining <= 0:
+        DB_TIME_LIMIT_EXCEEDED.inc(limit="request_budget")
+        raise DBTimeLimitExceeded("request_budget")
+
+    info = conn.info
+    if conn.dialect.name == "sqlite":
+        statement_timeout = settings.db_statement_timeout_ms / 1000 if settings.db_statement_timeout_ms else None
+        if remaining is not None and (statement_timeout is None or remaining < statement_timeout):
+            info["deadline"], info["deadline_limit"] = time.perf_counter() + remaining, "request_budget"
+        elif statement_timeout is not None:
+            info["deadline"], info["deadline_limit"] = time.perf_counter() + statement_timeout, "statement_timeout"
+    elif conn.dialect.name == "postgresql" and remaining is not None and not info.get("budget_timeout_set"):
+        remaining_ms = max(1, int(remaining * 1000))
+        if not settings.db_statement_timeout_ms or remaining_ms < settings.db_statement_timeout_ms:
+            cursor.execute(f"SET LOCAL statement_timeout = {remaining_ms}")
+            info["deadline_limit"] = "request_budget"
+        info["budget_timeout_set"] = True
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info["deadline"] = None
+
+
+def _on_begin(conn):
+    conn.info["budget_timeout_set"] = False
+    conn.info["deadline_limit"] = "statement_timeout"
+
+
+def _handle_error(exception_context):
+    """Replace the driver's cancellation error with DBTimeLimitExceeded"""
+    connection = exception_context.connection
+    if connection is None:
+        return None
+    info = connection.info
+    original = exception_context.original_exception
+    if connection.dialect.name == "sqlite":
+        limit = info.get("deadline_limit") if info.get("deadline") is not None else None
+        info["deadline"] = None
+        if limit is None or "interrupted" not in str(original):
+            return None
+    elif getattr(original, "pgcode", None) == QUERY_CANCELED:
+        limit = info.get("deadline_limit") or "statement_timeout"
+    else:
+        return None
+    DB_TIME_LIMIT_EXCEEDED.inc(limit=limit)
+    return DBTimeLimitExceeded(limit)
+
+
+def _install_progress_handler(dbapi_connection, connection_record):
+    """Interrupt a SQLite statement once the deadline armed in before_cursor_execute has passed"""
+    info = connection_record.info
+
+    def check_deadline():
+        deadline = info.get("deadline")
+        return 1 if deadline is not None and time.perf_counter() > deadline else 0
+
+    driver_connection = getattr(dbapi_connection, "driver_connection", None)
+    if driver_connection is not None:
+        # aiosqlite: the handler must be installed from its worker thread
+        dbapi_connection.await_(driver_connection.set_progress_handler(check_deadline, PROGRESS_INTERVAL))
+    else:
+        dbapi_connection.set_progress_handler(check_deadline, PROGRESS_INTERVAL)
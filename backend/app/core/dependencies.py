@@ -3,7 +3,7 @@ from fastapi import Depends, HTTPException, status
 from sqlalchemy.orm import Session
 
 from app.core.session import get_db
-from app.utils.auth import get_current_user_dependency
+from app.utils.auth import get_current_user_dependency, get_current_user_async_dependency
 from app.models.employee import Employee, EmployeeRole
 
 
@@ -129,4 +129,5 @@ require_consultant = require_role(EmployeeRole.CONSULTANT)
 require_client_manager = require_role(EmployeeRole.CLIENT_MANAGER)
 require_dew_admin_role = require_role(EmployeeRole.DEW_ADMIN)
 
-get_current_user = get_current_user_dependency 
\ No newline at end of file
+get_current_user = get_current_user_dependency
+get_current_user_async = get_current_user_async_dependency
@@ -0,0 +1,228 @@
+"""
+In-process change notifications for server-sent events
+
+Endpoints call publish() after committing a change to a timesheet or time off
+request; the hub fans the event out to every open GET /events stream whose user
+may see it (the employee it concerns, the manager it is addressed to, admins).
+Events carry only ids and the new status, so clients refetch what they show
+instead of polling whole lists.
+
+Each stream has a bounded buffer. A client too slow to keep up is not allowed to
+grow it: the stream is sent a `reset` event and closed, and the client reloads
+its data before reconnecting. The hub keeps the last events_replay_size events,
+so a reconnect with Last-Event-ID replays what was missed; ids embed the hub's
+start time, so an id from before a restart (or too old to replay) also gets a
+`reset`.
+
+The hub lives in one process: with several workers each serves only the changes
+made through it, which is why clients should treat events as hints to refetch.
+"""
+import asyncio
+import itertools
+import json
+import threading
+import time
+from collections import deque
+from dataclasses import dataclass, field
+from typing import Deque, List, Optional, Set, Tuple
+
+from app.config import settings
+from app.core.metrics import REGISTRY
+from app.models.employee import Employee, EmployeeRole
+
+EVENTS_SUBSCRIBERS = REGISTRY.gauge("events_subscribers", "Open event streams")
+EVENTS_PUBLISHED = REGISTRY.counter("events_published_total", "Change events published", ("type",))
+EVENTS_OVERFLOWS = REGISTRY.counter("events_overflows_total", "Event streams reset because their buffer was full")
+
+# --- Event types ---
+TIMESHEET_SUBMITTED = "timesheet.submitted"
+TIMESHEET_APPROVED = "timesheet.approved"
+TIMESHEET_REJECTED = "timesheet.rejected"
+TIMESHEET_ENTRY_ADDED = "timesheet.entry_added"
+TIME_OFF_SUBMITTED = "time_off.submitted"
+TIME_OFF_APPROVED = "time_off.approved"
+TIME_OFF_REJECTED = "time_off.rejected"
+
+# Control messages on a subscription's queue (never replayed)
+RESET = "reset"
+CLOSED = "closed"
+
+
+@dataclass(frozen=True)
+class ChangeEvent:
+    seq: int
+    type: str
+    data: dict
+    employee_id: int
+    manager_email: Optional[str]
+
+
+@dataclass(frozen=True)
+class EventScope:
+    """Who a stream belongs to, copied from the Employee so the stream holds no session"""
+    user_id: int
+    role: EmployeeRole
+    email: str
+
+    @classmethod
+    def of(cls, user: Employee) -> "EventScope":
+        return cls(user_id=user.id, role=user.role, email=user.email)
+
+    def allows(self, event: ChangeEvent) -> bool:
+        """Same visibility as the list endpoints: own requests, requests addressed to me, everything for admins"""
+        if self.role == EmployeeRole.DEW_ADMIN:
+            return True
+        if event.employee_id == self.user_id:
+            return True
+        return self.role == EmployeeRole.CLIENT_MANAGER and event.manager_email == self.email
+
+
+@dataclass(eq=False)
+class Subscription:
+    scope: EventScope
+    loop: asyncio.AbstractEventLoop
+    buffer_size: int
+    queue: asyncio.Queue = field(default_factory=asyncio.Queue)
+    done: bool = False
+
+    def deliver(self, item) -> None:
+        """Queue an event or control message; runs on the subscription's loop"""
+        if self.done:
+            return
+        if item in (RESET, CLOSED):
+            self.done = True
+        elif self.queue.qsize() >= self.buffer_size:
+            # Slow consumer: end the stream rather than buffer without bound
+            EVENTS_OVERFLOWS.inc()
+            self.done = True
+            item = RESET
+        self.queue.put_nowait(item)
+
+
+class EventHub:
+    """
+    Fan-out of change events to the open streams
+
+    **Logic:**
+    1. publish() numbers the event, keeps it in the replay ring and hands it to every subscription whose scope allows it
+    2. Delivery happens on each subscription's event loop (call_soon_threadsafe when published from another thread)
+    3. subscribe() registers a stream and returns the events it missed since Last-Event-ID, or RESET if they are gone
+    4. A subscription whose buffer is full gets RESET and no further events
+    """
+
+    def __init__(self, buffer_size: int, replay_size: int):
+        self.buffer_size = buffer_size
+        self.epoch = format(int(time.time() * 1000), "x")
+        self._seq = itertools.count(1)
+        self._recent: Deque[ChangeEvent] = deque(maxlen=replay_size)
+        self._subscriptions: Set[Subscription] = set()
+        self._lock = threading.Lock()
+
+    def event_id(self, event: ChangeEvent) -> str:
+        return f"{self.epoch}-{event.seq}"
+
+    def publish(self, type: str, employee_id: int, manager_email: Optional[str] = None, **data) -> ChangeEvent:
+        with self._lock:
+            event = ChangeEvent(seq=next(self._seq), type=type, data={"employee_id": employee_id, **data},
+                                employee_id=employee_id, manager_email=manager_email)
+            self._recent.append(event)
+            targets = [s for s in self._subscriptions if s.scope.allows(event)]
+        EVENTS_PUBLISHED.inc(type=type)
+        for subscription in targets:
+            self._dispatch(subscription, event)
+        return event
+
+    def subscribe(self, scope: EventScope, last_event_id: Optional[str] = None) -> Tuple[Subscription, List]:
+        """Register a stream; the second value is the backlog to send first (missed events, or [RESET])"""
+        subscription = Subscription(scope=scope, loop=asyncio.get_running_loop(), buffer_size=self.buffer_size)
+        with self._lock:
+            backlog = self._missed(scope, last_event_id) if last_event_id else []
+            self._subscriptions.add(subscription)
+            EVENTS_SUBSCRIBERS.set(len(self._subscriptions))
+        return subscription, backlog
+
+    def unsubscribe(self, subscription: Subscription) -> None:
+        with self._lock:
+            self._subscriptions.discard(subscription)
+            EVENTS_SUBSCRIBERS.set(len(self._subscriptions))
+
+    def close(self) -> None:
+        """End every open stream (application shutdown)"""
+        with self._lock:
+            subscriptions = list(self._subscriptions)
+        for subscription in subscriptions:
+            self._dispatch(subscription, CLOSED)
+
+    def _missed(self, scope: EventScope, last_event_id: str) -> List:
+        epoch, _, seq = last_event_id.partition("-")
+        if epoch != self.epoch or not seq.isdigit():
+            return [RESET]
+        seq = int(seq)
+        oldest = self._recent[0].seq if self._recent else None
+        # Events after seq were dropped from the ring: the client must reload
+        if oldest is not None and seq < oldest - 1:
+            return [RESET]
+        return [event for event in self._recent if event.seq > seq and scope.allows(event)]
+
+    @staticmethod
+    def _dispatch(subscription: Subscription, item) -> None:
+        try:
+            running = asyncio.get_running_loop()
+        except RuntimeError:
+            running = None
+        if running is subscription.loop:
+            subscription.deliver(item)
+        else:
+            try:
+                subscription.loop.call_soon_threadsafe(subscription.deliver, item)
+            except RuntimeError:
+                # The stream's loop is gone; its generator's finally unsubscribes it
+                pass
+
+
+def format_event(hub: EventHub, event: ChangeEvent) -> str:
+    """One SSE message: id (for Last-Event-ID), event type and compact JSON data"""
+    return f"id: {hub.event_id(event)}\nevent: {event.type}\ndata: {json.dumps(event.data, separators=(',', ':'))}\n\n"
+
+
+async def stream_events(hub: EventHub, subscription: Subscription, backlog: List, is_disconnected, heartbeat: float):
+    """
+    Body of an event stream
+
+    **Logic:**
+    1. Tells the client how long to wait before reconnecting, then sends the backlog
+    2. Sends each delivered event; a comment line every `heartbeat` seconds keeps proxies from closing an idle stream
+    3. RESET is sent as a `reset` event and ends the stream; CLOSED ends it silently
+    4. Stops when the client disconnects and always unsubscribes
+    """
+    try:
+        yield f"retry: {settings.events_retry_ms}\n\n"
+        for item in backlog:
+            if item == RESET:
+                yield "event: reset\ndata: {}\n\n"
+                return
+            yield format_event(hub, item)
+        while True:
+            try:
+                item = await asyncio.wait_for(subscription.queue.get(), timeout=heartbeat)
+            except asyncio.TimeoutError:
+                if await is_disconnected():
+                    return
+                yield ": keepalive\n\n"
+                continue
+            if item == RESET:
+                yield "event: reset\ndata: {}\n\n"
+                return
+            if item == CLOSED:
+                return
+            yield format_event(hub, item)
+    finally:
+        hub.unsubscribe(subscription)
+
+
+event_hub = EventHub(buffer_size=settings.events_buffer_size, replay_size=settings.events_replay_size)
+
+
+def publish(type: str, employee_id: int, manager_email: Optional[str] = None, **data) -> None:
+    """Notify open streams of a committed change (call after the commit)"""
+    event_hub.publish(type, employee_id, manager_email, **data)
@@ -0,0 +1,300 @@
+"""
+In-process request metrics exported in Prometheus text format
+
+Per route template we record request latency, SQL statement count, DB time,
+rows returned and response bytes. SQL numbers come from cursor events on the
+engine and are attributed to the request that issued them through a context
+variable, which Starlette copies into the threadpool running sync endpoints.
+"""
+import bisect
+import threading
+import time
+from contextvars import ContextVar
+from dataclasses import dataclass
+from typing import Dict, Optional, Sequence, Tuple
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from starlette.routing import Match
+
+from app.core.structured_log import log_sampled
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+COUNT_BUCKETS = (0, 1, 2, 5, 10, 20, 50, 100, 200, 500, 1000)
+ROW_BUCKETS = (0, 1, 10, 100, 1000, 10000, 100000, 1000000)
+BYTE_BUCKETS = (256, 1024, 4096, 16384, 65536, 262144, 1048576, 4194304, 16777216)
+
+
+class _Metric:
+    """Base class: a named metric with a fixed label set"""
+    kind = "untyped"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+
+    def _key(self, labels: Dict[str, str]) -> Tuple[str, ...]:
+        return tuple(str(labels.get(name, "")) for name in self.labelnames)
+
+    def _format_labels(self, key: Tuple[str, ...], extra: Optional[Dict[str, str]] = None) -> str:
+        pairs = list(zip(self.labelnames, key)) + list((extra or {}).items())
+        if not pairs:
+            return ""
+        escaped = ",".join(f'{name}="{_escape(value)}"' for name, value in pairs)
+        return "{" + escaped + "}"
+
+    def render(self) -> str:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.kind}"]
+        lines.extend(self._samples())
+        return "\n".join(lines)
+
+    def _samples(self):
+        raise NotImplementedError
+
+
+class Counter(_Metric):
+    """Monotonically increasing value"""
+    kind = "counter"
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._values: Dict[Tuple[str, ...], float] = {}
+
+    def inc(self, amount: float = 1.0, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def value(self, **labels) -> float:
+        return self._values.get(self._key(labels), 0.0)
+
+    def _samples(self):
+        with self._lock:
+            items = sorted(self._values.items())
+        return [f"{self.name}{self._format_labels(key)} {_number(value)}" for key, value in items]
+
+
+class Gauge(Counter):
+    """Value that can go up and down"""
+    kind = "gauge"
+
+    def set(self, value: float, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = value
+
+    def dec(self, amount: float = 1.0, **labels):
+        self.inc(-amount, **labels)
+
+
+class Histogram(_Metric):
+    """Cumulative bucketed observations with sum and count"""
+    kind = "histogram"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = (), buckets: Sequence[float] = LATENCY_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets))
+        self._series: Dict[Tuple[str, ...], list] = {}
+
+    def observe(self, value: float, **labels):
+        key = self._key(labels)
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(key)
+            if series is None:
+                # bucket counts (+Inf last), sum, count
+                series = self._series[key] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+            series[0][index] += 1
+            series[1] += value
+            series[2] += 1
+
+    def count(self, **labels) -> int:
+        series = self._series.get(self._key(labels))
+        return series[2] if series else 0
+
+    def _samples(self):
+        with self._lock:
+            items = sorted((key, ([*series[0]], series[1], series[2])) for key, series in self._series.items())
+        lines = []
+        for key, (bucket_counts, total, count) in items:
+            cumulative = 0
+            for bound, bucket_count in zip(self.buckets + (float("inf"),), bucket_counts):
+                cumulative += bucket_count
+                le = "+Inf" if bound == float("inf") else _number(bound)
+                lines.append(f"{self.name}_bucket{self._format_labels(key, {'le': le})} {cumulative}")
+            lines.append(f"{self.name}_sum{self._format_labels(key)} {_number(total)}")
+            lines.append(f"{self.name}_count{self._format_labels(key)} {count}")
+        return lines
+
+
+class Registry:
+    """Collection of metrics rendered together at /metrics"""
+
+    def __init__(self):
+        self._metrics: Dict[str, _Metric] = {}
+        self._lock = threading.Lock()
+
+    def register(self, metric: _Metric) -> _Metric:
+        with self._lock:
+            if metric.name in self._metrics:
+                return self._metrics[metric.name]
+            self._metrics[metric.name] = metric
+        return metric
+
+    def counter(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> Counter:
+        return self.register(Counter(name, documentation, labelnames))
+
+    def gauge(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> Gauge:
+        return self.register(Gauge(name, documentation, labelnames))
+
+    def histogram(self, name: str, documentation: str, labelnames: Sequence[str] = (), buckets: Sequence[float] = LATENCY_BUCKETS) -> Histogram:
+        return self.register(Histogram(name, documentation, labelnames, buckets))
+
+    def render(self) -> str:
+        with self._lock:
+            metrics = list(self._metrics.values())
+        return "\n".join(metric.render() for metric in metrics) + "\n"
+
+
+REGISTRY = Registry()
+
+REQUEST_LATENCY = REGISTRY.histogram("http_request_duration_seconds", "Request latency by route template", ("method", "route", "status"))
+REQUEST_STATEMENTS = REGISTRY.histogram("http_request_db_statements", "SQL statements executed per request", ("method", "route"), COUNT_BUCKETS)
+REQUEST_DB_TIME = REGISTRY.histogram("http_request_db_seconds", "Time spent in SQL per request", ("method", "route"))
+REQUEST_DB_ROWS = REGISTRY.histogram("http_request_db_rows", "Rows returned by SQL per request (drivers that report rowcount)", ("method", "route"), ROW_BUCKETS)
+REQUEST_AUDIT_TIME = REGISTRY.histogram("http_request_audit_seconds", "Time spent queueing audit events per request", ("method", "route"))
+RESPONSE_BYTES = REGISTRY.histogram("http_response_bytes", "Response body size per request", ("method", "route"), BYTE_BUCKETS)
+DB_STATEMENTS_TOTAL = REGISTRY.counter("db_statements_total", "SQL statements executed, including outside requests")
+DB_SECONDS_TOTAL = REGISTRY.counter("db_seconds_total", "Time spent in SQL, including outside requests")
+
+
+@dataclass
+class RequestStats:
+    """SQL activity attributed to the current request"""
+    statements: int = 0
+    db_seconds: float = 0.0
+    rows: int = 0
+    audit_events: int = 0
+    audit_seconds: float = 0.0
+
+
+_current_stats: ContextVar[Optional[RequestStats]] = ContextVar("request_stats", default=None)
+
+
+def current_request_stats() -> Optional[RequestStats]:
+    return _current_stats.get()
+
+
+def install_sql_hooks(engine: Engine):
+    """Attach cursor timing hooks to an engine (idempotent)"""
+    if event.contains(engine, "before_cursor_execute", _before_cursor_execute):
+        return
+    event.listen(engine, "before_cursor_execute", _before_cursor_execute)
+    event.listen(engine, "after_cursor_execute", _after_cursor_execute)
+    event.listen(engine, "handle_error", _handle_error)
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault("query_start", []).append(time.perf_counter())
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    elapsed = time.perf_counter() - conn.info["query_start"].pop()
+    DB_STATEMENTS_TOTAL.inc()
+    DB_SECONDS_TOTAL.inc(elapsed)
+    stats = _current_stats.get()
+    if stats is not None:
+        stats.statements += 1
+        stats.db_seconds += elapsed
+        # SQLite reports -1 for SELECTs; psycopg2 reports the rows fetched
+        if cursor.rowcount and cursor.rowcount > 0 and not executemany:
+            stats.rows += cursor.rowcount
+
+
+def _handle_error(exception_context):
+    start_stack = exception_context.connection.info.get("query_start") if exception_context.connection is not None else None
+    if start_stack:
+        start_stack.pop()
+
+
+def route_template(app, scope) -> str:
+    """Path template of the matching route (e.g. /api/v1/timesheets/{timesheet_id}), to bound label cardinality"""
+    for route in getattr(app, "routes", []):
+        match, _ = route.matches(scope)
+        if match == Match.FULL:
+            return getattr(route, "path", scope["path"])
+    return "unmatched"
+
+
+class MetricsMiddleware:
+    """
+    Pure ASGI middleware recording per-route request metrics
+
+    **Logic:**
+    1. Installs a fresh RequestStats in the context before calling the app
+    2. Counts response body bytes as they are sent (works for streaming responses)
+    3. Observes latency, SQL statements, DB time, rows, audit overhead and bytes by route template
+    4. Optionally emits a sampled structured log line per request
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        stats = RequestStats()
+        token = _current_stats.set(stats)
+        started = time.perf_counter()
+        status_code = 500
+        body_bytes = 0
+
+        async def send_wrapper(message):
+            nonlocal status_code, body_bytes
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            elif message["type"] == "http.response.body":
+                body_bytes += len(message.get("body", b""))
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            _current_stats.reset(token)
+            elapsed = time.perf_counter() - started
+            method = scope["method"]
+            route = route_template(scope["app"], scope) if "app" in scope else "unmatched"
+            REQUEST_LATENCY.observe(elapsed, method=method, route=route, status=status_code)
+            REQUEST_STATEMENTS.observe(stats.statements, method=method, route=route)
+            REQUEST_DB_TIME.observe(stats.db_seconds, method=method, route=route)
+            REQUEST_DB_ROWS.observe(stats.rows, method=method, route=route)
+            if stats.audit_events:
+                REQUEST_AUDIT_TIME.observe(stats.audit_seconds, method=method, route=route)
+            RESPONSE_BYTES.observe(body_bytes, method=method, route=route)
+            log_sampled(
+                "request",
+                method=method,
+                route=route,
+                status=status_code,
+                duration_ms=round(elapsed * 1000, 2),
+                db_statements=stats.statements,
+                db_ms=round(stats.db_seconds * 1000, 2),
+                db_rows=stats.rows,
+                audit_events=stats.audit_events,
+                audit_ms=round(stats.audit_seconds * 1000, 3),
+                response_bytes=body_bytes,
+            )
+
+
+def _escape(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _number(value: float) -> str:
+    if value == int(value):
+        return str(int(value))
+    return repr(float(value))
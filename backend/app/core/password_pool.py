@@ -0,0 +1,104 @@
+"""
+Dedicated executor for password hashing
+
+bcrypt is deliberately slow (tens to hundreds of milliseconds per call). Run
+inline in a sync endpoint it holds one of the threads FastAPI shares with every
+other sync endpoint, so a burst of logins starves the rest of the API. Hashing
+goes through this small pool instead, and requests beyond its queue limit are
+turned away at once with 503 and Retry-After rather than piling up.
+"""
+import asyncio
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Optional
+
+from fastapi import HTTPException, status
+
+from app.config import settings
+from app.core.metrics import REGISTRY
+
+PASSWORD_HASH_SECONDS = REGISTRY.histogram("password_hash_seconds", "Time spent in bcrypt by operation", ("operation",))
+PASSWORD_QUEUE_WAIT_SECONDS = REGISTRY.histogram("password_hash_queue_wait_seconds", "Time a hash job waited for a pool thread", ("operation",))
+PASSWORD_POOL_REJECTED = REGISTRY.counter("password_hash_rejected_total", "Hash jobs refused because the pool was saturated", ("operation",))
+PASSWORD_POOL_IN_FLIGHT = REGISTRY.gauge("password_hash_in_flight", "Hash jobs running or queued")
+
+
+class PasswordPool:
+    """
+    Size-limited thread pool with admission control
+
+    **Logic:**
+    1. At most `workers` jobs run at once (bcrypt releases the GIL, so they run in parallel)
+    2. Up to `queue_limit` more may wait; beyond that run() raises 503 with Retry-After
+    3. A slot is released when the job finishes, even if the awaiting request was cancelled
+    4. Queue wait and hash time are recorded per operation
+    """
+
+    def __init__(self, workers: int, queue_limit: int, retry_after_seconds: int):
+        self.workers = workers
+        self.queue_limit = queue_limit
+        self.retry_after_seconds = retry_after_seconds
+        self._in_flight = 0
+        self._lock = threading.Lock()
+        self._executor: Optional[ThreadPoolExecutor] = None
+
+    @property
+    def capacity(self) -> int:
+        return self.workers + self.queue_limit
+
+    @property
+    def in_flight(self) -> int:
+        return self._in_flight
+
+    async def run(self, operation: str, func: Callable[..., Any], *args) -> Any:
+        with self._lock:
+            if self._in_flight >= self.capacity:
+                PASSWORD_POOL_REJECTED.inc(operation=operation)
+                raise HTTPException(
+                    status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                    detail="Too many sign-in requests, please retry shortly",
+                    headers={"Retry-After": str(self.retry_after_seconds)},
+                )
+            self._in_flight += 1
+            PASSWORD_POOL_IN_FLIGHT.set(self._in_flight)
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="password-hash")
+            executor = self._executor
+
+        queued_at = time.perf_counter()
+
+        def job():
+            started = time.perf_counter()
+            PASSWORD_QUEUE_WAIT_SECONDS.observe(started - queued_at, operation=operation)
+            try:
+                return func(*args)
+            finally:
+                PASSWORD_HASH_SECONDS.observe(time.perf_counter() - started, operation=operation)
+
+        try:
+            future = executor.submit(job)
+        except BaseException:
+            self._release()
+            raise
+        future.add_done_callback(lambda _: self._release())
+        return await asyncio.wrap_future(future)
+
+    def shutdown(self):
+        """Wait for running jobs and drop the executor; the next run() starts a new one"""
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=True)
+
+    def _release(self):
+        with self._lock:
+            self._in_flight -= 1
+            PASSWORD_POOL_IN_FLIGHT.set(self._in_flight)
+
+
+password_pool = PasswordPool(
+    settings.password_hash_workers,
+    settings.password_hash_queue_limit,
+    settings.password_hash_retry_after_seconds,
+)
@@ -0,0 +1,120 @@
+"""
+In-process cache of authenticated principals
+
+get_current_user would otherwise decode the JWT and load the Employee row on
+every request. Entries are keyed by the bearer token (a hit skips both the
+decode and the query) and indexed by user id so writes to an employee can
+drop every token of that user. The cache is per process: other workers see a
+change once their entries expire, so the TTL bounds staleness.
+"""
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, NamedTuple, Optional, Set
+
+from sqlalchemy.orm import Session, make_transient_to_detached
+
+from app.config import settings
+from app.core.metrics import REGISTRY
+from app.models.employee import Employee
+
+PRINCIPAL_CACHE_REQUESTS = REGISTRY.counter("principal_cache_requests_total", "Principal cache lookups by result", ("result",))
+PRINCIPAL_CACHE_SIZE = REGISTRY.gauge("principal_cache_entries", "Tokens currently held in the principal cache")
+
+
+class _Entry(NamedTuple):
+    user_id: int
+    columns: dict
+    expires_at: float
+
+
+class PrincipalCache:
+    """
+    Bounded LRU of token -> Employee column values with a TTL
+
+    **Logic:**
+    1. A hit returns a fresh Employee merged into the caller's session with
+       load=False, so no SQL runs and relationships still lazy load as usual
+    2. Entries expire after the TTL or when the token itself expires, whichever is first
+    3. The least recently used token is evicted once max_size is reached
+    4. invalidate_user drops every token of a user (update, delete, deactivation)
+    """
+
+    def __init__(self, max_size: int, ttl_seconds: float):
+        self.max_size = max_size
+        self.ttl_seconds = ttl_seconds
+        self._entries: "OrderedDict[str, _Entry]" = OrderedDict()
+        self._tokens_by_user: Dict[int, Set[str]] = {}
+        self._lock = threading.Lock()
+
+    @property
+    def enabled(self) -> bool:
+        return self.max_size > 0 and self.ttl_seconds > 0
+
+    def get(self, db: Session, token: str) -> Optional[Employee]:
+        user = self.lookup(token)
+        if user is None:
+            return None
+        return db.merge(user, load=False)
+
+    def lookup(self, token: str) -> Optional[Employee]:
+        """Detached Employee for `token`; async callers merge it with `await db.merge(user, load=False)`"""
+        if not self.enabled:
+            return None
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(token)
+            if entry is not None and entry.expires_at <= now:
+                self._remove(token)
+                entry = None
+            if entry is None:
+                PRINCIPAL_CACHE_REQUESTS.inc(result="miss")
+                return None
+            self._entries.move_to_end(token)
+        PRINCIPAL_CACHE_REQUESTS.inc(result="hit")
+        user = Employee(**entry.columns)
+        make_transient_to_detached(user)
+        return user
+
+    def put(self, token: str, user: Employee, token_expires_at: Optional[float] = None):
+        """Cache `user` for `token`; token_expires_at is the JWT exp as a unix timestamp"""
+        if not self.enabled:
+            return
+        ttl = self.ttl_seconds
+        if token_expires_at is not None:
+            ttl = min(ttl, token_expires_at - time.time())
+        if ttl <= 0:
+            return
+        columns = {column.key: getattr(user, column.key) for column in Employee.__table__.columns}
+        with self._lock:
+            self._remove(token)
+            self._entries[token] = _Entry(user.id, columns, time.monotonic() + ttl)
+            self._tokens_by_user.setdefault(user.id, set()).add(token)
+            while len(self._entries) > self.max_size:
+                self._remove(next(iter(self._entries)))
+            PRINCIPAL_CACHE_SIZE.set(len(self._entries))
+
+    def invalidate_user(self, user_id: int):
+        with self._lock:
+            for token in list(self._tokens_by_user.get(user_id, ())):
+                self._remove(token)
+            PRINCIPAL_CACHE_SIZE.set(len(self._entries))
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._tokens_by_user.clear()
+            PRINCIPAL_CACHE_SIZE.set(0)
+
+    def _remove(self, token: str):
+        entry = self._entries.pop(token, None)
+        if entry is None:
+            return
+        tokens = self._tokens_by_user.get(entry.user_id)
+        if tokens is not None:
+            tokens.discard(token)
+            if not tokens:
+                del self._tokens_by_user[entry.user_id]
+
+
+principal_cache = PrincipalCache(settings.principal_cache_size, settings.principal_cache_ttl_seconds)
@@ -0,0 +1,89 @@
+"""
+Background recompute of a client's rollups after its overtime rules change
+
+Splitting every timesheet of a client again can take far longer than one
+request may spend on SQL (db_request_time_budget_ms), so PUT /overtime-rules
+only commits the rules and queues the client here. A background thread runs
+app.utils.rollups.recompute with its own session. The thread carries no
+request's stats, so the request budget does not apply to it and the request
+does not wait for it.
+
+A client queued again while it waits is recomputed once. A recompute that
+fails is logged; `python -m app.utils.rollups recompute --client-id N` repeats
+it (it only rewrites the days whose split changed).
+"""
+import atexit
+import logging
+import threading
+from typing import List, Optional
+
+from sqlmodel import Session
+
+from app.core.database import engine
+from app.core.metrics import REGISTRY
+from app.utils.rollups import recompute
+
+logger = logging.getLogger("dew_timetracker.rollups")
+
+ROLLUP_RECOMPUTES_PENDING = REGISTRY.gauge("rollup_recomputes_pending", "Clients waiting for their rollups to be recomputed")
+ROLLUP_RECOMPUTE_ERRORS = REGISTRY.counter("rollup_recompute_errors_total", "Client recomputes that failed")
+
+RECOMPUTE_THREAD_NAME = "rollup-recompute"
+
+
+class RecomputeQueue:
+    """
+    Clients whose rollups are recomputed one at a time by a background thread
+
+    **Logic:**
+    1. submit() queues the client (once, however often its rules change meanwhile) and starts the thread
+    2. The thread recomputes queued clients in order, then exits; the next submit() starts a new one
+    3. wait() blocks until the queue is drained (shutdown, tests)
+    """
+
+    def __init__(self, bind):
+        self.bind = bind
+        self._pending: List[int] = []
+        self._lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def pending(self) -> int:
+        return len(self._pending)
+
+    def submit(self, client_id: int):
+        with self._lock:
+            if client_id not in self._pending:
+                self._pending.append(client_id)
+            ROLLUP_RECOMPUTES_PENDING.set(len(self._pending))
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name=RECOMPUTE_THREAD_NAME, daemon=True)
+                self._thread.start()
+
+    def wait(self):
+        """Block until every queued recompute has run"""
+        with self._lock:
+            thread = self._thread
+        if thread is not None:
+            thread.join()
+
+    def _run(self):
+        while True:
+            with self._lock:
+                if not self._pending:
+                    self._thread = None
+                    return
+                client_id = self._pending.pop(0)
+                ROLLUP_RECOMPUTES_PENDING.set(len(self._pending))
+            try:
+                with Session(self.bind) as session:
+                    count = recompute(session, client_id)
+                logger.info("Applied the overtime rules of client %s to %d timesheets", client_id, count)
+            except Exception:
+                ROLLUP_RECOMPUTE_ERRORS.inc()
+                logger.exception("Recompute of client %s failed; run `python -m app.utils.rollups recompute --client-id %s`",
+                                 client_id, client_id)
+
+
+recompute_queue = RecomputeQueue(engine)
+atexit.register(recompute_queue.wait)
@@ -1,6 +1,7 @@
-from typing import Generator
+from typing import AsyncGenerator, Generator
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlmodel import Session
-from app.core.database import engine
+from app.core.database import engine, AsyncSessionLocal
 
 def get_db() -> Generator[Session, None, None]:
     """
@@ -13,5 +14,13 @@ def get_db() -> Generator[Session, None, None]:
         finally:
             session.close()
 
+async def get_async_db() -> AsyncGenerator[AsyncSession, None]:
+    """
+    Dependency to get an AsyncSession for `async def` endpoints.
+    Relationships must be eager loaded: lazy loading needs IO the session cannot do implicitly.
+    """
+    async with AsyncSessionLocal() as session:
+        yield session
+
 # Alias for backward compatibility
-get_db_session = get_db 
\ No newline at end of file
+get_db_session = get_db
@@ -0,0 +1,21 @@
+"""
+Sampled structured (JSON) logging for hot paths
+
+Hot paths log through log_sampled instead of print. Nothing is emitted unless
+settings.log_sample_rate is above zero, and then only that fraction of calls.
+"""
+import json
+import logging
+import random
+
+from app.config import settings
+
+logger = logging.getLogger("dew_timetracker")
+
+
+def log_sampled(event: str, **fields):
+    """Emit `event` with `fields` as one JSON log line for a sampled fraction of calls"""
+    rate = settings.log_sample_rate
+    if rate <= 0 or (rate < 1 and random.random() >= rate):
+        return
+    logger.info(json.dumps({"event": event, **fields}, default=str))
@@ -1,10 +1,18 @@
-from fastapi import FastAPI
+from fastapi import FastAPI, Request, status
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse, PlainTextResponse
 from app.config import settings
 from app.core.database import create_db_and_tables
 from app.core.admin import ensure_seeded_admin
 from app.api.v1.api import api_router
 from app.models.timesheet import TimesheetStatus
+from app.utils.pagination import NEXT_CURSOR_HEADER
+from app.core.metrics import MetricsMiddleware, REGISTRY
+from app.core.password_pool import password_pool
+from app.core.audit import audit_writer
+from app.core.rollup_jobs import recompute_queue
+from app.core.events import event_hub
+from app.core.db_pool import DBTimeLimitExceeded
 
 print("TIMESHEET ENUM VALUES:", list(TimesheetStatus))
 
@@ -23,8 +31,18 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=[NEXT_CURSOR_HEADER, "ETag"],
 )
 
+# Request metrics (latency, SQL statements, DB time, rows, bytes per route)
+if settings.metrics_enabled:
+    app.add_middleware(MetricsMiddleware)
+
+@app.exception_handler(DBTimeLimitExceeded)
+async def db_time_limit_handler(request: Request, exc: DBTimeLimitExceeded):
+    """A statement hit db_statement_timeout_ms or the request spent db_request_time_budget_ms"""
+    return JSONResponse(status_code=status.HTTP_503_SERVICE_UNAVAILABLE, content={"detail": str(exc)})
+
 # Include API routes
 app.include_router(api_router, prefix="/api/v1")
 
@@ -36,12 +54,25 @@ async def root():
 async def health_check():
     return {"status": "healthy"}
 
+@app.get("/metrics", include_in_schema=False)
+async def metrics():
+    """Prometheus scrape endpoint"""
+    return PlainTextResponse(REGISTRY.render(), media_type="text/plain; version=0.0.4")
+
 @app.on_event("startup")
 async def startup_event():
     """Initialize database and create seeded admin on startup"""
     create_db_and_tables()
     ensure_seeded_admin()
 
+@app.on_event("shutdown")
+def shutdown_event():
+    """Let in-flight password hashes and rollup recomputes finish, write the buffered audit events and end open event streams"""
+    password_pool.shutdown()
+    recompute_queue.wait()
+    audit_writer.close()
+    event_hub.close()
+
 if __name__ == "__main__":
     import uvicorn
     uvicorn.run(app, host="0.0.0.0", port=8000) 
\ No newline at end of file
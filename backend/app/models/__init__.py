@@ -1,11 +1,15 @@
 # Database models package
 from .client import Client
-from .employee import Employee, EmployeeRole
+from .employee import Employee, EmployeeRole, NotificationMode
 from .timesheet import Timesheet, TimesheetStatus
 from .time_entry import TimeEntry, BreakPeriod
+from .timesheet_day import TimesheetDay
 from .audit_log import AuditLog, AuditEventType
 from .time_off import TimeOff
+from .email_outbox import EmailOutbox, OutboxStatus
+from .pending_notification import PendingNotification
+from .overtime_rules import OvertimeRules
 
 __all__ = [
-    "Client", "Employee", "EmployeeRole", "Timesheet", "TimesheetStatus", "TimeEntry", "BreakPeriod", "AuditLog", "AuditEventType", "TimeOff"
+    "Client", "Employee", "EmployeeRole", "NotificationMode", "Timesheet", "TimesheetStatus", "TimeEntry", "BreakPeriod", "TimesheetDay", "AuditLog", "AuditEventType", "TimeOff", "EmailOutbox", "OutboxStatus", "PendingNotification", "OvertimeRules"
 ] 
\ No newline at end of file
@@ -1,8 +1,11 @@
+from sqlalchemy import JSON, Column, Index, literal
+from sqlalchemy.dialects.postgresql import JSONB
+from sqlalchemy.ext.mutable import MutableDict
 from sqlmodel import SQLModel, Field, Relationship
 from typing import Optional, Dict, Any
 from datetime import datetime
 from enum import Enum
-import json
+from app.models.loading import relationship_kwargs
 
 
 class AuditEventType(str, Enum):
@@ -14,6 +17,10 @@ class AuditEventType(str, Enum):
     TIMESHEET_APPROVED = "timesheet_approved"
     TIMESHEET_REJECTED = "timesheet_rejected"
     
+    # Time off events
+    TIME_OFF_APPROVED = "time_off_approved"
+    TIME_OFF_REJECTED = "time_off_rejected"
+    
     # Employee events
     EMPLOYEE_CREATED = "employee_created"
     EMPLOYEE_UPDATED = "employee_updated"
@@ -35,44 +42,70 @@ class AuditEventType(str, Enum):
     BULK_OPERATION = "bulk_operation"
 
 
+# JSONB on PostgreSQL, JSON1 text on SQLite; MutableDict turns in-place key changes into an update
+DetailsType = MutableDict.as_mutable(JSON().with_variant(JSONB(), "postgresql"))
+
+
 class AuditLog(SQLModel, table=True):
     """AuditLog model for tracking all system activities"""
+    __table_args__ = (
+        # GET /audit keyset order (newest first) and the retention job's month ranges
+        Index("ix_auditlog_timestamp_id", "timestamp", "id"),
+        # GET /audit filtered by actor or event
+        Index("ix_auditlog_actor_id_timestamp", "actor_id", "timestamp"),
+        Index("ix_auditlog_event_timestamp", "event", "timestamp"),
+    )
     
     id: Optional[int] = Field(default=None, primary_key=True)
-    timesheet_id: Optional[int] = Field(default=None, foreign_key="timesheet.id", description="Related timesheet if applicable")
+    timesheet_id: Optional[int] = Field(default=None, foreign_key="timesheet.id", index=True, description="Related timesheet if applicable")
     event: AuditEventType = Field(description="Type of event that occurred")
     actor_id: Optional[int] = Field(default=None, foreign_key="employee.id", description="Employee who performed the action")
     actor_email: str = Field(max_length=255, description="Email of the actor (for external users)")
     actor_role: str = Field(max_length=50, description="Role of the actor at time of event")
-    details: Optional[str] = Field(default=None, max_length=2000, description="Additional details about the event")
+    details: Optional[Dict[str, Any]] = Field(default=None, sa_column=Column(DetailsType), description="Additional details about the event")
     ip_address: Optional[str] = Field(default=None, max_length=45, description="IP address of the actor")
     user_agent: Optional[str] = Field(default=None, max_length=500, description="User agent string")
     timestamp: datetime = Field(default_factory=datetime.utcnow, description="When the event occurred")
     
     # Relationships
-    timesheet: Optional["Timesheet"] = Relationship(back_populates="audit_logs")
-    actor: Optional["Employee"] = Relationship(back_populates="audit_logs")
+    timesheet: Optional["Timesheet"] = Relationship(back_populates="audit_logs", sa_relationship_kwargs=relationship_kwargs())
+    actor: Optional["Employee"] = Relationship(back_populates="audit_logs", sa_relationship_kwargs=relationship_kwargs())
     
     @property
     def details_data(self) -> Dict[str, Any]:
-        """Parse details JSON and return as dictionary"""
-        if not self.details:
-            return {}
-        try:
-            return json.loads(self.details)
-        except (json.JSONDecodeError, TypeError):
-            return {"raw_details": self.details}
+        """Details as a plain dictionary (empty when there are none)"""
+        return dict(self.details or {})
     
     @details_data.setter
     def details_data(self, value: Dict[str, Any]):
-        """Set details from dictionary"""
-        self.details = json.dumps(value)
+        """Replace all details"""
+        self.details = dict(value)
     
     def add_detail(self, key: str, value: Any):
-        """Add a detail to the existing details"""
-        current_details = self.details_data
-        current_details[key] = value
-        self.details_data = current_details
+        """Set one detail in place; the document is serialized once, when the row is flushed"""
+        if self.details is None:
+            self.details = {}
+        self.details[key] = value
+    
+    @classmethod
+    def detail(cls, key: str):
+        """
+        details[key] with the key rendered into the SQL text
+
+        A bound key (details -> ?) never matches the ix_auditlog_details_* expression
+        indexes, so the key is rendered as a literal when the statement executes.
+        """
+        return cls.details[literal(key, JSON.JSONStrIndexType, literal_execute=True)]
+    
+    @classmethod
+    def detail_text(cls, key: str):
+        """SQL expression for detail `key` as text (details ->> key)"""
+        return cls.detail(key).as_string()
+    
+    @classmethod
+    def detail_int(cls, key: str):
+        """SQL expression for detail `key` as an integer"""
+        return cls.detail(key).as_integer()
     
     class Config:
         schema_extra = {
@@ -82,9 +115,14 @@ class AuditLog(SQLModel, table=True):
                 "actor_id": 2,
                 "actor_email": "manager@client.com",
                 "actor_role": "client_manager",
-                "details": '{"comment": "Approved - looks good", "previous_status": "pending"}',
+                "details": {"comment": "Approved - looks good", "previous_status": "pending"},
                 "ip_address": "192.168.1.100",
                 "user_agent": "Mozilla/5.0...",
                 "timestamp": "2024-01-01T12:00:00"
             }
-        } 
\ No newline at end of file
+        } 
+
+
+# Detail keys GET /audit filters on; queries use the same accessors, so the planner matches the expressions
+Index("ix_auditlog_details_employee_id", AuditLog.detail_int("employee_id"))
+Index("ix_auditlog_details_previous_status", AuditLog.detail_text("previous_status"))
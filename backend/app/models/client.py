@@ -1,6 +1,7 @@
 from sqlmodel import SQLModel, Field, Relationship
 from typing import List, Optional
 from datetime import datetime
+from app.models.loading import relationship_kwargs
 
 
 class Client(SQLModel, table=True):
@@ -13,7 +14,7 @@ class Client(SQLModel, table=True):
     updated_at: datetime = Field(default_factory=datetime.utcnow)
     
     # Relationships
-    employees: List["Employee"] = Relationship(back_populates="client")
+    employees: List["Employee"] = Relationship(back_populates="client", sa_relationship_kwargs=relationship_kwargs())
     
     class Config:
         schema_extra = {
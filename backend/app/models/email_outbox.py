@@ -0,0 +1,41 @@
+from sqlmodel import SQLModel, Field
+from sqlalchemy import Index
+from typing import List, Optional
+from datetime import datetime
+from enum import Enum
+
+
+class OutboxStatus(str, Enum):
+    PENDING = "pending"
+    SENT = "sent"
+    FAILED = "failed"
+
+
+class EmailOutbox(SQLModel, table=True):
+    """
+    Email waiting to be sent, written in the same transaction as the change it announces
+
+    The sender worker (app/utils/email_sender.py) delivers pending rows whose
+    next_attempt_at has passed and reschedules failures with backoff.
+    """
+
+    __table_args__ = (
+        # Sender's claim query: due pending messages in insertion order
+        Index("ix_emailoutbox_status_next_attempt_at", "status", "next_attempt_at"),
+    )
+
+    id: Optional[int] = Field(default=None, primary_key=True)
+    recipients: str = Field(max_length=2000, description="Comma-separated addresses")
+    subject: str = Field(max_length=500)
+    body: str
+    html: Optional[str] = None
+    status: OutboxStatus = Field(default=OutboxStatus.PENDING)
+    attempts: int = Field(default=0, description="Delivery attempts so far")
+    next_attempt_at: datetime = Field(default_factory=datetime.utcnow)
+    last_error: Optional[str] = Field(default=None, max_length=1000)
+    created_at: datetime = Field(default_factory=datetime.utcnow)
+    sent_at: Optional[datetime] = None
+
+    @property
+    def recipient_list(self) -> List[str]:
+        return [address.strip() for address in self.recipients.split(",") if address.strip()]
@@ -3,6 +3,7 @@ from typing import List, Optional
 from datetime import datetime
 from enum import Enum
 from app.models.time_off import TimeOff
+from app.models.loading import relationship_kwargs
 
 
 class EmployeeRole(str, Enum):
@@ -12,6 +13,12 @@ class EmployeeRole(str, Enum):
     DEW_ADMIN = "dew_admin"
 
 
+class NotificationMode(str, Enum):
+    """How a manager hears about submissions awaiting their approval"""
+    IMMEDIATE = "immediate"  # One email per event
+    DIGEST = "digest"  # Events collected into one email per digest interval
+
+
 class Employee(SQLModel, table=True):
     """Employee model representing consultants and managers"""
     
@@ -19,26 +26,28 @@ class Employee(SQLModel, table=True):
     full_name: str = Field(max_length=255, description="Employee full name")
     email: str = Field(max_length=255, unique=True, description="Employee email address")
     password_hash: str = Field(description="Hashed password")
-    client_id: Optional[int] = Field(default=None, foreign_key="client.id", description="Associated client")
+    client_id: Optional[int] = Field(default=None, foreign_key="client.id", index=True, description="Associated client")
     role: EmployeeRole = Field(default=EmployeeRole.CONSULTANT, description="Employee role")
     is_active: bool = Field(default=True, description="Whether the account is active")
+    notification_mode: NotificationMode = Field(default=NotificationMode.IMMEDIATE, description="Approval notifications per event or as a digest")
+    digest_interval_minutes: int = Field(default=60, description="Digest mode: how long notifications are collected before one email is sent")
     created_at: datetime = Field(default_factory=datetime.utcnow)
     updated_at: datetime = Field(default_factory=datetime.utcnow)
     
     # Relationships
-    client: Optional["Client"] = Relationship(back_populates="employees")
+    client: Optional["Client"] = Relationship(back_populates="employees", sa_relationship_kwargs=relationship_kwargs())
     timesheets_created: List["Timesheet"] = Relationship(
         back_populates="employee",
-        sa_relationship_kwargs={"foreign_keys": "[Timesheet.employee_id]"}
+        sa_relationship_kwargs=relationship_kwargs(foreign_keys="[Timesheet.employee_id]")
     )
     timesheets_approved: List["Timesheet"] = Relationship(
         back_populates="approver",
-        sa_relationship_kwargs={"foreign_keys": "[Timesheet.approved_by]"}
+        sa_relationship_kwargs=relationship_kwargs(foreign_keys="[Timesheet.approved_by]")
     )
-    audit_logs: List["AuditLog"] = Relationship(back_populates="actor")
+    audit_logs: List["AuditLog"] = Relationship(back_populates="actor", sa_relationship_kwargs=relationship_kwargs())
     time_off_requests: List["TimeOff"] = Relationship(
         back_populates="employee",
-        sa_relationship_kwargs={"foreign_keys": "[TimeOff.employee_id]"}
+        sa_relationship_kwargs=relationship_kwargs(foreign_keys="[TimeOff.employee_id]")
     )
     
     class Config:
@@ -0,0 +1,14 @@
+from app.config import settings
+
+
+def relationship_kwargs(**kwargs) -> dict:
+    """
+    sa_relationship_kwargs for every Relationship in app.models
+
+    With settings.orm_raise_on_lazy_load enabled (development only), relationships
+    default to lazy="raise" so any access that was not eager loaded with
+    joinedload/selectinload fails loudly instead of issuing a hidden query per row.
+    """
+    if settings.orm_raise_on_lazy_load:
+        kwargs.setdefault("lazy", "raise")
+    return kwargs
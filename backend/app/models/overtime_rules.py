@@ -0,0 +1,17 @@
+from sqlmodel import SQLModel, Field
+from typing import Optional
+from datetime import datetime
+
+
+class OvertimeRules(SQLModel, table=True):
+    """Per-client overtime rules; clients without a row use app.utils.overtime.DEFAULT_RULES"""
+
+    id: Optional[int] = Field(default=None, primary_key=True)
+    client_id: int = Field(foreign_key="client.id", unique=True, description="Client the rules apply to")
+    daily_overtime_after_minutes: Optional[int] = Field(default=480, description="Minutes per day after which time is overtime (None: no daily overtime)")
+    daily_double_time_after_minutes: Optional[int] = Field(default=None, description="Minutes per day after which time is double time (None: no daily double time)")
+    weekly_overtime_after_minutes: Optional[int] = Field(default=2400, description="Regular minutes per week after which time is overtime (None: no weekly overtime)")
+    seventh_day: bool = Field(default=False, description="The 7th consecutive worked day of the week is overtime from its first minute")
+    seventh_day_double_time_after_minutes: Optional[int] = Field(default=480, description="Minutes on the 7th consecutive day after which time is double time")
+    created_at: datetime = Field(default_factory=datetime.utcnow)
+    updated_at: datetime = Field(default_factory=datetime.utcnow)
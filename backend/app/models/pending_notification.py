@@ -0,0 +1,18 @@
+from sqlmodel import SQLModel, Field
+from typing import Optional
+from datetime import datetime
+
+
+class PendingNotification(SQLModel, table=True):
+    """
+    Approval notification held for a manager in digest mode
+
+    Written in the same transaction as the submission; the digest job
+    (app/utils/notifications.py) turns each manager's rows into one email.
+    """
+
+    id: Optional[int] = Field(default=None, primary_key=True)
+    manager_email: str = Field(max_length=255, index=True)
+    kind: str = Field(max_length=50, description="timesheet_submitted or time_off_requested")
+    summary: str = Field(max_length=500, description="One line of the digest")
+    created_at: datetime = Field(default_factory=datetime.utcnow)
@@ -1,6 +1,8 @@
 from sqlmodel import SQLModel, Field, Relationship
+from sqlalchemy import Index
 from typing import Optional, List, TYPE_CHECKING
 from datetime import datetime, date, time
+from app.models.loading import relationship_kwargs
 
 if TYPE_CHECKING:
     from .timesheet import Timesheet
@@ -9,6 +11,11 @@ if TYPE_CHECKING:
 class TimeEntry(SQLModel, table=True):
     """Individual time entry for a specific day"""
     
+    __table_args__ = (
+        # Same-day entry lookup used by overlap and 24h validation
+        Index("ix_timeentry_timesheet_id_date", "timesheet_id", "date"),
+    )
+    
     id: Optional[int] = Field(default=None, primary_key=True)
     timesheet_id: int = Field(foreign_key="timesheet.id")
     date: date
@@ -20,8 +27,8 @@ class TimeEntry(SQLModel, table=True):
     updated_at: datetime = Field(default_factory=datetime.utcnow)
     
     # Use only string references in Relationship fields
-    timesheet: Optional["Timesheet"] = Relationship(back_populates="time_entries")
-    break_periods: List["BreakPeriod"] = Relationship(back_populates="time_entry", sa_relationship_kwargs={"cascade": "all, delete-orphan"})
+    timesheet: Optional["Timesheet"] = Relationship(back_populates="time_entries", sa_relationship_kwargs=relationship_kwargs())
+    break_periods: List["BreakPeriod"] = Relationship(back_populates="time_entry", sa_relationship_kwargs=relationship_kwargs(cascade="all, delete-orphan"))
     
     def get_hours_worked(self) -> float:
         """Calculate hours worked minus breaks"""
@@ -44,10 +51,10 @@ class BreakPeriod(SQLModel, table=True):
     """Break period within a time entry"""
     
     id: Optional[int] = Field(default=None, primary_key=True)
-    time_entry_id: int = Field(foreign_key="timeentry.id")
+    time_entry_id: int = Field(foreign_key="timeentry.id", index=True)
     start_time: time
     end_time: time
     created_at: datetime = Field(default_factory=datetime.utcnow)
     
     # Use only string reference in Relationship field
-    time_entry: Optional["TimeEntry"] = Relationship(back_populates="break_periods") 
\ No newline at end of file
+    time_entry: Optional["TimeEntry"] = Relationship(back_populates="break_periods", sa_relationship_kwargs=relationship_kwargs()) 
\ No newline at end of file
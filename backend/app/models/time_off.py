@@ -1,7 +1,9 @@
 from sqlmodel import SQLModel, Field, Relationship
+from sqlalchemy import Index
 from typing import Optional
 from datetime import date, datetime
 from enum import Enum
+from app.models.loading import relationship_kwargs
 
 class TimeOffType(str, Enum):
     VACATION = "vacation"
@@ -14,8 +16,13 @@ class TimeOffStatus(str, Enum):
     REJECTED = "rejected"
 
 class TimeOff(SQLModel, table=True):
+    __table_args__ = (
+        # Manager approval queue: pending requests for a manager_email
+        Index("ix_timeoff_manager_email_status", "manager_email", "status"),
+    )
+
     id: Optional[int] = Field(default=None, primary_key=True)
-    employee_id: int = Field(foreign_key="employee.id")
+    employee_id: int = Field(foreign_key="employee.id", index=True)
     start_date: date
     end_date: date
     type: TimeOffType
@@ -28,5 +35,5 @@ class TimeOff(SQLModel, table=True):
     updated_at: datetime = Field(default_factory=datetime.utcnow)
     manager_email: str = Field(max_length=255, description="Email of manager for approval")
 
-    employee: Optional["Employee"] = Relationship(back_populates="time_off_requests", sa_relationship_kwargs={"foreign_keys": "TimeOff.employee_id"})
-    approver: Optional["Employee"] = Relationship(back_populates=None, sa_relationship_kwargs={"foreign_keys": "TimeOff.approved_by"}) 
\ No newline at end of file
+    employee: Optional["Employee"] = Relationship(back_populates="time_off_requests", sa_relationship_kwargs=relationship_kwargs(foreign_keys="TimeOff.employee_id"))
+    approver: Optional["Employee"] = Relationship(back_populates=None, sa_relationship_kwargs=relationship_kwargs(foreign_keys="TimeOff.approved_by")) 
\ No newline at end of file
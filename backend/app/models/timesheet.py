@@ -1,7 +1,9 @@
 from sqlmodel import SQLModel, Field, Relationship
+from sqlalchemy import Index
 from typing import Optional, List, TYPE_CHECKING
 from datetime import datetime, date
 from enum import Enum
+from app.models.loading import relationship_kwargs
 
 
 class TimesheetStatus(str, Enum):
@@ -13,11 +15,21 @@ class TimesheetStatus(str, Enum):
 
 if TYPE_CHECKING:
     from .time_entry import TimeEntry
+    from .timesheet_day import TimesheetDay
 
 
 class Timesheet(SQLModel, table=True):
     """Timesheet model representing weekly time entries (per-day in/out/breaks)"""
     
+    __table_args__ = (
+        # Consultant "my timesheets" list and per-week lookups; status and the rollups are carried
+        # along so the utilization report sums them from the index without visiting the table
+        Index("ix_timesheet_employee_id_week_start", "employee_id", "week_start", "status",
+              "total_minutes", "regular_minutes", "overtime_minutes", "double_time_minutes"),
+        # Manager approval queue: submitted timesheets for a manager_email
+        Index("ix_timesheet_manager_email_status", "manager_email", "status"),
+    )
+    
     id: Optional[int] = Field(default=None, primary_key=True)
     employee_id: int = Field(foreign_key="employee.id", description="Employee who created the timesheet")
     week_start: date = Field(description="Start date of the week (Monday)")
@@ -29,22 +41,30 @@ class Timesheet(SQLModel, table=True):
     comment: Optional[str] = Field(default=None, max_length=1000, description="Approval/rejection comment")
     token_hash: Optional[str] = Field(default=None, max_length=255, description="Hash for approval token")
     project: Optional[str] = Field(default=None, max_length=255, description="Project name (free text)")
+    total_minutes: int = Field(default=0, description="Rollup of worked minutes across all entries")
+    regular_minutes: int = Field(default=0, description="Rollup of regular minutes across all entries")
+    overtime_minutes: int = Field(default=0, description="Rollup of overtime minutes across all entries")
+    double_time_minutes: int = Field(default=0, description="Rollup of double time minutes across all entries")
     created_at: datetime = Field(default_factory=datetime.utcnow)
     updated_at: datetime = Field(default_factory=datetime.utcnow)
     
     # Relationships
     employee: "Employee" = Relationship(
         back_populates="timesheets_created",
-        sa_relationship_kwargs={"foreign_keys": "[Timesheet.employee_id]"}
+        sa_relationship_kwargs=relationship_kwargs(foreign_keys="[Timesheet.employee_id]")
     )
     approver: Optional["Employee"] = Relationship(
         back_populates="timesheets_approved",
-        sa_relationship_kwargs={"foreign_keys": "[Timesheet.approved_by]"}
+        sa_relationship_kwargs=relationship_kwargs(foreign_keys="[Timesheet.approved_by]")
     )
-    audit_logs: List["AuditLog"] = Relationship(back_populates="timesheet")
+    audit_logs: List["AuditLog"] = Relationship(back_populates="timesheet", sa_relationship_kwargs=relationship_kwargs())
     time_entries: List["TimeEntry"] = Relationship(
         back_populates="timesheet",
-        sa_relationship_kwargs={"cascade": "all, delete-orphan"}
+        sa_relationship_kwargs=relationship_kwargs(cascade="all, delete-orphan")
+    )
+    days: List["TimesheetDay"] = Relationship(
+        back_populates="timesheet",
+        sa_relationship_kwargs=relationship_kwargs(cascade="all, delete-orphan")
     )
 
     class Config:
@@ -0,0 +1,26 @@
+from sqlmodel import SQLModel, Field, Relationship
+from sqlalchemy import UniqueConstraint
+from typing import Optional, TYPE_CHECKING
+from datetime import date
+from app.models.loading import relationship_kwargs
+
+if TYPE_CHECKING:
+    from .timesheet import Timesheet
+
+
+class TimesheetDay(SQLModel, table=True):
+    """Per-day hours rollup of a timesheet, maintained alongside its time entries"""
+    
+    __table_args__ = (
+        UniqueConstraint("timesheet_id", "date", name="uq_timesheetday_timesheet_id_date"),
+    )
+    
+    id: Optional[int] = Field(default=None, primary_key=True)
+    timesheet_id: int = Field(foreign_key="timesheet.id")
+    date: date
+    total_minutes: int = Field(default=0, description="Worked minutes (in/out minus breaks)")
+    regular_minutes: int = Field(default=0, description="Worked minutes counted as regular time")
+    overtime_minutes: int = Field(default=0, description="Worked minutes counted as overtime")
+    double_time_minutes: int = Field(default=0, description="Worked minutes counted as double time")
+    
+    timesheet: Optional["Timesheet"] = Relationship(back_populates="days", sa_relationship_kwargs=relationship_kwargs())
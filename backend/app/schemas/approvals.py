@@ -0,0 +1,104 @@
+from pydantic import BaseModel, Field
+from typing import Dict, List, Optional, Tuple
+from datetime import date
+from enum import Enum
+from app.schemas.employee import EmployeeBasicResponse
+
+# Upper bound on ids per batch decision (a manager's whole queue fits comfortably)
+MAX_BATCH_DECISIONS = 500
+
+class DecisionOutcome(str, Enum):
+    APPLIED = "applied"
+    SKIPPED = "skipped"
+    FORBIDDEN = "forbidden"
+
+class BatchDecisionRequest(BaseModel):
+    ids: List[int] = Field(..., min_length=1, max_length=MAX_BATCH_DECISIONS)
+    comment: Optional[str] = Field(default=None, max_length=1000)
+
+class BatchDecisionResult(BaseModel):
+    id: int
+    outcome: DecisionOutcome
+    reason: Optional[str] = None
+
+class BatchDecisionResponse(BaseModel):
+    applied: int
+    skipped: int
+    forbidden: int
+    results: List[BatchDecisionResult]
+
+    @classmethod
+    def from_outcomes(cls, ids: List[int], outcomes: Dict[int, Tuple[DecisionOutcome, Optional[str]]]) -> "BatchDecisionResponse":
+        """One result per requested id, in request order; ids without an outcome were not found"""
+        results = []
+        for i in ids:
+            outcome, reason = outcomes.get(i, (DecisionOutcome.SKIPPED, "not found"))
+            results.append(BatchDecisionResult(id=i, outcome=outcome, reason=reason))
+        return cls(
+            applied=sum(r.outcome == DecisionOutcome.APPLIED for r in results),
+            skipped=sum(r.outcome == DecisionOutcome.SKIPPED for r in results),
+            forbidden=sum(r.outcome == DecisionOutcome.FORBIDDEN for r in results),
+            results=results,
+        )
+
+# --- Queue Summary Schemas ---
+# Row kinds of the summary query: one row per (employee, week) of submitted timesheets, one per employee of pending time off
+SUMMARY_TIMESHEETS = "timesheets"
+SUMMARY_TIME_OFF = "time_off"
+
+class ApprovalWeekSummary(BaseModel):
+    week_start: date
+    timesheets: int
+    regular_hours: float
+    overtime_hours: float
+    double_time_hours: float
+    total_hours: float
+
+class ApprovalEmployeeSummary(BaseModel):
+    employee: EmployeeBasicResponse
+    pending_timesheets: int = 0
+    pending_time_off: int = 0
+    total_hours: float = 0.0
+    weeks: List[ApprovalWeekSummary] = []
+
+class ApprovalQueueSummary(BaseModel):
+    """Counts and hours of a manager's approval queue, without the timesheets themselves"""
+    pending_timesheets: int
+    pending_time_off: int
+    total_hours: float
+    employees: List[ApprovalEmployeeSummary]
+
+    @classmethod
+    def from_rows(cls, rows) -> "ApprovalQueueSummary":
+        """Fold the grouped rows into per-employee summaries, ordered by employee name then week"""
+        employees: Dict[int, ApprovalEmployeeSummary] = {}
+        for row in rows:
+            data = row._mapping
+            summary = employees.get(data["employee_id"])
+            if summary is None:
+                summary = employees[data["employee_id"]] = ApprovalEmployeeSummary(
+                    employee=EmployeeBasicResponse(id=data["employee_id"], full_name=data["full_name"], email=data["email"])
+                )
+            if data["kind"] == SUMMARY_TIME_OFF:
+                summary.pending_time_off += data["items"]
+                continue
+            week = ApprovalWeekSummary(
+                week_start=data["week_start"],
+                timesheets=data["items"],
+                regular_hours=data["regular_minutes"] / 60.0,
+                overtime_hours=data["overtime_minutes"] / 60.0,
+                double_time_hours=data["double_time_minutes"] / 60.0,
+                total_hours=data["total_minutes"] / 60.0,
+            )
+            summary.weeks.append(week)
+            summary.pending_timesheets += week.timesheets
+            summary.total_hours += week.total_hours
+        ordered = sorted(employees.values(), key=lambda e: (e.employee.full_name, e.employee.id))
+        for summary in ordered:
+            summary.weeks.sort(key=lambda w: w.week_start)
+        return cls(
+            pending_timesheets=sum(e.pending_timesheets for e in ordered),
+            pending_time_off=sum(e.pending_time_off for e in ordered),
+            total_hours=sum(e.total_hours for e in ordered),
+            employees=ordered,
+        )
@@ -0,0 +1,32 @@
+from pydantic import BaseModel
+from typing import Any, Dict, Optional
+from datetime import datetime
+from app.models.audit_log import AuditEventType, AuditLog
+
+class AuditLogResponse(BaseModel):
+    id: int
+    timesheet_id: Optional[int] = None
+    event: AuditEventType
+    actor_id: Optional[int] = None
+    actor_email: str
+    actor_role: str
+    details: Dict[str, Any] = {}
+    ip_address: Optional[str] = None
+    user_agent: Optional[str] = None
+    timestamp: datetime
+    archived: bool = False
+
+    @classmethod
+    def from_log(cls, log: AuditLog) -> "AuditLogResponse":
+        return cls(
+            id=log.id,
+            timesheet_id=log.timesheet_id,
+            event=log.event,
+            actor_id=log.actor_id,
+            actor_email=log.actor_email,
+            actor_role=log.actor_role,
+            details=log.details_data,
+            ip_address=log.ip_address,
+            user_agent=log.user_agent,
+            timestamp=log.timestamp,
+        )
@@ -3,7 +3,7 @@ from typing import Optional
 from enum import Enum
 from datetime import datetime
 
-from app.models.employee import EmployeeRole
+from app.models.employee import EmployeeRole, NotificationMode
 
 
 class TokenResponse(BaseModel):
@@ -54,6 +54,8 @@ class UserResponse(BaseModel):
     role: EmployeeRole
     client_id: Optional[int] = None
     is_active: bool = True
+    notification_mode: NotificationMode = NotificationMode.IMMEDIATE
+    digest_interval_minutes: int = 60
     created_at: datetime
     updated_at: datetime
 
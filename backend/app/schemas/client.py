@@ -1,4 +1,4 @@
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, Field, validator
 from typing import Optional
 from datetime import datetime
 
@@ -18,4 +18,25 @@ class ClientResponse(BaseModel):
     updated_at: datetime
 
     class Config:
-        from_attributes = True 
\ No newline at end of file
+        from_attributes = True 
+# --- Overtime Rules Schemas ---
+class OvertimeRulesRequest(BaseModel):
+    """A client's overtime rules in minutes; None turns a threshold off"""
+    daily_overtime_after_minutes: Optional[int] = Field(480, gt=0, le=1440, description="Daily minutes after which time is overtime")
+    daily_double_time_after_minutes: Optional[int] = Field(None, gt=0, le=1440, description="Daily minutes after which time is double time")
+    weekly_overtime_after_minutes: Optional[int] = Field(2400, gt=0, le=10080, description="Weekly regular minutes after which time is overtime")
+    seventh_day: bool = Field(False, description="The 7th consecutive worked day of the week is all overtime")
+    seventh_day_double_time_after_minutes: Optional[int] = Field(480, gt=0, le=1440, description="Minutes on the 7th consecutive day after which time is double time")
+
+    @validator('daily_double_time_after_minutes')
+    def double_time_after_overtime(cls, v, values):
+        overtime_after = values.get('daily_overtime_after_minutes')
+        if v is not None and overtime_after is not None and v <= overtime_after:
+            raise ValueError('daily_double_time_after_minutes must be greater than daily_overtime_after_minutes')
+        return v
+
+class OvertimeRulesResponse(OvertimeRulesRequest):
+    client_id: int
+    is_default: bool = Field(description="The client has no rules of its own and uses the defaults")
+    updated_at: Optional[datetime] = None
+    recompute_queued: bool = Field(False, description="The client's timesheets are being split again under the new rules, in the background")
@@ -1,6 +1,6 @@
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
 from typing import Optional
-from app.models.employee import EmployeeRole
+from app.models.employee import EmployeeRole, NotificationMode
 
 class EmployeeBasicResponse(BaseModel):
     id: int
@@ -15,4 +15,6 @@ class EmployeeUpdateRequest(BaseModel):
     full_name: Optional[str] = None
     role: Optional[EmployeeRole] = None
     client_id: Optional[int] = None
-    is_active: Optional[bool] = None 
\ No newline at end of file
+    is_active: Optional[bool] = None
+    notification_mode: Optional[NotificationMode] = None
+    digest_interval_minutes: Optional[int] = Field(default=None, ge=1, le=7 * 24 * 60) 
\ No newline at end of file
@@ -0,0 +1,31 @@
+from pydantic import BaseModel
+from typing import List, Optional
+from datetime import date
+from enum import Enum
+
+class UtilizationGroup(str, Enum):
+    CLIENT = "client"
+    EMPLOYEE = "employee"
+
+class UtilizationRow(BaseModel):
+    """Hours of one client or employee; the weekly_* lists are aligned with UtilizationReport.weeks"""
+    client_id: Optional[int] = None
+    client_name: Optional[str] = None
+    employee_id: Optional[int] = None
+    employee_name: Optional[str] = None
+    total_hours: float
+    regular_hours: float
+    overtime_hours: float
+    double_time_hours: float
+    billable_hours: float
+    weekly_total_hours: List[float]
+    weekly_overtime_hours: List[float]
+    weekly_billable_hours: List[float]
+
+class UtilizationReport(BaseModel):
+    group_by: UtilizationGroup
+    date_from: date
+    date_to: date
+    weeks: List[date]
+    rows: List[UtilizationRow]
+    totals: UtilizationRow
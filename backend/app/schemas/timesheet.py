@@ -1,6 +1,7 @@
 from pydantic import BaseModel, Field
 from typing import Optional, List
 from datetime import date, datetime, time
+from enum import Enum
 from app.models.timesheet import TimesheetStatus
 from app.schemas.employee import EmployeeBasicResponse
 
@@ -27,6 +28,19 @@ class TimeEntryCreate(BaseModel):
     note: Optional[str] = None
     break_periods: List[BreakPeriodCreate] = []
 
+# Upper bound on entries per batch request (a busy week is a few dozen)
+MAX_BATCH_ENTRIES = 200
+
+class TimeEntryBatchCreate(BaseModel):
+    entries: List[TimeEntryCreate] = Field(..., min_length=1, max_length=MAX_BATCH_ENTRIES)
+
+class TimeEntrySync(TimeEntryCreate):
+    id: Optional[int] = None  # stored entry this row replaces; None matches by date/in/out or inserts
+
+class TimesheetWeekSync(BaseModel):
+    """Desired full set of entries for a timesheet; anything stored but not listed is deleted"""
+    entries: List[TimeEntrySync] = Field(default_factory=list, max_length=MAX_BATCH_ENTRIES)
+
 class TimeEntryResponse(BaseModel):
     id: int
     date: date
@@ -79,25 +93,13 @@ class TimesheetResponse(BaseModel):
     time_entries: List[TimeEntryResponse]
     regular_hours: float
     overtime_hours: float
+    double_time_hours: float
     total_hours: float
     employee: EmployeeBasicResponse  # <-- new field
 
     @classmethod
     def from_orm(cls, obj):
-        # Calculate hours from time_entries
-        total_hours = 0.0
-        regular_hours = 0.0
-        overtime_hours = 0.0
-        
-        for entry in getattr(obj, 'time_entries', []):
-            hours_worked = entry.get_hours_worked() if hasattr(entry, 'get_hours_worked') else 0.0
-            total_hours += hours_worked
-            if hours_worked <= 8.0:  # Standard work day
-                regular_hours += hours_worked
-            else:
-                regular_hours += 8.0
-                overtime_hours += (hours_worked - 8.0)
-        
+        # Hours come from the rollup columns maintained by app.utils.rollups
         return cls(
             id=obj.id,
             employee_id=obj.employee_id,
@@ -111,11 +113,76 @@ class TimesheetResponse(BaseModel):
             created_at=obj.created_at,
             updated_at=obj.updated_at,
             time_entries=[TimeEntryResponse.from_orm(te) for te in getattr(obj, 'time_entries', [])],
-            regular_hours=regular_hours,
-            overtime_hours=overtime_hours,
-            total_hours=total_hours,
+            regular_hours=obj.regular_minutes / 60.0,
+            overtime_hours=obj.overtime_minutes / 60.0,
+            double_time_hours=obj.double_time_minutes / 60.0,
+            total_hours=obj.total_minutes / 60.0,
             employee=EmployeeBasicResponse.from_orm(obj.employee) if hasattr(obj, 'employee') and obj.employee else None,
         )
 
     class Config:
-        from_attributes = True 
\ No newline at end of file
+        from_attributes = True 
+
+class WeekChangeSummary(BaseModel):
+    created: List[int] = []
+    updated: List[int] = []
+    deleted: List[int] = []
+    unchanged: int = 0
+    breaks_created: int = 0
+    breaks_deleted: int = 0
+
+class TimesheetWeekSyncResponse(BaseModel):
+    timesheet: TimesheetResponse
+    changes: WeekChangeSummary
+
+class TimesheetView(str, Enum):
+    """Shape of the timesheet list response"""
+    FULL = "full"        # header, entries and breaks
+    SUMMARY = "summary"  # header and hours totals only
+
+class TimesheetSummaryResponse(BaseModel):
+    """Timesheet header with hours totals from the rollup columns (no entries)"""
+    id: int
+    employee_id: int
+    week_start: date
+    status: TimesheetStatus
+    manager_email: str
+    approved_by: Optional[int]
+    approved_at: Optional[datetime]
+    submitted_at: Optional[datetime]
+    comment: Optional[str]
+    project: Optional[str]
+    created_at: datetime
+    updated_at: datetime
+    regular_hours: float
+    overtime_hours: float
+    double_time_hours: float
+    total_hours: float
+    employee: EmployeeBasicResponse
+
+    @classmethod
+    def from_row(cls, row):
+        data = row._mapping
+        return cls(
+            id=data["id"],
+            employee_id=data["employee_id"],
+            week_start=data["week_start"],
+            status=data["status"],
+            manager_email=data["manager_email"],
+            approved_by=data["approved_by"],
+            approved_at=data["approved_at"],
+            submitted_at=data["submitted_at"],
+            comment=data["comment"],
+            project=data["project"],
+            created_at=data["created_at"],
+            updated_at=data["updated_at"],
+            regular_hours=data["regular_minutes"] / 60.0,
+            overtime_hours=data["overtime_minutes"] / 60.0,
+            double_time_hours=data["double_time_minutes"] / 60.0,
+            total_hours=data["total_minutes"] / 60.0,
+            employee=EmployeeBasicResponse(
+                id=data["employee_id"],
+                full_name=data["employee_full_name"],
+                email=data["employee_email"]
+            ),
+        )
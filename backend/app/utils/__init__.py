@@ -2,6 +2,8 @@
 from .auth import (
     verify_password,
     get_password_hash,
+    hash_password,
+    verify_and_update_password,
     create_access_token,
     verify_token,
     authenticate_user,
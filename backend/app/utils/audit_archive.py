@@ -0,0 +1,226 @@
+"""
+Audit log retention: monthly partitions, compressed archives, point lookups
+
+    python -m app.utils.audit_archive [--retention-months N] [--archive-dir DIR]
+
+Run daily (cron) next to the API. Each run:
+
+1. On PostgreSQL, creates the monthly partitions of auditlog for the coming
+   audit_partition_months_ahead months (the table is partitioned by RANGE
+   (timestamp); rows outside every month land in auditlog_default).
+2. Archives every whole month older than audit_retention_months: its rows,
+   in id order, go to auditlog-YYYY-MM.jsonl.gz and are then removed from the
+   database (on PostgreSQL by dropping the month's partition).
+
+The archive is a series of independently compressed gzip members of
+audit_archive_block_rows lines each, so `zcat` reads it whole while a point
+lookup decompresses one block. The sidecar auditlog-YYYY-MM.index.json holds
+the month's row count, id and time range, and each block's byte offset,
+length and id range.
+
+The archive and its index are written to temporary files and renamed, index
+last; an index on disk means the month is completely archived. A run that
+stops after the rename but before the delete only deletes on the next run
+(audit rows are written within seconds of the event, so a month past
+retention gets no new rows).
+"""
+import argparse
+import bisect
+import glob
+import gzip
+import json
+import os
+import sys
+from datetime import date, datetime
+from typing import Iterator, List, Optional, Tuple
+
+from sqlalchemy import delete, func, select, text
+
+from app.config import settings
+from app.models.audit_log import AuditLog
+
+ARCHIVE_PREFIX = "auditlog-"
+
+
+def month_start(value) -> date:
+    return date(value.year, value.month, 1)
+
+
+def add_months(month: date, months: int) -> date:
+    index = month.year * 12 + month.month - 1 + months
+    return date(index // 12, index % 12 + 1, 1)
+
+
+def partition_name(month: date) -> str:
+    return f"auditlog_y{month.year}m{month.month:02d}"
+
+
+def archive_paths(archive_dir: str, month: date) -> Tuple[str, str]:
+    """(archive, index) file paths of `month`"""
+    stem = os.path.join(archive_dir, f"{ARCHIVE_PREFIX}{month:%Y-%m}")
+    return f"{stem}.jsonl.gz", f"{stem}.index.json"
+
+
+def archive_record(row) -> dict:
+    """JSON-ready audit row: enum as its value, timestamp in ISO format"""
+    record = dict(row)
+    record["event"] = record["event"].value if hasattr(record["event"], "value") else record["event"]
+    record["timestamp"] = record["timestamp"].isoformat()
+    return record
+
+
+# --- Partitions (PostgreSQL) ---
+
+def ensure_partitions(conn, first: date, last: date):
+    """Create the monthly partitions of auditlog from month `first` through `last` (PostgreSQL only)"""
+    month = first
+    while month <= last:
+        conn.execute(text(
+            f"CREATE TABLE IF NOT EXISTS {partition_name(month)} PARTITION OF auditlog "
+            f"FOR VALUES FROM ('{month.isoformat()}') TO ('{add_months(month, 1).isoformat()}')"
+        ))
+        month = add_months(month, 1)
+
+
+def _is_partitioned(conn) -> bool:
+    return conn.dialect.name == "postgresql" and conn.scalar(text(
+        "SELECT count(*) FROM pg_partitioned_table WHERE partrelid = 'auditlog'::regclass"
+    )) > 0
+
+
+# --- Archiving ---
+
+def write_archive(rows: Iterator[List[dict]], archive_path: str, index_path: str, month: date) -> int:
+    """
+    Write blocks of archive records to `archive_path` and the sidecar index to `index_path`
+
+    **Logic:**
+    1. Each block is compressed as its own gzip member; its offset, length and id range go in the index
+    2. Both files are written under temporary names, flushed to disk and renamed, index last
+
+    Returns the number of rows written.
+    """
+    blocks = []
+    total = 0
+    first_ts = last_ts = None
+    min_id = max_id = None
+    with open(archive_path + ".tmp", "wb") as archive:
+        for block in rows:
+            if not block:
+                continue
+            data = gzip.compress("".join(json.dumps(record, separators=(",", ":")) + "\n" for record in block).encode())
+            blocks.append({"offset": archive.tell(), "length": len(data), "first_id": block[0]["id"], "last_id": block[-1]["id"], "rows": len(block)})
+            archive.write(data)
+            total += len(block)
+            # Rows are in id order; timestamps only roughly follow it
+            timestamps = [record["timestamp"] for record in block]
+            first_ts = min(timestamps) if first_ts is None else min(first_ts, *timestamps)
+            last_ts = max(timestamps) if last_ts is None else max(last_ts, *timestamps)
+            min_id = block[0]["id"] if min_id is None else min_id
+            max_id = block[-1]["id"]
+        archive.flush()
+        os.fsync(archive.fileno())
+    index = {
+        "month": f"{month:%Y-%m}", "rows": total, "min_id": min_id, "max_id": max_id,
+        "min_timestamp": first_ts, "max_timestamp": last_ts, "blocks": blocks,
+    }
+    with open(index_path + ".tmp", "w") as sidecar:
+        json.dump(index, sidecar)
+        sidecar.flush()
+        os.fsync(sidecar.fileno())
+    os.replace(archive_path + ".tmp", archive_path)
+    os.replace(index_path + ".tmp", index_path)
+    return total
+
+
+def archive_month(engine, month: date, archive_dir: str, block_rows: int) -> int:
+    """
+    Archive and remove one month of audit rows; returns the rows archived (0 if already archived)
+
+    **Logic:**
+    1. Without an index on disk, streams the month's rows in id order into a new archive
+    2. Removes the month from the database: drops its partition on PostgreSQL, and deletes
+       whatever is left in the range (all of it elsewhere, stray rows in auditlog_default there)
+    """
+    start, end = month, add_months(month, 1)
+    in_month = (AuditLog.timestamp >= datetime.combine(start, datetime.min.time()),
+                AuditLog.timestamp < datetime.combine(end, datetime.min.time()))
+    archive_path, index_path = archive_paths(archive_dir, month)
+    archived = 0
+    if not os.path.exists(index_path):
+        os.makedirs(archive_dir, exist_ok=True)
+        with engine.connect() as conn:
+            result = conn.execution_options(stream_results=True, max_row_buffer=block_rows).execute(
+                select(AuditLog.__table__).where(*in_month).order_by(AuditLog.id)
+            )
+            blocks = ([archive_record(row) for row in block] for block in result.mappings().partitions(block_rows))
+            archived = write_archive(blocks, archive_path, index_path, month)
+    with engine.begin() as conn:
+        if _is_partitioned(conn) and conn.scalar(text(f"SELECT to_regclass('{partition_name(month)}')")) is not None:
+            conn.execute(text(f"ALTER TABLE auditlog DETACH PARTITION {partition_name(month)}"))
+            conn.execute(text(f"DROP TABLE {partition_name(month)}"))
+        conn.execute(delete(AuditLog).where(*in_month))
+    return archived
+
+
+def run_retention(engine, archive_dir: str, retention_months: int, block_rows: int, now: Optional[datetime] = None) -> List[Tuple[date, int]]:
+    """Create upcoming partitions and archive every month older than the retention; returns (month, rows archived)"""
+    current = month_start(now or datetime.utcnow())
+    cutoff = add_months(current, -retention_months)
+    with engine.begin() as conn:
+        if _is_partitioned(conn):
+            ensure_partitions(conn, current, add_months(current, settings.audit_partition_months_ahead))
+        oldest = conn.scalar(select(func.min(AuditLog.timestamp)).where(AuditLog.timestamp < datetime.combine(cutoff, datetime.min.time())))
+    archived = []
+    month = month_start(oldest) if oldest else cutoff
+    while month < cutoff:
+        archived.append((month, archive_month(engine, month, archive_dir, block_rows)))
+        month = add_months(month, 1)
+    return archived
+
+
+# --- Point lookups ---
+
+def find_archived(archive_dir: str, audit_id: int) -> Optional[dict]:
+    """
+    Archived audit record with `audit_id`, or None
+
+    Only sidecar indexes are read until the one block that can hold the id is found;
+    that block alone is read and decompressed.
+    """
+    for index_path in sorted(glob.glob(os.path.join(archive_dir, f"{ARCHIVE_PREFIX}*.index.json"))):
+        with open(index_path) as sidecar:
+            index = json.load(sidecar)
+        if not index["rows"] or not index["min_id"] <= audit_id <= index["max_id"]:
+            continue
+        blocks = index["blocks"]
+        position = bisect.bisect_right([block["first_id"] for block in blocks], audit_id) - 1
+        if position < 0 or blocks[position]["last_id"] < audit_id:
+            continue
+        block = blocks[position]
+        with open(index_path[:-len(".index.json")] + ".jsonl.gz", "rb") as archive:
+            archive.seek(block["offset"])
+            data = gzip.decompress(archive.read(block["length"]))
+        for line in data.decode().splitlines():
+            record = json.loads(line)
+            if record["id"] == audit_id:
+                return record
+    return None
+
+
+def main(argv=None) -> int:
+    from app.core.database import engine
+
+    parser = argparse.ArgumentParser(description="Archive audit log months past retention")
+    parser.add_argument("--retention-months", type=int, default=settings.audit_retention_months)
+    parser.add_argument("--archive-dir", default=settings.audit_archive_dir)
+    parser.add_argument("--block-rows", type=int, default=settings.audit_archive_block_rows)
+    args = parser.parse_args(argv)
+
+    for month, rows in run_retention(engine, args.archive_dir, args.retention_months, args.block_rows):
+        print(f"✅ {month:%Y-%m}: archived {rows} audit rows")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,18 +1,23 @@
 from datetime import datetime, timedelta
-from typing import Optional
+from typing import Optional, Tuple
 from jose import JWTError, jwt
 from passlib.context import CryptContext
 from fastapi import HTTPException, status, Depends
 from fastapi.security import HTTPBearer
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 from fastapi.security import HTTPAuthorizationCredentials
+from starlette.concurrency import run_in_threadpool
 
 from app.models.employee import Employee
 from app.config import settings
-from app.core.session import get_db
+from app.core.session import get_db, get_async_db
+from app.core.principal_cache import principal_cache
+from app.core.password_pool import password_pool
 
-# Password hashing context
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+# Password hashing context; hashes made with another cost are flagged for update
+pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto", bcrypt__rounds=settings.bcrypt_rounds)
 
 # JWT settings
 SECRET_KEY = settings.SECRET_KEY
@@ -30,6 +35,16 @@ def get_password_hash(password: str) -> str:
     return pwd_context.hash(password)
 
 
+async def hash_password(password: str) -> str:
+    """Hash a password on the password pool (503 when it is saturated)"""
+    return await password_pool.run("hash", pwd_context.hash, password)
+
+
+async def verify_and_update_password(plain_password: str, hashed_password: str) -> Tuple[bool, Optional[str]]:
+    """Verify on the password pool; also returns a new hash when the stored one uses outdated settings"""
+    return await password_pool.run("verify", pwd_context.verify_and_update, plain_password, hashed_password)
+
+
 def create_access_token(data: dict, expires_delta: Optional[timedelta] = None) -> str:
     """Create a JWT access token"""
     to_encode = data.copy()
@@ -52,42 +67,95 @@ def verify_token(token: str) -> Optional[dict]:
         return None
 
 
-def authenticate_user(db, email: str, password: str) -> Optional[Employee]:
-    """Authenticate a user with email and password"""
-    user = db.query(Employee).filter(Employee.email == email).first()
+async def authenticate_user(db, email: str, password: str) -> Optional[Employee]:
+    """
+    Authenticate a user with email and password
+    
+    **Logic:**
+    1. Database work runs in the shared threadpool, bcrypt on the password pool
+    2. On success, a hash made with an outdated cost is replaced and saved
+    """
+    user = await run_in_threadpool(lambda: db.query(Employee).filter(Employee.email == email).first())
     if not user:
         return None
-    if not verify_password(password, user.password_hash):
+    valid, new_hash = await verify_and_update_password(password, user.password_hash)
+    if not valid:
         return None
+    if new_hash:
+        user.password_hash = new_hash
+        await run_in_threadpool(_save_user, db, user)
     return user
 
 
+def _save_user(db, user: Employee):
+    db.commit()
+    db.refresh(user)
+
+
 def get_current_user(db, token: str) -> Employee:
-    """Get current user from JWT token"""
-    credentials_exception = HTTPException(
-        status_code=status.HTTP_401_UNAUTHORIZED,
-        detail="Could not validate credentials",
-        headers={"WWW-Authenticate": "Bearer"},
-    )
-    
-    payload = verify_token(token)
-    if payload is None:
-        raise credentials_exception
+    """
+    Get current user from JWT token
     
-    user_id: int = payload.get("sub")
-    if user_id is None:
-        raise credentials_exception
+    **Logic:**
+    1. A principal cache hit skips both the JWT decode and the Employee query
+    2. Otherwise decode the token, load the Employee by id and cache it
+    """
+    cached = principal_cache.get(db, token)
+    if cached is not None:
+        return cached
     
+    user_id, payload = _decode_principal(token)
     user = db.query(Employee).filter(Employee.id == user_id).first()
     if user is None:
-        raise credentials_exception
+        raise _credentials_exception()
     
+    principal_cache.put(token, user, payload.get("exp"))
     return user
 
 
+async def get_current_user_async(db: AsyncSession, token: str) -> Employee:
+    """get_current_user for async endpoints: same cache, Employee loaded through the AsyncSession"""
+    cached = principal_cache.lookup(token)
+    if cached is not None:
+        return await db.merge(cached, load=False)
+    
+    user_id, payload = _decode_principal(token)
+    user = (await db.scalars(select(Employee).where(Employee.id == user_id))).first()
+    if user is None:
+        raise _credentials_exception()
+    
+    principal_cache.put(token, user, payload.get("exp"))
+    return user
+
+
+def _credentials_exception() -> HTTPException:
+    return HTTPException(
+        status_code=status.HTTP_401_UNAUTHORIZED,
+        detail="Could not validate credentials",
+        headers={"WWW-Authenticate": "Bearer"},
+    )
+
+
+def _decode_principal(token: str) -> Tuple[int, dict]:
+    """User id and JWT payload of a valid token, else 401"""
+    payload = verify_token(token)
+    try:
+        return int(payload["sub"]), payload
+    except (TypeError, KeyError, ValueError):
+        raise _credentials_exception()
+
+
 def get_current_user_dependency(
     token: HTTPAuthorizationCredentials = Depends(HTTPBearer()),
     db: Session = Depends(get_db)
 ) -> Employee:
     """Dependency to get current user from JWT token"""
-    return get_current_user(db, token.credentials) 
\ No newline at end of file
+    return get_current_user(db, token.credentials)
+
+
+async def get_current_user_async_dependency(
+    token: HTTPAuthorizationCredentials = Depends(HTTPBearer()),
+    db: AsyncSession = Depends(get_async_db)
+) -> Employee:
+    """Dependency to get current user from JWT token, bound to the request's AsyncSession"""
+    return await get_current_user_async(db, token.credentials)
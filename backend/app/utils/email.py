@@ -1,9 +1,12 @@
 import smtplib
+from datetime import datetime
 from email.message import EmailMessage
+from sqlalchemy import insert
 from app.config import settings
-from typing import List, Optional
+from app.models.email_outbox import EmailOutbox, OutboxStatus
+from typing import List, Optional, Tuple
 
-def send_email(subject: str, body: str, to: List[str], html: Optional[str] = None):
+def build_message(subject: str, body: str, to: List[str], html: Optional[str] = None) -> EmailMessage:
     msg = EmailMessage()
     msg['Subject'] = subject
     msg['From'] = settings.email_from
@@ -11,8 +14,37 @@ def send_email(subject: str, body: str, to: List[str], html: Optional[str] = Non
     msg.set_content(body)
     if html:
         msg.add_alternative(html, subtype='html')
+    return msg
+
+def queue_email(db, subject: str, body: str, to: List[str], html: Optional[str] = None) -> EmailOutbox:
+    """
+    Add an email to the outbox in the caller's transaction (Session or AsyncSession)
+
+    It is only sent if the transaction commits, and survives restarts until the
+    sender (python -m app.utils.email_sender) delivers it.
+    """
+    message = EmailOutbox(recipients=', '.join(to), subject=subject, body=body, html=html)
+    db.add(message)
+    return message
 
+async def queue_emails(db, messages: List[Tuple[str, str, List[str]]]):
+    """
+    Add many (subject, body, to) emails to the outbox in the caller's AsyncSession transaction
+
+    One executemany INSERT: unlike adding EmailOutbox objects, no row waits on its generated id.
+    """
+    if not messages:
+        return
+    now = datetime.utcnow()
+    await db.execute(insert(EmailOutbox), [
+        {"recipients": ', '.join(to), "subject": subject, "body": body, "html": None,
+         "status": OutboxStatus.PENDING, "attempts": 0, "next_attempt_at": now, "created_at": now}
+        for subject, body, to in messages
+    ])
+
+def send_email(subject: str, body: str, to: List[str], html: Optional[str] = None):
+    """Send one message right away on its own connection (scripts; the API queues through queue_email)"""
     with smtplib.SMTP(settings.smtp_host, settings.smtp_port) as server:
         server.starttls()
         server.login(settings.smtp_user, settings.smtp_password)
-        server.send_message(msg) 
\ No newline at end of file
+        server.send_message(build_message(subject, body, to, html))
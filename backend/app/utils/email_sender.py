@@ -0,0 +1,223 @@
+"""
+Email outbox sender
+
+    python -m app.utils.email_sender [--once] [--batch-size N] [--poll-interval SECONDS]
+
+Runs as its own process next to the API. Endpoints only add EmailOutbox rows in
+the transaction that makes the change (see queue_email), so a message exists
+exactly when the change was committed and survives restarts. This process
+claims due messages in batches, sends them over one SMTP connection that is
+kept open and reused, and reschedules failures with exponential backoff. It
+also queues the manager digests that are due (see app/utils/notifications.py).
+
+Delivery is at-least-once: a crash after sending but before the batch commits
+sends those messages again. On PostgreSQL several senders can run side by
+side; claimed rows are locked and skipped by the others.
+"""
+import argparse
+import smtplib
+import sys
+import time
+from datetime import datetime, timedelta
+from email.message import EmailMessage
+from typing import List, Optional
+
+from sqlalchemy import select
+from sqlmodel import Session
+
+from app.config import settings
+from app.models.email_outbox import EmailOutbox, OutboxStatus
+from app.utils.email import build_message
+from app.utils.notifications import queue_due_digests
+
+# Errors after which the connection can't be trusted for the next message
+CONNECTION_ERRORS = (smtplib.SMTPServerDisconnected, smtplib.SMTPConnectError, OSError)
+
+
+class SMTPConnection:
+    """
+    One SMTP session reused across messages
+
+    **Logic:**
+    1. Connects on first use (STARTTLS and login when configured)
+    2. Reconnects after max_messages, after idle_seconds without traffic, or once the server hangs up
+    3. A message that fails because a reused connection was already dead is retried once on a new one
+    """
+
+    def __init__(self, host: str, port: int, use_tls: bool = False, user: Optional[str] = None, password: Optional[str] = None,
+                 timeout: float = 30.0, idle_seconds: float = 60.0, max_messages: int = 100):
+        self.host = host
+        self.port = port
+        self.use_tls = use_tls
+        self.user = user
+        self.password = password
+        self.timeout = timeout
+        self.idle_seconds = idle_seconds
+        self.max_messages = max_messages
+        self.connects = 0
+        self._server: Optional[smtplib.SMTP] = None
+        self._sent = 0
+        self._last_used = 0.0
+
+    @classmethod
+    def from_settings(cls) -> "SMTPConnection":
+        return cls(
+            settings.smtp_host, settings.smtp_port,
+            use_tls=settings.smtp_use_tls,
+            user=settings.smtp_user or None,
+            password=settings.smtp_password,
+            timeout=settings.smtp_timeout_seconds,
+            idle_seconds=settings.smtp_idle_seconds,
+            max_messages=settings.smtp_max_messages_per_connection,
+        )
+
+    def send(self, message: EmailMessage) -> dict:
+        """Send `message`; returns the recipients the server refused (the others were accepted)"""
+        if self._server is not None and (self._sent >= self.max_messages or time.monotonic() - self._last_used > self.idle_seconds):
+            self.close()
+        reused = self._server is not None
+        try:
+            refused = self._connect().send_message(message)
+        except CONNECTION_ERRORS:
+            self.close()
+            if not reused:
+                raise
+            refused = self._connect().send_message(message)
+        self._sent += 1
+        self._last_used = time.monotonic()
+        return refused
+
+    def close_if_idle(self):
+        if self._server is not None and time.monotonic() - self._last_used > self.idle_seconds:
+            self.close()
+
+    def close(self):
+        server, self._server = self._server, None
+        if server is None:
+            return
+        try:
+            server.quit()
+        except CONNECTION_ERRORS + (smtplib.SMTPException,):
+            server.close()
+
+    def _connect(self) -> smtplib.SMTP:
+        if self._server is None:
+            server = smtplib.SMTP(self.host, self.port, timeout=self.timeout)
+            try:
+                if self.use_tls:
+                    server.starttls()
+                if self.user:
+                    server.login(self.user, self.password)
+            except BaseException:
+                server.close()
+                raise
+            self._server = server
+            self._sent = 0
+            self._last_used = time.monotonic()
+            self.connects += 1
+        return self._server
+
+
+def retry_delay(attempts: int) -> timedelta:
+    """Backoff after the `attempts`-th failed attempt: base, 2x base, 4x base ... capped at email_retry_max_seconds"""
+    seconds = settings.email_retry_base_seconds * 2 ** (attempts - 1)
+    return timedelta(seconds=min(seconds, settings.email_retry_max_seconds))
+
+
+def claim_batch(session: Session, batch_size: int) -> List[EmailOutbox]:
+    """Due pending messages, oldest first, locked until the caller commits (skipped by other senders)"""
+    return session.scalars(
+        select(EmailOutbox)
+        .where(EmailOutbox.status == OutboxStatus.PENDING, EmailOutbox.next_attempt_at <= datetime.utcnow())
+        .order_by(EmailOutbox.id)
+        .limit(batch_size)
+        .with_for_update(skip_locked=True)
+    ).all()
+
+
+def deliver_batch(session: Session, connection: SMTPConnection, batch_size: int) -> int:
+    """
+    Send one batch of due messages and record the outcome in a single commit
+
+    **Logic:**
+    1. Claims up to batch_size due messages
+    2. Sent: status sent (recipients the server refused individually are noted in last_error)
+    3. 5xx reply: permanent, status failed
+    4. Anything else: rescheduled with backoff, failed after email_max_attempts
+    5. A connection failure stops the batch; the remaining messages stay due for the next one
+
+    Returns the number of messages attempted.
+    """
+    attempted = 0
+    for message in claim_batch(session, batch_size):
+        attempted += 1
+        now = datetime.utcnow()
+        try:
+            refused = connection.send(build_message(message.subject, message.body, message.recipient_list, message.html))
+        except smtplib.SMTPRecipientsRefused as error:
+            _record_failure(message, error, permanent=all(code >= 500 for code, _ in error.recipients.values()), now=now)
+        except smtplib.SMTPResponseException as error:
+            _record_failure(message, error, permanent=error.smtp_code >= 500, now=now)
+        except CONNECTION_ERRORS + (smtplib.SMTPException,) as error:
+            _record_failure(message, error, permanent=False, now=now)
+            break
+        else:
+            message.status = OutboxStatus.SENT
+            message.attempts += 1
+            message.sent_at = now
+            message.last_error = f"Refused: {', '.join(sorted(refused))}"[:1000] if refused else None
+    session.commit()
+    return attempted
+
+
+def _record_failure(message: EmailOutbox, error: Exception, permanent: bool, now: datetime):
+    message.attempts += 1
+    message.last_error = f"{type(error).__name__}: {error}"[:1000]
+    if permanent or message.attempts >= settings.email_max_attempts:
+        message.status = OutboxStatus.FAILED
+    else:
+        message.next_attempt_at = now + retry_delay(message.attempts)
+
+
+def run(engine, connection: SMTPConnection, batch_size: int, poll_interval: float, once: bool = False) -> int:
+    """
+    Queue due manager digests and deliver batches until interrupted (or, with once,
+    until nothing is due); returns messages attempted
+    """
+    total = 0
+    try:
+        while True:
+            with Session(engine) as session:
+                queue_due_digests(session)
+            with Session(engine) as session:
+                attempted = deliver_batch(session, connection, batch_size)
+            total += attempted
+            # A short batch means the outbox is drained (or the server is unreachable): wait before polling again
+            if attempted < batch_size:
+                if once:
+                    return total
+                connection.close_if_idle()
+                time.sleep(poll_interval)
+    finally:
+        connection.close()
+
+
+def main(argv=None) -> int:
+    from app.core.database import engine
+
+    parser = argparse.ArgumentParser(description="Send queued email from the outbox")
+    parser.add_argument("--once", action="store_true", help="Exit once nothing is due instead of polling")
+    parser.add_argument("--batch-size", type=int, default=settings.email_batch_size)
+    parser.add_argument("--poll-interval", type=float, default=settings.email_poll_interval_seconds)
+    args = parser.parse_args(argv)
+
+    try:
+        total = run(engine, SMTPConnection.from_settings(), args.batch_size, args.poll_interval, once=args.once)
+    except KeyboardInterrupt:
+        return 0
+    print(f"✅ Attempted {total} queued messages")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
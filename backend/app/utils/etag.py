@@ -0,0 +1,56 @@
+import hashlib
+from typing import Any, Optional
+
+from fastapi import Request, Response, status
+from sqlalchemy import Select, func
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.employee import Employee
+
+
+async def scope_etag(db: AsyncSession, request: Request, user: Employee, statement: Select, updated_column: Any) -> str:
+    """
+    Cheap weak validator for a list endpoint's scoped select
+
+    **Logic:**
+    1. Runs a single `count(*), max(updated_at)` over the same filtered scope the
+       endpoint would return; no ORM objects are loaded
+    2. Mixes in the caller and the query string (filters, cursor, limit, view),
+       since both change the response for the same rows
+    3. Inserts bump the count, deletes lower it, and updates move max(updated_at): every
+       write path must set updated_at, bulk UPDATEs included (see test_etag.py)
+    """
+    count, last_updated = (await db.execute(
+        statement.with_only_columns(func.count(), func.max(updated_column), maintain_column_froms=True).order_by(None)
+    )).one()
+    raw = "|".join([
+        str(user.id),
+        user.role.value,
+        str(sorted(request.query_params.multi_items())),
+        str(count),
+        last_updated.isoformat() if last_updated else "",
+    ])
+    return f'W/"{hashlib.sha1(raw.encode()).hexdigest()}"'
+
+
+def conditional_response(request: Request, response: Response, etag: str) -> Optional[Response]:
+    """
+    Honour If-None-Match for a computed ETag
+
+    Returns a bare 304 response when the client's copy is current (the caller should
+    return it without building the body); otherwise stamps the ETag on `response`
+    and returns None.
+    """
+    headers = {"ETag": etag, "Cache-Control": "private, no-cache"}
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match:
+        candidates = [tag.strip() for tag in if_none_match.split(",")]
+        # Weak comparison: W/"x" matches "x"
+        if "*" in candidates or _strip_weak(etag) in {_strip_weak(tag) for tag in candidates}:
+            return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+    response.headers.update(headers)
+    return None
+
+
+def _strip_weak(tag: str) -> str:
+    return tag[2:] if tag.startswith("W/") else tag
@@ -0,0 +1,65 @@
+from sqlalchemy import Integer, func, select
+from sqlalchemy.ext.compiler import compiles
+from sqlalchemy.sql.expression import FunctionElement
+
+from app.models.time_entry import TimeEntry, BreakPeriod
+
+
+class minutes_of_day(FunctionElement):
+    """
+    SQL expression for hour * 60 + minute of a TIME column
+
+    Mirrors TimeEntry.get_hours_worked, which ignores seconds.
+    """
+    type = Integer()
+    inherit_cache = True
+    name = "minutes_of_day"
+
+
+@compiles(minutes_of_day)
+def _compile_minutes_of_day(element, compiler, **kw):
+    column = compiler.process(element.clauses, **kw)
+    return f"(CAST(EXTRACT(HOUR FROM {column}) AS INTEGER) * 60 + CAST(EXTRACT(MINUTE FROM {column}) AS INTEGER))"
+
+
+@compiles(minutes_of_day, "sqlite")
+def _compile_minutes_of_day_sqlite(element, compiler, **kw):
+    # SQLite stores TIME as 'HH:MM:SS[.ffffff]' text
+    column = compiler.process(element.clauses, **kw)
+    return f"(CAST(substr({column}, 1, 2) AS INTEGER) * 60 + CAST(substr({column}, 4, 2) AS INTEGER))"
+
+
+def entry_minutes_subquery(timesheet_ids=None):
+    """
+    Worked minutes per time entry of the given timesheets
+
+    **Logic:**
+    1. Left join each entry to its break periods
+    2. Worked minutes = (out - in) - sum(break lengths)
+    3. `timesheet_ids` is a selectable (or list) of ids, so only those entries are read;
+       None reads every entry
+    """
+    break_minutes = func.coalesce(
+        func.sum(minutes_of_day(BreakPeriod.end_time) - minutes_of_day(BreakPeriod.start_time)),
+        0
+    )
+    statement = (
+        select(
+            TimeEntry.timesheet_id.label("timesheet_id"),
+            TimeEntry.date.label("date"),
+            (minutes_of_day(TimeEntry.out_time) - minutes_of_day(TimeEntry.in_time) - break_minutes).label("minutes")
+        )
+        .outerjoin(BreakPeriod, BreakPeriod.time_entry_id == TimeEntry.id)
+        .group_by(TimeEntry.id, TimeEntry.timesheet_id, TimeEntry.date, TimeEntry.in_time, TimeEntry.out_time)
+    )
+    if timesheet_ids is not None:
+        statement = statement.where(TimeEntry.timesheet_id.in_(timesheet_ids))
+    return statement.subquery()
+
+
+def entry_minutes(entry) -> int:
+    """Worked minutes of a TimeEntry or TimeEntryCreate (in/out minus breaks), in Python"""
+    minutes = (entry.out_time.hour * 60 + entry.out_time.minute) - (entry.in_time.hour * 60 + entry.in_time.minute)
+    for br in entry.break_periods:
+        minutes -= (br.end_time.hour * 60 + br.end_time.minute) - (br.start_time.hour * 60 + br.start_time.minute)
+    return minutes
@@ -0,0 +1,54 @@
+"""
+Interval validation by sort-and-sweep
+
+Shared by time entries within a day, break periods within an entry and
+time-off date ranges. Intervals are half-open [start, end): two intervals
+that touch (one ends exactly when the next starts) do not conflict.
+"""
+import heapq
+from typing import Any, Iterable, List, NamedTuple
+
+
+class Interval(NamedTuple):
+    start: Any
+    end: Any
+    position: Any  # caller's identifier (index, row id, ...), reported back in conflicts
+
+
+class Conflict(NamedTuple):
+    first: Interval   # the interval that starts first
+    second: Interval
+
+
+def find_empty(intervals: Iterable[Interval]) -> List[Interval]:
+    """Intervals whose end is not after their start"""
+    return [interval for interval in intervals if interval.end <= interval.start]
+
+
+def find_outside(intervals: Iterable[Interval], start: Any, end: Any) -> List[Interval]:
+    """Intervals not contained in [start, end]"""
+    return [interval for interval in intervals if interval.start < start or interval.end > end]
+
+
+def find_overlaps(intervals: Iterable[Interval]) -> List[Conflict]:
+    """
+    Every pair of overlapping intervals, in sweep order
+
+    **Logic:**
+    1. Sort once by (start, end)
+    2. Sweep left to right keeping the active intervals in a min-heap by end
+    3. Before an interval is added, active ones ending at or before its start are
+       dropped (touching is allowed); whatever is still active overlaps it
+    4. O(n log n + k) for k conflicts; empty intervals should be rejected first
+       with find_empty
+    """
+    ordered = sorted(intervals, key=lambda interval: (interval.start, interval.end))
+    active = []  # (end, sweep index, interval)
+    conflicts = []
+    for index, interval in enumerate(ordered):
+        while active and active[0][0] <= interval.start:
+            heapq.heappop(active)
+        if active:
+            conflicts.extend(Conflict(other, interval) for _, _, other in sorted(active, key=lambda item: item[1]))
+        heapq.heappush(active, (interval.end, index, interval))
+    return conflicts
@@ -0,0 +1,92 @@
+"""
+Approval notifications for managers: one email per event, or a digest
+
+A manager's Employee.notification_mode decides. In immediate mode (the default,
+and for manager emails with no account) each submission queues its own email.
+In digest mode it is held as a PendingNotification, and the digest job, run by
+the email sender on every poll, coalesces each manager's held notifications
+into one email once the oldest has waited digest_interval_minutes.
+"""
+from datetime import datetime, timedelta
+from typing import List, Optional
+
+from sqlalchemy import String, cast, delete, func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlmodel import Session
+
+from app.models.employee import Employee, NotificationMode
+from app.models.pending_notification import PendingNotification
+from app.utils.email import queue_email
+
+TIMESHEET_SUBMITTED = "timesheet_submitted"
+TIME_OFF_REQUESTED = "time_off_requested"
+
+
+async def notify_manager(db: AsyncSession, manager_email: str, kind: str, summary: str, subject: str, body: str):
+    """Queue the email now, or hold `summary` for the manager's digest, in the caller's transaction"""
+    mode = await db.scalar(select(Employee.notification_mode).where(Employee.email == manager_email))
+    if mode == NotificationMode.DIGEST:
+        db.add(PendingNotification(manager_email=manager_email, kind=kind, summary=summary))
+    else:
+        queue_email(db, subject, body, [manager_email])
+
+
+def pending_digests_query():
+    """
+    One row per manager with held notifications
+
+    (manager_email, full name, digest interval, oldest, ids joined by newlines).
+    The outer join keeps notifications of managers whose account is gone; they are sent right away.
+    """
+    return (
+        select(
+            PendingNotification.manager_email,
+            Employee.full_name,
+            Employee.digest_interval_minutes,
+            func.min(PendingNotification.created_at),
+            func.aggregate_strings(cast(PendingNotification.id, String), "\n"),
+        )
+        .outerjoin(Employee, Employee.email == PendingNotification.manager_email)
+        .group_by(PendingNotification.manager_email, Employee.full_name, Employee.digest_interval_minutes)
+    )
+
+
+def queue_due_digests(session: Session, now: Optional[datetime] = None) -> int:
+    """
+    Turn due digests into outbox emails; returns how many were queued
+
+    **Logic:**
+    1. One grouped query gathers every manager's held notification ids
+    2. A digest is due once its oldest notification has waited the manager's interval
+    3. Each due digest deletes its notifications with DELETE ... RETURNING and becomes
+       one outbox email built from exactly the returned rows (ones committed meanwhile
+       wait for the next digest)
+    4. Everything commits together; with several senders each notification is
+       returned by only one delete, so it is sent exactly once
+    """
+    now = now or datetime.utcnow()
+    queued = 0
+    for manager_email, full_name, interval, oldest, ids in session.execute(pending_digests_query()).all():
+        if interval is not None and oldest + timedelta(minutes=interval) > now:
+            continue
+        summaries = session.scalars(
+            delete(PendingNotification)
+            .where(PendingNotification.id.in_([int(i) for i in ids.split("\n")]))
+            .returning(PendingNotification.summary)
+        ).all()
+        if not summaries:
+            # Another sender digested them first
+            continue
+        subject, body = digest_email(full_name, len(summaries), sorted(summaries))
+        queue_email(session, subject, body, [manager_email])
+        queued += 1
+    session.commit()
+    return queued
+
+
+def digest_email(full_name: str, count: int, summaries: List[str]):
+    subject = f"{count} item{'s' if count != 1 else ''} awaiting your approval"
+    lines = "\n".join(f"- {summary}" for summary in summaries)
+    greeting = f"Hello {full_name}," if full_name else "Hello,"
+    body = f"{greeting}\n\nThe following were submitted for your approval:\n\n{lines}\n\nPlease log in to review and approve.\n\n-- Dew Time Tracker"
+    return subject, body
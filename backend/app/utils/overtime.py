@@ -0,0 +1,148 @@
+"""
+Overtime rules engine
+
+Worked minutes are split into regular, overtime and double time from a
+timesheet's day totals (all entries of a day summed, so split shifts count
+together) under its client's OvertimeRules:
+
+- daily: minutes of a day above daily_overtime_after_minutes are overtime, above
+  daily_double_time_after_minutes double time
+- weekly: regular minutes beyond weekly_overtime_after_minutes in the week become
+  overtime, in day order; minutes already paid as daily overtime are not counted twice
+- seventh day: with seventh_day set, the 7th consecutive worked day is overtime
+  from its first minute and double time after seventh_day_double_time_after_minutes
+
+evaluate() works on arrays of day totals for many timesheets sharing one rule
+set, so a bulk recomputation groups timesheets by rules and makes one call per
+group. The splits are stored in the hours rollups (see
+app/utils/rollups.py); responses read them from there.
+"""
+from dataclasses import dataclass, fields
+from datetime import date
+from typing import Dict, Hashable, List, Mapping, Optional, Sequence, Tuple
+
+from sqlalchemy import select
+
+from app.models.employee import Employee
+from app.models.overtime_rules import OvertimeRules
+from app.models.timesheet import Timesheet
+
+
+@dataclass(frozen=True)
+class OvertimeRuleSet:
+    """The rule values of an OvertimeRules row, hashable so timesheets can be grouped by them"""
+    daily_overtime_after_minutes: Optional[int] = 480
+    daily_double_time_after_minutes: Optional[int] = None
+    weekly_overtime_after_minutes: Optional[int] = 2400
+    seventh_day: bool = False
+    seventh_day_double_time_after_minutes: Optional[int] = 480
+
+    @classmethod
+    def of(cls, rules: Optional[OvertimeRules]) -> "OvertimeRuleSet":
+        """Rule set of an OvertimeRules row; None (a client without rules) gets DEFAULT_RULES"""
+        if rules is None:
+            return DEFAULT_RULES
+        return cls(**{field: getattr(rules, field) for field in RULE_FIELDS})
+
+
+RULE_FIELDS = tuple(f.name for f in fields(OvertimeRuleSet))
+
+# Clients without an OvertimeRules row: overtime after 8 hours a day or 40 regular hours a week
+DEFAULT_RULES = OvertimeRuleSet()
+
+# (regular, overtime, double time) minutes of one day
+Split = Tuple[int, int, int]
+
+
+def evaluate(rules: OvertimeRuleSet, day_totals: Sequence[Sequence[int]]) -> List[List[Split]]:
+    """
+    Split the day totals of many timesheets under one rule set
+
+    **Logic:**
+    1. `day_totals` holds one array per timesheet of worked minutes per consecutive
+       calendar day, starting on the first day of the week
+    2. Each day in order: daily tiers, or the seventh-day rule once the worked-day
+       streak reaches 7; then the weekly threshold against the regular minutes so far
+    3. Returns per timesheet a (regular, overtime, double time) split per day, aligned with its input
+
+    The rule values are read once per call, not once per day.
+    """
+    overtime_after = rules.daily_overtime_after_minutes
+    double_after = rules.daily_double_time_after_minutes
+    weekly_after = rules.weekly_overtime_after_minutes
+    seventh_day = rules.seventh_day
+    seventh_double_after = rules.seventh_day_double_time_after_minutes
+
+    result = []
+    for days in day_totals:
+        splits = []
+        streak = week_regular = 0
+        for total in days:
+            streak = streak + 1 if total > 0 else 0
+            if seventh_day and streak >= 7:
+                double = total - seventh_double_after if seventh_double_after is not None and total > seventh_double_after else 0
+                overtime, regular = total - double, 0
+            else:
+                double = total - double_after if double_after is not None and total > double_after else 0
+                overtime = total - double - overtime_after if overtime_after is not None and total - double > overtime_after else 0
+                regular = total - overtime - double
+            if weekly_after is not None and week_regular + regular > weekly_after:
+                kept = max(0, weekly_after - week_regular)
+                overtime, regular = overtime + regular - kept, kept
+            week_regular += regular
+            splits.append((regular, overtime, double))
+        result.append(splits)
+    return result
+
+
+def split_weeks(
+    weeks: Mapping[Hashable, Tuple[OvertimeRuleSet, date, Mapping[date, int]]]
+) -> Dict[Hashable, Dict[date, Tuple[int, int, int, int]]]:
+    """
+    Split dated day totals of many timesheets, keyed by e.g. timesheet id
+
+    **Logic:**
+    1. Each timesheet's {date: minutes} becomes an array from its week start (or an
+       earlier entry date) through its last date, with zeros for days not worked
+    2. Timesheets are grouped by rule set and each group is evaluated in one call
+    3. Returns per key {date: (total, regular, overtime, double time)} for the dates given
+    """
+    groups: Dict[OvertimeRuleSet, List[Tuple[Hashable, date, Mapping[date, int]]]] = {}
+    for key, (rules, week_start, days) in weeks.items():
+        groups.setdefault(rules, []).append((key, min([week_start, *days]), days))
+    split = {}
+    for rules, members in groups.items():
+        arrays, offsets = [], []
+        for _, start, days in members:
+            origin = start.toordinal()
+            day_offsets = {day: day.toordinal() - origin for day in days}
+            array = [0] * (max(day_offsets.values(), default=-1) + 1)
+            for day, offset in day_offsets.items():
+                array[offset] = days[day]
+            arrays.append(array)
+            offsets.append(day_offsets)
+        for (key, _, days), day_offsets, day_splits in zip(members, offsets, evaluate(rules, arrays)):
+            split[key] = {day: (days[day], *day_splits[offset]) for day, offset in day_offsets.items()}
+    return split
+
+
+def timesheet_rules(timesheet_ids):
+    """(timesheet id, week start, rules id, *RULE_FIELDS) of the given timesheets; rules columns are NULL for clients without rules"""
+    return (
+        select(
+            Timesheet.id.label("timesheet_id"),
+            Timesheet.week_start.label("week_start"),
+            OvertimeRules.id.label("rules_id"),
+            *[getattr(OvertimeRules, field).label(field) for field in RULE_FIELDS],
+        )
+        .join(Employee, Employee.id == Timesheet.employee_id)
+        .outerjoin(OvertimeRules, OvertimeRules.client_id == Employee.client_id)
+        .where(Timesheet.id.in_(timesheet_ids))
+    )
+
+
+def rules_of_row(data: Mapping) -> OvertimeRuleSet:
+    """Rule set from a row carrying timesheet_rules()' columns"""
+    if data["rules_id"] is None:
+        return DEFAULT_RULES
+    return OvertimeRuleSet(**{field: data[field] for field in RULE_FIELDS})
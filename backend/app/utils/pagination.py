@@ -0,0 +1,109 @@
+import base64
+import binascii
+import json
+from datetime import datetime
+from typing import Any, List, Optional, Tuple
+
+from fastapi import HTTPException, Query as QueryParam, status
+from sqlalchemy import Select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+# Page size when the client sends no limit, and the hard ceiling, so a single
+# request can never pull a whole table
+DEFAULT_PAGE_SIZE = 100
+MAX_PAGE_SIZE = 500
+
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+
+
+class PageParams:
+    """
+    Dependency holding the keyset pagination parameters of a list endpoint
+
+    **Logic:**
+    1. `cursor` is the opaque value returned in the previous page's X-Next-Cursor header
+    2. `limit` caps the page size (DEFAULT_PAGE_SIZE when omitted); clients follow
+       X-Next-Cursor until it is absent to read the whole listing
+    """
+
+    def __init__(
+        self,
+        cursor: Optional[str] = QueryParam(None, description="Opaque cursor from the previous page"),
+        limit: int = QueryParam(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE, description="Maximum number of rows to return")
+    ):
+        self.cursor = cursor
+        self.limit = limit
+
+
+def encode_cursor(last_id: int) -> str:
+    """Encode the last seen primary key as an opaque, URL-safe cursor"""
+    raw = json.dumps({"id": last_id}, separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> int:
+    """Decode a cursor produced by encode_cursor, raising 400 if it was tampered with"""
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        data = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        last_id = data["id"]
+        if not isinstance(last_id, int):
+            raise ValueError(last_id)
+        return last_id
+    except (binascii.Error, ValueError, KeyError, TypeError):
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid cursor")
+
+
+def encode_time_cursor(timestamp: datetime, last_id: int) -> str:
+    """Encode the last seen (timestamp, id) of a time-ordered listing as an opaque cursor"""
+    raw = json.dumps({"ts": timestamp.isoformat(), "id": last_id}, separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_time_cursor(cursor: str) -> Tuple[datetime, int]:
+    """Decode a cursor produced by encode_time_cursor, raising 400 if it was tampered with"""
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        data = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        last_id = data["id"]
+        if not isinstance(last_id, int):
+            raise ValueError(last_id)
+        return datetime.fromisoformat(data["ts"]), last_id
+    except (binascii.Error, ValueError, KeyError, TypeError):
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid cursor")
+
+
+def keyset_window(statement: Select, id_column: Any, page: PageParams) -> Select:
+    """
+    Restrict a select to one keyset page without executing it
+
+    **Logic:**
+    1. Order by the primary key so every page is an index range scan
+    2. Seek past the cursor with `id > last_id` instead of OFFSET
+    3. Fetch limit + 1 rows so split_page can tell whether another page exists
+    """
+    statement = statement.order_by(id_column)
+    if page.cursor:
+        statement = statement.where(id_column > decode_cursor(page.cursor))
+    return statement.limit(page.limit + 1)
+
+
+def split_page(rows: List[Any], page: PageParams) -> Tuple[List[Any], Optional[str]]:
+    """Trim the look-ahead row of a keyset window and build the next cursor (None on the last page)"""
+    if len(rows) <= page.limit:
+        return rows, None
+    rows = rows[:page.limit]
+    return rows, encode_cursor(_row_id(rows[-1]))
+
+
+async def paginate(db: AsyncSession, statement: Select, id_column: Any, page: PageParams) -> Tuple[List[Any], Optional[str]]:
+    """Apply keyset pagination to a filtered select of ORM entities and return the page plus the next cursor"""
+    rows = (await db.scalars(keyset_window(statement, id_column, page))).all()
+    return split_page(rows, page)
+
+
+def _row_id(row: Any) -> int:
+    """Primary key of an ORM instance or a Row whose first column is the id"""
+    if hasattr(row, "id"):
+        return row.id
+    return row[0]
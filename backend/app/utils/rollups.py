@@ -0,0 +1,298 @@
+"""
+Hours rollups stored on Timesheet and TimesheetDay
+
+Writes keep the rollups current (apply_entry_minutes): day totals move by the
+written entries' minutes and the timesheet's days are split again under its
+client's overtime rules (app/utils/overtime.py). The backfill and verify
+commands recompute everything from the entry tables; recompute splits the
+stored day totals again after a client's rules change:
+
+    python -m app.utils.rollups backfill
+    python -m app.utils.rollups verify
+    python -m app.utils.rollups recompute [--client-id N]
+"""
+import argparse
+import sys
+from collections import defaultdict
+from datetime import date, datetime
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from sqlalchemy import delete, func, insert, select, update
+from sqlalchemy.orm import Session
+
+from app.models.employee import Employee
+from app.models.timesheet import Timesheet
+from app.models.timesheet_day import TimesheetDay
+from app.utils.hours import entry_minutes_subquery
+from app.utils.overtime import rules_of_row, split_weeks, timesheet_rules
+
+ROLLUP_FIELDS = ("total_minutes", "regular_minutes", "overtime_minutes", "double_time_minutes")
+
+ZERO = (0,) * len(ROLLUP_FIELDS)
+
+DEFAULT_BATCH_SIZE = 500
+
+
+def apply_entry_minutes(db: Session, timesheet: Timesheet, entry_date: date, minutes: int, sign: int = 1):
+    """
+    Add (sign=1) or remove (sign=-1) one entry's minutes from the rollups
+
+    **Logic:**
+    1. Move the day's total by the entry's minutes
+    2. Split the timesheet's days again under its client's overtime rules
+    3. Runs inside the caller's transaction; the caller commits
+    """
+    if sign > 0:
+        apply_entries_minutes(db, timesheet, added=[(entry_date, minutes)])
+    else:
+        apply_entries_minutes(db, timesheet, removed=[(entry_date, minutes)])
+
+
+def apply_entries_minutes(
+    db: Session,
+    timesheet: Timesheet,
+    added: Iterable[Tuple[date, int]] = (),
+    removed: Iterable[Tuple[date, int]] = ()
+):
+    """
+    Apply several entries' (date, minutes) to the rollups at once
+
+    Minutes of added and removed entries are summed per day first. The day rows and
+    the client's rules are read in one query that locks the timesheet row, so
+    concurrent writers to the same timesheet apply their changes one after another.
+    Every day is split again because a weekly threshold or the seventh-day rule
+    moves time between days; changed day rows are updated in one bulk statement,
+    missing ones created in one bulk insert. The timesheet columns must only be
+    assigned once per flush, which is why an edit passes its old and new values in
+    a single call.
+    """
+    per_day = defaultdict(int)
+    for entries, sign in ((added, 1), (removed, -1)):
+        for entry_date, minutes in entries:
+            per_day[entry_date] += sign * minutes
+    if not per_day:
+        return
+
+    rows = db.execute(
+        timesheet_rules([timesheet.id])
+        .add_columns(TimesheetDay.id.label("day_id"), TimesheetDay.date.label("date"),
+                     *[getattr(TimesheetDay, field).label(field) for field in ROLLUP_FIELDS])
+        .outerjoin(TimesheetDay, TimesheetDay.timesheet_id == Timesheet.id)
+        .with_for_update(of=Timesheet)
+    ).all()
+    stored = {
+        row.date: (row.day_id, tuple(row._mapping[field] for field in ROLLUP_FIELDS))
+        for row in rows
+        if row.day_id is not None
+    }
+    totals = {day: values[0] for day, (_, values) in stored.items()}
+    for entry_date, delta in per_day.items():
+        totals[entry_date] = totals.get(entry_date, 0) + delta
+    days = split_weeks({timesheet.id: (rules_of_row(rows[0]._mapping), rows[0].week_start, totals)})[timesheet.id]
+
+    day_updates, new_days = [], []
+    for day, values in days.items():
+        if day not in stored:
+            new_days.append({"timesheet_id": timesheet.id, "date": day, **dict(zip(ROLLUP_FIELDS, values))})
+        elif stored[day][1] != values:
+            day_updates.append({"id": stored[day][0], **dict(zip(ROLLUP_FIELDS, values))})
+    if day_updates:
+        db.execute(update(TimesheetDay), day_updates)
+    if new_days:
+        db.execute(insert(TimesheetDay), new_days)
+    for i, field in enumerate(ROLLUP_FIELDS):
+        setattr(timesheet, field, sum(values[i] for values in days.values()))
+
+
+def _split_timesheets(db: Session, timesheet_ids: List[int], day_totals: Dict[int, Dict[date, int]]) -> Dict[int, Dict[date, Tuple[int, ...]]]:
+    """Split each timesheet's day totals under its client's rules, with one rules query for the batch"""
+    weeks, rule_sets = {}, {}
+    for row in db.connection().execute(timesheet_rules(timesheet_ids)):
+        data = row._mapping
+        if data["rules_id"] not in rule_sets:
+            rule_sets[data["rules_id"]] = rules_of_row(data)
+        weeks[data["timesheet_id"]] = (rule_sets[data["rules_id"]], data["week_start"], day_totals.get(data["timesheet_id"], {}))
+    return split_weeks(weeks)
+
+
+def _expected_days(db: Session, timesheet_ids: List[int]) -> Dict[int, Dict[date, Tuple[int, ...]]]:
+    """Recompute per-day rollups of the given timesheets from the entry tables: one grouped query, then the overtime rules"""
+    entry_minutes = entry_minutes_subquery(timesheet_ids)
+    rows = db.execute(
+        select(entry_minutes.c.timesheet_id, entry_minutes.c.date, func.coalesce(func.sum(entry_minutes.c.minutes), 0))
+        .group_by(entry_minutes.c.timesheet_id, entry_minutes.c.date)
+    ).all()
+    day_totals = defaultdict(dict)
+    for timesheet_id, day, total in rows:
+        day_totals[timesheet_id][day] = int(total)
+    return _split_timesheets(db, timesheet_ids, day_totals)
+
+
+def _timesheet_batches(db: Session, batch_size: int, client_id: Optional[int] = None):
+    """Yield lists of timesheet ids (of the client's employees, when given) in primary key order without loading the whole table"""
+    last_id = 0
+    while True:
+        statement = select(Timesheet.id).where(Timesheet.id > last_id).order_by(Timesheet.id).limit(batch_size)
+        if client_id is not None:
+            statement = statement.where(Timesheet.employee_id.in_(select(Employee.id).where(Employee.client_id == client_id)))
+        ids = db.execute(statement).scalars().all()
+        if not ids:
+            return
+        yield ids
+        last_id = ids[-1]
+
+
+def backfill(db: Session, batch_size: int = DEFAULT_BATCH_SIZE) -> int:
+    """
+    Rebuild every rollup from the entry tables
+
+    **Logic:**
+    1. Walk timesheets in id batches
+    2. Replace the batch's TimesheetDay rows with the recomputed ones (bulk insert)
+    3. Set the timesheet totals to the sum of their days (bulk update)
+    4. Commit per batch so a long backfill does not hold one huge transaction
+    """
+    processed = 0
+    for ids in _timesheet_batches(db, batch_size):
+        expected = _expected_days(db, ids)
+        db.execute(delete(TimesheetDay).where(TimesheetDay.timesheet_id.in_(ids)))
+        day_rows = [
+            {"timesheet_id": timesheet_id, "date": day, **dict(zip(ROLLUP_FIELDS, values))}
+            for timesheet_id, days in expected.items()
+            for day, values in days.items()
+        ]
+        if day_rows:
+            db.execute(insert(TimesheetDay), day_rows)
+        totals, now = [], datetime.utcnow()
+        for timesheet_id in ids:
+            days = expected.get(timesheet_id, {}).values()
+            # updated_at too: list ETags (app/utils/etag.py) change only when it does
+            totals.append({"id": timesheet_id, "updated_at": now, **{
+                field: sum(values[i] for values in days) for i, field in enumerate(ROLLUP_FIELDS)
+            }})
+        db.execute(update(Timesheet), totals)
+        db.commit()
+        processed += len(ids)
+    return processed
+
+
+def recompute(db: Session, client_id: Optional[int] = None, batch_size: int = DEFAULT_BATCH_SIZE) -> int:
+    """
+    Split the stored day totals again under the current overtime rules
+
+    **Logic:**
+    1. Walk the timesheets (of the client's employees, when given) in id batches
+    2. Lock the batch's timesheets (as entry writes do, see apply_entries_minutes) so
+       no entry changes its day totals between the read and the write back, then read
+       the day totals from TimesheetDay; entries and breaks are not read
+    3. Split them under each timesheet's rules; bulk update the day rows whose split
+       changed and the totals (and updated_at) of their timesheets
+    4. Commit per batch, like backfill; returns the number of timesheets walked
+    """
+    processed = 0
+    for ids in _timesheet_batches(db, batch_size, client_id):
+        db.execute(select(Timesheet.id).where(Timesheet.id.in_(ids)).with_for_update())
+        stored = defaultdict(dict)
+        for row in db.connection().execute(
+            select(TimesheetDay.id, TimesheetDay.timesheet_id, TimesheetDay.date, *[getattr(TimesheetDay, f) for f in ROLLUP_FIELDS])
+            .where(TimesheetDay.timesheet_id.in_(ids))
+        ):
+            stored[row[1]][row[2]] = (row[0], tuple(row[3:]))
+        split = _split_timesheets(db, ids, {
+            timesheet_id: {day: values[0] for day, (_, values) in days.items()}
+            for timesheet_id, days in stored.items()
+        })
+        day_updates, changed = [], set()
+        for timesheet_id, days in stored.items():
+            for day, (day_id, values) in days.items():
+                if split[timesheet_id][day] != values:
+                    day_updates.append({"id": day_id, **dict(zip(ROLLUP_FIELDS, split[timesheet_id][day]))})
+                    changed.add(timesheet_id)
+        if day_updates:
+            db.execute(update(TimesheetDay), day_updates)
+            now = datetime.utcnow()
+            db.execute(update(Timesheet), [
+                {"id": timesheet_id, "updated_at": now, **{
+                    field: sum(values[i] for values in split[timesheet_id].values()) for i, field in enumerate(ROLLUP_FIELDS)
+                }}
+                for timesheet_id in sorted(changed)
+            ])
+        db.commit()
+        processed += len(ids)
+    return processed
+
+
+def verify(db: Session, batch_size: int = DEFAULT_BATCH_SIZE) -> List[dict]:
+    """
+    Compare stored rollups with values recomputed from the entry tables
+
+    Returns one drift record per mismatching field; date is None for timesheet totals.
+    Days whose expected and stored values are all zero are treated as equal.
+    """
+    drift = []
+    for ids in _timesheet_batches(db, batch_size):
+        expected = _expected_days(db, ids)
+        stored_days = defaultdict(dict)
+        for row in db.execute(
+            select(TimesheetDay.timesheet_id, TimesheetDay.date, *[getattr(TimesheetDay, f) for f in ROLLUP_FIELDS])
+            .where(TimesheetDay.timesheet_id.in_(ids))
+        ):
+            stored_days[row[0]][row[1]] = tuple(row[2:])
+        stored_totals = {
+            row[0]: tuple(row[1:])
+            for row in db.execute(
+                select(Timesheet.id, *[getattr(Timesheet, f) for f in ROLLUP_FIELDS]).where(Timesheet.id.in_(ids))
+            )
+        }
+        for timesheet_id in ids:
+            expected_days = expected.get(timesheet_id, {})
+            actual_days = stored_days.get(timesheet_id, {})
+            for day in sorted(set(expected_days) | set(actual_days)):
+                drift.extend(_diff(timesheet_id, day, expected_days.get(day, ZERO), actual_days.get(day, ZERO)))
+            expected_total = tuple(sum(values[i] for values in expected_days.values()) for i in range(len(ROLLUP_FIELDS)))
+            drift.extend(_diff(timesheet_id, None, expected_total, stored_totals[timesheet_id]))
+    return drift
+
+
+def _diff(timesheet_id: int, day, expected: tuple, stored: tuple) -> List[dict]:
+    return [
+        {"timesheet_id": timesheet_id, "date": day, "field": field, "stored": stored[i], "expected": expected[i]}
+        for i, field in enumerate(ROLLUP_FIELDS)
+        if stored[i] != expected[i]
+    ]
+
+
+def main(argv=None) -> int:
+    from app.core.session import get_db
+
+    parser = argparse.ArgumentParser(description="Maintain the timesheet hours rollups")
+    parser.add_argument("command", choices=["backfill", "verify", "recompute"])
+    parser.add_argument("--batch-size", type=int, default=DEFAULT_BATCH_SIZE)
+    parser.add_argument("--client-id", type=int, help="recompute: only this client's timesheets")
+    args = parser.parse_args(argv)
+
+    db = next(get_db())
+    try:
+        if args.command == "backfill":
+            count = backfill(db, args.batch_size)
+            print(f"✅ Rebuilt rollups for {count} timesheets")
+            return 0
+        if args.command == "recompute":
+            count = recompute(db, args.client_id, args.batch_size)
+            print(f"✅ Applied the overtime rules to {count} timesheets")
+            return 0
+        drift = verify(db, args.batch_size)
+        for record in drift:
+            where = f"day {record['date']}" if record["date"] else "total"
+            print(f"❌ Timesheet {record['timesheet_id']} {where}: {record['field']} stored={record['stored']} expected={record['expected']}")
+        if drift:
+            print(f"⚠️  {len(drift)} rollup values drifted; run `python -m app.utils.rollups backfill`")
+            return 1
+        print("✅ All rollups match the entry tables")
+        return 0
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,135 @@
+"""
+Utilization report: hours per client or employee and week
+
+The database does the aggregation. Timesheet already stores its entries' worked
+minutes (in/out minus breaks) split into regular, overtime and double time in
+the rollup columns (see app/utils/rollups.py), so the report is one GROUP BY
+over timesheet headers. It reads no time entry or break rows, which keeps it
+fast at millions of entries. The grouped rows come back as flat columns and are pivoted into one
+row per group with a value per week.
+
+Hours count submitted and approved timesheets; billable hours are those of
+approved timesheets.
+
+    python -m benchmarks.utilization --entries 10000000
+"""
+from collections import defaultdict
+from datetime import date, timedelta
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from sqlalchemy import case, func, select
+
+from app.models.client import Client
+from app.models.employee import Employee
+from app.models.timesheet import Timesheet, TimesheetStatus
+from app.schemas.reports import UtilizationGroup, UtilizationReport, UtilizationRow
+
+# Timesheets whose hours are reported; drafts and rejected weeks are not worked time yet
+REPORTED_STATUSES = (TimesheetStatus.SUBMITTED.value, TimesheetStatus.APPROVED.value)
+
+
+def week_of(value: date) -> date:
+    """Monday of the week containing `value`"""
+    return value - timedelta(days=value.weekday())
+
+
+def report_weeks(date_from: date, date_to: date) -> List[date]:
+    """Every week start from the week of date_from through the week of date_to (the pivot's columns)"""
+    weeks, week = [], week_of(date_from)
+    while week <= date_to:
+        weeks.append(week)
+        week += timedelta(weeks=1)
+    return weeks
+
+
+def utilization_statement(date_from: date, date_to: date, group_by: UtilizationGroup, client_id: Optional[int] = None):
+    """
+    Summed rollup minutes per (client[, employee], week)
+
+    **Logic:**
+    1. Timesheets of the reported statuses whose week starts in the range, joined to their employee and client
+    2. GROUP BY client (and employee), week_start; billable minutes are summed for approved timesheets only
+    3. Employees without a client are grouped under a NULL client
+    """
+    approved_minutes = case((Timesheet.status == TimesheetStatus.APPROVED.value, Timesheet.total_minutes), else_=0)
+    group_columns = [Employee.client_id.label("client_id"), Client.name.label("client_name")]
+    if group_by == UtilizationGroup.EMPLOYEE:
+        group_columns += [Timesheet.employee_id.label("employee_id"), Employee.full_name.label("employee_name")]
+    statement = (
+        select(
+            *group_columns,
+            Timesheet.week_start.label("week_start"),
+            func.sum(Timesheet.total_minutes).label("total_minutes"),
+            func.sum(Timesheet.regular_minutes).label("regular_minutes"),
+            func.sum(Timesheet.overtime_minutes).label("overtime_minutes"),
+            func.sum(Timesheet.double_time_minutes).label("double_time_minutes"),
+            func.sum(approved_minutes).label("billable_minutes"),
+        )
+        .select_from(Timesheet)
+        .join(Employee, Employee.id == Timesheet.employee_id)
+        .outerjoin(Client, Client.id == Employee.client_id)
+        .where(
+            Timesheet.week_start >= week_of(date_from),
+            Timesheet.week_start <= date_to,
+            Timesheet.status.in_(REPORTED_STATUSES),
+        )
+        .group_by(*group_columns, Timesheet.week_start)
+    )
+    if client_id is not None:
+        statement = statement.where(Employee.client_id == client_id)
+    return statement
+
+
+def pivot(rows: Sequence, weeks: List[date], group_by: UtilizationGroup, date_from: date, date_to: date) -> UtilizationReport:
+    """
+    Pivot grouped rows into one row per group with a column per week
+
+    **Logic:**
+    1. Each group gets zero-filled minute arrays, one slot per week; a row's minutes go into its week's slot
+    2. Totals per group and for the whole report are sums of those arrays
+    3. Groups are ordered by client name, then employee name
+    """
+    slot = {week: i for i, week in enumerate(weeks)}
+    names: Dict[Tuple, Tuple] = {}
+    # (total, regular, overtime, double time, billable) minutes per week, per group
+    minutes: Dict[Tuple, List[List[int]]] = defaultdict(lambda: [[0] * len(weeks) for _ in range(5)])
+    for row in rows:
+        data = row._mapping
+        key = (data["client_id"], data.get("employee_id"))
+        names[key] = (data["client_name"], data.get("employee_name"))
+        # Week starts are Mondays; anything else still lands in its week
+        columns, i = minutes[key], slot[week_of(data["week_start"])]
+        columns[0][i] += data["total_minutes"] or 0
+        columns[1][i] += data["regular_minutes"] or 0
+        columns[2][i] += data["overtime_minutes"] or 0
+        columns[3][i] += data["double_time_minutes"] or 0
+        columns[4][i] += data["billable_minutes"] or 0
+
+    def make_row(columns: List[List[int]], **labels) -> UtilizationRow:
+        total, regular, overtime, double_time, billable = columns
+        return UtilizationRow(
+            **labels,
+            total_hours=sum(total) / 60.0,
+            regular_hours=sum(regular) / 60.0,
+            overtime_hours=sum(overtime) / 60.0,
+            double_time_hours=sum(double_time) / 60.0,
+            billable_hours=sum(billable) / 60.0,
+            weekly_total_hours=[m / 60.0 for m in total],
+            weekly_overtime_hours=[m / 60.0 for m in overtime],
+            weekly_billable_hours=[m / 60.0 for m in billable],
+        )
+
+    ordered = sorted(minutes, key=lambda key: (names[key][0] or "", names[key][1] or "", key[0] or 0, key[1] or 0))
+    report_rows = [
+        make_row(minutes[key], client_id=key[0], client_name=names[key][0], employee_id=key[1], employee_name=names[key][1])
+        for key in ordered
+    ]
+    totals = [[sum(values) for values in zip(*(minutes[key][field] for key in ordered))] or [0] * len(weeks) for field in range(5)]
+    return UtilizationReport(
+        group_by=group_by,
+        date_from=date_from,
+        date_to=date_to,
+        weeks=weeks,
+        rows=report_rows,
+        totals=make_row(totals),
+    )
@@ -0,0 +1,156 @@
+"""
+Throughput of the async request path (AsyncSession) vs the sync one it replaced
+
+    python -m benchmarks.async_db [--database-url URL] [--requests-per-client N]
+
+Both handlers serve the same request: one timesheet with its employee, entries and
+breaks eager loaded, serialized as TimesheetResponse. The sync handler is a plain
+`def` with a Session, dispatched to Starlette's threadpool (40 threads); the async
+one an `async def` with an AsyncSession. Requests are driven in-process through
+httpx's ASGI transport at 50, 200 and 1000 concurrent clients, and both engines
+get the same connection pool.
+
+The default database is a temporary SQLite file. SQLite does no network I/O, so it
+mostly measures dispatch overhead; pass a PostgreSQL --database-url (sync form,
+postgresql://...) for numbers that reflect waiting on the server.
+"""
+import argparse
+import asyncio
+import os
+import tempfile
+import time
+from datetime import date, time as clock, timedelta
+
+import httpx
+from fastapi import FastAPI
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import create_async_engine
+from sqlalchemy.orm import joinedload, selectinload
+from sqlalchemy.pool import AsyncAdaptedQueuePool, QueuePool
+from sqlmodel import SQLModel, Session, create_engine
+
+from app.core.database import async_url, make_async_sessionmaker
+from app.models import BreakPeriod, Client, Employee, EmployeeRole, Timesheet, TimeEntry
+from app.schemas.timesheet import TimesheetResponse
+
+CONCURRENCY = (50, 200, 1000)
+POOL_SIZE = 20
+TIMESHEETS = 50
+
+
+def timesheet_statement(timesheet_id: int):
+    """Same eager loading as the timesheet router's _load_timesheet"""
+    return select(Timesheet).options(
+        joinedload(Timesheet.employee),
+        selectinload(Timesheet.time_entries).selectinload(TimeEntry.break_periods)
+    ).where(Timesheet.id == timesheet_id)
+
+
+def seed(engine) -> list:
+    """One consultant with TIMESHEETS weeks of five 8h entries with a break each"""
+    with Session(engine) as session:
+        client = Client(name="Bench", code="bench")
+        session.add(client)
+        session.flush()
+        consultant = Employee(full_name="Consultant", email="bench@dew.com", password_hash="x", role=EmployeeRole.CONSULTANT, client_id=client.id)
+        session.add(consultant)
+        session.flush()
+        ids = []
+        for w in range(TIMESHEETS):
+            week_start = date(2024, 1, 1) + timedelta(weeks=w)
+            timesheet = Timesheet(employee_id=consultant.id, week_start=week_start, manager_email="manager@dew.com", status="draft")
+            session.add(timesheet)
+            session.flush()
+            ids.append(timesheet.id)
+            for d in range(5):
+                entry = TimeEntry(timesheet_id=timesheet.id, date=week_start + timedelta(days=d), in_time=clock(9, 0), out_time=clock(17, 30))
+                session.add(entry)
+                session.flush()
+                session.add(BreakPeriod(time_entry_id=entry.id, start_time=clock(12, 0), end_time=clock(12, 30)))
+        session.commit()
+        return ids
+
+
+def build_app(database_url: str) -> FastAPI:
+    # Waiting for a connection is part of what is measured, so never time out on it
+    pool = {"pool_size": POOL_SIZE, "max_overflow": 0, "pool_timeout": 3600}
+    sync_engine = create_engine(database_url, poolclass=QueuePool, **pool)
+    async_engine = create_async_engine(async_url(database_url), poolclass=AsyncAdaptedQueuePool, **pool)
+    async_sessions = make_async_sessionmaker(async_engine)
+    app = FastAPI()
+    app.state.engines = (sync_engine, async_engine)
+
+    @app.get("/sync/{timesheet_id}")
+    def sync_timesheet(timesheet_id: int):
+        with Session(sync_engine) as db:
+            return TimesheetResponse.from_orm(db.scalars(timesheet_statement(timesheet_id)).first())
+
+    @app.get("/async/{timesheet_id}")
+    async def async_timesheet(timesheet_id: int):
+        async with async_sessions() as db:
+            return TimesheetResponse.from_orm((await db.scalars(timesheet_statement(timesheet_id))).first())
+
+    return app
+
+
+async def drive(app: FastAPI, path: str, ids: list, clients: int, requests_per_client: int):
+    """Requests per second and p95 latency in ms with `clients` concurrent clients"""
+    latencies = []
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as http:
+        async def client(n: int):
+            for i in range(requests_per_client):
+                started = time.perf_counter()
+                response = await http.get(f"/{path}/{ids[(n + i) % len(ids)]}")
+                latencies.append(time.perf_counter() - started)
+                assert response.status_code == 200, response.text
+
+        started = time.perf_counter()
+        await asyncio.gather(*(client(n) for n in range(clients)))
+        elapsed = time.perf_counter() - started
+    latencies.sort()
+    return len(latencies) / elapsed, latencies[int(len(latencies) * 0.95)] * 1000
+
+
+async def run(app: FastAPI, ids: list, requests_per_client: int):
+    # One event loop for every run: the async connection pool is bound to the loop that created it
+    print(f"{'clients':>8}{'sync req/s':>13}{'async req/s':>13}{'sync p95 ms':>13}{'async p95 ms':>14}")
+    try:
+        for clients in CONCURRENCY:
+            sync_rate, sync_p95 = await drive(app, "sync", ids, clients, requests_per_client)
+            async_rate, async_p95 = await drive(app, "async", ids, clients, requests_per_client)
+            print(f"{clients:>8}{sync_rate:>13.0f}{async_rate:>13.0f}{sync_p95:>13.1f}{async_p95:>14.1f}")
+    finally:
+        # Pooled aiosqlite connections each hold a non-daemon thread
+        sync_engine, async_engine = app.state.engines
+        sync_engine.dispose()
+        await async_engine.dispose()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--database-url", help="Sync SQLAlchemy URL of a database to seed (default: temporary SQLite file)")
+    parser.add_argument("--requests-per-client", type=int, default=5)
+    args = parser.parse_args(argv)
+
+    path = None
+    database_url = args.database_url
+    if database_url is None:
+        handle, path = tempfile.mkstemp(suffix=".db", prefix="dew_bench_")
+        os.close(handle)
+        database_url = f"sqlite:///{path}"
+    try:
+        engine = create_engine(database_url)
+        SQLModel.metadata.create_all(engine)
+        ids = seed(engine)
+        engine.dispose()
+        app = build_app(database_url)
+
+        asyncio.run(run(app, ids, args.requests_per_client))
+    finally:
+        if path is not None:
+            os.remove(path)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,85 @@
+"""
+Audit overhead per request: inline INSERT and commit vs the batched writer
+
+    python -m benchmarks.audit_writer [--events N] [--batch-size N]
+
+The inline path is what writing an AuditLog row in the endpoint would cost: one
+INSERT and commit per event on the request path. The batched path is what an
+endpoint pays with audit(): appending to the writer's buffer. The time the
+writer then spends draining the buffer off the request path is reported too.
+Both run against a temporary SQLite file.
+"""
+import argparse
+import os
+import tempfile
+import time
+from datetime import datetime
+
+from sqlalchemy import insert
+from sqlmodel import SQLModel, create_engine
+
+from app.core.audit import AuditWriter
+from app.models import AuditEventType, AuditLog
+
+
+def event_row(n: int) -> dict:
+    return {"timesheet_id": None, "event": AuditEventType.TIMESHEET_SUBMITTED, "actor_id": None, "actor_email": f"user{n}@dew.com",
+            "actor_role": "consultant", "details": '{"manager_email": "manager@dew.com"}', "ip_address": "127.0.0.1",
+            "user_agent": "bench", "timestamp": datetime.utcnow()}
+
+
+def temporary_engine():
+    handle, path = tempfile.mkstemp(suffix=".db", prefix="dew_bench_")
+    os.close(handle)
+    engine = create_engine(f"sqlite:///{path}")
+    SQLModel.metadata.create_all(engine)
+    return engine, path
+
+
+def inline(events: int) -> float:
+    """Mean request-path seconds per event with an INSERT and commit each"""
+    engine, path = temporary_engine()
+    try:
+        started = time.perf_counter()
+        for n in range(events):
+            with engine.begin() as conn:
+                conn.execute(insert(AuditLog), [event_row(n)])
+        return (time.perf_counter() - started) / events
+    finally:
+        engine.dispose()
+        os.remove(path)
+
+
+def batched(events: int, batch_size: int):
+    """Mean request-path seconds per event with the writer, and seconds until everything was written"""
+    engine, path = temporary_engine()
+    writer = AuditWriter(engine, batch_size, flush_interval=1.0, max_pending=events)
+    try:
+        started = time.perf_counter()
+        for n in range(events):
+            writer.record(event_row(n))
+        recorded = time.perf_counter() - started
+        writer.close()
+        return recorded / events, time.perf_counter() - started
+    finally:
+        engine.dispose()
+        os.remove(path)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--events", type=int, default=2000)
+    parser.add_argument("--batch-size", type=int, default=200)
+    args = parser.parse_args(argv)
+
+    direct = inline(args.events)
+    queued, drained = batched(args.events, args.batch_size)
+
+    print(f"{'path':<28}{'us/event':>12}")
+    print(f"{'inline insert + commit':<28}{direct * 1e6:>12.1f}")
+    print(f"{'batched writer (record)':<28}{queued * 1e6:>12.1f}")
+    print(f"all {args.events} batched events written after {drained * 1000:.0f} ms; request-path speedup {direct / queued:.0f}x")
+
+
+if __name__ == "__main__":
+    main()
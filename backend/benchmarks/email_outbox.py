@@ -0,0 +1,118 @@
+"""
+Email throughput: one SMTP connection per message vs the outbox sender
+
+    python -m benchmarks.email_outbox [--messages N] [--batch-size N] [--rtt-ms MS]
+
+A local aiosmtpd server stands in for the mail relay. The per-message path is
+what send_email did inside BackgroundTasks: connect, EHLO, send, QUIT for every
+message. The outbox path queues the messages in a temporary SQLite outbox and
+drains it with the sender (app.utils.email_sender) over one reused connection,
+committing each batch.
+
+aiosmtpd here speaks plain SMTP, so STARTTLS and AUTH, which the real relay
+adds to every new connection, are left out: the per-message numbers are a best
+case. --rtt-ms delays each SMTP command reply to approximate a remote relay.
+"""
+import argparse
+import asyncio
+import os
+import smtplib
+import socket
+import tempfile
+import time
+
+from aiosmtpd.controller import Controller
+from sqlmodel import SQLModel, Session, create_engine
+
+from app.utils.email import build_message, queue_email
+from app.utils.email_sender import SMTPConnection, run
+
+
+class CountingHandler:
+    """Accepts everything after an optional per-command delay"""
+
+    def __init__(self, rtt: float):
+        self.rtt = rtt
+        self.received = 0
+
+    async def _delay(self):
+        if self.rtt:
+            await asyncio.sleep(self.rtt)
+
+    async def handle_EHLO(self, server, session, envelope, hostname, responses):
+        await self._delay()
+        session.host_name = hostname
+        return responses
+
+    async def handle_MAIL(self, server, session, envelope, address, mail_options):
+        await self._delay()
+        envelope.mail_from = address
+        return "250 OK"
+
+    async def handle_RCPT(self, server, session, envelope, address, rcpt_options):
+        await self._delay()
+        envelope.rcpt_tos.append(address)
+        return "250 OK"
+
+    async def handle_DATA(self, server, session, envelope):
+        await self._delay()
+        self.received += 1
+        return "250 Message accepted"
+
+
+def per_message(port: int, messages: int) -> float:
+    """Messages per second with a new connection for each"""
+    started = time.perf_counter()
+    for n in range(messages):
+        with smtplib.SMTP("127.0.0.1", port) as server:
+            server.send_message(build_message(f"Message {n}", "Hello", [f"user{n}@dew.com"]))
+    return messages / (time.perf_counter() - started)
+
+
+def outbox(port: int, messages: int, batch_size: int) -> float:
+    """Messages per second through the outbox and sender, queueing excluded"""
+    handle, path = tempfile.mkstemp(suffix=".db", prefix="dew_bench_")
+    os.close(handle)
+    engine = create_engine(f"sqlite:///{path}")
+    try:
+        SQLModel.metadata.create_all(engine)
+        with Session(engine) as session:
+            for n in range(messages):
+                queue_email(session, f"Message {n}", "Hello", [f"user{n}@dew.com"])
+            session.commit()
+        started = time.perf_counter()
+        run(engine, SMTPConnection("127.0.0.1", port), batch_size, poll_interval=0, once=True)
+        return messages / (time.perf_counter() - started)
+    finally:
+        engine.dispose()
+        os.remove(path)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--messages", type=int, default=500)
+    parser.add_argument("--batch-size", type=int, default=50)
+    parser.add_argument("--rtt-ms", type=float, default=0.0, help="Delay before each SMTP command reply")
+    args = parser.parse_args(argv)
+
+    with socket.socket() as probe:
+        probe.bind(("127.0.0.1", 0))
+        port = probe.getsockname()[1]
+    handler = CountingHandler(args.rtt_ms / 1000)
+    controller = Controller(handler, hostname="127.0.0.1", port=port)
+    controller.start()
+    try:
+        direct = per_message(port, args.messages)
+        pooled = outbox(port, args.messages, args.batch_size)
+    finally:
+        controller.stop()
+    assert handler.received == 2 * args.messages, handler.received
+
+    print(f"{'path':<28}{'msg/s':>10}")
+    print(f"{'connection per message':<28}{direct:>10.0f}")
+    print(f"{'outbox, reused connection':<28}{pooled:>10.0f}")
+    print(f"speedup {pooled / direct:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,70 @@
+"""
+Benchmark of interval overlap detection: sort-and-sweep vs the pairwise scan it replaced
+
+    python -m benchmarks.intervals
+
+Two shapes per size: a realistic one (back-to-back intervals, no conflicts) and a
+sparse random one with a handful of overlaps. The pairwise scan is skipped above
+10k intervals, where it would run for minutes.
+"""
+import random
+import time
+
+from app.utils.intervals import Interval, find_overlaps
+
+SIZES = (10, 1_000, 100_000)
+PAIRWISE_LIMIT = 10_000
+
+
+def pairwise_overlaps(intervals):
+    """The previous approach: compare every pair"""
+    conflicts = []
+    for i, a in enumerate(intervals):
+        for b in intervals[i + 1:]:
+            if a.start < b.end and b.start < a.end:
+                conflicts.append((a, b))
+    return conflicts
+
+
+def back_to_back(n: int, rng: random.Random):
+    intervals = [Interval(i * 10, i * 10 + 10, i) for i in range(n)]
+    rng.shuffle(intervals)
+    return intervals
+
+
+def sparse_random(n: int, rng: random.Random):
+    intervals = []
+    for i in range(n):
+        start = rng.randrange(n * 100)
+        intervals.append(Interval(start, start + rng.randint(1, 50), i))
+    return intervals
+
+
+def timed(func, intervals, repeat: int):
+    best = float("inf")
+    for _ in range(repeat):
+        started = time.perf_counter()
+        result = func(intervals)
+        best = min(best, time.perf_counter() - started)
+    return best, len(result)
+
+
+def main():
+    rng = random.Random(42)
+    print(f"{'shape':<14}{'n':>9}{'conflicts':>11}{'sweep ms':>12}{'pairwise ms':>14}")
+    for shape, generate in (("back-to-back", back_to_back), ("sparse random", sparse_random)):
+        for n in SIZES:
+            intervals = generate(n, rng)
+            repeat = 5 if n <= 1_000 else 1
+            sweep_seconds, conflicts = timed(find_overlaps, intervals, repeat)
+            if n <= PAIRWISE_LIMIT:
+                pairwise_seconds, pairwise_conflicts = timed(pairwise_overlaps, intervals, repeat)
+                assert pairwise_conflicts == conflicts
+                pairwise = f"{pairwise_seconds * 1000:.2f}"
+            else:
+                pairwise = "skipped"
+            print(f"{shape:<14}{n:>9}{conflicts:>11}{sweep_seconds * 1000:>12.2f}{pairwise:>14}")
+
+
+if __name__ == "__main__":
+    main()
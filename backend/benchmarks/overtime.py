@@ -0,0 +1,107 @@
+"""
+Overtime rules at scale: the engine alone, and recomputing history after a rules change
+
+    python -m benchmarks.overtime [--timesheets N] [--clients N]
+
+Seeds a temporary SQLite file with `--timesheets` timesheets (default 200,000)
+of 5-7 worked days each, with their TimesheetDay rows, spread over `--clients`
+clients, then times:
+
+- evaluate() over every timesheet's day totals in memory, one call per rule set
+- recompute() for one client after its rules gain double time and the seventh-day
+  rule, i.e. the work PUT /clients/{id}/overtime-rules does
+- recompute() for every client with the rules unchanged (reads only, no writes)
+"""
+import argparse
+import os
+import random
+import tempfile
+import time
+from datetime import date, timedelta
+
+from sqlalchemy import insert
+from sqlmodel import SQLModel, Session, create_engine
+
+from app.models import Client, Employee, EmployeeRole, OvertimeRules, Timesheet, TimesheetDay, TimesheetStatus
+from app.utils.overtime import DEFAULT_RULES, evaluate
+from app.utils.rollups import recompute
+
+EMPLOYEES_PER_CLIENT = 50
+INSERT_CHUNK = 20000
+
+
+def seed(engine, timesheets: int, clients: int) -> list:
+    """Clients, employees, timesheets and their day rows split under the default rules; returns the day arrays"""
+    employees = clients * EMPLOYEES_PER_CLIENT
+    with Session(engine) as session:
+        session.add_all(Client(name=f"Client {c:02d}", code=f"client{c}") for c in range(clients))
+        session.commit()
+    with engine.begin() as conn:
+        conn.execute(insert(Employee), [
+            {"full_name": f"Employee {e}", "email": f"e{e}@dew.com", "password_hash": "x",
+             "role": EmployeeRole.CONSULTANT, "client_id": e % clients + 1, "is_active": True}
+            for e in range(employees)
+        ])
+    rng = random.Random(7)
+    arrays = [[rng.randint(300, 720) for _ in range(rng.choice((5, 6, 7)))] for _ in range(timesheets)]
+    first_week = date(2020, 1, 6)
+    with engine.begin() as conn:
+        for start in range(0, timesheets, INSERT_CHUNK):
+            chunk = arrays[start:start + INSERT_CHUNK]
+            splits = evaluate(DEFAULT_RULES, chunk)
+            headers, days = [], []
+            for n, (array, split) in enumerate(zip(chunk, splits), start=start):
+                week_start = first_week + timedelta(weeks=n // employees)
+                regular, overtime, double = map(sum, zip(*split))
+                headers.append({
+                    "id": n + 1, "employee_id": n % employees + 1, "week_start": week_start,
+                    "status": TimesheetStatus.APPROVED.value, "manager_email": "manager@dew.com",
+                    "total_minutes": sum(array), "regular_minutes": regular, "overtime_minutes": overtime, "double_time_minutes": double,
+                })
+                days.extend(
+                    {"timesheet_id": n + 1, "date": week_start + timedelta(days=d), "total_minutes": minutes,
+                     "regular_minutes": r, "overtime_minutes": o, "double_time_minutes": x}
+                    for d, (minutes, (r, o, x)) in enumerate(zip(array, split))
+                )
+            conn.execute(insert(Timesheet), headers)
+            conn.execute(insert(TimesheetDay), days)
+    return arrays
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--timesheets", type=int, default=200_000)
+    parser.add_argument("--clients", type=int, default=20)
+    args = parser.parse_args()
+
+    handle, path = tempfile.mkstemp(suffix=".db", prefix="dew_bench_")
+    os.close(handle)
+    engine = create_engine(f"sqlite:///{path}")
+    try:
+        SQLModel.metadata.create_all(engine)
+        started = time.perf_counter()
+        arrays = seed(engine, args.timesheets, args.clients)
+        days = sum(len(array) for array in arrays)
+        print(f"Seeded {args.timesheets:,} timesheets ({days:,} days) in {time.perf_counter() - started:.1f}s")
+
+        started = time.perf_counter()
+        evaluate(DEFAULT_RULES, arrays)
+        elapsed = time.perf_counter() - started
+        print(f"evaluate: {elapsed:.2f}s ({days / elapsed:,.0f} days/s)")
+
+        with Session(engine) as session:
+            session.add(OvertimeRules(client_id=1, daily_double_time_after_minutes=600, seventh_day=True))
+            session.commit()
+            started = time.perf_counter()
+            count = recompute(session, client_id=1)
+            print(f"recompute one client after a rules change: {count:,} timesheets in {time.perf_counter() - started:.2f}s")
+            started = time.perf_counter()
+            count = recompute(session)
+            print(f"recompute every client, rules unchanged: {count:,} timesheets in {time.perf_counter() - started:.2f}s")
+    finally:
+        engine.dispose()
+        os.remove(path)
+
+
+if __name__ == "__main__":
+    main()
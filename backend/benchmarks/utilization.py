@@ -0,0 +1,103 @@
+"""
+Utilization report at scale: one grouped query over the timesheet rollups
+
+    python -m benchmarks.utilization [--entries N] [--entries-per-timesheet N] [--weeks N]
+
+Seeds a temporary SQLite file with the timesheets that `--entries` time entries
+(default 10 million) spread over `--weeks` weeks amount to, with their rollup
+columns filled in as the entry writes would leave them, then times the report
+grouped by client and, for one client, by employee: the SQL aggregation and
+the pivot separately. The report reads only the timesheet headers (from the
+covering ix_timesheet_employee_id_week_start), so entry and break rows are not
+generated.
+"""
+import argparse
+import os
+import random
+import tempfile
+import time
+from datetime import date, timedelta
+
+from sqlalchemy import insert
+from sqlmodel import SQLModel, Session, create_engine
+
+from app.models import Client, Employee, EmployeeRole, Timesheet, TimesheetStatus
+from app.schemas.reports import UtilizationGroup
+from app.utils.overtime import DEFAULT_RULES, evaluate
+from app.utils.utilization import pivot, report_weeks, utilization_statement
+
+CLIENTS = 20
+INSERT_CHUNK = 50000
+STATUSES = [TimesheetStatus.APPROVED.value] * 6 + [TimesheetStatus.SUBMITTED.value] * 2 + [TimesheetStatus.DRAFT.value, TimesheetStatus.REJECTED.value]
+
+
+def seed(engine, entries: int, per_timesheet: int, weeks: int, last_week: date) -> int:
+    """Clients, employees and one timesheet per employee and week; returns the timesheet count"""
+    timesheets = entries // per_timesheet
+    employees = max(1, timesheets // weeks)
+    with Session(engine) as session:
+        session.add_all(Client(name=f"Client {c:02d}", code=f"client{c}") for c in range(CLIENTS))
+        session.commit()
+    with engine.begin() as conn:
+        conn.execute(insert(Employee), [
+            {"full_name": f"Employee {e}", "email": f"e{e}@dew.com", "password_hash": "x",
+             "role": EmployeeRole.CONSULTANT, "client_id": e % CLIENTS + 1, "is_active": True}
+            for e in range(employees)
+        ])
+    rng = random.Random(7)
+    first_week = last_week - timedelta(weeks=weeks - 1)
+    rows, written = [], 0
+    with engine.begin() as conn:
+        for n in range(timesheets):
+            # Each entry is a working day of 7-10 hours, split under the default overtime rules
+            days = [rng.randint(420, 600) for _ in range(per_timesheet)]
+            rows.append({
+                "employee_id": n % employees + 1, "week_start": first_week + timedelta(weeks=(n // employees) % weeks),
+                "status": rng.choice(STATUSES), "manager_email": "manager@dew.com", "total_minutes": sum(days), "days": days,
+            })
+            if len(rows) == INSERT_CHUNK or n == timesheets - 1:
+                splits = evaluate(DEFAULT_RULES, [row.pop("days") for row in rows])
+                for row, split in zip(rows, splits):
+                    row.update(zip(("regular_minutes", "overtime_minutes", "double_time_minutes"), map(sum, zip(*split))))
+                conn.execute(insert(Timesheet), rows)
+                written += len(rows)
+                rows = []
+    return written
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--entries", type=int, default=10_000_000)
+    parser.add_argument("--entries-per-timesheet", type=int, default=5)
+    parser.add_argument("--weeks", type=int, default=52)
+    args = parser.parse_args()
+
+    handle, path = tempfile.mkstemp(suffix=".db", prefix="dew_bench_")
+    os.close(handle)
+    engine = create_engine(f"sqlite:///{path}")
+    try:
+        SQLModel.metadata.create_all(engine)
+        date_to = date.today()
+        date_from = date_to - timedelta(weeks=args.weeks - 1)
+        started = time.perf_counter()
+        timesheets = seed(engine, args.entries, args.entries_per_timesheet, args.weeks, date_to - timedelta(days=date_to.weekday()))
+        print(f"Seeded {timesheets:,} timesheets ({args.entries:,} entries) in {time.perf_counter() - started:.1f}s")
+        weeks = report_weeks(date_from, date_to)
+        # As the API serves them: every client, and one client's employees
+        for group_by, client_id in ((UtilizationGroup.CLIENT, None), (UtilizationGroup.EMPLOYEE, 1)):
+            with engine.connect() as conn:
+                started = time.perf_counter()
+                rows = conn.execute(utilization_statement(date_from, date_to, group_by, client_id)).all()
+                queried = time.perf_counter()
+                report = pivot(rows, weeks, group_by, date_from, date_to)
+                done = time.perf_counter()
+            print(f"group_by={group_by.value:<8} {len(rows):>9,} grouped rows -> {len(report.rows):>6,} report rows x {len(weeks)} weeks: "
+                  f"query {queried - started:.2f}s, pivot {done - queried:.2f}s, total {done - started:.2f}s "
+                  f"({report.totals.total_hours:,.0f} h, {report.totals.billable_hours:,.0f} h billable)")
+    finally:
+        engine.dispose()
+        os.remove(path)
+
+
+if __name__ == "__main__":
+    main()
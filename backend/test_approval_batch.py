@@ -0,0 +1,157 @@
+#!/usr/bin/env python3
+"""
+Tests for batch approve/reject of timesheets and time off
+
+A batch decision loads the requested ids in one query, authorizes them as a
+set, applies the transition with one conditional UPDATE and reports each id
+as applied, skipped or forbidden; the statement count does not grow with the
+number of ids.
+"""
+
+import os
+import sys
+from datetime import date, timedelta
+
+# Add the app directory to Python path
+sys.path.append(os.path.join(os.path.dirname(__file__), 'app'))
+
+from sqlmodel import Session, select
+
+from app.models import Client, EmailOutbox, Employee, EmployeeRole, Timesheet, TimesheetStatus
+from app.models.time_off import TimeOff, TimeOffStatus, TimeOffType
+from app.utils.auth import create_access_token
+from test_query_budget import SMALL, capture_statements, isolated_app, make_engine, seed
+
+
+def auth(user_id: int) -> dict:
+    return {"Authorization": f"Bearer {create_access_token({'sub': str(user_id)})}"}
+
+
+def setup(engine, submitted: int) -> dict:
+    """SMALL seed plus `submitted` more submitted timesheets and pending time off, and one of each at another client"""
+    with Session(engine) as session:
+        ids = seed(session, SMALL)
+        consultant = session.get(Employee, ids["consultant"])
+        ids["timesheets"], ids["time_off"] = [], []
+        for w in range(submitted):
+            week_start = date(2024, 6, 3) + timedelta(weeks=w)
+            timesheet = Timesheet(employee_id=consultant.id, week_start=week_start, manager_email="manager@paypal.com",
+                                  status=TimesheetStatus.SUBMITTED.value)
+            time_off = TimeOff(employee_id=consultant.id, start_date=week_start, end_date=week_start, type=TimeOffType.VACATION,
+                               status=TimeOffStatus.PENDING, manager_email="manager@paypal.com")
+            session.add_all([timesheet, time_off])
+            session.flush()
+            ids["timesheets"].append(timesheet.id)
+            ids["time_off"].append(time_off.id)
+        other = Client(name="Acme", code="acme")
+        session.add(other)
+        session.flush()
+        outsider = Employee(full_name="Outsider", email="outsider@acme.com", password_hash="x", role=EmployeeRole.CONSULTANT, client_id=other.id)
+        session.add(outsider)
+        session.flush()
+        foreign_timesheet = Timesheet(employee_id=outsider.id, week_start=date(2024, 6, 3), manager_email="boss@acme.com",
+                                      status=TimesheetStatus.SUBMITTED.value)
+        foreign_time_off = TimeOff(employee_id=outsider.id, start_date=date(2024, 6, 3), end_date=date(2024, 6, 3),
+                                   type=TimeOffType.VACATION, status=TimeOffStatus.PENDING, manager_email="boss@acme.com")
+        session.add_all([foreign_timesheet, foreign_time_off])
+        session.commit()
+        ids["foreign_timesheet"], ids["foreign_time_off"] = foreign_timesheet.id, foreign_time_off.id
+    return ids
+
+
+def outbox_subjects(engine) -> list:
+    with Session(engine) as session:
+        return [message.subject for message in session.exec(select(EmailOutbox).order_by(EmailOutbox.id)).all()]
+
+
+def test_timesheet_batch_reports_each_id():
+    engine = make_engine()
+    ids = setup(engine, submitted=3)
+    requested = ids["timesheets"] + [ids["draft"], ids["foreign_timesheet"], 9999, ids["timesheets"][0]]
+    with isolated_app(engine) as client:
+        response = client.post("/api/v1/timesheets/approve:batch", headers=auth(ids["manager"]), json={"ids": requested})
+        assert response.status_code == 200, response.text
+        report = response.json()
+        assert (report["applied"], report["skipped"], report["forbidden"]) == (3, 2, 1)
+        outcomes = {result["id"]: result["outcome"] for result in report["results"]}
+        assert [outcomes[i] for i in ids["timesheets"]] == ["applied"] * 3
+        assert outcomes[ids["draft"]] == "skipped" and outcomes[9999] == "skipped"
+        assert outcomes[ids["foreign_timesheet"]] == "forbidden"
+        # Deciding again skips what is no longer submitted
+        response = client.post("/api/v1/timesheets/reject:batch", headers=auth(ids["manager"]),
+                               json={"ids": ids["timesheets"] + [ids["submitted"]], "comment": "Missing project"})
+        assert response.json()["applied"] == 1
+        assert client.post("/api/v1/timesheets/approve:batch", headers=auth(ids["consultant"]), json={"ids": [1]}).status_code == 403
+        assert client.post("/api/v1/timesheets/approve:batch", headers=auth(ids["manager"]), json={"ids": []}).status_code == 422
+
+    with Session(engine) as session:
+        statuses = {t.id: t for t in session.exec(select(Timesheet)).all()}
+    assert all(statuses[i].status == TimesheetStatus.APPROVED.value and statuses[i].approved_by == ids["manager"] for i in ids["timesheets"])
+    assert statuses[ids["submitted"]].status == TimesheetStatus.REJECTED.value and statuses[ids["submitted"]].comment == "Missing project"
+    assert statuses[ids["foreign_timesheet"]].status == TimesheetStatus.SUBMITTED.value
+    subjects = outbox_subjects(engine)
+    assert len(subjects) == 4 and subjects[-1].startswith("Your Timesheet Was Rejected")
+
+
+def test_rejection_without_comment_keeps_existing_comment():
+    engine = make_engine()
+    ids = setup(engine, submitted=1)
+    with Session(engine) as session:
+        timesheet = session.get(Timesheet, ids["timesheets"][0])
+        timesheet.comment = "Includes the offsite on Friday"
+        time_off = session.get(TimeOff, ids["time_off"][0])
+        time_off.manager_comment = "Checked with the team"
+        session.add_all([timesheet, time_off])
+        session.commit()
+    with isolated_app(engine) as client:
+        response = client.post("/api/v1/timesheets/reject:batch", headers=auth(ids["manager"]), json={"ids": ids["timesheets"]})
+        assert response.json()["applied"] == 1, response.text
+        response = client.post("/api/v1/time_off/reject:batch", headers=auth(ids["manager"]), json={"ids": ids["time_off"]})
+        assert response.json()["applied"] == 1, response.text
+    with Session(engine) as session:
+        timesheet = session.get(Timesheet, ids["timesheets"][0])
+        assert timesheet.status == TimesheetStatus.REJECTED.value and timesheet.comment == "Includes the offsite on Friday"
+        time_off = session.get(TimeOff, ids["time_off"][0])
+        assert time_off.status == TimeOffStatus.REJECTED and time_off.manager_comment == "Checked with the team"
+
+
+def test_time_off_batch_reports_each_id():
+    engine = make_engine()
+    ids = setup(engine, submitted=2)
+    with isolated_app(engine) as client:
+        response = client.post("/api/v1/time_off/reject:batch", headers=auth(ids["manager"]),
+                               json={"ids": ids["time_off"] + [ids["foreign_time_off"]], "comment": "Release week"})
+        assert response.status_code == 200, response.text
+        assert (response.json()["applied"], response.json()["forbidden"]) == (2, 1)
+        response = client.post("/api/v1/time_off/approve:batch", headers=auth(ids["manager"]), json={"ids": ids["time_off"] + [1]})
+        assert [result["outcome"] for result in response.json()["results"]] == ["skipped", "skipped", "applied"]
+    with Session(engine) as session:
+        rejected = session.get(TimeOff, ids["time_off"][0])
+        assert rejected.status == TimeOffStatus.REJECTED and rejected.manager_comment == "Release week"
+        assert session.get(TimeOff, 1).status == TimeOffStatus.APPROVED
+    # Only approvals notify the employee, as with the single-request endpoints
+    assert outbox_subjects(engine) == ["Your Time Off Request Was Approved (2024-01-01 to 2024-01-02)"]
+
+
+def test_batch_statements_do_not_grow_with_ids():
+    counts = []
+    for submitted in (2, 20):
+        engine = make_engine()
+        ids = setup(engine, submitted)
+        with isolated_app(engine) as client:
+            # Load the manager into the principal cache first
+            client.get("/api/v1/time_off/1", headers=auth(ids["manager"]))
+            with capture_statements() as statements:
+                for path, batch in (("timesheets", ids["timesheets"]), ("time_off", ids["time_off"])):
+                    response = client.post(f"/api/v1/{path}/approve:batch", headers=auth(ids["manager"]), json={"ids": batch})
+                    assert response.json()["applied"] == submitted
+        counts.append(len(statements))
+    # Per batch: load, conditional UPDATE, outbox INSERT
+    assert counts[0] == counts[1] <= 6, counts
+
+
+if __name__ == "__main__":
+    for test in (test_timesheet_batch_reports_each_id, test_rejection_without_comment_keeps_existing_comment,
+                 test_time_off_batch_reports_each_id, test_batch_statements_do_not_grow_with_ids):
+        test()
+        print(f"✅ {test.__name__}")
@@ -0,0 +1,95 @@
+#!/usr/bin/env python3
+"""
+Tests for the approval queue summary
+
+GET /approvals/summary returns a manager's pending timesheets grouped by
+employee and week, with hours from the rollup columns, and pending time off
+per employee, in one grouped query.
+"""
+
+import os
+import sys
+from datetime import date
+
+# Add the app directory to Python path
+sys.path.append(os.path.join(os.path.dirname(__file__), 'app'))
+
+from sqlmodel import Session
+
+from app.models import Employee, EmployeeRole, Timesheet, TimesheetStatus
+from app.models.time_off import TimeOff, TimeOffStatus, TimeOffType
+from app.utils.auth import create_access_token
+from test_query_budget import SMALL, capture_statements, isolated_app, make_engine, seed
+
+
+def auth(user_id: int) -> dict:
+    return {"Authorization": f"Bearer {create_access_token({'sub': str(user_id)})}"}
+
+
+def add_timesheet(session, employee: Employee, week_start: date, total: int, overtime: int = 0,
+                  manager_email: str = "manager@paypal.com", status: str = TimesheetStatus.SUBMITTED.value):
+    session.add(Timesheet(employee_id=employee.id, week_start=week_start, manager_email=manager_email, status=status,
+                          total_minutes=total, regular_minutes=total - overtime, overtime_minutes=overtime))
+
+
+def setup(engine) -> dict:
+    with Session(engine) as session:
+        ids = seed(session, SMALL)
+        consultant = session.get(Employee, ids["consultant"])
+        # Sorts before "Consultant"
+        analyst = Employee(full_name="Analyst", email="analyst@paypal.com", password_hash="x", role=EmployeeRole.CONSULTANT,
+                           client_id=consultant.client_id)
+        session.add(analyst)
+        session.flush()
+        add_timesheet(session, consultant, date(2024, 1, 8), total=2400, overtime=60)
+        add_timesheet(session, consultant, date(2024, 1, 8), total=300)
+        add_timesheet(session, analyst, date(2024, 1, 15), total=480)
+        # Not in this manager's queue
+        add_timesheet(session, analyst, date(2024, 1, 22), total=480, status=TimesheetStatus.APPROVED.value)
+        add_timesheet(session, analyst, date(2024, 1, 29), total=480, manager_email="other@paypal.com")
+        session.add(TimeOff(employee_id=analyst.id, start_date=date(2024, 2, 5), end_date=date(2024, 2, 9),
+                            type=TimeOffType.VACATION, status=TimeOffStatus.REJECTED, manager_email="manager@paypal.com"))
+        session.commit()
+        ids["analyst"] = analyst.id
+    return ids
+
+
+def test_summary_groups_by_employee_and_week():
+    engine = make_engine()
+    ids = setup(engine)
+    with isolated_app(engine) as client:
+        response = client.get("/api/v1/approvals/summary", headers=auth(ids["manager"]))
+        assert response.status_code == 200, response.text
+        summary = response.json()
+        assert (summary["pending_timesheets"], summary["pending_time_off"], summary["total_hours"]) == (4, 2, 62.75)
+        analyst, consultant = summary["employees"]
+        assert analyst["employee"]["id"] == ids["analyst"] and analyst["pending_time_off"] == 0
+        assert analyst["weeks"] == [{"week_start": "2024-01-15", "timesheets": 1, "regular_hours": 8.0, "overtime_hours": 0.0, "double_time_hours": 0.0, "total_hours": 8.0}]
+        # The seeded submitted week has one 9h45 entry
+        assert [(w["week_start"], w["timesheets"], w["total_hours"]) for w in consultant["weeks"]] == [("2024-01-01", 1, 9.75), ("2024-01-08", 2, 45.0)]
+        assert consultant["weeks"][1]["overtime_hours"] == 1.0
+        assert (consultant["pending_timesheets"], consultant["pending_time_off"]) == (3, 2)
+
+        # One statement once the manager is in the principal cache
+        with capture_statements() as statements:
+            client.get("/api/v1/approvals/summary", headers=auth(ids["manager"]))
+        assert len(statements) == 1
+
+        assert client.get("/api/v1/approvals/summary", headers=auth(ids["consultant"])).status_code == 403
+
+
+def test_empty_queue():
+    engine = make_engine()
+    with Session(engine) as session:
+        session.add(Employee(full_name="Idle", email="idle@paypal.com", password_hash="x", role=EmployeeRole.CLIENT_MANAGER))
+        session.commit()
+        manager_id = session.exec(Employee.__table__.select()).first().id
+    with isolated_app(engine) as client:
+        response = client.get("/api/v1/approvals/summary", headers=auth(manager_id))
+        assert response.json() == {"pending_timesheets": 0, "pending_time_off": 0, "total_hours": 0.0, "employees": []}
+
+
+if __name__ == "__main__":
+    for test in (test_summary_groups_by_employee_and_week, test_empty_queue):
+        test()
+        print(f"✅ {test.__name__}")
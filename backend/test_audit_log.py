@@ -68,7 +68,7 @@ def test_audit_log():
                 actor_id=employee.id,
                 actor_email=employee.email,
                 actor_role=employee.role.value,
-                details='{"total_hours": 40, "overtime_hours": 1}',
+                details={"total_hours": 40, "overtime_hours": 1},
                 ip_address="192.168.1.100",
                 user_agent="Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36"
             )
@@ -100,7 +100,7 @@ def test_audit_log():
                 actor_id=employee.id,
                 actor_email=employee.email,
                 actor_role=employee.role.value,
-                details='{"previous_status": "submitted", "comment": "Self-approved for testing"}',
+                details={"previous_status": "submitted", "comment": "Self-approved for testing"},
                 ip_address="192.168.1.100",
                 user_agent="Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36"
             )
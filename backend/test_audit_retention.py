@@ -0,0 +1,168 @@
+#!/usr/bin/env python3
+"""
+Tests for the audit log API and retention archives
+
+GET /audit pages newest first by (timestamp, id) with filters and role scope;
+details are a native JSON column filtered through indexed key expressions.
+The retention job moves months past retention into compressed JSONL archives
+whose sidecar index lets GET /audit/{id} find an archived event by reading
+one block.
+"""
+
+import gzip
+import json
+import os
+import shutil
+import sys
+import tempfile
+from datetime import date, datetime, timedelta
+
+# Add the app directory to Python path
+sys.path.append(os.path.join(os.path.dirname(__file__), 'app'))
+
+from sqlmodel import Session, func, select
+
+from app.config import settings
+from app.models import AuditEventType, AuditLog, Client, Employee, EmployeeRole
+from app.utils.audit_archive import archive_paths, find_archived, run_retention
+from app.utils.auth import create_access_token
+from test_query_budget import SMALL, capture_statements, isolated_app, make_engine, seed
+
+
+def auth(user_id: int) -> dict:
+    return {"Authorization": f"Bearer {create_access_token({'sub': str(user_id)})}"}
+
+
+def add_events(engine, actor: Employee, start: datetime, count: int, step: timedelta, event=AuditEventType.USER_LOGIN):
+    with Session(engine) as session:
+        for n in range(count):
+            session.add(AuditLog(event=event, actor_id=actor.id, actor_email=actor.email, actor_role=actor.role.value,
+                                 details={"n": n}, timestamp=start + n * step))
+        session.commit()
+
+
+def setup(engine) -> dict:
+    with Session(engine) as session:
+        ids = seed(session, SMALL)
+        other = Client(name="Acme", code="acme")
+        session.add(other)
+        session.flush()
+        session.add_all([
+            Employee(full_name="Admin", email="admin@dew.com", password_hash="x", role=EmployeeRole.DEW_ADMIN),
+            Employee(full_name="Outsider", email="outsider@acme.com", password_hash="x", role=EmployeeRole.CONSULTANT, client_id=other.id),
+        ])
+        session.commit()
+        ids["admin"] = session.exec(select(Employee.id).where(Employee.email == "admin@dew.com")).one()
+        actors = {e.email: e for e in session.exec(select(Employee)).all()}
+    return ids, actors
+
+
+def test_list_pages_newest_first_with_filters():
+    engine = make_engine()
+    ids, actors = setup(engine)
+    now = datetime.utcnow().replace(microsecond=0)
+    # Same timestamp for two events: the id breaks the tie
+    add_events(engine, actors["consultant@paypal.com"], now - timedelta(hours=5), 5, timedelta(hours=1))
+    add_events(engine, actors["consultant@paypal.com"], now - timedelta(hours=1), 1, timedelta(0), AuditEventType.TIMESHEET_SUBMITTED)
+    add_events(engine, actors["outsider@acme.com"], now - timedelta(minutes=30), 2, timedelta(minutes=1))
+
+    with isolated_app(engine) as client:
+        seen, cursor = [], None
+        while True:
+            response = client.get("/api/v1/audit/", headers=auth(ids["admin"]), params={"limit": 3, **({"cursor": cursor} if cursor else {})})
+            assert response.status_code == 200, response.text
+            seen += [(event["timestamp"], event["id"]) for event in response.json()]
+            cursor = response.headers.get("X-Next-Cursor")
+            if not cursor:
+                break
+        assert len(seen) == 8 and seen == sorted(seen, reverse=True)
+
+        # Each page is one indexed query after the user is loaded
+        with capture_statements() as statements:
+            client.get("/api/v1/audit/", headers=auth(ids["admin"]), params={"limit": 3})
+        assert len(statements) <= 2
+
+        response = client.get("/api/v1/audit/", headers=auth(ids["admin"]), params={"event": "timesheet_submitted"})
+        assert [event["event"] for event in response.json()] == ["timesheet_submitted"]
+        response = client.get("/api/v1/audit/", headers=auth(ids["admin"]), params={"since": (now - timedelta(hours=2, minutes=30)).isoformat()})
+        assert len(response.json()) == 5
+
+        # Managers only see their client's employees; consultants see nothing
+        response = client.get("/api/v1/audit/", headers=auth(ids["manager"]))
+        assert {event["actor_email"] for event in response.json()} == {"consultant@paypal.com"}
+        assert response.json()[0]["details"] == {"n": 0}
+        assert client.get("/api/v1/audit/", headers=auth(ids["consultant"])).status_code == 403
+        assert client.get("/api/v1/audit/", headers=auth(ids["admin"]), params={"cursor": "bogus"}).status_code == 400
+
+
+def test_details_are_native_json():
+    engine = make_engine()
+    ids, actors = setup(engine)
+    manager = actors["manager@paypal.com"]
+    with Session(engine) as session:
+        log = AuditLog(event=AuditEventType.TIMESHEET_APPROVED, actor_id=manager.id, actor_email=manager.email,
+                       actor_role=manager.role.value, details={"employee_id": ids["consultant"], "previous_status": "submitted"})
+        session.add(log)
+        session.commit()
+        # In-place change, tracked without reassigning the document
+        log.add_detail("comment", "Looks good")
+        session.commit()
+        session.expire_all()
+        assert log.details == {"employee_id": ids["consultant"], "previous_status": "submitted", "comment": "Looks good"}
+        assert session.exec(select(AuditLog.id).where(AuditLog.detail_text("previous_status") == "submitted")).all() == [log.id]
+    add_events(engine, actors["consultant@paypal.com"], datetime.utcnow(), 2, timedelta(seconds=1))
+
+    with isolated_app(engine) as client:
+        response = client.get("/api/v1/audit/", headers=auth(ids["admin"]),
+                              params={"employee_id": ids["consultant"], "previous_status": "submitted"})
+        assert [event["details"]["comment"] for event in response.json()] == ["Looks good"]
+        response = client.get("/api/v1/audit/", headers=auth(ids["admin"]), params={"previous_status": "draft"})
+        assert response.json() == []
+
+
+def test_retention_archives_old_months():
+    engine = make_engine()
+    ids, actors = setup(engine)
+    consultant = actors["consultant@paypal.com"]
+    add_events(engine, consultant, datetime(2025, 1, 3), 25, timedelta(hours=1))
+    add_events(engine, consultant, datetime(2025, 2, 27), 5, timedelta(days=1))   # Straddles February and March
+    add_events(engine, consultant, datetime(2025, 6, 1), 3, timedelta(hours=1))
+
+    archive_dir = tempfile.mkdtemp(prefix="dew_audit_")
+    archived = run_retention(engine, archive_dir, retention_months=3, block_rows=10, now=datetime(2025, 6, 15))
+    # March, April and May are kept whole besides the current month
+    assert archived == [(date(2025, 1, 1), 25), (date(2025, 2, 1), 2)]
+    with Session(engine) as session:
+        assert session.exec(select(func.count(AuditLog.id))).one() == 6
+
+    archive_path, index_path = archive_paths(archive_dir, date(2025, 1, 1))
+    with open(index_path) as sidecar:
+        index = json.load(sidecar)
+    assert index["rows"] == 25 and [block["rows"] for block in index["blocks"]] == [10, 10, 5]
+    # Plain gzip readers see one JSONL document
+    with gzip.open(archive_path, "rt") as archive:
+        lines = [json.loads(line) for line in archive]
+    assert len(lines) == 25 and lines[0]["event"] == "user_login" and lines[0]["details"] == {"n": 0}
+
+    # Already archived months are not written twice
+    assert run_retention(engine, archive_dir, retention_months=3, block_rows=10, now=datetime(2025, 6, 15)) == []
+
+    target = lines[14]
+    assert find_archived(archive_dir, target["id"]) == target
+    assert find_archived(archive_dir, 10 ** 6) is None
+    original, settings.audit_archive_dir = settings.audit_archive_dir, archive_dir
+    try:
+        with isolated_app(engine) as client:
+            response = client.get(f"/api/v1/audit/{target['id']}", headers=auth(ids["manager"]))
+            assert response.status_code == 200, response.text
+            assert response.json()["archived"] is True and response.json()["details"] == target["details"]
+            assert client.get(f"/api/v1/audit/{10 ** 6}", headers=auth(ids["admin"])).status_code == 404
+    finally:
+        settings.audit_archive_dir = original
+        shutil.rmtree(archive_dir)
+
+
+if __name__ == "__main__":
+    for test in (test_list_pages_newest_first_with_filters, test_details_are_native_json, test_retention_archives_old_months):
+        test()
+        print(f"✅ {test.__name__}")
@@ -0,0 +1,137 @@
+#!/usr/bin/env python3
+"""
+Tests for the batched audit trail writer
+
+Events are buffered in process and written with one bulk INSERT once enough
+are waiting or the flush interval has passed; close() writes what is left, and
+a failed flush keeps the events for the next attempt. Endpoints record their
+events without waiting for the audit table.
+"""
+
+import os
+import sys
+import time
+from datetime import datetime
+
+# Add the app directory to Python path
+sys.path.append(os.path.join(os.path.dirname(__file__), 'app'))
+
+from sqlalchemy import event
+from sqlmodel import Session, create_engine, select
+
+from app.core.audit import AuditWriter
+from app.core.metrics import REQUEST_AUDIT_TIME
+from app.models import AuditEventType, AuditLog
+from app.utils.auth import create_access_token
+from test_query_budget import SMALL, isolated_app, make_engine, seed
+
+
+def auth(user_id: int) -> dict:
+    return {"Authorization": f"Bearer {create_access_token({'sub': str(user_id)})}"}
+
+
+def event_row(n: int) -> dict:
+    return {"timesheet_id": None, "event": AuditEventType.USER_LOGIN, "actor_id": None, "actor_email": f"user{n}@dew.com",
+            "actor_role": "consultant", "details": None, "ip_address": None, "user_agent": None, "timestamp": datetime.utcnow()}
+
+
+def audit_rows(engine) -> list:
+    with Session(engine) as session:
+        return session.exec(select(AuditLog).order_by(AuditLog.id)).all()
+
+
+def wait_until(condition, timeout: float = 5.0):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < deadline, "timed out"
+        time.sleep(0.01)
+
+
+def test_flushes_by_size_in_one_insert():
+    engine = make_engine()
+    writer = AuditWriter(engine, batch_size=5, flush_interval=60, max_pending=100)
+    inserts = []
+    event.listen(engine, "before_cursor_execute",
+                 lambda conn, cursor, statement, *args: inserts.append(statement) if statement.startswith("INSERT") else None)
+    for n in range(4):
+        writer.record(event_row(n))
+    time.sleep(0.1)
+    assert writer.pending == 4 and audit_rows(engine) == []
+    writer.record(event_row(4))
+    wait_until(lambda: writer.pending == 0)
+    writer.close()
+    assert len(inserts) == 1
+    assert [row.actor_email for row in audit_rows(engine)] == [f"user{n}@dew.com" for n in range(5)]
+
+
+def test_flushes_by_time_and_on_close():
+    engine = make_engine()
+    writer = AuditWriter(engine, batch_size=1000, flush_interval=0.05, max_pending=100)
+    writer.record(event_row(0))
+    wait_until(lambda: len(audit_rows(engine)) == 1)
+
+    writer.flush_interval = 60
+    writer.close()
+    for n in range(1, 4):
+        writer.record(event_row(n))
+    # Shutdown writes what the timer has not
+    writer.close()
+    assert len(audit_rows(engine)) == 4
+    assert writer.pending == 0
+
+
+def test_failed_flush_keeps_events():
+    engine = make_engine()
+    writer = AuditWriter(create_engine("sqlite://"), batch_size=1000, flush_interval=60, max_pending=3)
+    for n in range(4):
+        writer.record(event_row(n))
+    try:
+        writer.flush()
+    except Exception:
+        pass
+    else:
+        raise AssertionError("flush into a database without the audit table should fail")
+    # The oldest event was dropped at the cap, the others survived the failure in order
+    assert writer.pending == 3
+    writer.bind = engine
+    writer.close()
+    assert [row.actor_email for row in audit_rows(engine)] == ["user1@dew.com", "user2@dew.com", "user3@dew.com"]
+
+
+def test_endpoints_record_events():
+    engine = make_engine()
+    with Session(engine) as session:
+        ids = seed(session, SMALL)
+    submits = REQUEST_AUDIT_TIME.count(method="POST", route="/api/v1/timesheets/{timesheet_id}/submit")
+    with isolated_app(engine) as client:
+        assert client.post(f"/api/v1/timesheets/{ids['draft']}/submit", headers=auth(ids["consultant"])).status_code == 200
+        assert client.post(f"/api/v1/timesheets/{ids['draft']}/approve", headers=auth(ids["manager"])).status_code == 200
+        # Editing a pending request is not audited
+        response = client.put("/api/v1/time_off/2", headers=auth(ids["consultant"]), json={"comment": "Family trip"})
+        assert response.status_code == 200, response.text
+        assert client.post("/api/v1/time_off/1/approve", headers=auth(ids["manager"])).status_code == 200
+        response = client.post("/api/v1/time_off/2/reject", headers=auth(ids["manager"]), json={"manager_comment": "Busy week"})
+        assert response.status_code == 200, response.text
+        response = client.put(f"/api/v1/employees/employees/{ids['consultant']}", headers=auth(ids["manager"]), json={"full_name": "Renamed"})
+        assert response.status_code == 200, response.text
+    # Audit overhead is measured per request
+    assert REQUEST_AUDIT_TIME.count(method="POST", route="/api/v1/timesheets/{timesheet_id}/submit") == submits + 1
+
+    events = audit_rows(engine)
+    assert [event.event for event in events] == [
+        AuditEventType.TIMESHEET_SUBMITTED, AuditEventType.TIMESHEET_APPROVED,
+        AuditEventType.TIME_OFF_APPROVED, AuditEventType.TIME_OFF_REJECTED, AuditEventType.EMPLOYEE_UPDATED,
+    ]
+    submitted, approved, _, rejected, updated = events
+    assert submitted.actor_id == ids["consultant"] and submitted.timesheet_id == ids["draft"]
+    assert approved.actor_email == "manager@paypal.com" and approved.actor_role == "client_manager"
+    assert rejected.details_data == {"time_off_id": 2, "employee_id": ids["consultant"], "previous_status": "pending", "comment": "Busy week"}
+    assert updated.details_data == {"employee_id": ids["consultant"], "fields": ["full_name"]}
+    assert submitted.ip_address == "testclient" and submitted.user_agent == "testclient"
+
+
+if __name__ == "__main__":
+    for test in (test_flushes_by_size_in_one_insert, test_flushes_by_time_and_on_close,
+                 test_failed_flush_keeps_events, test_endpoints_record_events):
+        test()
+        print(f"✅ {test.__name__}")
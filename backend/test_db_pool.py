@@ -0,0 +1,156 @@
+#!/usr/bin/env python3
+"""
+Tests for pool telemetry and DB time limits
+
+Checkouts report wait time, in-use connections, overflow and timeouts; a
+statement timeout or a spent request budget interrupts SQLite statements and
+the API answers 503.
+"""
+
+import os
+import sys
+import time
+from contextlib import contextmanager
+
+# Add the app directory to Python path
+sys.path.append(os.path.join(os.path.dirname(__file__), 'app'))
+
+from sqlalchemy import event, exc, text
+from sqlalchemy.ext.asyncio import create_async_engine
+from sqlalchemy.pool import NullPool
+from sqlmodel import Session, create_engine
+
+from app.config import settings
+from app.core.database import async_url, make_async_sessionmaker
+from app.core.db_pool import (
+    DB_POOL_CHECKOUT_WAIT, DB_POOL_IN_USE, DB_POOL_OVERFLOW, DB_POOL_TIMEOUTS, DB_TIME_LIMIT_EXCEEDED,
+    DBTimeLimitExceeded, TimedQueuePool, install_pool_hooks, install_time_limits,
+)
+from app.core.metrics import RequestStats, _current_stats, install_sql_hooks
+from app.core.principal_cache import principal_cache
+from app.core.session import get_async_db
+from app.main import app
+from app.models import Employee, EmployeeRole
+from app.utils.auth import create_access_token
+from test_query_budget import isolated_app, make_engine
+
+# Counts forever: SQLite only stops it by interrupting the statement
+RUNAWAY = text("WITH RECURSIVE n(x) AS (SELECT 1 UNION ALL SELECT x + 1 FROM n) SELECT count(*) FROM n")
+
+
+@contextmanager
+def limits(statement_timeout_ms: int = 0, request_time_budget_ms: int = 0):
+    original = settings.db_statement_timeout_ms, settings.db_request_time_budget_ms
+    settings.db_statement_timeout_ms, settings.db_request_time_budget_ms = statement_timeout_ms, request_time_budget_ms
+    try:
+        yield
+    finally:
+        settings.db_statement_timeout_ms, settings.db_request_time_budget_ms = original
+
+
+def test_pool_reports_usage_overflow_and_timeouts():
+    path = make_engine().url.database
+    engine = create_engine(f"sqlite:///{path}", poolclass=TimedQueuePool, pool_size=1, max_overflow=1,
+                           pool_timeout=0.05, pool_logging_name="pool-test")
+    install_pool_hooks(engine)
+    waits = DB_POOL_CHECKOUT_WAIT.count(pool="pool-test")
+
+    first, second = engine.connect(), engine.connect()
+    assert DB_POOL_IN_USE.value(pool="pool-test") == 2
+    assert DB_POOL_OVERFLOW.value(pool="pool-test") == 1
+    try:
+        engine.connect()
+        raise AssertionError("third checkout should time out")
+    except exc.TimeoutError:
+        pass
+    assert DB_POOL_TIMEOUTS.value(pool="pool-test") == 1
+    assert DB_POOL_CHECKOUT_WAIT.count(pool="pool-test") == waits + 3
+
+    first.close()
+    second.close()
+    assert DB_POOL_IN_USE.value(pool="pool-test") == 0
+    engine.dispose()
+
+
+def test_statement_timeout_interrupts_sqlite():
+    engine = make_engine()
+    install_time_limits(engine)
+    engine.dispose()  # the progress handler is installed on new connections
+    cancelled = DB_TIME_LIMIT_EXCEEDED.value(limit="statement_timeout")
+    with limits(statement_timeout_ms=50), engine.connect() as conn:
+        started = time.perf_counter()
+        try:
+            conn.execute(RUNAWAY)
+            raise AssertionError("runaway statement should have been interrupted")
+        except DBTimeLimitExceeded as error:
+            assert error.limit == "statement_timeout"
+        assert time.perf_counter() - started < 2
+        # The connection is still usable, and fast statements are unaffected
+        assert conn.execute(text("SELECT 1")).scalar() == 1
+    assert DB_TIME_LIMIT_EXCEEDED.value(limit="statement_timeout") == cancelled + 1
+
+
+def test_request_budget_refuses_and_interrupts():
+    engine = make_engine()
+    install_time_limits(engine)
+    engine.dispose()  # the progress handler is installed on new connections
+    token = _current_stats.set(RequestStats(db_seconds=0.2))
+    try:
+        with limits(request_time_budget_ms=200), engine.connect() as conn:
+            # Spent: refused before it runs
+            try:
+                conn.execute(text("SELECT 1"))
+                raise AssertionError("statement should have been refused")
+            except DBTimeLimitExceeded as error:
+                assert error.limit == "request_budget"
+
+        _current_stats.get().db_seconds = 0.15
+        with limits(statement_timeout_ms=10_000, request_time_budget_ms=200), engine.connect() as conn:
+            # 50ms left, nearer than the statement timeout
+            started = time.perf_counter()
+            try:
+                conn.execute(RUNAWAY)
+                raise AssertionError("runaway statement should have been interrupted")
+            except DBTimeLimitExceeded as error:
+                assert error.limit == "request_budget"
+            assert time.perf_counter() - started < 2
+    finally:
+        _current_stats.reset(token)
+
+
+def test_api_answers_503_when_budget_spent():
+    engine = make_engine()
+    with Session(engine) as session:
+        user = Employee(full_name="Admin", email="admin@dew.com", password_hash="x", role=EmployeeRole.DEW_ADMIN)
+        session.add(user)
+        session.commit()
+        session.refresh(user)
+        headers = {"Authorization": f"Bearer {create_access_token({'sub': str(user.id)})}"}
+
+    # Same hooks as the app's own async engine, plus 5ms of latency on every statement
+    async_engine = create_async_engine(async_url(engine.url), poolclass=NullPool)
+    install_time_limits(async_engine.sync_engine)
+    install_sql_hooks(async_engine.sync_engine)
+    event.listen(async_engine.sync_engine, "before_cursor_execute", lambda *args: time.sleep(0.005))
+    async_sessions = make_async_sessionmaker(async_engine)
+
+    async def override_get_async_db():
+        async with async_sessions() as session:
+            yield session
+
+    with isolated_app(engine) as client:
+        app.dependency_overrides[get_async_db] = override_get_async_db
+        assert client.get("/api/v1/clients/clients/", headers=headers).status_code == 200
+        # The principal lookup spends the whole budget, so the listing query is refused
+        principal_cache.clear()
+        with limits(request_time_budget_ms=2):
+            response = client.get("/api/v1/clients/clients/", headers=headers)
+    assert response.status_code == 503, response.text
+    assert "budget" in response.json()["detail"]
+
+
+if __name__ == "__main__":
+    for test in (test_pool_reports_usage_overflow_and_timeouts, test_statement_timeout_interrupts_sqlite,
+                 test_request_budget_refuses_and_interrupts, test_api_answers_503_when_budget_spent):
+        test()
+        print(f"✅ {test.__name__}")
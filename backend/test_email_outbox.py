@@ -0,0 +1,146 @@
+#!/usr/bin/env python3
+"""
+Tests for the email outbox and its sender
+
+Notifications are written to the outbox in the transaction that makes the
+change; the sender delivers them to a local aiosmtpd server over one reused
+connection, reschedules temporary failures and gives up on permanent ones.
+"""
+
+import os
+import socket
+import sys
+from contextlib import contextmanager
+from datetime import datetime, timedelta
+
+# Add the app directory to Python path
+sys.path.append(os.path.join(os.path.dirname(__file__), 'app'))
+
+from aiosmtpd.controller import Controller
+from sqlmodel import Session, select
+
+from app.config import settings
+from app.models import EmailOutbox, OutboxStatus
+from app.utils.auth import create_access_token
+from app.utils.email import queue_email
+from app.utils.email_sender import SMTPConnection, deliver_batch, run
+from test_query_budget import SMALL, isolated_app, make_engine, seed
+
+
+class RecordingHandler:
+    """Accepts mail; recipients starting with busy get 451, with bounce 550"""
+
+    def __init__(self):
+        self.messages = []
+        self.peers = set()
+
+    async def handle_RCPT(self, server, session, envelope, address, rcpt_options):
+        if address.startswith("busy"):
+            return "451 Mailbox busy, try later"
+        if address.startswith("bounce"):
+            return "550 No such user"
+        envelope.rcpt_tos.append(address)
+        return "250 OK"
+
+    async def handle_DATA(self, server, session, envelope):
+        self.messages.append((envelope.rcpt_tos, envelope.content))
+        self.peers.add(session.peer)
+        return "250 Message accepted"
+
+
+@contextmanager
+def smtp_server():
+    with socket.socket() as probe:
+        probe.bind(("127.0.0.1", 0))
+        port = probe.getsockname()[1]
+    handler = RecordingHandler()
+    controller = Controller(handler, hostname="127.0.0.1", port=port)
+    controller.start()
+    try:
+        yield handler, SMTPConnection("127.0.0.1", port)
+    finally:
+        controller.stop()
+
+
+def outbox(engine) -> list:
+    with Session(engine) as session:
+        return session.exec(select(EmailOutbox).order_by(EmailOutbox.id)).all()
+
+
+def test_notifications_are_queued_with_the_change():
+    engine = make_engine()
+    with Session(engine) as session:
+        ids = seed(session, SMALL)
+    consultant = {"Authorization": f"Bearer {create_access_token({'sub': str(ids['consultant'])})}"}
+    with isolated_app(engine) as client:
+        assert client.post(f"/api/v1/timesheets/{ids['draft']}/submit", headers=consultant).status_code == 200
+        # Rejected change: nothing queued
+        assert client.post(f"/api/v1/timesheets/{ids['draft']}/submit", headers=consultant).status_code == 400
+    queued = outbox(engine)
+    assert [(message.recipients, message.status) for message in queued] == [("manager@paypal.com", OutboxStatus.PENDING)]
+    assert queued[0].subject.startswith("Timesheet Submitted for Approval")
+
+
+def test_sender_reuses_one_connection():
+    engine = make_engine()
+    with Session(engine) as session:
+        for n in range(5):
+            queue_email(session, f"Message {n}", "Hello", [f"user{n}@dew.com"])
+        session.commit()
+
+    with smtp_server() as (handler, connection):
+        assert run(engine, connection, batch_size=2, poll_interval=0, once=True) == 5
+    assert [recipients for recipients, _ in handler.messages] == [[f"user{n}@dew.com"] for n in range(5)]
+    assert len(handler.peers) == 1 and connection.connects == 1
+    assert all(message.status == OutboxStatus.SENT and message.sent_at for message in outbox(engine))
+
+
+def test_sender_reconnects_after_max_messages():
+    engine = make_engine()
+    with Session(engine) as session:
+        for n in range(5):
+            queue_email(session, f"Message {n}", "Hello", [f"user{n}@dew.com"])
+        session.commit()
+
+    with smtp_server() as (handler, connection):
+        connection.max_messages = 2
+        run(engine, connection, batch_size=10, poll_interval=0, once=True)
+    assert len(handler.messages) == 5 and connection.connects == 3
+
+
+def test_sender_retries_temporary_failures_with_backoff():
+    engine = make_engine()
+    with Session(engine) as session:
+        for address in ("busy@dew.com", "bounce@dew.com", "ok@dew.com"):
+            queue_email(session, "Hello", "Hello", [address])
+        session.commit()
+
+    with smtp_server() as (handler, connection):
+        with Session(engine) as session:
+            assert deliver_batch(session, connection, batch_size=10) == 3
+        busy, bounce, ok = outbox(engine)
+        assert busy.status == OutboxStatus.PENDING and busy.attempts == 1 and "451" in busy.last_error
+        expected = datetime.utcnow() + timedelta(seconds=settings.email_retry_base_seconds)
+        assert abs((busy.next_attempt_at - expected).total_seconds()) < 5
+        assert bounce.status == OutboxStatus.FAILED and "550" in bounce.last_error
+        assert ok.status == OutboxStatus.SENT and len(handler.messages) == 1
+
+        # Not due yet: the next batch leaves it alone
+        with Session(engine) as session:
+            assert deliver_batch(session, connection, batch_size=10) == 0
+
+        # Due again, and failing until email_max_attempts
+        with Session(engine) as session:
+            message = session.get(EmailOutbox, busy.id)
+            message.attempts, message.next_attempt_at = settings.email_max_attempts - 1, datetime.utcnow()
+            session.commit()
+            assert deliver_batch(session, connection, batch_size=10) == 1
+        connection.close()
+    assert outbox(engine)[0].status == OutboxStatus.FAILED
+
+
+if __name__ == "__main__":
+    for test in (test_notifications_are_queued_with_the_change, test_sender_reuses_one_connection,
+                 test_sender_reconnects_after_max_messages, test_sender_retries_temporary_failures_with_backoff):
+        test()
+        print(f"✅ {test.__name__}")
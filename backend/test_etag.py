@@ -0,0 +1,84 @@
+#!/usr/bin/env python3
+"""
+Tests for conditional GETs on the list endpoints
+
+A list response carries a weak ETag computed from the caller, the query string
+and count(*)/max(updated_at) of the scoped rows. Sending it back in
+If-None-Match answers 304 until any of those changes: a write, a different
+query string, a different user, or rollups recomputed after a rules change.
+"""
+
+import os
+import sys
+
+# Add the app directory to Python path
+sys.path.append(os.path.join(os.path.dirname(__file__), 'app'))
+
+from sqlmodel import Session
+
+from app.models import Employee, OvertimeRules
+from app.utils.auth import create_access_token
+from app.utils.rollups import recompute
+from test_query_budget import SMALL, isolated_app, make_engine, seed
+
+
+def auth(user_id: int) -> dict:
+    return {"Authorization": f"Bearer {create_access_token({'sub': str(user_id)})}"}
+
+
+def revalidate(client, path: str, user_id: int, etag: str):
+    return client.get(path, headers={**auth(user_id), "If-None-Match": etag})
+
+
+def test_repeat_get_is_not_modified():
+    engine = make_engine()
+    with Session(engine) as session:
+        ids = seed(session, SMALL)
+    with isolated_app(engine) as client:
+        for path in ("/api/v1/timesheets/", "/api/v1/time_off/", "/api/v1/employees/employees/", "/api/v1/clients/clients/"):
+            response = client.get(path, headers=auth(ids["manager"]))
+            assert response.status_code == 200, response.text
+            etag = response.headers["ETag"]
+            assert etag.startswith('W/"') and response.headers["Cache-Control"] == "private, no-cache"
+            not_modified = revalidate(client, path, ids["manager"], etag)
+            assert not_modified.status_code == 304 and not_modified.content == b""
+            assert not_modified.headers["ETag"] == etag
+            # Weak comparison, lists of candidates and * also match
+            assert revalidate(client, path, ids["manager"], f'"x", {etag[2:]}').status_code == 304
+            assert revalidate(client, path, ids["manager"], "*").status_code == 304
+
+
+def test_changes_invalidate_the_etag():
+    engine = make_engine()
+    with Session(engine) as session:
+        ids = seed(session, SMALL)
+        client_id = session.get(Employee, ids["consultant"]).client_id
+    path = "/api/v1/timesheets/"
+    with isolated_app(engine) as client:
+        etag = client.get(path, headers=auth(ids["consultant"])).headers["ETag"]
+
+        # Query string and caller are part of the validator
+        assert revalidate(client, f"{path}?view=summary", ids["consultant"], etag).status_code == 200
+        assert revalidate(client, path, ids["manager"], etag).status_code == 200
+
+        # A write to one of the listed timesheets
+        entry = {"date": "2024-01-12", "in_time": "09:00", "out_time": "10:00"}
+        assert client.post(f"/api/v1/timesheets/{ids['draft']}/entries", json=entry, headers=auth(ids["consultant"])).status_code == 200
+        response = revalidate(client, path, ids["consultant"], etag)
+        assert response.status_code == 200 and response.headers["ETag"] != etag
+        etag = response.headers["ETag"]
+        assert revalidate(client, path, ids["consultant"], etag).status_code == 304
+
+        # Rollups split again under new overtime rules, outside any endpoint
+        with Session(engine) as session:
+            session.add(OvertimeRules(client_id=client_id, daily_overtime_after_minutes=300))
+            session.commit()
+            recompute(session, client_id)
+        response = revalidate(client, path, ids["consultant"], etag)
+        assert response.status_code == 200 and response.headers["ETag"] != etag
+
+
+if __name__ == "__main__":
+    for test in (test_repeat_get_is_not_modified, test_changes_invalidate_the_etag):
+        test()
+        print(f"✅ {test.__name__}")
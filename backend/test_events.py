@@ -0,0 +1,152 @@
+#!/usr/bin/env python3
+"""
+Tests for the server-sent change events
+
+The hub delivers each committed change to the streams whose user may see it,
+replays missed events on reconnect with Last-Event-ID, and resets a stream
+whose bounded buffer fills up or whose Last-Event-ID can no longer be served.
+"""
+
+import asyncio
+import os
+import sys
+
+# Add the app directory to Python path
+sys.path.append(os.path.join(os.path.dirname(__file__), 'app'))
+
+from sqlmodel import Session
+
+from app.core import events
+from app.core.events import RESET, EventHub, EventScope, event_hub, stream_events
+from app.models import EmployeeRole
+from app.utils.auth import create_access_token
+from test_query_budget import SMALL, isolated_app, make_engine, seed
+
+
+def auth(user_id: int) -> dict:
+    return {"Authorization": f"Bearer {create_access_token({'sub': str(user_id)})}"}
+
+
+MANAGER = EventScope(user_id=1, role=EmployeeRole.CLIENT_MANAGER, email="manager@paypal.com")
+CONSULTANT = EventScope(user_id=2, role=EmployeeRole.CONSULTANT, email="consultant@paypal.com")
+OTHER = EventScope(user_id=3, role=EmployeeRole.CONSULTANT, email="other@paypal.com")
+ADMIN = EventScope(user_id=4, role=EmployeeRole.DEW_ADMIN, email="admin@dew.com")
+
+
+def drain(subscription) -> list:
+    items = []
+    while not subscription.queue.empty():
+        items.append(subscription.queue.get_nowait())
+    return items
+
+
+def test_fan_out_follows_scope():
+    async def run():
+        hub = EventHub(buffer_size=10, replay_size=100)
+        subscriptions = {name: hub.subscribe(scope)[0] for name, scope in
+                         (("manager", MANAGER), ("consultant", CONSULTANT), ("other", OTHER), ("admin", ADMIN))}
+        hub.publish(events.TIMESHEET_SUBMITTED, 2, "manager@paypal.com", timesheet_id=7, status="submitted")
+        hub.publish(events.TIME_OFF_APPROVED, 3, "boss@acme.com", time_off_id=9, status="approved")
+        received = {name: [event.type for event in drain(s)] for name, s in subscriptions.items()}
+        assert received == {
+            "manager": [events.TIMESHEET_SUBMITTED],
+            "consultant": [events.TIMESHEET_SUBMITTED],
+            "other": [events.TIME_OFF_APPROVED],
+            "admin": [events.TIMESHEET_SUBMITTED, events.TIME_OFF_APPROVED],
+        }
+        hub.unsubscribe(subscriptions["other"])
+        hub.publish(events.TIME_OFF_REJECTED, 3, "boss@acme.com", time_off_id=10, status="rejected")
+        assert drain(subscriptions["other"]) == []
+    asyncio.run(run())
+
+
+def test_resume_and_reset():
+    async def run():
+        hub = EventHub(buffer_size=3, replay_size=5)
+        first = hub.publish(events.TIMESHEET_SUBMITTED, 2, "manager@paypal.com", timesheet_id=1)
+        hub.publish(events.TIMESHEET_SUBMITTED, 3, "manager@paypal.com", timesheet_id=2)
+        hub.publish(events.TIMESHEET_ENTRY_ADDED, 2, "manager@paypal.com", timesheet_id=1)
+        # Missed events in the caller's scope only
+        _, backlog = hub.subscribe(CONSULTANT, hub.event_id(first))
+        assert [event.data["timesheet_id"] for event in backlog] == [1]
+        assert [event.type for event in backlog] == [events.TIMESHEET_ENTRY_ADDED]
+        # An id from another process start, or one older than the replay ring, cannot be served
+        assert hub.subscribe(CONSULTANT, "0-1")[1] == [RESET]
+        for n in range(5):
+            hub.publish(events.TIMESHEET_ENTRY_ADDED, 2, None, timesheet_id=n)
+        assert hub.subscribe(CONSULTANT, hub.event_id(first))[1] == [RESET]
+
+        # A stream that falls buffer_size behind is reset and gets nothing further
+        slow, _ = hub.subscribe(CONSULTANT)
+        for n in range(6):
+            hub.publish(events.TIMESHEET_ENTRY_ADDED, 2, None, timesheet_id=n)
+        items = drain(slow)
+        assert len(items) == 4 and items[-1] == RESET
+    asyncio.run(run())
+
+
+def test_stream_framing_and_heartbeat():
+    async def run():
+        hub = EventHub(buffer_size=10, replay_size=10)
+        subscription, backlog = hub.subscribe(MANAGER)
+        disconnected = False
+
+        async def is_disconnected():
+            return disconnected
+
+        chunks = []
+        stream = stream_events(hub, subscription, backlog, is_disconnected, heartbeat=0.01)
+        chunks.append(await stream.__anext__())
+        event = hub.publish(events.TIMESHEET_APPROVED, 2, "manager@paypal.com", timesheet_id=5, status="approved")
+        chunks.append(await stream.__anext__())
+        chunks.append(await stream.__anext__())
+        hub.close()
+        chunks += [chunk async for chunk in stream]
+        assert chunks[0].startswith("retry: ")
+        assert chunks[1] == f'id: {hub.event_id(event)}\nevent: timesheet.approved\ndata: {{"employee_id":2,"timesheet_id":5,"status":"approved"}}\n\n'
+        assert chunks[2:] == [": keepalive\n\n"]
+        # Ending the stream unsubscribes it
+        hub.publish(events.TIMESHEET_APPROVED, 2, "manager@paypal.com", timesheet_id=6)
+        assert subscription.queue.empty() and subscription.done
+    asyncio.run(run())
+
+
+def test_endpoints_publish_committed_changes():
+    engine = make_engine()
+    with Session(engine) as session:
+        ids = seed(session, SMALL)
+    marker = event_hub.publish("test.marker", 0)
+    with isolated_app(engine) as client:
+        client.post(f"/api/v1/timesheets/{ids['draft']}/submit", headers=auth(ids["consultant"]))
+        client.post(f"/api/v1/timesheets/{ids['submitted']}/approve", headers=auth(ids["manager"]))
+        client.post("/api/v1/time_off/reject:batch", headers=auth(ids["manager"]), json={"ids": [1, 2]})
+        client.post(f"/api/v1/timesheets/{ids['draft']}/entries", headers=auth(ids["consultant"]),
+                    json={"date": "2024-01-13", "in_time": "09:00", "out_time": "10:00"})
+
+        async def missed(scope):
+            subscription, backlog = event_hub.subscribe(scope, event_hub.event_id(marker))
+            event_hub.unsubscribe(subscription)
+            return [(event.type, event.data.get("timesheet_id") or event.data.get("time_off_id")) for event in backlog]
+
+        manager = EventScope(user_id=ids["manager"], role=EmployeeRole.CLIENT_MANAGER, email="manager@paypal.com")
+        assert asyncio.run(missed(manager)) == [
+            (events.TIMESHEET_SUBMITTED, ids["draft"]),
+            (events.TIMESHEET_APPROVED, ids["submitted"]),
+            (events.TIME_OFF_REJECTED, 1),
+            (events.TIME_OFF_REJECTED, 2),
+            (events.TIMESHEET_ENTRY_ADDED, ids["draft"]),
+        ]
+        assert asyncio.run(missed(OTHER)) == []
+
+        # The stream itself: a stale Last-Event-ID gets retry + reset and the stream ends
+        token = create_access_token({"sub": str(ids["consultant"])})
+        response = client.get("/api/v1/events/", params={"access_token": token}, headers={"Last-Event-ID": "0-1"})
+        assert response.status_code == 200 and response.headers["content-type"].startswith("text/event-stream")
+        assert response.text.endswith("event: reset\ndata: {}\n\n")
+        assert client.get("/api/v1/events/").status_code == 401
+
+
+if __name__ == "__main__":
+    for test in (test_fan_out_follows_scope, test_resume_and_reset, test_stream_framing_and_heartbeat, test_endpoints_publish_committed_changes):
+        test()
+        print(f"✅ {test.__name__}")
@@ -0,0 +1,115 @@
+#!/usr/bin/env python3
+"""
+Tests for the streaming timesheet export
+
+GET /exports/timesheets streams one row per time entry as CSV or NDJSON.
+Admins export any client, managers only their own, and every export records
+a DATA_EXPORT audit event with its filters and row count.
+"""
+
+import csv
+import io
+import json
+import os
+import sys
+from datetime import date, time
+
+# Add the app directory to Python path
+sys.path.append(os.path.join(os.path.dirname(__file__), 'app'))
+
+from sqlmodel import Session, select
+
+from app.models import AuditEventType, AuditLog, Client, Employee, EmployeeRole, Timesheet, TimesheetStatus, TimeEntry
+from app.utils.auth import create_access_token
+from test_query_budget import SMALL, isolated_app, make_engine, seed
+
+PATH = "/api/v1/exports/timesheets"
+
+
+def auth(user_id: int) -> dict:
+    return {"Authorization": f"Bearer {create_access_token({'sub': str(user_id)})}"}
+
+
+def setup(engine) -> dict:
+    """The seeded PayPal client plus an admin and a second client with one entry"""
+    with Session(engine) as session:
+        ids = seed(session, SMALL)
+        other = Client(name="Acme", code="acme")
+        session.add(other)
+        session.flush()
+        worker = Employee(full_name="Worker", email="worker@acme.com", password_hash="x", role=EmployeeRole.CONSULTANT, client_id=other.id)
+        admin = Employee(full_name="Admin", email="admin@dew.com", password_hash="x", role=EmployeeRole.DEW_ADMIN)
+        session.add_all([worker, admin])
+        session.flush()
+        timesheet = Timesheet(employee_id=worker.id, week_start=date(2024, 1, 1), manager_email="boss@acme.com",
+                              status=TimesheetStatus.APPROVED.value)
+        session.add(timesheet)
+        session.flush()
+        session.add(TimeEntry(timesheet_id=timesheet.id, date=date(2024, 1, 2), in_time=time(9, 0), out_time=time(12, 30), project="Audit"))
+        session.commit()
+        ids.update(admin=admin.id, other_client=other.id, own_client=session.get(Employee, ids["manager"]).client_id)
+    return ids
+
+
+def export_events(engine) -> list:
+    with Session(engine) as session:
+        return [log.details for log in session.exec(select(AuditLog).where(AuditLog.event == AuditEventType.DATA_EXPORT).order_by(AuditLog.id))]
+
+
+def test_csv_and_ndjson_rows():
+    engine = make_engine()
+    ids = setup(engine)
+    with isolated_app(engine) as client:
+        response = client.get(PATH, headers=auth(ids["admin"]))
+        assert response.status_code == 200, response.text
+        assert response.headers["content-type"].startswith("text/csv")
+        assert response.headers["content-disposition"].startswith('attachment; filename="timesheets-')
+        rows = list(csv.DictReader(io.StringIO(response.text)))
+        # Ordered by entry date: PayPal's Monday, Acme's Tuesday, PayPal's next Monday
+        assert [(row["client_code"], row["date"]) for row in rows] == [("paypal", "2024-01-01"), ("acme", "2024-01-02"), ("paypal", "2024-01-08")]
+        first = rows[0]
+        assert (first["employee_email"], first["in_time"], first["out_time"]) == ("consultant@paypal.com", "08:00", "18:00")
+        assert (first["break_minutes"], first["worked_minutes"], first["status"]) == ("15", "585", "submitted")
+        assert rows[1]["project"] == "Audit" and rows[1]["worked_minutes"] == "210"
+
+        response = client.get(PATH, params={"format": "ndjson", "date_from": "2024-01-02", "status": "approved"}, headers=auth(ids["admin"]))
+        assert response.status_code == 200, response.text
+        assert response.headers["content-type"].startswith("application/x-ndjson")
+        records = [json.loads(line) for line in response.text.splitlines()]
+        assert len(records) == 1 and records[0]["employee_name"] == "Worker" and records[0]["break_minutes"] == 0
+
+
+def test_manager_scoping_and_validation():
+    engine = make_engine()
+    ids = setup(engine)
+    with isolated_app(engine) as client:
+        response = client.get(PATH, params={"format": "ndjson"}, headers=auth(ids["manager"]))
+        assert response.status_code == 200, response.text
+        assert {json.loads(line)["client_code"] for line in response.text.splitlines()} == {"paypal"}
+
+        assert client.get(PATH, params={"client_id": ids["other_client"]}, headers=auth(ids["manager"])).status_code == 403
+        assert client.get(PATH, headers=auth(ids["consultant"])).status_code == 403
+        response = client.get(PATH, params={"date_from": "2024-01-08", "date_to": "2024-01-01"}, headers=auth(ids["admin"]))
+        assert response.status_code == 400
+    # Refused requests record nothing
+    [event] = export_events(engine)
+    assert event["filters"] == {"date_from": None, "date_to": None, "client_id": ids["own_client"], "status": None}
+
+
+def test_export_is_audited():
+    engine = make_engine()
+    ids = setup(engine)
+    with isolated_app(engine) as client:
+        assert client.get(PATH, params={"date_to": "2024-01-05"}, headers=auth(ids["admin"])).status_code == 200
+    [event] = export_events(engine)
+    assert (event["export"], event["format"], event["row_count"], event["completed"]) == ("timesheets", "csv", 2, True)
+    assert event["filters"]["date_to"] == "2024-01-05" and event["filters"]["client_id"] is None
+    with Session(engine) as session:
+        log = session.exec(select(AuditLog).where(AuditLog.event == AuditEventType.DATA_EXPORT)).one()
+        assert (log.actor_id, log.actor_role) == (ids["admin"], "dew_admin")
+
+
+if __name__ == "__main__":
+    for test in (test_csv_and_ndjson_rows, test_manager_scoping_and_validation, test_export_is_audited):
+        test()
+        print(f"✅ {test.__name__}")
@@ -0,0 +1,63 @@
+#!/usr/bin/env python3
+"""
+Tests for the sort-and-sweep interval validation in app.utils.intervals
+"""
+
+import os
+import random
+import sys
+from datetime import time
+
+# Add the app directory to Python path
+sys.path.append(os.path.join(os.path.dirname(__file__), 'app'))
+
+from app.utils.intervals import Interval, find_empty, find_outside, find_overlaps
+
+
+def brute_force_overlaps(intervals):
+    """Reference: every pair with a strict overlap (touching allowed)"""
+    return {
+        frozenset((a.position, b.position))
+        for i, a in enumerate(intervals)
+        for b in intervals[i + 1:]
+        if a.start < b.end and b.start < a.end
+    }
+
+
+def test_touching_intervals_do_not_conflict():
+    intervals = [Interval(time(9), time(12), "a"), Interval(time(12), time(13), "b"), Interval(time(13), time(17), "c")]
+    assert find_overlaps(intervals) == []
+
+
+def test_reports_every_conflict_with_positions():
+    intervals = [
+        Interval(time(9), time(17), 0),
+        Interval(time(10), time(11), 1),
+        Interval(time(10, 30), time(12), 2),
+        Interval(time(17), time(18), 3),
+    ]
+    conflicts = {(c.first.position, c.second.position) for c in find_overlaps(intervals)}
+    assert conflicts == {(0, 1), (0, 2), (1, 2)}
+
+
+def test_empty_and_outside():
+    intervals = [Interval(2, 2, "empty"), Interval(3, 1, "reversed"), Interval(0, 5, "early"), Interval(2, 4, "inside")]
+    assert [i.position for i in find_empty(intervals)] == ["empty", "reversed"]
+    assert [i.position for i in find_outside(intervals, 1, 4)] == ["early"]
+
+
+def test_matches_brute_force_on_random_input():
+    rng = random.Random(7)
+    for _ in range(200):
+        intervals = []
+        for position in range(rng.randint(0, 30)):
+            start = rng.randint(0, 100)
+            intervals.append(Interval(start, start + rng.randint(1, 20), position))
+        found = {frozenset((c.first.position, c.second.position)) for c in find_overlaps(intervals)}
+        assert found == brute_force_overlaps(intervals)
+
+
+if __name__ == "__main__":
+    for test in (test_touching_intervals_do_not_conflict, test_reports_every_conflict_with_positions, test_empty_and_outside, test_matches_brute_force_on_random_input):
+        test()
+        print(f"✅ {test.__name__}")
@@ -0,0 +1,108 @@
+#!/usr/bin/env python3
+"""
+Tests for the request metrics and the /metrics endpoint
+
+Each request is recorded under its route template with its latency, SQL
+statement count, DB time, rows and response size; /metrics renders the
+registry in the Prometheus text format. metrics_enabled=false leaves the
+middleware and the engine hooks out.
+"""
+
+import os
+import re
+import subprocess
+import sys
+
+# Add the app directory to Python path
+sys.path.append(os.path.join(os.path.dirname(__file__), 'app'))
+
+from sqlalchemy.ext.asyncio import create_async_engine
+from sqlalchemy.pool import NullPool
+from sqlmodel import Session
+
+from app.main import app
+from app.core.database import async_url, make_async_sessionmaker
+from app.core.metrics import MetricsMiddleware, install_sql_hooks
+from app.core.session import get_async_db
+from app.models import Employee
+from app.utils.auth import create_access_token
+from test_query_budget import SMALL, capture_statements, isolated_app, make_engine, seed
+
+
+def auth(user_id: int) -> dict:
+    return {"Authorization": f"Bearer {create_access_token({'sub': str(user_id)})}"}
+
+
+def sample(exposition: str, name: str, **labels) -> float:
+    """Value of one sample, 0 when the series doesn't exist yet"""
+    rendered = ",".join(f'{key}="{value}"' for key, value in labels.items())
+    match = re.search(rf"^{re.escape(name)}\{{{re.escape(rendered)}\}} (\S+)$", exposition, re.MULTILINE)
+    return float(match.group(1)) if match else 0.0
+
+
+def test_requests_and_statements_by_route():
+    engine = make_engine()
+    with Session(engine) as session:
+        ids = seed(session, SMALL)
+        client_id = session.get(Employee, ids["manager"]).client_id
+
+    # Same SQL hooks as the app's own async engine
+    async_engine = create_async_engine(async_url(engine.url), poolclass=NullPool)
+    install_sql_hooks(async_engine.sync_engine)
+    async_sessions = make_async_sessionmaker(async_engine)
+
+    async def override_get_async_db():
+        async with async_sessions() as session:
+            yield session
+
+    route = "/api/v1/clients/clients/{client_id}/overtime-rules"
+    with isolated_app(engine) as client:
+        app.dependency_overrides[get_async_db] = override_get_async_db
+        before = client.get("/metrics").text
+        with capture_statements() as statements:
+            for _ in range(2):
+                assert client.get(f"/api/v1/clients/clients/{client_id}/overtime-rules", headers=auth(ids["manager"])).status_code == 200
+            assert client.get("/api/v1/clients/clients/999/overtime-rules", headers=auth(ids["manager"])).status_code == 403
+        response = client.get("/metrics")
+
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/plain; version=0.0.4")
+    after = response.text
+    assert "# TYPE http_request_duration_seconds histogram" in after
+    assert "# TYPE db_statements_total counter" in after
+
+    def delta(name, **labels):
+        return sample(after, name, **labels) - sample(before, name, **labels)
+
+    # Labelled by route template, not by the concrete path
+    assert delta("http_request_duration_seconds_count", method="GET", route=route, status="200") == 2
+    assert delta("http_request_duration_seconds_count", method="GET", route=route, status="403") == 1
+    assert f'client_id="{client_id}"' not in after and f"/clients/clients/{client_id}/" not in after
+    # Every SQL statement of the three requests is attributed to the route
+    assert delta("http_request_db_statements_count", method="GET", route=route) == 3
+    assert statements and delta("http_request_db_statements_sum", method="GET", route=route) == len(statements)
+    assert delta("http_request_db_statements_bucket", method="GET", route=route, le="+Inf") == 3
+    assert delta("http_response_bytes_count", method="GET", route=route) == 3
+
+
+def test_metrics_can_be_disabled():
+    # Enabled by default, as in this process
+    assert MetricsMiddleware in [middleware.cls for middleware in app.user_middleware]
+    check = (
+        "from sqlalchemy import event\n"
+        "from app.main import app\n"
+        "from app.core.database import engine\n"
+        "from app.core.metrics import MetricsMiddleware, _before_cursor_execute\n"
+        "assert MetricsMiddleware not in [m.cls for m in app.user_middleware]\n"
+        "assert not event.contains(engine, 'before_cursor_execute', _before_cursor_execute)\n"
+    )
+    env = dict(os.environ, METRICS_ENABLED="false", DATABASE_URL=f"sqlite:///{make_engine().url.database}")
+    result = subprocess.run([sys.executable, "-c", check], cwd=os.path.dirname(os.path.abspath(__file__)),
+                            env=env, capture_output=True, text=True)
+    assert result.returncode == 0, result.stdout + result.stderr
+
+
+if __name__ == "__main__":
+    for test in (test_requests_and_statements_by_route, test_metrics_can_be_disabled):
+        test()
+        print(f"✅ {test.__name__}")
@@ -0,0 +1,122 @@
+#!/usr/bin/env python3
+"""
+Tests for manager digest notifications
+
+A manager in digest mode gets no email per submission; held notifications are
+coalesced into one email per manager once the digest interval has passed,
+using one grouped query for all managers.
+"""
+
+import os
+import sys
+from datetime import datetime, timedelta
+
+# Add the app directory to Python path
+sys.path.append(os.path.join(os.path.dirname(__file__), 'app'))
+
+from sqlalchemy import event
+from sqlmodel import Session, select
+
+from app.models import EmailOutbox, Employee, EmployeeRole, NotificationMode, PendingNotification
+from app.utils.auth import create_access_token
+from app.utils.notifications import TIMESHEET_SUBMITTED, queue_due_digests
+from test_query_budget import SMALL, capture_statements, isolated_app, make_engine, seed
+
+
+def auth(user_id: int) -> dict:
+    return {"Authorization": f"Bearer {create_access_token({'sub': str(user_id)})}"}
+
+
+def rows(engine, model) -> list:
+    with Session(engine) as session:
+        return session.exec(select(model).order_by(model.id)).all()
+
+
+def test_digest_mode_coalesces_submissions():
+    engine = make_engine()
+    with Session(engine) as session:
+        ids = seed(session, SMALL)
+    with isolated_app(engine) as client:
+        response = client.put(f"/api/v1/employees/employees/{ids['manager']}", headers=auth(ids["manager"]),
+                              json={"notification_mode": "digest", "digest_interval_minutes": 30})
+        assert response.status_code == 200, response.text
+        assert response.json()["notification_mode"] == "digest"
+
+        assert client.post(f"/api/v1/timesheets/{ids['draft']}/submit", headers=auth(ids["consultant"])).status_code == 200
+        assert client.post("/api/v1/time_off/", headers=auth(ids["consultant"]), json={
+            "start_date": "2025-01-06", "end_date": "2025-01-07", "type": "vacation", "manager_email": "manager@paypal.com"
+        }).status_code == 201
+    assert rows(engine, EmailOutbox) == []
+    assert len(rows(engine, PendingNotification)) == 2
+
+    with Session(engine) as session:
+        # Held until the oldest notification has waited 30 minutes
+        assert queue_due_digests(session, datetime.utcnow() + timedelta(minutes=29)) == 0
+        assert queue_due_digests(session, datetime.utcnow() + timedelta(minutes=31)) == 1
+    [digest] = rows(engine, EmailOutbox)
+    assert digest.recipients == "manager@paypal.com"
+    assert digest.subject == "2 items awaiting your approval"
+    assert "- Time off: Consultant, 2025-01-06 to 2025-01-07 (vacation)" in digest.body
+    assert "- Timesheet: Consultant, week of" in digest.body
+    assert rows(engine, PendingNotification) == []
+
+
+def test_digests_use_one_grouped_query():
+    engine = make_engine()
+    with Session(engine) as session:
+        for n in range(3):
+            session.add(Employee(full_name=f"Manager {n}", email=f"m{n}@dew.com", password_hash="x",
+                                 role=EmployeeRole.CLIENT_MANAGER, notification_mode=NotificationMode.DIGEST))
+            for i in range(4):
+                session.add(PendingNotification(manager_email=f"m{n}@dew.com", kind=TIMESHEET_SUBMITTED, summary=f"Timesheet {i}"))
+        # No account behind this address: sent at once
+        session.add(PendingNotification(manager_email="former@dew.com", kind=TIMESHEET_SUBMITTED, summary="Timesheet"))
+        session.commit()
+
+    with Session(engine) as session, capture_statements() as statements:
+        assert queue_due_digests(session, datetime.utcnow()) == 1
+        assert queue_due_digests(session, datetime.utcnow() + timedelta(hours=2)) == 3
+    assert sum(statement.lstrip().upper().startswith("SELECT") for statement in statements) == 2
+    digests = {message.recipients: message for message in rows(engine, EmailOutbox)}
+    assert set(digests) == {"former@dew.com", "m0@dew.com", "m1@dew.com", "m2@dew.com"}
+    assert digests["m1@dew.com"].subject == "4 items awaiting your approval"
+    assert digests["former@dew.com"].body.startswith("Hello,\n")
+
+
+def test_digest_covers_exactly_the_deleted_notifications():
+    engine = make_engine()
+    with Session(engine) as session:
+        session.add(Employee(full_name="Manager", email="m@dew.com", password_hash="x",
+                             role=EmployeeRole.CLIENT_MANAGER, notification_mode=NotificationMode.DIGEST))
+        for i in range(3):
+            session.add(PendingNotification(manager_email="m@dew.com", kind=TIMESHEET_SUBMITTED, summary=f"Timesheet {i}"))
+        session.commit()
+
+    raced = []
+
+    def concurrent_sender(conn, cursor, statement, *args):
+        # Another sender digests "Timesheet 0" between the grouped query and this delete
+        if statement.lstrip().upper().startswith("DELETE") and not raced:
+            raced.append(statement)
+            with Session(engine) as other:
+                other.delete(other.exec(select(PendingNotification).where(PendingNotification.summary == "Timesheet 0")).one())
+                other.commit()
+
+    event.listen(engine, "before_cursor_execute", concurrent_sender)
+    try:
+        with Session(engine) as session:
+            assert queue_due_digests(session, datetime.utcnow() + timedelta(hours=2)) == 1
+    finally:
+        event.remove(engine, "before_cursor_execute", concurrent_sender)
+    assert raced
+    [digest] = rows(engine, EmailOutbox)
+    assert digest.subject == "2 items awaiting your approval"
+    assert "- Timesheet 0" not in digest.body and "- Timesheet 1" in digest.body and "- Timesheet 2" in digest.body
+    assert rows(engine, PendingNotification) == []
+
+
+if __name__ == "__main__":
+    for test in (test_digest_mode_coalesces_submissions, test_digests_use_one_grouped_query,
+                 test_digest_covers_exactly_the_deleted_notifications):
+        test()
+        print(f"✅ {test.__name__}")
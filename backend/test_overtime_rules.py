@@ -0,0 +1,155 @@
+#!/usr/bin/env python3
+"""
+Tests for the overtime rules engine
+
+Worked time is split per day total (so split shifts count together) under the
+client's rules: daily and weekly overtime thresholds, double time tiers and the
+seventh-consecutive-day rule. Entry writes keep the stored splits current and
+changing a client's rules splits its existing timesheets again, in the
+background and outside the request's DB time budget.
+"""
+
+import os
+import sys
+from datetime import date, timedelta
+
+# Add the app directory to Python path
+sys.path.append(os.path.join(os.path.dirname(__file__), 'app'))
+
+from sqlmodel import Session
+
+from app.core.metrics import RequestStats, _current_stats
+from app.core.db_pool import install_time_limits
+from app.core.rollup_jobs import RecomputeQueue, recompute_queue
+from app.models import Employee, EmployeeRole, OvertimeRules, Timesheet
+from app.utils.auth import create_access_token
+from app.utils.overtime import DEFAULT_RULES, OvertimeRuleSet, evaluate, split_weeks
+from app.utils.rollups import verify
+from test_db_pool import limits
+from test_query_budget import SMALL, isolated_app, make_engine, seed
+
+# Daily overtime after 8h and double time after 12h, weekly after 40h, seventh day rule
+CALIFORNIA = OvertimeRuleSet(daily_double_time_after_minutes=720, seventh_day=True)
+
+
+def auth(user_id: int) -> dict:
+    return {"Authorization": f"Bearer {create_access_token({'sub': str(user_id)})}"}
+
+
+def test_engine_daily_weekly_and_seventh_day():
+    weeks = [
+        [600, 540, 0, 0, 0],                # Daily overtime only
+        [480] * 6,                          # The sixth 8h day crosses 40h: all weekly overtime
+        [540] * 5,                          # 45h, but the extra hours are already daily overtime
+    ]
+    assert evaluate(DEFAULT_RULES, weeks) == [
+        [(480, 120, 0), (480, 60, 0), (0, 0, 0), (0, 0, 0), (0, 0, 0)],
+        [(480, 0, 0)] * 5 + [(0, 480, 0)],
+        [(480, 60, 0)] * 5,
+    ]
+    # Double time after 12h; seven consecutive days make the seventh overtime, doubled after 8h
+    assert evaluate(CALIFORNIA, [[780, 0, 0, 0, 0, 0, 0], [300] * 7, [300] * 6 + [0]]) == [
+        [(480, 240, 60)] + [(0, 0, 0)] * 6,
+        [(300, 0, 0)] * 6 + [(0, 300, 0)],
+        [(300, 0, 0)] * 6 + [(0, 0, 0)],
+    ]
+    assert evaluate(OvertimeRuleSet(daily_overtime_after_minutes=None, weekly_overtime_after_minutes=None), [[900]]) == [[(900, 0, 0)]]
+    # Dated totals of several timesheets, grouped by rule set
+    split = split_weeks({
+        1: (DEFAULT_RULES, date(2024, 1, 8), {date(2024, 1, 9): 500}),
+        2: (CALIFORNIA, date(2024, 1, 8), {date(2024, 1, 8) + timedelta(days=d): 60 for d in range(7)}),
+        3: (CALIFORNIA, date(2024, 1, 8), {}),
+    })
+    assert split[1] == {date(2024, 1, 9): (500, 480, 20, 0)}
+    assert split[2][date(2024, 1, 14)] == (60, 0, 60, 0) and split[2][date(2024, 1, 13)] == (60, 60, 0, 0)
+    assert split[3] == {}
+
+
+def test_split_shifts_count_as_one_day():
+    engine = make_engine()
+    with Session(engine) as session:
+        ids = seed(session, SMALL)
+    shifts = [{"date": "2024-01-09", "in_time": "07:00", "out_time": "12:00"},
+              {"date": "2024-01-09", "in_time": "13:00", "out_time": "18:00"}]
+    with isolated_app(engine) as client:
+        response = client.post(f"/api/v1/timesheets/{ids['draft']}/entries:batch", json={"entries": shifts}, headers=auth(ids["consultant"]))
+        assert response.status_code == 201, response.text
+        timesheet = client.get(f"/api/v1/timesheets/{ids['draft']}", headers=auth(ids["consultant"])).json()
+        # Seeded 9h45 on Monday plus two 5h shifts on Tuesday
+        assert (timesheet["regular_hours"], timesheet["overtime_hours"], timesheet["double_time_hours"]) == (16.0, 3.75, 0.0)
+        response = client.delete(f"/api/v1/timesheets/{ids['draft']}/entries/{ids['entry']}", headers=auth(ids["consultant"]))
+        assert response.status_code == 204
+        timesheet = client.get(f"/api/v1/timesheets/{ids['draft']}", headers=auth(ids["consultant"])).json()
+        assert (timesheet["regular_hours"], timesheet["overtime_hours"], timesheet["total_hours"]) == (8.0, 2.0, 10.0)
+    with Session(engine) as session:
+        assert verify(session) == []
+
+
+def test_rules_change_recomputes_history():
+    engine = make_engine()
+    with Session(engine) as session:
+        ids = seed(session, SMALL)
+        client_id = session.get(Employee, ids["consultant"]).client_id
+        admin = Employee(full_name="Admin", email="admin@dew.com", password_hash="x", role=EmployeeRole.DEW_ADMIN)
+        session.add(admin)
+        session.commit()
+        ids["admin"] = admin.id
+    path = f"/api/v1/clients/clients/{client_id}/overtime-rules"
+    rules = {"daily_overtime_after_minutes": 480, "daily_double_time_after_minutes": 540,
+             "weekly_overtime_after_minutes": 2400, "seventh_day": False}
+    with isolated_app(engine) as client:
+        current = client.get(path, headers=auth(ids["manager"])).json()
+        assert current["is_default"] and current["weekly_overtime_after_minutes"] == 2400
+        assert client.put(path, json=rules, headers=auth(ids["manager"])).status_code == 403
+        invalid = dict(rules, daily_double_time_after_minutes=480)
+        assert client.put(path, json=invalid, headers=auth(ids["admin"])).status_code == 422
+
+        listing = client.get("/api/v1/timesheets/", headers=auth(ids["manager"]))
+        etag = listing.headers["ETag"]
+        assert client.get("/api/v1/timesheets/", headers={**auth(ids["manager"]), "If-None-Match": etag}).status_code == 304
+
+        response = client.put(path, json=rules, headers=auth(ids["admin"]))
+        assert response.status_code == 200, response.text
+        assert response.json()["recompute_queued"] and not response.json()["is_default"]
+        recompute_queue.wait()
+        # The recompute moves the list ETag, so cached listings show the new split
+        listing = client.get("/api/v1/timesheets/", headers={**auth(ids["manager"]), "If-None-Match": etag})
+        assert listing.status_code == 200 and listing.headers["ETag"] != etag
+        assert listing.json()[0]["double_time_hours"] == 0.75
+        assert client.get(path, headers=auth(ids["consultant"])).status_code == 403
+        timesheet = client.get(f"/api/v1/timesheets/{ids['submitted']}", headers=auth(ids["manager"])).json()
+        # 9h45: 8h regular, 1h overtime, 45 minutes double time
+        assert (timesheet["regular_hours"], timesheet["overtime_hours"], timesheet["double_time_hours"]) == (8.0, 1.0, 0.75)
+    with Session(engine) as session:
+        assert verify(session) == []
+        assert session.get(Timesheet, ids["draft"]).double_time_minutes == 45
+
+
+def test_recompute_runs_outside_the_request_budget():
+    engine = make_engine()
+    install_time_limits(engine)
+    engine.dispose()  # the progress handler is installed on new connections
+    with Session(engine) as session:
+        ids = seed(session, SMALL)
+        client_id = session.get(Employee, ids["consultant"]).client_id
+        session.add(OvertimeRules(client_id=client_id, daily_double_time_after_minutes=540))
+        session.commit()
+    queue = RecomputeQueue(engine)
+    # Queued by a request that has already spent its whole budget
+    token = _current_stats.set(RequestStats(db_seconds=1.0))
+    try:
+        with limits(request_time_budget_ms=200):
+            queue.submit(client_id)
+            queue.wait()
+    finally:
+        _current_stats.reset(token)
+    with Session(engine) as session:
+        assert verify(session) == []
+        assert session.get(Timesheet, ids["draft"]).double_time_minutes == 45
+
+
+if __name__ == "__main__":
+    for test in (test_engine_daily_weekly_and_seventh_day, test_split_shifts_count_as_one_day, test_rules_change_recomputes_history,
+                 test_recompute_runs_outside_the_request_budget):
+        test()
+        print(f"✅ {test.__name__}")
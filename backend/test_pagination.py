@@ -0,0 +1,46 @@
+#!/usr/bin/env python3
+"""
+Tests for keyset pagination of the list endpoints
+
+A request without `limit` gets one DEFAULT_PAGE_SIZE page, never the whole
+table; following X-Next-Cursor reads the rest without gaps or repeats.
+"""
+
+import os
+import sys
+
+# Add the app directory to Python path
+sys.path.append(os.path.join(os.path.dirname(__file__), 'app'))
+
+from sqlmodel import Session
+
+from app.utils.auth import create_access_token
+from app.utils.pagination import DEFAULT_PAGE_SIZE, NEXT_CURSOR_HEADER
+from test_query_budget import isolated_app, make_engine, seed
+
+WEEKS = DEFAULT_PAGE_SIZE + 5
+
+
+def auth(user_id: int) -> dict:
+    return {"Authorization": f"Bearer {create_access_token({'sub': str(user_id)})}"}
+
+
+def test_list_is_paged_by_default():
+    engine = make_engine()
+    with Session(engine) as session:
+        ids = seed(session, {"timesheets": WEEKS, "entries": 1, "breaks": 0})
+    with isolated_app(engine) as client:
+        first = client.get("/api/v1/timesheets/", params={"view": "summary"}, headers=auth(ids["consultant"]))
+        assert first.status_code == 200, first.text
+        assert len(first.json()) == DEFAULT_PAGE_SIZE
+        cursor = first.headers[NEXT_CURSOR_HEADER]
+        rest = client.get("/api/v1/timesheets/", params={"view": "summary", "cursor": cursor}, headers=auth(ids["consultant"]))
+        assert NEXT_CURSOR_HEADER not in rest.headers
+        listed = [t["id"] for t in first.json() + rest.json()]
+        assert listed == sorted(set(listed)) and len(listed) == WEEKS
+        assert client.get("/api/v1/timesheets/", params={"limit": 501}, headers=auth(ids["consultant"])).status_code == 422
+
+
+if __name__ == "__main__":
+    test_list_is_paged_by_default()
+    print("✅ test_list_is_paged_by_default")
@@ -0,0 +1,125 @@
+#!/usr/bin/env python3
+"""
+Tests for the password hashing pool
+
+Hashing runs on a bounded pool that answers 503 with Retry-After once its
+queue is full, and logins upgrade hashes made with an outdated bcrypt cost.
+"""
+
+import asyncio
+import os
+import sys
+import threading
+
+# Add the app directory to Python path
+sys.path.append(os.path.join(os.path.dirname(__file__), 'app'))
+
+from fastapi import HTTPException
+from passlib.context import CryptContext
+from sqlmodel import Session
+
+from app.core.password_pool import PasswordPool, PASSWORD_HASH_SECONDS, PASSWORD_POOL_REJECTED, password_pool
+from app.models import Employee, EmployeeRole
+from app.utils import auth as auth_utils
+from test_query_budget import isolated_app, make_engine
+
+PASSWORD = "correct horse battery staple"
+
+
+def make_user(rounds: int):
+    engine = make_engine()
+    context = CryptContext(schemes=["bcrypt"], bcrypt__rounds=rounds)
+    with Session(engine) as session:
+        user = Employee(full_name="Admin", email="admin@dew.com", password_hash=context.hash(PASSWORD), role=EmployeeRole.DEW_ADMIN)
+        session.add(user)
+        session.commit()
+        session.refresh(user)
+        return engine, user.id
+
+
+def stored_hash(engine, user_id: int) -> str:
+    with Session(engine) as session:
+        return session.get(Employee, user_id).password_hash
+
+
+def test_pool_rejects_when_queue_is_full():
+    pool = PasswordPool(workers=1, queue_limit=1, retry_after_seconds=7)
+    release = threading.Event()
+
+    async def scenario():
+        running = [asyncio.ensure_future(pool.run("hash", release.wait)) for _ in range(2)]
+        await asyncio.sleep(0.05)
+        assert pool.in_flight == 2
+        try:
+            await pool.run("hash", release.wait)
+            raise AssertionError("third job should have been refused")
+        except HTTPException as exc:
+            assert exc.status_code == 503
+            assert exc.headers["Retry-After"] == "7"
+        release.set()
+        await asyncio.gather(*running)
+
+    rejected = PASSWORD_POOL_REJECTED.value(operation="hash")
+    asyncio.run(scenario())
+    assert PASSWORD_POOL_REJECTED.value(operation="hash") == rejected + 1
+    assert pool.in_flight == 0
+    pool.shutdown()
+
+
+def test_login_returns_503_when_saturated():
+    engine, _ = make_user(rounds=4)
+    queue_limit = password_pool.queue_limit
+    password_pool.queue_limit = -password_pool.workers  # capacity 0
+    try:
+        with isolated_app(engine) as client:
+            response = client.post("/api/v1/auth/login", json={"email": "admin@dew.com", "password": PASSWORD})
+    finally:
+        password_pool.queue_limit = queue_limit
+    assert response.status_code == 503
+    assert response.headers["Retry-After"] == str(password_pool.retry_after_seconds)
+
+
+def test_login_rehashes_when_cost_changes():
+    engine, user_id = make_user(rounds=4)
+    original_context = auth_utils.pwd_context
+    auth_utils.pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto", bcrypt__rounds=5)
+    verified = PASSWORD_HASH_SECONDS.count(operation="verify")
+    try:
+        with isolated_app(engine) as client:
+            response = client.post("/api/v1/auth/login", json={"email": "admin@dew.com", "password": PASSWORD})
+            assert response.status_code == 200, response.text
+            upgraded = stored_hash(engine, user_id)
+            assert upgraded.startswith("$2b$05$")
+
+            # Already at the configured cost: nothing to rewrite
+            assert client.post("/api/v1/auth/login", json={"email": "admin@dew.com", "password": PASSWORD}).status_code == 200
+            assert stored_hash(engine, user_id) == upgraded
+
+            # A wrong password never rewrites the hash
+            assert client.post("/api/v1/auth/login", json={"email": "admin@dew.com", "password": "nope"}).status_code == 401
+    finally:
+        auth_utils.pwd_context = original_context
+    assert PASSWORD_HASH_SECONDS.count(operation="verify") == verified + 3
+
+
+def test_signup_hashes_on_pool():
+    engine, _ = make_user(rounds=4)
+    hashed = PASSWORD_HASH_SECONDS.count(operation="hash")
+    with isolated_app(engine) as client:
+        response = client.post("/api/v1/auth/signup", json={
+            "email": "second@dew.com", "password": PASSWORD, "full_name": "Second", "role": "dew_admin"
+        })
+        assert response.status_code == 200, response.text
+        assert client.post("/api/v1/auth/login", json={"email": "second@dew.com", "password": PASSWORD}).status_code == 200
+        duplicate = client.post("/api/v1/auth/signup", json={
+            "email": "second@dew.com", "password": PASSWORD, "full_name": "Second", "role": "dew_admin"
+        })
+        assert duplicate.status_code == 400
+    assert PASSWORD_HASH_SECONDS.count(operation="hash") == hashed + 1
+
+
+if __name__ == "__main__":
+    for test in (test_pool_rejects_when_queue_is_full, test_login_returns_503_when_saturated,
+                 test_login_rehashes_when_cost_changes, test_signup_hashes_on_pool):
+        test()
+        print(f"✅ {test.__name__}")
@@ -0,0 +1,78 @@
+#!/usr/bin/env python3
+"""
+Tests for the principal cache used by get_current_user
+"""
+
+import os
+import sys
+import time
+
+# Add the app directory to Python path
+sys.path.append(os.path.join(os.path.dirname(__file__), 'app'))
+
+from sqlmodel import Session
+
+from app.core.principal_cache import PrincipalCache, PRINCIPAL_CACHE_REQUESTS
+from app.models import Employee, EmployeeRole
+from test_time_entry_batch import auth, make_client_and_ids
+from test_query_budget import capture_statements, isolated_app
+
+
+def employee(user_id: int) -> Employee:
+    return Employee(id=user_id, full_name=f"User {user_id}", email=f"user{user_id}@paypal.com", password_hash="x", role=EmployeeRole.CONSULTANT)
+
+
+def test_hit_skips_employee_query():
+    engine, ids = make_client_and_ids()
+    with isolated_app(engine) as client, capture_statements() as statements:
+        headers = auth(ids["manager"])
+        hits = PRINCIPAL_CACHE_REQUESTS.value(result="hit")
+        client.get("/api/v1/clients/clients/", headers=headers)
+        statements.clear()
+        response = client.get("/api/v1/clients/clients/", headers=headers)
+        assert response.status_code == 200
+        assert not any("FROM employee" in sql for sql in statements)
+        assert PRINCIPAL_CACHE_REQUESTS.value(result="hit") == hits + 1
+
+
+def test_update_and_delete_invalidate():
+    engine, ids = make_client_and_ids()
+    with isolated_app(engine) as client:
+        with Session(engine) as session:
+            admin = Employee(full_name="Admin", email="admin@dew.com", password_hash="x", role=EmployeeRole.DEW_ADMIN)
+            session.add(admin)
+            session.commit()
+            admin_id = admin.id
+        manager = auth(ids["manager"])
+        assert client.get("/api/v1/clients/clients/", headers=manager).status_code == 200
+
+        # Demote the manager: the cached principal must not keep the old role
+        response = client.put(f"/api/v1/employees/employees/{ids['manager']}", json={"role": "consultant", "client_id": 1}, headers=auth(admin_id))
+        assert response.status_code == 200, response.text
+        assert client.get("/api/v1/employees/employees/", headers=manager).status_code == 403
+
+        assert client.delete(f"/api/v1/employees/employees/{ids['manager']}", headers=auth(admin_id)).status_code == 204
+        assert client.get("/api/v1/clients/clients/", headers=manager).status_code == 401
+
+
+def test_lru_eviction_and_ttl():
+    engine, _ = make_client_and_ids()
+    cache = PrincipalCache(max_size=2, ttl_seconds=60)
+    with Session(engine) as session:
+        for user_id in (1, 2, 3):
+            cache.put(f"token{user_id}", employee(user_id))
+        assert cache.get(session, "token1") is None  # evicted as least recently used
+        assert cache.get(session, "token3").email == "user3@paypal.com"
+
+        cache.put("expiring", employee(4), token_expires_at=time.time() + 0.05)
+        time.sleep(0.1)
+        assert cache.get(session, "expiring") is None
+
+        cache.invalidate_user(3)
+        assert cache.get(session, "token3") is None
+
+
+if __name__ == "__main__":
+    for test in (test_hit_skips_employee_query, test_update_and_delete_invalidate, test_lru_eviction_and_ttl):
+        test()
+        print(f"✅ {test.__name__}")
@@ -0,0 +1,271 @@
+#!/usr/bin/env python3
+"""
+Query-count budgets for the main endpoints
+
+Runs each endpoint against a small and a large seeded SQLite database and
+counts the SQL statements it issues. A request must stay within its budget
+and issue the same number of statements at both sizes, so an N+1 (one query
+per row) fails here instead of in production.
+
+The same scenarios are re-run in a subprocess with ORM_RAISE_ON_LAZY_LOAD=1,
+where any relationship access that was not eager loaded raises.
+"""
+
+import atexit
+import os
+import subprocess
+import sys
+import tempfile
+import threading
+from contextlib import contextmanager
+from datetime import date, time, timedelta
+
+# Add the app directory to Python path
+sys.path.append(os.path.join(os.path.dirname(__file__), 'app'))
+
+from fastapi.testclient import TestClient
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from sqlalchemy.ext.asyncio import create_async_engine
+from sqlalchemy.pool import NullPool
+from sqlmodel import SQLModel, Session, create_engine, select
+
+from app.main import app
+from app.core.database import async_url, make_async_sessionmaker
+from app.core.session import get_db, get_async_db
+from app.models import Client, Employee, EmployeeRole, Timesheet, TimesheetStatus, TimeEntry, BreakPeriod
+from app.models.time_off import TimeOff, TimeOffType, TimeOffStatus
+from app.utils.auth import create_access_token
+from app.utils.rollups import backfill
+from app.core.principal_cache import principal_cache
+from app.core.audit import WRITER_THREAD_NAME, audit_writer
+from app.core.rollup_jobs import recompute_queue
+
+SMALL = {"timesheets": 2, "entries": 1, "breaks": 1}
+LARGE = {"timesheets": 30, "entries": 5, "breaks": 3}
+
+# Maximum statements per request. The current user is loaded on each user's first
+# request (list timesheets, get time off) and comes from the principal cache after that.
+# Submit and approve (timesheet and time off) and create time off include the INSERT
+# of their notification into the email outbox; submit and create time off also look
+# up the manager's notification mode (email or digest).
+BUDGETS = {
+    "list timesheets": 5,
+    "list timesheets (summary)": 2,
+    "get timesheet": 3,
+    "add time entry": 9,
+    "add time entries (batch)": 10,
+    "delete time entry": 8,
+    "submit timesheet": 7,
+    "approve timesheet": 6,
+    "list time off": 2,
+    "approval summary": 1,
+    "get time off": 2,
+    "create time off": 5,
+    "approve time off": 4,
+    "list employees": 2,
+    "list clients": 2,
+}
+
+
+def seed(session: Session, size: dict) -> dict:
+    """One client with a manager and a consultant owning size['timesheets'] timesheets"""
+    client = Client(name="PayPal", code="paypal")
+    session.add(client)
+    session.flush()
+    manager = Employee(full_name="Manager", email="manager@paypal.com", password_hash="x", role=EmployeeRole.CLIENT_MANAGER, client_id=client.id)
+    consultant = Employee(full_name="Consultant", email="consultant@paypal.com", password_hash="x", role=EmployeeRole.CONSULTANT, client_id=client.id)
+    session.add_all([manager, consultant])
+    session.flush()
+    timesheet_ids = []
+    for w in range(size["timesheets"]):
+        week_start = date(2024, 1, 1) + timedelta(weeks=w)
+        timesheet = Timesheet(
+            employee_id=consultant.id,
+            week_start=week_start,
+            manager_email=manager.email,
+            status=TimesheetStatus.SUBMITTED.value if w == 0 else TimesheetStatus.DRAFT.value
+        )
+        session.add(timesheet)
+        session.flush()
+        timesheet_ids.append(timesheet.id)
+        for e in range(size["entries"]):
+            entry = TimeEntry(timesheet_id=timesheet.id, date=week_start + timedelta(days=e), in_time=time(8, 0), out_time=time(18, 0))
+            session.add(entry)
+            session.flush()
+            for b in range(size["breaks"]):
+                session.add(BreakPeriod(time_entry_id=entry.id, start_time=time(10 + b, 0), end_time=time(10 + b, 15)))
+        session.add(TimeOff(
+            employee_id=consultant.id,
+            start_date=week_start,
+            end_date=week_start + timedelta(days=1),
+            type=TimeOffType.VACATION,
+            status=TimeOffStatus.PENDING,
+            manager_email=manager.email
+        ))
+    session.commit()
+    # Entries are inserted directly, so build their rollups as the endpoints would have
+    backfill(session)
+    first_entry = session.exec(select(TimeEntry).where(TimeEntry.timesheet_id == timesheet_ids[-1])).first()
+    return {
+        "manager": manager.id,
+        "consultant": consultant.id,
+        "submitted": timesheet_ids[0],
+        "draft": timesheet_ids[-1],
+        "entry": first_entry.id,
+    }
+
+
+def scenarios(ids: dict, size: dict) -> list:
+    """(name, user, method, path, json body) in execution order; writes come after reads"""
+    free_day = (date(2024, 1, 1) + timedelta(weeks=size["timesheets"] - 1, days=6)).isoformat()
+    return [
+        ("list timesheets", "manager", "GET", "/api/v1/timesheets/", None),
+        ("list timesheets (summary)", "manager", "GET", "/api/v1/timesheets/?view=summary", None),
+        ("get timesheet", "manager", "GET", f"/api/v1/timesheets/{ids['draft']}", None),
+        ("list time off", "manager", "GET", "/api/v1/time_off/", None),
+        ("approval summary", "manager", "GET", "/api/v1/approvals/summary", None),
+        ("get time off", "consultant", "GET", "/api/v1/time_off/1", None),
+        ("list employees", "manager", "GET", "/api/v1/employees/employees/", None),
+        ("list clients", "manager", "GET", "/api/v1/clients/clients/", None),
+        ("add time entry", "consultant", "POST", f"/api/v1/timesheets/{ids['draft']}/entries", {
+            "date": free_day, "in_time": "09:00", "out_time": "17:00",
+            "break_periods": [{"start_time": "12:00", "end_time": "12:30"}]
+        }),
+        ("add time entries (batch)", "consultant", "POST", f"/api/v1/timesheets/{ids['draft']}/entries:batch", {
+            "entries": [
+                {"date": free_day, "in_time": start, "out_time": end, "project": "batch",
+                 "break_periods": [{"start_time": start.replace(":00", ":30"), "end_time": start.replace(":00", ":45")}]}
+                for start, end in [("18:00", "19:00"), ("19:00", "20:00"), ("20:00", "21:00")]
+            ]
+        }),
+        ("delete time entry", "consultant", "DELETE", f"/api/v1/timesheets/{ids['draft']}/entries/{ids['entry']}", None),
+        ("submit timesheet", "consultant", "POST", f"/api/v1/timesheets/{ids['draft']}/submit", None),
+        ("approve timesheet", "manager", "POST", f"/api/v1/timesheets/{ids['submitted']}/approve", None),
+        ("create time off", "consultant", "POST", "/api/v1/time_off/", {
+            "start_date": "2025-01-06", "end_date": "2025-01-07", "type": "vacation", "manager_email": "manager@paypal.com"
+        }),
+        ("approve time off", "manager", "POST", "/api/v1/time_off/1/approve", None),
+    ]
+
+
+def make_engine():
+    """
+    Empty schema in a temporary SQLite file
+
+    A file rather than :memory:, so the test's sync engine and the aiosqlite engine
+    the async endpoints use (see isolated_app) see the same database.
+    """
+    handle, path = tempfile.mkstemp(suffix=".db", prefix="dew_test_")
+    os.close(handle)
+    atexit.register(os.remove, path)
+    engine = create_engine(f"sqlite:///{path}")
+    SQLModel.metadata.create_all(engine)
+    return engine
+
+
+@contextmanager
+def capture_statements():
+    """SQL text of every statement executed on any engine (sync or async) while active, audit writer excluded"""
+    statements = []
+
+    def record(conn, cursor, statement, *args):
+        # The audit writer flushes off the request path, whenever its timer fires
+        if threading.current_thread().name != WRITER_THREAD_NAME:
+            statements.append(statement)
+
+    event.listen(Engine, "before_cursor_execute", record)
+    try:
+        yield statements
+    finally:
+        event.remove(Engine, "before_cursor_execute", record)
+
+
+@contextmanager
+def isolated_app(engine):
+    """Point the app (sync and async sessions, audit writer, rollup recomputes) at `engine` for the duration (queued email stays in its outbox)"""
+    def override_get_db():
+        with Session(engine) as session:
+            yield session
+
+    async_sessions = make_async_sessionmaker(create_async_engine(async_url(engine.url), poolclass=NullPool))
+
+    async def override_get_async_db():
+        async with async_sessions() as session:
+            yield session
+
+    app.dependency_overrides[get_db] = override_get_db
+    app.dependency_overrides[get_async_db] = override_get_async_db
+    principal_cache.clear()
+    audit_writer.close()
+    audit_bind, audit_writer.bind = audit_writer.bind, engine
+    recompute_queue.wait()
+    recompute_bind, recompute_queue.bind = recompute_queue.bind, engine
+    try:
+        yield TestClient(app)
+    finally:
+        app.dependency_overrides.pop(get_db, None)
+        app.dependency_overrides.pop(get_async_db, None)
+        principal_cache.clear()
+        audit_writer.close()
+        audit_writer.bind = audit_bind
+        recompute_queue.wait()
+        recompute_queue.bind = recompute_bind
+
+
+def measure(size: dict) -> dict:
+    """Statement count per scenario on a fresh database seeded at `size`"""
+    engine = make_engine()
+    with Session(engine) as session:
+        ids = seed(session, size)
+
+    counts = {}
+    # One token per user for the whole run, as a real client would reuse it
+    tokens = {user: create_access_token({"sub": str(ids[user])}) for user in ("manager", "consultant")}
+    with isolated_app(engine) as client, capture_statements() as statements:
+        for name, user, method, path, body in scenarios(ids, size):
+            statements.clear()
+            response = client.request(method, path, json=body, headers={"Authorization": f"Bearer {tokens[user]}"})
+            assert response.status_code < 400, f"{name}: {response.status_code} {response.text}"
+            counts[name] = len(statements)
+    engine.dispose()
+    return counts
+
+
+def check_budgets() -> list:
+    """Return (name, small count, large count, budget) for every scenario over budget or growing with data"""
+    small, large = measure(SMALL), measure(LARGE)
+    failures = []
+    for name, budget in BUDGETS.items():
+        print(f"🔍 {name}: {small[name]} statements (small), {large[name]} (large), budget {budget}")
+        if large[name] > budget or small[name] != large[name]:
+            failures.append((name, small[name], large[name], budget))
+    return failures
+
+
+def test_query_budgets():
+    failures = check_budgets()
+    assert not failures, "Query budget exceeded:\n" + "\n".join(
+        f"  {name}: {small} small / {large} large, budget {budget}" for name, small, large, budget in failures
+    )
+
+
+def test_no_lazy_loads():
+    # Relationship loading strategy is fixed when the models are imported, so use a fresh interpreter
+    env = dict(os.environ, ORM_RAISE_ON_LAZY_LOAD="1")
+    result = subprocess.run(
+        [sys.executable, os.path.abspath(__file__)],
+        cwd=os.path.dirname(os.path.abspath(__file__)),
+        env=env, capture_output=True, text=True
+    )
+    assert result.returncode == 0, result.stdout + result.stderr
+
+
+if __name__ == "__main__":
+    print("Checking query budgets...")
+    failures = check_budgets()
+    if failures:
+        for name, small, large, budget in failures:
+            print(f"❌ {name}: {small} statements small, {large} large (budget {budget})")
+        sys.exit(1)
+    print("✅ All endpoints within their query budgets")
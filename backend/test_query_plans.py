@@ -0,0 +1,210 @@
+#!/usr/bin/env python3
+"""
+Query-plan regression tests for the hot lookups
+
+Seeds a scratch database, captures EXPLAIN output for every hot filter and
+fails when one of them falls back to a full table scan. Runs against an
+in-memory SQLite database by default; point QUERY_PLAN_DATABASE_URL at a
+disposable PostgreSQL database to check the production planner instead.
+"""
+
+import os
+import sys
+from datetime import date, time, timedelta
+
+# Add the app directory to Python path
+sys.path.append(os.path.join(os.path.dirname(__file__), 'app'))
+
+from sqlalchemy import event, select, text
+from sqlalchemy.pool import StaticPool
+from sqlmodel import SQLModel, Session, create_engine
+
+from app.models import Client, Employee, EmployeeRole, Timesheet, TimesheetStatus, TimesheetDay, TimeEntry, BreakPeriod, AuditLog, AuditEventType
+from app.models.time_off import TimeOff, TimeOffType, TimeOffStatus
+from app.schemas.reports import UtilizationGroup
+from app.utils.overtime import timesheet_rules
+from app.utils.utilization import utilization_statement
+
+DATABASE_URL = os.getenv("QUERY_PLAN_DATABASE_URL", "sqlite://")
+
+SEED_CLIENTS = 20
+SEED_EMPLOYEES_PER_CLIENT = 25
+SEED_WEEKS = 8
+
+
+def make_engine():
+    if DATABASE_URL.startswith("sqlite"):
+        return create_engine(DATABASE_URL, connect_args={"check_same_thread": False}, poolclass=StaticPool)
+    return create_engine(DATABASE_URL)
+
+
+def seed(session: Session):
+    """Seed enough rows that a full scan is clearly worse than an index lookup"""
+    for c in range(SEED_CLIENTS):
+        client = Client(name=f"Client {c}", code=f"client{c}")
+        session.add(client)
+        session.flush()
+        manager_email = f"manager{c}@client{c}.com"
+        for e in range(SEED_EMPLOYEES_PER_CLIENT):
+            employee = Employee(
+                full_name=f"Employee {c}-{e}",
+                email=f"employee{e}@client{c}.com",
+                password_hash="x",
+                client_id=client.id,
+                role=EmployeeRole.CONSULTANT
+            )
+            session.add(employee)
+            session.flush()
+            for w in range(SEED_WEEKS):
+                week_start = date(2024, 1, 1) + timedelta(weeks=w)
+                timesheet = Timesheet(
+                    employee_id=employee.id,
+                    week_start=week_start,
+                    manager_email=manager_email,
+                    status=TimesheetStatus.SUBMITTED.value if w == SEED_WEEKS - 1 else TimesheetStatus.APPROVED.value
+                )
+                session.add(timesheet)
+                session.flush()
+                entry = TimeEntry(timesheet_id=timesheet.id, date=week_start, in_time=time(9, 0), out_time=time(17, 0))
+                session.add(entry)
+                session.flush()
+                session.add(BreakPeriod(time_entry_id=entry.id, start_time=time(12, 0), end_time=time(12, 30)))
+                # Only status changes carry previous_status
+                session.add(AuditLog(
+                    timesheet_id=timesheet.id,
+                    event=AuditEventType.TIMESHEET_CREATED,
+                    actor_id=employee.id,
+                    actor_email=employee.email,
+                    actor_role=employee.role.value,
+                    details={"employee_id": employee.id, "previous_status": "draft"} if w == SEED_WEEKS - 1 else {"employee_id": employee.id}
+                ))
+            session.add(TimeOff(
+                employee_id=employee.id,
+                start_date=date(2024, 3, 4),
+                end_date=date(2024, 3, 8),
+                type=TimeOffType.VACATION,
+                status=TimeOffStatus.PENDING,
+                manager_email=manager_email
+            ))
+    session.commit()
+
+
+# Each hot lookup: (name, table that must not be fully scanned, statement)
+HOT_QUERIES = [
+    ("timesheets by employee", "timesheet",
+     select(Timesheet).where(Timesheet.employee_id == 42)),
+    ("manager timesheet queue", "timesheet",
+     select(Timesheet).where(Timesheet.manager_email == "manager3@client3.com", Timesheet.status == TimesheetStatus.SUBMITTED.value)),
+    ("same-day entries", "timeentry",
+     select(TimeEntry).where(TimeEntry.timesheet_id == 42, TimeEntry.date == date(2024, 1, 1))),
+    ("entry breaks", "breakperiod",
+     select(BreakPeriod).where(BreakPeriod.time_entry_id.in_([1, 2, 3]))),
+    ("utilization of a client's employees", "timesheet",
+     utilization_statement(date(2024, 1, 1), date(2024, 2, 25), UtilizationGroup.EMPLOYEE, client_id=3)),
+    ("rollup days and overtime rules of a timesheet", "timesheetday",
+     timesheet_rules([42]).add_columns(TimesheetDay.total_minutes).outerjoin(TimesheetDay, TimesheetDay.timesheet_id == Timesheet.id)),
+    ("client's timesheets to recompute", "timesheet",
+     select(Timesheet.id).where(Timesheet.id > 0, Timesheet.employee_id.in_(select(Employee.id).where(Employee.client_id == 3)))
+     .order_by(Timesheet.id).limit(500)),
+    ("manager time off queue", "timeoff",
+     select(TimeOff).where(TimeOff.manager_email == "manager3@client3.com", TimeOff.status == TimeOffStatus.PENDING)),
+    ("employees by client", "employee",
+     select(Employee).where(Employee.client_id == 3)),
+    ("audit trail of a timesheet", "auditlog",
+     select(AuditLog).where(AuditLog.timesheet_id == 42)),
+    ("audit events about an employee", "auditlog",
+     select(AuditLog).where(AuditLog.detail_int("employee_id") == 42)),
+    ("audit transitions from a status", "auditlog",
+     select(AuditLog).where(AuditLog.detail_text("previous_status") == "submitted")),
+]
+
+
+class _Captured(Exception):
+    """Raised to stop a statement once its SQL and bound parameters are captured"""
+
+
+def executed_sql(session: Session, statement):
+    """
+    (SQL, parameters) exactly as the driver would receive them
+
+    Planning the statement with literal values inlined would hide expressions
+    that only match an index when they are part of the SQL text (bound
+    parameters can't be used by an expression index), so the plan is taken
+    for the executed form.
+    """
+    captured = []
+
+    def capture(conn, cursor, sql, parameters, context, executemany):
+        captured.append((sql, parameters))
+        raise _Captured()
+
+    connection = session.connection()
+    event.listen(connection, "before_cursor_execute", capture)
+    try:
+        connection.execute(statement)
+    except _Captured:
+        pass
+    finally:
+        event.remove(connection, "before_cursor_execute", capture)
+    return captured[0]
+
+
+def explain(session: Session, statement) -> list:
+    """Return the plan lines for a statement on the current dialect, with its parameters bound"""
+    dialect = session.get_bind().dialect
+    sql, parameters = executed_sql(session, statement)
+    connection = session.connection()
+    if dialect.name == "sqlite":
+        return [row[-1] for row in connection.exec_driver_sql(f"EXPLAIN QUERY PLAN {sql}", parameters)]
+    return [row[0] for row in connection.exec_driver_sql(f"EXPLAIN {sql}", parameters)]
+
+
+def is_full_scan(plan: list, table: str, dialect_name: str) -> bool:
+    """Detect a full scan of `table` in a plan (index scans are fine)"""
+    for line in plan:
+        if dialect_name == "sqlite":
+            # "SCAN t" and "SCAN t USING COVERING INDEX" both read every row
+            if line.startswith(f"SCAN {table}"):
+                return True
+        elif f"Seq Scan on {table}" in line:
+            return True
+    return False
+
+
+def check_query_plans() -> list:
+    """Seed a scratch database and return the hot queries that fall back to a full scan"""
+    engine = make_engine()
+    SQLModel.metadata.drop_all(engine)
+    SQLModel.metadata.create_all(engine)
+    failures = []
+    with Session(engine) as session:
+        seed(session)
+        dialect_name = engine.dialect.name
+        session.execute(text("ANALYZE"))
+        if dialect_name != "sqlite":
+            # With sequential scans disabled the planner only picks one when no index applies
+            session.execute(text("SET enable_seqscan = off"))
+        for name, table, statement in HOT_QUERIES:
+            plan = explain(session, statement)
+            print(f"🔍 {name}: {' | '.join(plan)}")
+            if is_full_scan(plan, table, dialect_name):
+                failures.append((name, plan))
+    SQLModel.metadata.drop_all(engine)
+    return failures
+
+
+def test_hot_lookups_use_indexes():
+    failures = check_query_plans()
+    assert not failures, "Full table scans detected:\n" + "\n".join(
+        f"  {name}: {' | '.join(plan)}" for name, plan in failures
+    )
+
+
+if __name__ == "__main__":
+    print("Checking query plans for hot lookups...")
+    failures = check_query_plans()
+    if failures:
+        for name, plan in failures:
+            print(f"❌ {name} falls back to a full scan: {plan}")
+        sys.exit(1)
+    print("✅ All hot lookups use an index")
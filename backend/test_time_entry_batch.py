@@ -0,0 +1,103 @@
+#!/usr/bin/env python3
+"""
+Tests for POST /timesheets/{id}/entries:batch
+
+A valid batch is written in one transaction and keeps the hours rollups in
+sync; an invalid batch is rejected as a whole with an error list per item.
+The single-entry endpoint reports every conflict of its entry the same way.
+"""
+
+import os
+import sys
+
+# Add the app directory to Python path
+sys.path.append(os.path.join(os.path.dirname(__file__), 'app'))
+
+from sqlmodel import Session, select
+
+from app.models import TimeEntry
+from app.utils.auth import create_access_token
+from app.utils.rollups import verify
+from test_query_budget import SMALL, isolated_app, make_engine, seed
+
+
+def make_client_and_ids():
+    engine = make_engine()
+    with Session(engine) as session:
+        ids = seed(session, SMALL)
+    return engine, ids
+
+
+def auth(user_id: int) -> dict:
+    return {"Authorization": "Bearer " + create_access_token({"sub": str(user_id)})}
+
+
+def week(days: range) -> list:
+    return [
+        {"date": f"2024-01-{day:02d}", "in_time": "09:00", "out_time": "17:30", "project": "apollo",
+         "break_periods": [{"start_time": "12:00", "end_time": "12:30"}]}
+        for day in days
+    ]
+
+
+def test_batch_creates_entries_and_rollups():
+    engine, ids = make_client_and_ids()
+    with isolated_app(engine) as client:
+        response = client.post(f"/api/v1/timesheets/{ids['draft']}/entries:batch", json={"entries": week(range(10, 15))}, headers=auth(ids["consultant"]))
+        assert response.status_code == 201, response.text
+        created = response.json()
+        assert len(created) == 5
+        assert all(entry["hours_worked"] == 8.0 and entry["project"] == "apollo" for entry in created)
+        assert all(len(entry["break_periods"]) == 1 for entry in created)
+
+        timesheet = client.get(f"/api/v1/timesheets/{ids['draft']}", headers=auth(ids["consultant"])).json()
+        assert timesheet["total_hours"] == 5 * 8.0 + 9.75
+    with Session(engine) as session:
+        assert verify(session) == []
+
+
+def test_batch_reports_every_invalid_item_and_writes_nothing():
+    engine, ids = make_client_and_ids()
+    entries = week(range(10, 12)) + [
+        {"date": "2024-01-10", "in_time": "17:00", "out_time": "18:00"},   # overlaps item 0
+        {"date": "2024-01-11", "in_time": "17:30", "out_time": "18:00"},   # touches item 1: fine
+        {"date": "2024-01-12", "in_time": "10:00", "out_time": "09:00"},   # out before in
+        {"date": "2024-01-08", "in_time": "09:00", "out_time": "10:00"},   # overlaps the seeded entry
+    ]
+    with isolated_app(engine) as client:
+        response = client.post(f"/api/v1/timesheets/{ids['draft']}/entries:batch", json={"entries": entries}, headers=auth(ids["consultant"]))
+    assert response.status_code == 400, response.text
+    errors = {item["index"]: item["errors"] for item in response.json()["detail"]["errors"]}
+    assert sorted(errors) == [2, 4, 5]
+    assert "item 0" in errors[2][0]
+    assert errors[4] == ["Out time must be after in time"]
+    assert "entry ID:" in errors[5][0]
+    with Session(engine) as session:
+        assert len(session.exec(select(TimeEntry).where(TimeEntry.timesheet_id == ids["draft"])).all()) == SMALL["entries"]
+
+
+def test_single_entry_reports_every_conflict():
+    engine, ids = make_client_and_ids()
+    entry = {"date": "2024-01-08", "in_time": "09:00", "out_time": "10:00",   # overlaps the seeded entry
+             "break_periods": [{"start_time": "11:00", "end_time": "11:15"}]}  # outside in/out
+    with isolated_app(engine) as client:
+        response = client.post(f"/api/v1/timesheets/{ids['draft']}/entries", json=entry, headers=auth(ids["consultant"]))
+    assert response.status_code == 400, response.text
+    detail = response.json()["detail"]
+    assert len(detail["errors"]) == 2
+    assert "entry ID:" in detail["errors"][0] and detail["errors"][1] == "Breaks must be within in/out time."
+    assert detail["message"] == "; ".join(detail["errors"])
+
+
+def test_batch_requires_owner():
+    engine, ids = make_client_and_ids()
+    with isolated_app(engine) as client:
+        response = client.post(f"/api/v1/timesheets/{ids['draft']}/entries:batch", json={"entries": week(range(10, 11))}, headers=auth(ids["manager"]))
+    assert response.status_code == 403
+
+
+if __name__ == "__main__":
+    for test in (test_batch_creates_entries_and_rollups, test_batch_reports_every_invalid_item_and_writes_nothing,
+                 test_single_entry_reports_every_conflict, test_batch_requires_owner):
+        test()
+        print(f"✅ {test.__name__}")
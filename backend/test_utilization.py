@@ -0,0 +1,116 @@
+#!/usr/bin/env python3
+"""
+Tests for the utilization report
+
+GET /reports/utilization sums the timesheet rollups per client (or per
+employee of one client) and week in one grouped query and pivots them into a
+row per group with a value per week; billable hours are approved ones.
+"""
+
+import os
+import sys
+from datetime import date
+
+# Add the app directory to Python path
+sys.path.append(os.path.join(os.path.dirname(__file__), 'app'))
+
+from sqlmodel import Session
+
+from app.models import Client, Employee, EmployeeRole, Timesheet, TimesheetStatus
+from app.utils.auth import create_access_token
+from app.utils.utilization import report_weeks
+from test_query_budget import capture_statements, isolated_app, make_engine
+
+
+def auth(user_id: int) -> dict:
+    return {"Authorization": f"Bearer {create_access_token({'sub': str(user_id)})}"}
+
+
+def setup(engine) -> dict:
+    with Session(engine) as session:
+        paypal, acme = Client(name="PayPal", code="paypal"), Client(name="Acme", code="acme")
+        session.add_all([paypal, acme])
+        session.flush()
+        people = {
+            "admin": Employee(full_name="Admin", email="admin@dew.com", password_hash="x", role=EmployeeRole.DEW_ADMIN),
+            "manager": Employee(full_name="Manager", email="manager@paypal.com", password_hash="x", role=EmployeeRole.CLIENT_MANAGER, client_id=paypal.id),
+            "ana": Employee(full_name="Ana", email="ana@paypal.com", password_hash="x", role=EmployeeRole.CONSULTANT, client_id=paypal.id),
+            "bo": Employee(full_name="Bo", email="bo@paypal.com", password_hash="x", role=EmployeeRole.CONSULTANT, client_id=paypal.id),
+            "cy": Employee(full_name="Cy", email="cy@acme.com", password_hash="x", role=EmployeeRole.CONSULTANT, client_id=acme.id),
+        }
+        session.add_all(people.values())
+        session.flush()
+        for who, week, status, total, overtime in [
+            ("ana", date(2024, 1, 1), TimesheetStatus.APPROVED, 2400, 60),
+            ("ana", date(2024, 1, 8), TimesheetStatus.SUBMITTED, 1200, 0),
+            ("bo", date(2024, 1, 8), TimesheetStatus.APPROVED, 600, 120),
+            ("bo", date(2024, 1, 15), TimesheetStatus.DRAFT, 999, 0),      # Not reported
+            ("bo", date(2024, 1, 15), TimesheetStatus.REJECTED, 999, 0),   # Not reported
+            ("cy", date(2024, 1, 15), TimesheetStatus.APPROVED, 300, 0),
+            ("cy", date(2023, 12, 25), TimesheetStatus.APPROVED, 999, 0),  # Before the range
+        ]:
+            session.add(Timesheet(employee_id=people[who].id, week_start=week, status=status.value, manager_email="manager@paypal.com",
+                                  total_minutes=total, regular_minutes=total - overtime, overtime_minutes=overtime))
+        session.commit()
+        ids = {name: employee.id for name, employee in people.items()}
+        ids["paypal"], ids["acme"] = paypal.id, acme.id
+    return ids
+
+
+RANGE = {"date_from": "2024-01-03", "date_to": "2024-01-21"}
+
+
+def test_report_by_client():
+    engine = make_engine()
+    ids = setup(engine)
+    with isolated_app(engine) as client:
+        client.get("/api/v1/reports/utilization", headers=auth(ids["admin"]), params=RANGE)
+        with capture_statements() as statements:
+            response = client.get("/api/v1/reports/utilization", headers=auth(ids["admin"]), params=RANGE)
+        assert response.status_code == 200, response.text
+        assert len(statements) == 1
+        report = response.json()
+        # date_from mid-week still covers its whole week
+        assert report["weeks"] == ["2024-01-01", "2024-01-08", "2024-01-15"]
+        acme, paypal = report["rows"]
+        assert (acme["client_name"], acme["employee_id"], acme["weekly_total_hours"]) == ("Acme", None, [0.0, 0.0, 5.0])
+        assert paypal["weekly_total_hours"] == [40.0, 30.0, 0.0]
+        assert paypal["weekly_overtime_hours"] == [1.0, 2.0, 0.0]
+        assert paypal["weekly_billable_hours"] == [40.0, 10.0, 0.0]
+        assert (paypal["total_hours"], paypal["regular_hours"], paypal["overtime_hours"], paypal["billable_hours"]) == (70.0, 67.0, 3.0, 50.0)
+        assert report["totals"]["weekly_total_hours"] == [40.0, 30.0, 5.0] and report["totals"]["billable_hours"] == 55.0
+
+
+def test_report_by_employee_and_scope():
+    engine = make_engine()
+    ids = setup(engine)
+    with isolated_app(engine) as client:
+        # Managers always report on their own client
+        response = client.get("/api/v1/reports/utilization", headers=auth(ids["manager"]),
+                              params={**RANGE, "group_by": "employee", "client_id": ids["acme"]})
+        assert response.status_code == 200, response.text
+        rows = response.json()["rows"]
+        assert [(row["employee_name"], row["weekly_total_hours"]) for row in rows] == [("Ana", [40.0, 20.0, 0.0]), ("Bo", [0.0, 10.0, 0.0])]
+        assert {row["client_id"] for row in rows} == {ids["paypal"]}
+
+        params = {**RANGE, "group_by": "employee"}
+        assert client.get("/api/v1/reports/utilization", headers=auth(ids["admin"]), params=params).status_code == 400
+        response = client.get("/api/v1/reports/utilization", headers=auth(ids["admin"]), params={**params, "client_id": ids["acme"]})
+        assert [row["employee_name"] for row in response.json()["rows"]] == ["Cy"]
+        assert client.get("/api/v1/reports/utilization", headers=auth(ids["ana"])).status_code == 403
+        bad_range = {"date_from": "2024-02-01", "date_to": "2024-01-01"}
+        assert client.get("/api/v1/reports/utilization", headers=auth(ids["admin"]), params=bad_range).status_code == 400
+        # The default range is the last 52 weeks
+        report = client.get("/api/v1/reports/utilization", headers=auth(ids["admin"])).json()
+        assert len(report["weeks"]) in (52, 53) and report["rows"] == []
+
+
+def test_report_weeks():
+    assert report_weeks(date(2024, 1, 7), date(2024, 1, 8)) == [date(2024, 1, 1), date(2024, 1, 8)]
+    assert report_weeks(date(2024, 1, 1), date(2024, 1, 1)) == [date(2024, 1, 1)]
+
+
+if __name__ == "__main__":
+    for test in (test_report_by_client, test_report_by_employee_and_scope, test_report_weeks):
+        test()
+        print(f"✅ {test.__name__}")
@@ -0,0 +1,85 @@
+#!/usr/bin/env python3
+"""
+Tests for PUT /timesheets/{id}/week
+
+Syncing the stored state writes nothing; a one-cell edit writes only the
+statements for that entry; rollups stay consistent with the entries.
+"""
+
+import os
+import sys
+
+# Add the app directory to Python path
+sys.path.append(os.path.join(os.path.dirname(__file__), 'app'))
+
+from sqlmodel import Session
+
+from app.utils.rollups import verify
+from test_time_entry_batch import auth, make_client_and_ids, week
+from test_query_budget import capture_statements, isolated_app
+
+
+def desired_state(timesheet: dict) -> list:
+    """The week as the client would send it back: stored entries with their ids"""
+    return [
+        {
+            "id": entry["id"], "date": entry["date"], "in_time": entry["in_time"], "out_time": entry["out_time"],
+            "project": entry["project"], "note": entry["note"],
+            "break_periods": [{"start_time": br["start_time"], "end_time": br["end_time"]} for br in entry["break_periods"]],
+        }
+        for entry in timesheet["time_entries"]
+    ]
+
+
+def writes(statements: list) -> list:
+    return [sql for sql in statements if sql.split()[0] in ("INSERT", "UPDATE", "DELETE")]
+
+
+def test_week_sync_writes_only_the_diff():
+    engine, ids = make_client_and_ids()
+    path = f"/api/v1/timesheets/{ids['draft']}"
+    with isolated_app(engine) as client, capture_statements() as statements:
+        headers = auth(ids["consultant"])
+        assert client.post(f"{path}/entries:batch", json={"entries": week(range(9, 13))}, headers=headers).status_code == 201
+        entries = desired_state(client.get(path, headers=headers).json())
+
+        statements.clear()
+        response = client.put(f"{path}/week", json={"entries": entries}, headers=headers)
+        assert response.status_code == 200, response.text
+        assert response.json()["changes"]["unchanged"] == len(entries)
+        assert writes(statements) == []
+
+        entries[1]["out_time"] = "18:30:00"
+        removed = entries.pop()
+        entries.append({"date": "2024-01-14", "in_time": "10:00", "out_time": "12:00"})
+        statements.clear()
+        response = client.put(f"{path}/week", json={"entries": entries}, headers=headers)
+        assert response.status_code == 200, response.text
+        changes = response.json()["changes"]
+        assert changes["updated"] == [entries[1]["id"]]
+        assert changes["deleted"] == [removed["id"]]
+        assert len(changes["created"]) == 1 and changes["unchanged"] == len(entries) - 2
+        assert [sql.split()[0] for sql in writes(statements) if "timeentry" in sql.split()[:3]] == ["DELETE", "UPDATE", "INSERT"]
+        assert len(response.json()["timesheet"]["time_entries"]) == len(entries)
+    with Session(engine) as session:
+        assert verify(session) == []
+
+
+def test_week_sync_rejects_invalid_week():
+    engine, ids = make_client_and_ids()
+    path = f"/api/v1/timesheets/{ids['draft']}"
+    with isolated_app(engine) as client:
+        headers = auth(ids["consultant"])
+        entries = desired_state(client.get(path, headers=headers).json())
+        entries.append({"date": entries[0]["date"], "in_time": "17:00", "out_time": "19:00"})
+        entries.append({"id": 9999, "date": "2024-01-12", "in_time": "09:00", "out_time": "10:00"})
+        response = client.put(f"{path}/week", json={"entries": entries}, headers=headers)
+        assert response.status_code == 400
+        assert [item["index"] for item in response.json()["detail"]["errors"]] == [1, 2]
+        assert len(client.get(path, headers=headers).json()["time_entries"]) == 1
+
+
+if __name__ == "__main__":
+    for test in (test_week_sync_writes_only_the_diff, test_week_sync_rejects_invalid_week):
+        test()
+        print(f"✅ {test.__name__}")
@@ -1,9 +1,11 @@
-import React, { useState, useEffect } from 'react';
+import React, { useState, useEffect, useRef } from 'react';
 // If using Material-UI, uncomment the following imports:
 // import { Tabs, Tab, Box, Typography } from '@mui/material';
 import { useAuth } from '../utils/AuthContext';
-import { fetchTimesheets, approveTimesheet, rejectTimesheet } from '../services/timesheetService';
-import { fetchTimeOffRequests, approveTimeOff, rejectTimeOff } from '../services/timeOffService';
+import { fetchTimesheets, approveTimesheet, rejectTimesheet, approveTimesheetsBatch, rejectTimesheetsBatch } from '../services/timesheetService';
+import { fetchTimeOffRequests, approveTimeOff, rejectTimeOff, approveTimeOffBatch, rejectTimeOffBatch } from '../services/timeOffService';
+import { fetchApprovalSummary } from '../services/approvalService';
+import { subscribeToEvents } from '../services/eventsService';
 // Material-UI imports
 import { Table, TableBody, TableCell, TableContainer, TableHead, TableRow, Paper, Button, CircularProgress, Snackbar, Alert, Accordion, AccordionSummary, AccordionDetails, Typography } from '@mui/material';
 import ExpandMoreIcon from '@mui/icons-material/ExpandMore';
@@ -11,12 +13,16 @@ import { useTheme } from '@mui/material/styles';
 
 const ApprovalsPage: React.FC = () => {
   const [activeTab, setActiveTab] = useState(0);
-  const [timesheets, setTimesheets] = useState<any[]>([]);
+  const [summary, setSummary] = useState<any | null>(null);
+  // Timesheets per employee id, fetched when that employee's group is first expanded
+  const [employeeTimesheets, setEmployeeTimesheets] = useState<Record<number, any[]>>({});
+  const [expanded, setExpanded] = useState<number[]>([]);
   const [timeOffRequests, setTimeOffRequests] = useState<any[]>([]);
   const [loadingTimesheets, setLoadingTimesheets] = useState(true);
   const [loadingTimeOff, setLoadingTimeOff] = useState(true);
   const [error, setError] = useState<string | null>(null);
   const [actionLoading, setActionLoading] = useState<number | null>(null); // id of item being actioned
+  const [batchLoading, setBatchLoading] = useState<string | null>(null); // key of group being actioned
   const [snackbar, setSnackbar] = useState<{ open: boolean; message: string; severity: 'success' | 'error' }>({ open: false, message: '', severity: 'success' });
 
   const { token } = useAuth();
@@ -27,12 +33,15 @@ const ApprovalsPage: React.FC = () => {
     setLoadingTimeOff(true);
     setError(null);
     try {
-      const [tsData, toData] = await Promise.all([
-        fetchTimesheets(token!),
+      const [summaryData, toData] = await Promise.all([
+        fetchApprovalSummary(token!),
         fetchTimeOffRequests(token!)
       ]);
-      setTimesheets(tsData);
+      setSummary(summaryData);
       setTimeOffRequests(toData);
+      // Groups already open are refreshed, the rest load on expand
+      setEmployeeTimesheets({});
+      expanded.forEach((employeeId) => loadEmployeeTimesheets(employeeId));
     } catch (err: any) {
       setError('Failed to fetch approvals data.');
     } finally {
@@ -41,17 +50,58 @@ const ApprovalsPage: React.FC = () => {
     }
   };
 
+  const loadEmployeeTimesheets = async (employeeId: number) => {
+    const data = await fetchTimesheets(token!, { employee_id: employeeId, status: 'submitted', view: 'summary' });
+    setEmployeeTimesheets((prev) => ({ ...prev, [employeeId]: data }));
+    return data;
+  };
+
+  const handleExpand = (employeeId: number, isExpanded: boolean) => {
+    setExpanded((prev) => isExpanded ? [...prev, employeeId] : prev.filter((id) => id !== employeeId));
+    if (isExpanded && !employeeTimesheets[employeeId]) {
+      loadEmployeeTimesheets(employeeId).catch(() => setError('Failed to fetch timesheets.'));
+    }
+  };
+
   useEffect(() => {
     fetchData();
     // eslint-disable-next-line
   }, [token]);
 
+  // Server-pushed changes replace refetching after every action; bursts (batch decisions) refresh once
+  const eventsOpen = useRef(false);
+  const refreshTimer = useRef<ReturnType<typeof setTimeout> | null>(null);
+  const fetchDataRef = useRef(fetchData);
+  fetchDataRef.current = fetchData;
+  const scheduleRefresh = () => {
+    if (refreshTimer.current) clearTimeout(refreshTimer.current);
+    refreshTimer.current = setTimeout(() => fetchDataRef.current(), 300);
+  };
+
+  useEffect(() => {
+    if (!token) return;
+    const source = subscribeToEvents(token, scheduleRefresh, scheduleRefresh);
+    source.onopen = () => { eventsOpen.current = true; };
+    source.onerror = () => { eventsOpen.current = false; };
+    return () => {
+      source.close();
+      eventsOpen.current = false;
+      if (refreshTimer.current) clearTimeout(refreshTimer.current);
+    };
+    // eslint-disable-next-line
+  }, [token]);
+
+  // After our own action: the event stream brings the change, unless it is not connected
+  const refreshAfterAction = () => {
+    if (!eventsOpen.current) fetchData();
+  };
+
   const handleApproveTimesheet = async (id: number) => {
     setActionLoading(id);
     try {
       await approveTimesheet(id, token!);
       setSnackbar({ open: true, message: 'Timesheet approved!', severity: 'success' });
-      fetchData();
+      refreshAfterAction();
     } catch {
       setSnackbar({ open: true, message: 'Failed to approve timesheet.', severity: 'error' });
     } finally {
@@ -64,7 +114,7 @@ const ApprovalsPage: React.FC = () => {
     try {
       await rejectTimesheet(id, token!);
       setSnackbar({ open: true, message: 'Timesheet rejected.', severity: 'success' });
-      fetchData();
+      refreshAfterAction();
     } catch {
       setSnackbar({ open: true, message: 'Failed to reject timesheet.', severity: 'error' });
     } finally {
@@ -77,7 +127,7 @@ const ApprovalsPage: React.FC = () => {
     try {
       await approveTimeOff(id, token!);
       setSnackbar({ open: true, message: 'Time off approved!', severity: 'success' });
-      fetchData();
+      refreshAfterAction();
     } catch {
       setSnackbar({ open: true, message: 'Failed to approve time off.', severity: 'error' });
     } finally {
@@ -90,7 +140,7 @@ const ApprovalsPage: React.FC = () => {
     try {
       await rejectTimeOff(id, token!);
       setSnackbar({ open: true, message: 'Time off rejected.', severity: 'success' });
-      fetchData();
+      refreshAfterAction();
     } catch {
       setSnackbar({ open: true, message: 'Failed to reject time off.', severity: 'error' });
     } finally {
@@ -98,13 +148,31 @@ const ApprovalsPage: React.FC = () => {
     }
   };
 
-  // Group timesheets by employee
-  const groupedTimesheets = timesheets.reduce((acc: Record<string, any[]>, ts) => {
-    const empName = ts.employee?.full_name || ts.employee_name || 'N/A';
-    if (!acc[empName]) acc[empName] = [];
-    acc[empName].push(ts);
-    return acc;
-  }, {});
+  const handleBatch = async (key: string, ids: number[], action: (ids: number[], token: string) => Promise<any>, label: string) => {
+    setBatchLoading(key);
+    try {
+      const report = await action(ids, token!);
+      const notApplied = report.skipped + report.forbidden;
+      setSnackbar({
+        open: true,
+        message: `${report.applied} ${label}${notApplied ? `, ${notApplied} skipped` : ''}.`,
+        severity: report.applied > 0 || notApplied === 0 ? 'success' : 'error'
+      });
+      refreshAfterAction();
+    } catch {
+      setSnackbar({ open: true, message: `Failed: ${label}.`, severity: 'error' });
+    } finally {
+      setBatchLoading(null);
+    }
+  };
+
+  const handleBatchEmployee = async (employeeId: number, action: (ids: number[], token: string) => Promise<any>, label: string) => {
+    // A collapsed group has not fetched its timesheets yet
+    const empTimesheets = employeeTimesheets[employeeId] || await loadEmployeeTimesheets(employeeId);
+    await handleBatch(String(employeeId), empTimesheets.map((ts: any) => ts.id), action, label);
+  };
+
+  const employeeSummaries: any[] = summary?.employees.filter((emp: any) => emp.pending_timesheets > 0) || [];
 
   return (
     <div style={{ maxWidth: 900, margin: '0 auto', padding: 24 }}>
@@ -149,28 +217,62 @@ const ApprovalsPage: React.FC = () => {
             {loadingTimesheets ? (
               <CircularProgress />
             ) : (
-              Object.keys(groupedTimesheets).length === 0 ? (
+              employeeSummaries.length === 0 ? (
                 <Paper style={{ padding: 24, textAlign: 'center' }}>No timesheets pending approval.</Paper>
               ) : (
-                Object.entries(groupedTimesheets).map(([empName, empTimesheets]) => (
-                  <Accordion key={empName} defaultExpanded={true} style={{ marginBottom: 12 }}>
+                employeeSummaries.map((emp) => (
+                  <Accordion
+                    key={emp.employee.id}
+                    expanded={expanded.includes(emp.employee.id)}
+                    onChange={(_, isExpanded) => handleExpand(emp.employee.id, isExpanded)}
+                    style={{ marginBottom: 12 }}
+                  >
                     <AccordionSummary expandIcon={<ExpandMoreIcon />}>
-                      <Typography variant="subtitle1" fontWeight={600}>{empName}</Typography>
+                      <Typography variant="subtitle1" fontWeight={600}>{emp.employee.full_name}</Typography>
+                      <Typography variant="body2" color="text.secondary" style={{ marginLeft: 'auto', marginRight: 16, alignSelf: 'center' }}>
+                        {emp.pending_timesheets} pending · {emp.weeks.length} {emp.weeks.length === 1 ? 'week' : 'weeks'} · {emp.total_hours.toFixed(1)} h
+                      </Typography>
                     </AccordionSummary>
                     <AccordionDetails>
+                      <div style={{ display: 'flex', justifyContent: 'flex-end', marginBottom: 8 }}>
+                        <Button
+                          variant="outlined"
+                          color="primary"
+                          size="small"
+                          style={{ marginRight: 8 }}
+                          disabled={batchLoading === String(emp.employee.id)}
+                          onClick={() => handleBatchEmployee(emp.employee.id, approveTimesheetsBatch, 'timesheets approved')}
+                        >
+                          Approve all
+                        </Button>
+                        <Button
+                          variant="outlined"
+                          color="secondary"
+                          size="small"
+                          disabled={batchLoading === String(emp.employee.id)}
+                          onClick={() => handleBatchEmployee(emp.employee.id, rejectTimesheetsBatch, 'timesheets rejected')}
+                        >
+                          Reject all
+                        </Button>
+                      </div>
+                      {!employeeTimesheets[emp.employee.id] ? (
+                        <CircularProgress size={24} />
+                      ) : (
                       <TableContainer component={Paper} elevation={0}>
                         <Table>
                           <TableHead>
                             <TableRow>
                               <TableCell>Week Start</TableCell>
+                              <TableCell>Hours</TableCell>
                               <TableCell>Status</TableCell>
                               <TableCell align="right">Actions</TableCell>
                             </TableRow>
                           </TableHead>
                           <TableBody>
-                            {empTimesheets.map((ts) => (
+                            {employeeTimesheets[emp.employee.id].map((ts) => (
                               <TableRow key={ts.id}>
                                 <TableCell>{ts.week_start}</TableCell>
+                                <TableCell>{ts.total_hours.toFixed(1)}</TableCell>
                                 <TableCell>{ts.status}</TableCell>
                                 <TableCell align="right">
                                   <Button
@@ -198,6 +300,7 @@ const ApprovalsPage: React.FC = () => {
                           </TableBody>
                         </Table>
                       </TableContainer>
+                      )}
                     </AccordionDetails>
                   </Accordion>
                 ))
@@ -211,6 +314,30 @@ const ApprovalsPage: React.FC = () => {
             {loadingTimeOff ? (
               <CircularProgress />
             ) : (
+              <>
+              {timeOffRequests.length > 0 && (
+                <div style={{ display: 'flex', justifyContent: 'flex-end', marginBottom: 8 }}>
+                  <Button
+                    variant="outlined"
+                    color="primary"
+                    size="small"
+                    style={{ marginRight: 8 }}
+                    disabled={batchLoading === 'time_off'}
+                    onClick={() => handleBatch('time_off', timeOffRequests.map((to) => to.id), approveTimeOffBatch, 'time off requests approved')}
+                  >
+                    Approve all
+                  </Button>
+                  <Button
+                    variant="outlined"
+                    color="secondary"
+                    size="small"
+                    disabled={batchLoading === 'time_off'}
+                    onClick={() => handleBatch('time_off', timeOffRequests.map((to) => to.id), rejectTimeOffBatch, 'time off requests rejected')}
+                  >
+                    Reject all
+                  </Button>
+                </div>
+              )}
               <TableContainer component={Paper}>
                 <Table>
                   <TableHead>
@@ -259,6 +386,7 @@ const ApprovalsPage: React.FC = () => {
                   </TableBody>
                 </Table>
               </TableContainer>
+              </>
             )}
           </div>
         )}
@@ -111,7 +111,9 @@ const TimesheetsPage: React.FC = () => {
       setTimesheets(data);
       setSnackbar({ open: true, message: 'Entry added!', severity: 'success' });
     } catch (err: any) {
-      setSnackbar({ open: true, message: err?.response?.data?.detail || 'Failed to add entry', severity: 'error' });
+      // Entry conflicts come back as { message, errors }; other failures as a string
+      const detail = err?.response?.data?.detail;
+      setSnackbar({ open: true, message: detail?.message || detail || 'Failed to add entry', severity: 'error' });
     }
   };
 
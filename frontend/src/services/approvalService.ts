@@ -0,0 +1,12 @@
+import axios from 'axios';
+
+export async function fetchApprovalSummary(token: string) {
+  // Counts and hours per employee and week; the timesheets themselves are fetched per group
+  const response = await axios.get(
+    '/api/v1/approvals/summary',
+    {
+      headers: { Authorization: `Bearer ${token}` }
+    }
+  );
+  return response.data;
+}
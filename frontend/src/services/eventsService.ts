@@ -0,0 +1,22 @@
+// Change notifications pushed by the server (GET /api/v1/events), instead of polling lists.
+// EventSource cannot send headers, so the token goes in the query string; it reconnects
+// by itself and resumes from the last event id.
+export const CHANGE_EVENTS = [
+  'timesheet.submitted',
+  'timesheet.approved',
+  'timesheet.rejected',
+  'timesheet.entry_added',
+  'time_off.submitted',
+  'time_off.approved',
+  'time_off.rejected',
+];
+
+export function subscribeToEvents(token: string, onChange: (type: string, data: any) => void, onReset: () => void) {
+  const source = new EventSource(`/api/v1/events/?access_token=${encodeURIComponent(token)}`);
+  CHANGE_EVENTS.forEach((type) => {
+    source.addEventListener(type, (event) => onChange(type, JSON.parse((event as MessageEvent).data)));
+  });
+  // Missed events could not be replayed: reload everything
+  source.addEventListener('reset', () => onReset());
+  return source;
+}
@@ -0,0 +1,19 @@
+import axios from 'axios';
+
+// List endpoints return one keyset page at a time; the X-Next-Cursor header
+// carries the cursor of the next page and is absent on the last one
+const NEXT_CURSOR_HEADER = 'x-next-cursor';
+
+export async function fetchAllPages(url: string, token: string, params?: Record<string, any>) {
+  const rows: any[] = [];
+  let cursor: string | undefined;
+  do {
+    const response = await axios.get(url, {
+      params: cursor ? { ...params, cursor } : params,
+      headers: { Authorization: `Bearer ${token}` }
+    });
+    rows.push(...response.data);
+    cursor = response.headers[NEXT_CURSOR_HEADER];
+  } while (cursor);
+  return rows;
+}
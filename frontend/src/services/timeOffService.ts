@@ -1,4 +1,5 @@
 import axios from 'axios';
+import { fetchAllPages } from './pagination';
 
 export async function createTimeOffRequest(data: any, token: string) {
   const response = await axios.post(
@@ -12,13 +13,7 @@ export async function createTimeOffRequest(data: any, token: string) {
 }
 
 export async function fetchTimeOffRequests(token: string) {
-  const response = await axios.get(
-    '/api/v1/time_off/',
-    {
-      headers: { Authorization: `Bearer ${token}` }
-    }
-  );
-  return response.data;
+  return fetchAllPages('/api/v1/time_off/', token);
 }
 
 export async function deleteTimeOffRequest(requestId: number, token: string) {
@@ -51,4 +46,27 @@ export async function rejectTimeOff(requestId: number, token: string) {
     }
   );
   return response.data;
+}
+
+export async function approveTimeOffBatch(ids: number[], token: string, comment?: string) {
+  // One request for many ids; the response reports each id as applied, skipped or forbidden
+  const response = await axios.post(
+    '/api/v1/time_off/approve:batch',
+    { ids, comment },
+    {
+      headers: { Authorization: `Bearer ${token}` }
+    }
+  );
+  return response.data;
+}
+
+export async function rejectTimeOffBatch(ids: number[], token: string, comment?: string) {
+  const response = await axios.post(
+    '/api/v1/time_off/reject:batch',
+    { ids, comment },
+    {
+      headers: { Authorization: `Bearer ${token}` }
+    }
+  );
+  return response.data;
 } 
\ No newline at end of file
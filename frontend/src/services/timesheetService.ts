@@ -1,4 +1,5 @@
 import axios from 'axios';
+import { fetchAllPages } from './pagination';
 
 export async function createTimesheet(data: any, token: string) {
   // Remove 'entries' from data if present
@@ -33,14 +34,9 @@ export async function deleteTimeEntry(timesheetId: number, entryId: number, toke
   );
 }
 
-export async function fetchTimesheets(token: string) {
-  const response = await axios.get(
-    '/api/v1/timesheets/',
-    {
-      headers: { Authorization: `Bearer ${token}` }
-    }
-  );
-  return response.data;
+export async function fetchTimesheets(token: string, params?: Record<string, any>) {
+  // Optional server-side filters, e.g. { employee_id, status, view: 'summary' }
+  return fetchAllPages('/api/v1/timesheets/', token, params);
 }
 
 export async function submitTimesheet(timesheetId: number, token: string) {
@@ -76,4 +72,27 @@ export async function rejectTimesheet(timesheetId: number, token: string) {
     }
   );
   return response.data;
+}
+
+export async function approveTimesheetsBatch(ids: number[], token: string, comment?: string) {
+  // One request for many ids; the response reports each id as applied, skipped or forbidden
+  const response = await axios.post(
+    '/api/v1/timesheets/approve:batch',
+    { ids, comment },
+    {
+      headers: { Authorization: `Bearer ${token}` }
+    }
+  );
+  return response.data;
+}
+
+export async function rejectTimesheetsBatch(ids: number[], token: string, comment?: string) {
+  const response = await axios.post(
+    '/api/v1/timesheets/reject:batch',
+    { ids, comment },
+    {
+      headers: { Authorization: `Bearer ${token}` }
+    }
+  );
+  return response.data;
 } 
\ No newline at end of file